@@ -0,0 +1,15 @@
+"""공용 테스트 설정 - 앱 모듈(파일명에 공백/한글이 있어 import 문 대신 경로로 로드)"""
+import importlib.util
+import os
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "실거래가 비교 프로그램 -R4.py")
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    spec = importlib.util.spec_from_file_location("real_estate_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
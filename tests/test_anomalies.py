@@ -0,0 +1,46 @@
+"""해제/이상거래 표시 테스트 - 단지/동 중위가 대비 범위, 직거래 하한, 이전 캐시 호환"""
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+
+
+def region_frame(app_module, trades):
+    columns = {name: [] for name in app_module.REGION_MONTH_COLUMNS}
+    for apt_name, price, extra in trades:
+        row = dict({'apt_name': apt_name, 'dong': '대치동', 'area': 84.97, 'date': '2024-03-02', 'price': price,
+                    'monthly_rent': 0, 'floor': 5, 'build_year': 2000, 'jibun': '1', 'parcel_key': ''}, **extra)
+        for name in columns:
+            columns[name].append(row.get(name, ''))
+    return app_module.region_month_frame(columns)
+
+
+def test_flags_cancelled_and_outlier_deals(app_module):
+    df = region_frame(app_module, [
+        ('가단지', 100000, {}),
+        ('가단지', 102000, {}),
+        ('가단지', 98000, {}),
+        ('가단지', 40000, {}),                            # 단지 중위가의 60% 미만
+        ('가단지', 60000, {'dealing_gbn': '직거래'}),      # 직거래는 80% 미만이면 이상거래
+        ('가단지', 61000, {'dealing_gbn': '중개거래'}),
+        ('가단지', 100000, {'cdeal_type': 'O'}),           # 해제 거래
+        ('나단지', 300000, {}),                           # 단지 거래 부족 -> 동 중위가 기준
+    ])
+
+    assert df['is_cancelled'].tolist() == [False] * 6 + [True, False]
+    assert df['is_outlier'].tolist() == [False, False, False, True, True, False, False, True]
+    assert app_module.anomaly_mask(df).tolist() == [False, False, False, True, True, False, True, True]
+
+
+def test_anomaly_mask_handles_legacy_frames(app_module):
+    legacy = pd.DataFrame({'price': [1, 2, 3]})
+    assert not app_module.anomaly_mask(legacy).any()
+
+    partial = pd.DataFrame({'price': [1, 2], 'is_outlier': [None, True]})
+    assert app_module.anomaly_mask(partial).tolist() == [False, True]
+
+
+def test_empty_frame_gets_flag_columns(app_module):
+    df = region_frame(app_module, [])
+    assert df.empty
+    assert {'is_cancelled', 'is_outlier'} <= set(df.columns)
@@ -0,0 +1,48 @@
+"""단지별 엑셀 거래내역 저장 테스트 - 추가 컬럼(필지 키/이상거래 표시)이 있어도 저장/복원"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("xlsxwriter")
+pytest.importorskip("openpyxl")
+
+
+def collected_frame(data_type):
+    trades = [
+        {'date': datetime(2024, 3, 2), 'price': 91000, 'floor': 7, 'area': 84.97,
+         'parcel_key': '1111010100100120000', 'dealing_gbn': '중개거래', 'is_cancelled': False, 'is_outlier': False},
+        {'date': datetime(2024, 5, 9), 'price': 95500, 'floor': 12, 'area': 84.97,
+         'parcel_key': '1111010100100120000', 'dealing_gbn': '직거래', 'is_cancelled': False, 'is_outlier': True},
+    ]
+    if data_type != "purchase":
+        for trade in trades:
+            trade['rent_type'] = '전세'
+    return pd.DataFrame(trades)
+
+
+@pytest.mark.parametrize("data_type", ["purchase", "jeonse"])
+def test_write_apt_workbook_with_extra_columns(app_module, tmp_path, data_type):
+    added = []
+    app = SimpleNamespace(history_store=SimpleNamespace(add=lambda *args: added.append(args)))
+    apt_info = {'apt_name': '테스트 아파트', 'area': '84.97', 'sido': '서울특별시', 'sigungu': '종로구', 'dong': '청운동'}
+    excel_path = str(tmp_path / f"test_{data_type}.xlsx")
+
+    app_module.RealEstateAnalyzerApp.write_apt_workbook(
+        app, collected_frame(data_type), apt_info, data_type, excel_path, "digest")
+
+    sheet = pd.read_excel(excel_path, sheet_name='거래내역', engine='openpyxl')
+    assert list(sheet.columns) == list(app_module.APT_WORKBOOK_COLUMNS[data_type].values())
+    assert list(sheet['거래일자']) == ['2024-05-09', '2024-03-02']  # 최신순
+    assert len(added) == 1
+
+    restored = app_module.trades_from_workbook(excel_path, data_type)
+    assert [(t['date'], t['price'], t['floor'], t['area']) for t in restored] == [
+        (datetime(2024, 3, 2), 91000, 7, 84.97), (datetime(2024, 5, 9), 95500, 12, 84.97)]
+
+
+def test_apt_workbook_trades_empty(app_module):
+    sheet = app_module.apt_workbook_trades(pd.DataFrame(), "purchase")
+    assert sheet.empty
+    assert list(sheet.columns) == ['거래일자', '가격(만원)', '층', '면적(㎡)']
@@ -0,0 +1,30 @@
+"""차트 이미지 캐시 테스트 - 적중 시 복사, 용량 초과 시 오래 쓰지 않은 파일부터 삭제"""
+import os
+
+
+def write_image(path, size):
+    path.write_bytes(b'x' * size)
+    return str(path)
+
+
+def test_fetch_copies_cached_image(app_module, tmp_path):
+    cache = app_module.ChartArtifactCache(str(tmp_path / 'charts'))
+    assert not cache.fetch('abc_100', str(tmp_path / 'miss.jpg'))
+
+    cache.store('abc_100', write_image(tmp_path / 'rendered.jpg', 10))
+
+    target = tmp_path / 'preview.jpg'
+    assert cache.fetch('abc_100', str(target))
+    assert target.read_bytes() == b'x' * 10
+
+
+def test_store_evicts_least_recently_used(app_module, tmp_path):
+    cache = app_module.ChartArtifactCache(str(tmp_path / 'charts'), max_bytes=250)
+    for i, key in enumerate(['a', 'b']):
+        cache.store(key, write_image(tmp_path / f'{key}.jpg', 100))
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    assert cache.fetch('a', str(tmp_path / 'use_a.jpg'))  # a를 최근 사용으로 갱신
+
+    cache.store('c', write_image(tmp_path / 'c.jpg', 100))
+
+    assert sorted(os.listdir(tmp_path / 'charts')) == ['a.jpg', 'c.jpg']
@@ -0,0 +1,23 @@
+"""점도표 표본 추출 테스트 - 점 개수 상한 준수, 최고/최저가 유지"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+
+@pytest.mark.parametrize("budget", [1, 2, 200, 1000, 5000])
+def test_scatter_sample_respects_budget(app_module, budget):
+    rng = np.random.default_rng(7)
+    x = rng.uniform(0, 10000, 50000)
+    y = rng.lognormal(10, 0.5, 50000)
+
+    keep = app_module.scatter_sample_indices(x, y, budget)
+
+    assert len(keep) <= budget + 2
+    assert np.argmax(y) in keep and np.argmin(y) in keep
+    assert np.array_equal(keep, app_module.scatter_sample_indices(x, y, budget))  # 같은 입력이면 같은 표본
+
+
+def test_scatter_sample_keeps_small_series(app_module):
+    x = np.arange(50, dtype=float)
+    assert np.array_equal(app_module.scatter_sample_indices(x, x * 2, 200), np.arange(50))
@@ -0,0 +1,73 @@
+"""엑셀 저장 대기열 테스트 - 대기 중 같은 키는 마지막 요청만 저장, 저장된 지문은 생략 (다음 실행 포함)"""
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def make_queue(app_module):
+    queues = []
+
+    def make(*args, **kwargs):
+        queue = app_module.ExcelExportQueue(*args, **kwargs)
+        queues.append(queue)
+        return queue
+    yield make
+    for queue in queues:
+        queue.shutdown(timeout=5)
+
+
+def write_file(path, content, log=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    if log is not None:
+        log.append(content)
+
+
+def test_pending_requests_for_same_key_coalesce(make_queue, tmp_path):
+    queue = make_queue()
+    release = threading.Event()
+    written = []
+    queue.submit('blocker', 'f0', str(tmp_path / 'blocker.xlsx'), lambda: release.wait(5))
+    path = str(tmp_path / 'a.xlsx')
+    for i in range(3):
+        assert queue.submit('a', f'f{i}', path, write_file, (path, f'v{i}', written))
+    release.set()
+
+    assert queue.flush(timeout=5)
+    assert written == ['v2']  # 대기 중 교체된 요청은 저장하지 않음
+    stats = queue.stats()
+    assert (stats['written'], stats['coalesced'], stats['depth']) == (2, 2, 0)
+
+
+def test_same_fingerprint_is_skipped_across_runs(make_queue, tmp_path):
+    state_path = str(tmp_path / 'excel_exports.json')
+    path = str(tmp_path / 'a.xlsx')
+    idle = []
+    queue = make_queue(state_path, on_idle=idle.append)
+    assert queue.submit('a', 'f1', path, write_file, (path, 'v1'))
+    assert queue.flush(timeout=5)
+    assert not queue.submit('a', 'f1', path, write_file, (path, 'v1'))
+    assert idle and idle[-1]['written'] == 1
+
+    restarted = make_queue(state_path)
+    assert not restarted.submit('a', 'f1', path, write_file, (path, 'v1'))
+    assert restarted.submit('a', 'f2', path, write_file, (path, 'v2'))  # 데이터가 바뀌면 저장
+    assert restarted.flush(timeout=5)
+    assert restarted.stats()['skipped'] == 1
+
+
+def test_missing_file_or_failed_write_is_not_skipped(make_queue, tmp_path):
+    queue = make_queue()
+    path = str(tmp_path / 'a.xlsx')
+
+    def fail():
+        raise OSError("disk full")
+    queue.submit('a', 'f1', path, fail)
+    assert queue.flush(timeout=5)
+    assert queue.stats()['failed'] == 1
+
+    assert queue.submit('a', 'f1', path, write_file, (path, 'v1'))  # 실패한 지문은 다시 저장
+    assert queue.flush(timeout=5)
+    (tmp_path / 'a.xlsx').unlink()
+    assert queue.submit('a', 'f1', path, write_file, (path, 'v1'))  # 파일이 지워졌으면 다시 저장
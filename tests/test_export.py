@@ -0,0 +1,78 @@
+"""명령줄 내보내기(--export) 테스트 - 설정 파일의 캐시 폴더 사용, 이전 버전의 null 경로 처리"""
+import gzip
+import json
+
+import pytest
+
+
+def write_settings(folder, trade_cache_path):
+    (folder / 'real_estate_analyzer_settings.json').write_text(
+        json.dumps({'trade_cache_path': trade_cache_path}), encoding='utf-8')
+
+
+def write_region_month(app_module, cache_dir, data_type, lawd_cd, deal_ymd, trades):
+    """지역-월 저장 파일 작성 (RegionMonthStore와 같은 열 단위 gzip JSON)"""
+    path = cache_dir / 'region_month' / data_type / lawd_cd / f"{deal_ymd}.json.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = {name: [trade.get(name, '') for trade in trades] for name in app_module.REGION_MONTH_COLUMNS}
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump({'data_type': data_type, 'lawd_cd': lawd_cd, 'deal_ymd': deal_ymd, 'columns': columns}, f)
+
+
+def test_export_cli_null_cache_path_uses_default(app_module, tmp_path, monkeypatch, capsys):
+    default_cache = tmp_path / 'default_cache'
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_module, 'DEFAULT_TRADE_CACHE_PATH', str(default_cache))
+    write_settings(tmp_path, None)
+
+    app_module.export_cli(['--export', str(tmp_path / 'out.csv')])
+
+    assert f"{default_cache} →" in capsys.readouterr().out
+    assert not (tmp_path / 'out.csv').exists()  # 저장된 거래 없음
+
+
+def test_export_cli_reads_settings_cache(app_module, tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    cache_dir = tmp_path / 'cache'
+    trade = {'apt_name': '테스트', 'dong': '청운동', 'area': 84.97, 'date': '2024-03-02', 'price': 91000,
+             'monthly_rent': 0, 'floor': 7, 'build_year': 2005, 'jibun': '12', 'parcel_key': '1111010100100120000',
+             'dealing_gbn': '중개거래'}
+    write_region_month(app_module, cache_dir, 'purchase', '11110', '202403', [trade])
+    write_region_month(app_module, cache_dir, 'purchase', '26110', '202403', [dict(trade, apt_name='다른 지역')])
+    monkeypatch.chdir(tmp_path)
+    write_settings(tmp_path, str(cache_dir))
+
+    app_module.export_cli(['--export', str(tmp_path / 'out.csv'), '--region', '11', '--type', 'purchase'])
+
+    exported = pd.read_csv(tmp_path / 'out.csv', encoding='utf-8-sig', dtype={'lawd_cd': str})
+    assert exported['apt_name'].tolist() == ['테스트']
+    assert exported['lawd_cd'].tolist() == ['11110']
+
+
+def test_export_region_store_filters(app_module, tmp_path):
+    pd = pytest.importorskip("pandas")
+    cache_dir = tmp_path / 'cache'
+    base = {'apt_name': '은마', 'dong': '대치동', 'area': 84.43, 'date': '2024-01-10', 'price': 230000,
+            'monthly_rent': 0, 'floor': 9, 'build_year': 1979, 'jibun': '316', 'parcel_key': '', 'dealing_gbn': '중개거래'}
+    write_region_month(app_module, cache_dir, 'purchase', '11680', '202401', [
+        base,
+        dict(base, price=231000, cdeal_type='O'),  # 해제 거래
+        dict(base, apt_name='래미안대치팰리스', price=330000),
+        dict(base, dong='개포동', apt_name='은마', price=200000),
+    ])
+    write_region_month(app_module, cache_dir, 'purchase', '11680', '202312', [dict(base, date='2023-12-05')])
+    write_region_month(app_module, cache_dir, 'jeonse', '11680', '202401', [dict(base, price=90000)])
+    out_path = tmp_path / 'out.csv'
+
+    result = app_module.export_region_store(str(cache_dir), str(out_path), data_types=('purchase',),
+                                            start_ymd='202401', apt_names=['은마'], dong='대치동',
+                                            include_anomalies=False)
+
+    exported = pd.read_csv(out_path, encoding='utf-8-sig')
+    assert (result['rows'], result['chunks']) == (1, 1)
+    assert exported[['data_type', 'deal_ymd', 'price']].values.tolist() == [['purchase', 202401, 230000]]
+
+
+def test_export_region_store_rejects_unknown_format(app_module, tmp_path):
+    with pytest.raises(ValueError):
+        app_module.export_region_store(str(tmp_path), str(tmp_path / 'out.xlsx'), fmt='xlsx')
@@ -0,0 +1,35 @@
+"""매전갭 테스트 - 매매 거래별 직전 전세가 as-of 조인, 같은 날 전세는 마지막 거래 사용"""
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+
+def trades(rows):
+    return pd.DataFrame({'date': pd.to_datetime([d for d, _ in rows]), 'price': [p for _, p in rows]})
+
+
+MAEMAE = trades([('2020-03-10', 105000), ('2020-01-01', 99000), ('2020-01-10', 100000), ('2020-02-10', 110000)])
+JEONSE = trades([('2020-02-20', 70000), ('2020-01-05', 60000), ('2020-01-05', 62000)])
+
+
+def test_gap_uses_latest_prior_jeonse(app_module):
+    gaps = app_module.compute_gap_series(MAEMAE, JEONSE)
+
+    # 전세 거래 이전의 매매(2020-01-01)는 제외
+    assert gaps['date'].dt.strftime('%Y-%m-%d').tolist() == ['2020-01-10', '2020-02-10', '2020-03-10']
+    assert gaps['jeonse_price'].tolist() == [62000, 62000, 70000]
+    assert gaps['gap'].tolist() == [38000, 48000, 35000]
+    assert app_module.min_gap_from_series(gaps) == (35000, pd.Timestamp('2020-03-10'))
+
+
+def test_gap_since_filters_both_sides(app_module):
+    gaps = app_module.compute_gap_series(MAEMAE, JEONSE, since=datetime(2020, 2, 1))
+    assert gaps['gap'].tolist() == [35000]
+
+
+def test_gap_without_jeonse(app_module):
+    gaps = app_module.compute_gap_series(MAEMAE, JEONSE.iloc[0:0])
+    assert gaps.empty
+    assert app_module.min_gap_from_series(gaps) == (None, None)
@@ -0,0 +1,37 @@
+"""히스토리 색인(JSONL) 테스트 - 추가분만 다시 읽기, 같은 이미지 대체, 삭제 표시, 정리 후 재읽기"""
+import json
+
+
+def test_items_replace_and_delete(app_module, tmp_path):
+    index = app_module.HistoryIndex(str(tmp_path / 'history_index.jsonl'))
+    index.add({'image_path': 'a.jpg', 'apt_name': '첫 기록'})
+    index.add_many([{'image_path': 'b.jpg'}, {'image_path': 'a.jpg', 'apt_name': '다시 기록'}])
+    index.remove(['b.jpg'])
+
+    assert index.items() == [{'image_path': 'a.jpg', 'apt_name': '다시 기록'}]
+
+
+def test_refresh_reads_lines_appended_by_another_writer(app_module, tmp_path):
+    path = tmp_path / 'history_index.jsonl'
+    index = app_module.HistoryIndex(str(path))
+    index.add({'image_path': 'a.jpg'})
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'image_path': 'b.jpg'}) + '\n')
+        f.write('{"image_path": "c.jpg"')  # 쓰는 중인 줄은 다음에 읽음
+
+    assert [item['image_path'] for item in index.items()] == ['a.jpg', 'b.jpg']
+
+
+def test_compact_rewrites_only_live_items(app_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'HISTORY_INDEX_COMPACT_MIN', 3)
+    path = tmp_path / 'history_index.jsonl'
+    index = app_module.HistoryIndex(str(path))
+    for _ in range(3):
+        index.add({'image_path': 'a.jpg'})
+    index.add({'image_path': 'b.jpg'})
+    index.remove(['b.jpg'])
+
+    assert path.read_text(encoding='utf-8').splitlines() == [json.dumps({'image_path': 'a.jpg'})]
+    # 다른 인스턴스도 정리된 파일을 처음부터 다시 읽음
+    assert app_module.HistoryIndex(str(path)).items() == [{'image_path': 'a.jpg'}]
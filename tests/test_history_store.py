@@ -0,0 +1,80 @@
+"""히스토리 엑셀 보관소 테스트 - 내용 해시 중복 제거, 키별 최근 N개/전체 용량 보관 정책, 이전 파일 이전"""
+import os
+
+import pytest
+
+
+@pytest.fixture
+def history_dir(tmp_path):
+    folder = tmp_path / 'history'
+    folder.mkdir()
+    return folder
+
+
+def add_version(app_module, store, tmp_path, key, content, created):
+    """내용이 content인 엑셀을 key로 추가하고 생성 시각을 created로 고정"""
+    source = tmp_path / 'source.xlsx'
+    source.write_bytes(content)
+    path = store.add(str(source), key, app_module.file_content_hash(str(source)), f"{key}_{created}.xlsx")
+    wait_compaction(store)
+    for entry in store._entries:
+        if store.entry_path(entry) == path:
+            entry['created'] = created
+    return path
+
+
+def wait_compaction(store):
+    if store._compact_thread is not None:
+        store._compact_thread.join(timeout=5)
+
+
+def test_add_same_content_reuses_entry(app_module, history_dir, tmp_path):
+    store = app_module.HistoryStore(str(history_dir))
+    first = add_version(app_module, store, tmp_path, 'history_a', b'v1', 1)
+    again = add_version(app_module, store, tmp_path, 'history_a', b'v1', 2)
+
+    assert again == first
+    assert len(store._entries) == 1
+
+
+def test_compact_keeps_latest_n_per_key(app_module, history_dir, tmp_path):
+    store = app_module.HistoryStore(str(history_dir), keep_per_key=10)
+    for i in range(4):
+        add_version(app_module, store, tmp_path, 'history_a', f'a{i}'.encode(), i)
+    add_version(app_module, store, tmp_path, 'history_b', b'b0', 0)
+
+    store.keep_per_key = 2
+    store.compact()
+
+    kept = sorted((entry['key'], entry['created']) for entry in store._entries)
+    assert kept == [('history_a', 2), ('history_a', 3), ('history_b', 0)]
+    assert sorted(name for name in os.listdir(history_dir) if name.endswith('.xlsx')) == [
+        'history_a_2.xlsx', 'history_a_3.xlsx', 'history_b_0.xlsx']
+    objects = [name for _, _, files in os.walk(history_dir / 'objects') for name in files]
+    assert len(objects) == 3  # 참조 없는 실제 파일 삭제
+
+
+def test_compact_max_bytes_drops_oldest_but_keeps_latest_per_key(app_module, history_dir, tmp_path):
+    store = app_module.HistoryStore(str(history_dir), keep_per_key=10)
+    add_version(app_module, store, tmp_path, 'history_a', b'a' * 100, 1)
+    add_version(app_module, store, tmp_path, 'history_b', b'b' * 100, 2)
+    add_version(app_module, store, tmp_path, 'history_a', b'A' * 100, 3)
+    add_version(app_module, store, tmp_path, 'history_c', b'c' * 100, 4)
+
+    store.max_bytes = 150  # 키별 최신 항목 3개(300바이트)는 용량을 넘어도 유지
+    store.compact()
+
+    assert sorted((entry['key'], entry['created']) for entry in store._entries) == [
+        ('history_a', 3), ('history_b', 2), ('history_c', 4)]
+
+
+def test_legacy_files_are_adopted_and_deduplicated(app_module, history_dir):
+    (history_dir / 'history_a_84m2_매매_20240101_120000.xlsx').write_bytes(b'same')
+    (history_dir / 'history_a_84m2_매매_20240102_120000.xlsx').write_bytes(b'same')
+
+    store = app_module.HistoryStore(str(history_dir))
+    store.compact()
+
+    assert {entry['key'] for entry in store._entries} == {'history_a_84m2_매매'}
+    assert len({entry['object'] for entry in store._entries}) == 1
+    assert os.path.exists(history_dir / 'history_store.json')
@@ -0,0 +1,68 @@
+"""레이블 배치 테스트 - 겹친 주석 분리, 같은 입력은 캐시 재사용, 예산 초과 시 캐시하지 않음"""
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.fixture
+def placements(app_module, monkeypatch):
+    cache = OrderedDict()
+    monkeypatch.setattr(app_module, '_label_placements', cache)
+    return cache
+
+
+def overlapping_annotations():
+    pytest.importorskip("matplotlib")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 4), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    annotations = [ax.annotate(f"최고가 {i}억", xy=(5, 5), xytext=(0, 10), textcoords='offset points')
+                   for i in range(3)]
+    return ax, annotations
+
+
+def text_boxes(ax, annotations):
+    from matplotlib.text import Text
+
+    renderer = ax.figure.canvas.get_renderer()
+    boxes = []
+    for ann in annotations:
+        ann.update_positions(renderer)
+        boxes.append(tuple(Text.get_window_extent(ann, renderer).extents))
+    return boxes
+
+
+def test_box_overlap(app_module):
+    assert app_module._box_overlap((0, 0, 10, 10), (5, 5, 15, 15)) == 25
+    assert app_module._box_overlap((0, 0, 10, 10), (10, 0, 20, 10)) == 0.0
+
+
+def test_overlapping_labels_are_separated_and_cached(app_module, placements, capsys):
+    ax, annotations = overlapping_annotations()
+
+    app_module.place_labels(ax, annotations)
+
+    boxes = text_boxes(ax, annotations)
+    assert all(app_module._box_overlap(a, b) == 0 for i, a in enumerate(boxes) for b in boxes[i + 1:])
+    assert len(placements) == 1
+    offsets = [tuple(ann.xyann) for ann in annotations]
+
+    ax2, annotations2 = overlapping_annotations()
+    app_module.place_labels(ax2, annotations2)
+    assert "레이블 배치 캐시 사용" in capsys.readouterr().out
+    assert [tuple(ann.xyann) for ann in annotations2] == offsets
+
+
+def test_exhausted_budget_is_not_cached(app_module, placements, capsys):
+    ax, annotations = overlapping_annotations()
+
+    app_module.place_labels(ax, annotations, max_iterations=1)
+
+    assert "예산 초과" in capsys.readouterr().out
+    assert len(placements) == 0
+    assert [tuple(ann.xyann) for ann in annotations][1:] == [(0, 10), (0, 10)]  # 남은 레이블은 원래 위치
@@ -0,0 +1,47 @@
+"""법정동 코드 파일 읽기 테스트 - 같은 이름 시군구 구분, 폐지 동 제외, 필지 키용 코드표"""
+import pytest
+
+LAWDONG_LINES = [
+    "법정동코드\t법정동명\t폐지여부",
+    "1100000000\t서울특별시\t존재",
+    "1114000000\t서울특별시 중구\t존재",
+    "1114010100\t서울특별시 중구 무교동\t존재",
+    "1114010200\t서울특별시 중구 옛동\t폐지",
+    "1150000000\t서울특별시 강서구\t존재",
+    "1150010300\t서울특별시 강서구 화곡동\t존재",
+    "2600000000\t부산광역시\t존재",
+    "2611000000\t부산광역시 중구\t존재",
+    "2611010100\t부산광역시 중구 중앙동1가\t존재",
+]
+
+
+@pytest.fixture
+def lawdong_file(tmp_path):
+    path = tmp_path / 'lawdong.txt'
+    path.write_text('\n'.join(LAWDONG_LINES), encoding='cp949')
+    return str(path)
+
+
+def test_duplicate_sigungu_names_get_sido_suffix(app_module, lawdong_file):
+    data = app_module.read_lawdong_file(lawdong_file)
+
+    assert data['sido_list'] == ['부산광역시', '서울특별시']
+    assert data['sigungu_dict']['서울특별시'] == ['강서구', '중구(서울)']
+    assert data['sigungu_dict']['부산광역시'] == ['중구(부산)']
+    assert data['sigungu_to_full_info']['중구(부산)'] == ('부산광역시', '중구', '26110')
+    assert data['special_sigungu_names']['중구(서울)'] == ('서울특별시', '중구')
+
+
+def test_dong_codes_and_closed_dongs(app_module, lawdong_file):
+    data = app_module.read_lawdong_file(lawdong_file)
+
+    assert data['dong_dict']['중구(서울)'] == ['무교동']  # 폐지 동 제외
+    assert data['region_codes'][('서울특별시', '중구(서울)', '무교동')] == ('1114010100', '11140')
+    assert data['region_codes'][('서울특별시', '강서구', '화곡동')] == ('1150010300', '11500')
+    assert data['bjd_code_by_name']['부산광역시 중구 중앙동1가'] == '2611010100'
+    assert data['umd_code_lookup'][('11140', '무교동')] == '10100'
+
+
+def test_missing_file_raises(app_module, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        app_module.read_lawdong_file(str(tmp_path / 'none.txt'))
@@ -0,0 +1,88 @@
+"""월별 집계 저장소 테스트 - 바뀐 월만 재집계, 파일 유지, 필터 키 구분"""
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+APT = {'sido': '서울특별시', 'sigungu': '강남구', 'dong': '대치동', 'apt_name': '테스트', 'area': 84.99}
+
+
+def trades(rows):
+    return pd.DataFrame({'date': pd.to_datetime([d for d, _ in rows]), 'price': [p for _, p in rows]})
+
+
+BASE = [('2024-01-05', 100000), ('2024-01-20', 110000),
+        ('2024-02-03', 120000), ('2024-03-15', 130000)]
+
+
+def by_month(rollup):
+    return rollup.set_index('year_month')
+
+
+def test_only_changed_month_is_recomputed(app_module, tmp_path, capsys):
+    store = app_module.MonthlyRollupStore(str(tmp_path))
+    key = store.make_key(APT, 'purchase')
+    first = by_month(store.update(key, trades(BASE)).copy())
+    assert list(first.index) == ['2024-01', '2024-02', '2024-03']
+    assert first.loc['2024-01', 'avg_price'] == 105000
+    capsys.readouterr()
+
+    changed = BASE[:3] + [('2024-03-15', 140000)]
+    second = by_month(store.update(key, trades(changed)))
+    assert "1/3개월 재계산" in capsys.readouterr().out
+    assert second.loc['2024-03', 'digest'] != first.loc['2024-03', 'digest']
+    assert second.loc['2024-03', 'avg_price'] == 140000
+    for month in ('2024-01', '2024-02'):
+        assert second.loc[month, 'digest'] == first.loc[month, 'digest']
+        assert second.loc[month, 'avg_price'] == first.loc[month, 'avg_price']
+
+
+def test_unchanged_trades_return_stored_rollup(app_module, tmp_path, capsys):
+    store = app_module.MonthlyRollupStore(str(tmp_path))
+    key = store.make_key(APT, 'purchase')
+    first = store.update(key, trades(BASE))
+    capsys.readouterr()
+
+    # 행 순서만 바뀐 경우 지문이 같아 재집계하지 않음
+    assert store.update(key, trades(BASE[::-1])) is first
+    assert "월별 집계 갱신" not in capsys.readouterr().out
+
+
+def test_removed_month_is_dropped(app_module, tmp_path):
+    store = app_module.MonthlyRollupStore(str(tmp_path))
+    key = store.make_key(APT, 'purchase')
+    store.update(key, trades(BASE))
+
+    rollup = store.update(key, trades(BASE[:3]))
+    assert list(rollup['year_month']) == ['2024-01', '2024-02']
+
+
+def test_rollup_persists_across_instances(app_module, tmp_path):
+    key = app_module.MonthlyRollupStore.make_key(APT, 'purchase')
+    app_module.MonthlyRollupStore(str(tmp_path)).update(key, trades(BASE))
+
+    reloaded = app_module.MonthlyRollupStore(str(tmp_path))
+    means = reloaded.monthly_mean_frame(key)
+    assert list(means.columns) == ['date', 'price']
+    assert list(means['price']) == [105000, 120000, 130000]
+
+
+def test_filtered_key_is_separate(app_module):
+    make_key = app_module.MonthlyRollupStore.make_key
+    assert make_key(APT, 'purchase') != make_key(APT, 'purchase', exclude_anomalies=True)
+    assert make_key(APT, 'purchase') != make_key(APT, 'jeonse')
+    assert make_key(dict(APT, area='84.990'), 'purchase') == make_key(APT, 'purchase')
+
+
+def test_missing_rollup_gives_empty_mean_frame(app_module, tmp_path):
+    store = app_module.MonthlyRollupStore(str(tmp_path))
+    assert store.get('없는 키') is None
+    assert store.monthly_mean_frame('없는 키').empty
+
+
+def test_rollup_quantile_bands(app_module):
+    rollup = app_module.compute_monthly_rollups(trades([('2024-01-05', p) for p in range(10000, 110000, 10000)]
+                                                       + [('2024-02-01', 50000)]))
+    january, february = rollup.iloc[0], rollup.iloc[1]
+    assert (january['p10'], january['p50'], january['p90']) == (19000, 55000, 91000)
+    assert february['p10'] == february['p50'] == february['p90'] == 50000
+    assert january['min_price'] <= january['p10'] <= january['p50'] <= january['p90'] <= january['max_price']
@@ -0,0 +1,40 @@
+"""필지 키(PNU 19자리) 테스트 - 산 번지 대지구분 포함, 실거래 item과 단지정보 주소의 키 일치"""
+import xml.etree.ElementTree as ET
+
+import pytest
+
+
+def rtms_item(**fields):
+    item = ET.Element('item')
+    for name, value in fields.items():
+        ET.SubElement(item, name).text = value
+    return item
+
+
+def test_make_parcel_key_land_flag(app_module):
+    assert app_module.make_parcel_key('11680', '10600', 316, 2) == '1168010600103160002'
+    assert app_module.make_parcel_key('11680', '10600', 316, 2, mountain=True) == '1168010600203160002'
+    assert len(app_module.make_parcel_key('11680', '10600', 1)) == app_module.PARCEL_KEY_LENGTH
+    assert app_module.make_parcel_key('1168', '10600', 316) is None
+
+
+def test_split_jibun(app_module):
+    assert app_module.split_jibun('316-2') == (316, 2, False)
+    assert app_module.split_jibun('산 12-1') == (12, 1, True)
+    assert app_module.split_jibun('산12') == (12, 0, True)
+    assert app_module.split_jibun('') is None
+
+
+def test_parcel_key_from_item_keeps_mountain(app_module):
+    item = rtms_item(sggCd='11680', umdCd='10600', bonbun='0012', bubun='0001', jibun='산12-1')
+    assert app_module.parcel_key_from_item(item) == '1168010600200120001'
+    item = rtms_item(sggCd='11680', umdCd='10600', jibun='316-2')
+    assert app_module.parcel_key_from_item(item) == '1168010600103160002'
+
+
+def test_add_parcel_keys_matches_items(app_module):
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({'h': ['서울특별시 강남구 대치동 316-2', '서울특별시 강남구 대치동 산 12-1', '알 수 없는 주소']})
+    keyed = app_module.add_parcel_keys(df, 'h', {'서울특별시 강남구 대치동': '1168010600'})
+    assert keyed['parcel_key'].tolist()[:2] == ['1168010600103160002', '1168010600200120001']
+    assert pd.isna(keyed['parcel_key'].iloc[2])
@@ -0,0 +1,23 @@
+"""차트 미리보기 파일명 테스트 - 요청 지문별 파일명, 히스토리 제외, 오래된 미리보기 정리"""
+import os
+
+
+def test_preview_filename_per_fingerprint(app_module):
+    first = app_module.preview_filename("0123456789abcdef")
+    assert first == "graph_01234567.jpg"
+    assert first != app_module.preview_filename("fedcba9876543210")
+    assert app_module.is_preview_file(first)
+    assert app_module.is_preview_file("graph.jpg")  # 이전 버전 미리보기
+    assert not app_module.is_preview_file("graph_래미안_20240101.jpg")
+
+
+def test_prune_preview_files_keeps_newest(app_module, tmp_path):
+    for i in range(5):
+        path = tmp_path / app_module.preview_filename(f"{i:08x}")
+        path.write_bytes(b"jpg")
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "history_chart.jpg").write_bytes(b"jpg")
+
+    app_module.prune_preview_files(str(tmp_path), keep=2)
+
+    assert sorted(os.listdir(tmp_path)) == ["graph_00000003.jpg", "graph_00000004.jpg", "history_chart.jpg"]
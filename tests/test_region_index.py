@@ -0,0 +1,44 @@
+"""지역 가격지수 테스트 - ㎡당 중위가 최소 표본, 반복매매 지수, 해제 거래 제외"""
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+
+
+def region_frame(app_module, trades):
+    columns = {name: [] for name in app_module.REGION_MONTH_COLUMNS}
+    for apt_name, date, price, extra in trades:
+        row = dict({'apt_name': apt_name, 'dong': '대치동', 'area': 84.97, 'date': date, 'price': price,
+                    'monthly_rent': 0, 'floor': 5, 'build_year': 2000, 'jibun': '1', 'parcel_key': ''}, **extra)
+        for name in columns:
+            columns[name].append(row.get(name, ''))
+    return app_module.region_month_frame(columns)
+
+
+@pytest.fixture
+def region_df(app_module):
+    return region_frame(app_module, [
+        ('가단지', '2024-01-10', 100000, {}),
+        ('가단지', '2024-02-10', 110000, {}),
+        ('가단지', '2024-03-10', 132000, {}),
+        ('가단지', '2024-02-20', 500000, {'cdeal_type': 'O'}),  # 해제 거래는 지수에서 제외
+        ('나단지', '2024-01-05', 90000, {}),
+        ('다단지', '2024-01-06', 95000, {}),
+        ('라단지', '2024-01-07', 105000, {}),
+        ('마단지', '2024-01-08', 120000, {}),
+    ])
+
+
+def test_region_price_index(app_module, region_df):
+    index = app_module.region_price_index(region_df)
+
+    assert index['month'].dt.strftime('%Y-%m').tolist() == ['2024-01', '2024-02', '2024-03']
+    assert index['count'].tolist() == [5, 1, 1]
+    assert index.loc[0, 'median_ppsm'] == pytest.approx(100000 / 84.97)
+    assert index.loc[1:, 'median_ppsm'].isna().all()  # 월 표본 부족
+    assert index['repeat_index'].tolist() == pytest.approx([100, 110, 132])
+    assert index['pairs'].tolist() == [0, 1, 1]
+
+
+def test_region_price_index_without_trades(app_module, region_df):
+    assert app_module.region_price_index(region_df, dong='없는동') is None
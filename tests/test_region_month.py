@@ -0,0 +1,96 @@
+"""지역-월 저장소 테스트 - 최근 월 유효 시간, 저장된 월만 사용, 단지 비교 지표"""
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+
+def columns_for(app_module, trades):
+    """거래 dict 목록 -> 지역-월 열 단위 dict"""
+    return {name: [trade.get(name, '') for trade in trades] for name in app_module.REGION_MONTH_COLUMNS}
+
+
+def trade(apt_name, date, price, area=84.97, **extra):
+    return dict({'apt_name': apt_name, 'dong': '대치동', 'area': area, 'date': date, 'price': price,
+                 'monthly_rent': 0, 'floor': 5, 'build_year': 2000, 'jibun': '1', 'parcel_key': ''}, **extra)
+
+
+def save_month(app_module, store, deal_ymd, trades, age_seconds=0):
+    path = store._path('purchase', '11680', deal_ymd)
+    store._save(path, 'purchase', '11680', deal_ymd, columns_for(app_module, trades))
+    if age_seconds:
+        past = time.time() - age_seconds
+        os.utime(path, (past, past))
+    return path
+
+
+def test_recent_month_expires_after_ttl(app_module, tmp_path):
+    store = app_module.RegionMonthStore(str(tmp_path), 'key')
+    current = datetime.now().strftime('%Y%m')
+    stale = app_module.REGION_MONTH_RECENT_TTL + 60
+
+    assert not store._is_fresh(store._path('purchase', '11680', current), current)
+    assert store._is_fresh(save_month(app_module, store, current, []), current)
+    assert not store._is_fresh(save_month(app_module, store, current, [], age_seconds=stale), current)
+    # 지난 월은 신고가 끝나 오래된 파일도 그대로 사용
+    assert store._is_fresh(save_month(app_module, store, '201901', [], age_seconds=stale), '201901')
+
+
+def test_stored_months_are_listed_oldest_first(app_module, tmp_path):
+    store = app_module.RegionMonthStore(str(tmp_path), 'key')
+    for deal_ymd in ('202403', '202312', '202401'):
+        save_month(app_module, store, deal_ymd, [])
+
+    assert store.stored_months('purchase', '11680') == ['202312', '202401', '202403']
+    assert [v[0] for v in store.stored_month_versions('purchase', '11680')] == ['202312', '202401', '202403']
+    assert store.stored_months('jeonse', '11680') == []
+
+
+def test_get_months_without_fetch_uses_stored_months_only(app_module, tmp_path, capsys):
+    pytest.importorskip("pandas")
+    store = app_module.RegionMonthStore(str(tmp_path), 'key')
+    current = datetime.now().strftime('%Y%m')
+    save_month(app_module, store, '201901', [trade('은마', '2019-01-05', 180000)])
+    save_month(app_module, store, current, [trade('은마', f"{current[:4]}-{current[4:]}-01", 250000)],
+               age_seconds=app_module.REGION_MONTH_RECENT_TTL + 60)
+
+    df = store.get_months('purchase', '11680', [current, '201901', '201902'], fetch_missing=False)
+
+    assert sorted(df['price']) == [180000, 250000]  # 유효 시간이 지난 최근 월도 API 없이 사용
+    assert "2개월 저장소, 1개월 API" in capsys.readouterr().out
+
+
+def test_compare_complexes_ranks_by_recent_median(app_module):
+    pytest.importorskip("pandas")
+    trades = [
+        trade('가단지', '2023-01-10', 100000), trade('가단지', '2023-06-10', 110000),
+        trade('가단지', '2024-01-10', 120000),
+        trade('가단지', '2023-09-01', 300000, cdeal_type='O', cdeal_day='23.09.15'),  # 해제 거래
+        trade('나단지', '2023-01-05', 80000), trade('나단지', '2023-06-05', 90000),
+        trade('나단지', '2024-01-20', 85000),
+        trade('다단지', '2023-03-01', 95000), trade('다단지', '2023-08-01', 97000),  # 거래 수 부족
+        trade('라단지', '2023-05-01', 70000, area=59.9),  # 다른 면적
+    ]
+    region_df = app_module.region_month_frame(columns_for(app_module, trades))
+
+    ranking, monthly_pivot, region_monthly = app_module.compare_complexes(region_df, target_area=84)
+
+    assert ranking['apt_name'].tolist() == ['가단지', '나단지']
+    assert ranking['rank'].tolist() == [1, 2]
+    first, second = ranking.iloc[0], ranking.iloc[1]
+    assert first['recent_median'] == 115000
+    assert first['max_price'] == 120000 and first['decline_rate'] == 0
+    assert second['recent_median'] == 87500
+    assert second['decline_rate'] == pytest.approx(5000 / 90000 * 100)
+    assert sorted(monthly_pivot.columns) == ['가단지', '나단지']
+    assert len(region_monthly) == 5  # 84㎡ 정상 거래가 있는 월 (거래 수 부족 단지 포함)
+
+
+def test_compare_complexes_without_matches_returns_empty(app_module):
+    pytest.importorskip("pandas")
+    region_df = app_module.region_month_frame(columns_for(app_module, [trade('가단지', '2023-01-10', 100000)]))
+
+    ranking, monthly_pivot, region_monthly = app_module.compare_complexes(region_df, target_area=114)
+
+    assert ranking.empty and monthly_pivot.empty and region_monthly.empty
@@ -0,0 +1,99 @@
+"""세션 저장/복원 테스트 - 거래 데이터는 건수만 저장, 복원 시 캐시/엑셀에서 API 없이 로드"""
+import json
+import threading
+
+
+class FakeWidget:
+    def __init__(self):
+        self.calls = []
+
+    def config(self, **options):
+        self.calls.append(options)
+
+    def insert(self, index, text):
+        self.calls.append(text)
+
+
+class FakeApp:
+    """세션 저장/복원이 쓰는 속성만 가진 앱 (창 없이 실행, UI 예약은 바로 실행)"""
+
+    def __init__(self, app_module, tmp_path, selected_apts=()):
+        self.app_module = app_module
+        self.trade_cache_path = str(tmp_path / 'cache')
+        self.download_path = str(tmp_path / 'downloads')
+        self.selected_apts = list(selected_apts)
+        self.selected_apt_listbox = FakeWidget()
+        self.status_label = FakeWidget()
+        self.graph_button = FakeWidget()
+        self.cached_trades = {}
+        self.restored = threading.Event()
+
+    def load_trade_cache(self, sido, sigungu, dong, apt_name, area, data_type):
+        return self.cached_trades.get(data_type)
+
+    def apt_workbook_path(self, apt_info, data_type):
+        return self.app_module.RealEstateAnalyzerApp.apt_workbook_path(self, apt_info, data_type)
+
+    def load_session_trades(self, apt, data_type):
+        return self.app_module.RealEstateAnalyzerApp.load_session_trades(self, apt, data_type)
+
+    def resolve_parcel_key(self, apt):
+        return '1168010600109770000'
+
+    def safe_after(self, delay, func):
+        func()
+        self.restored.set()
+
+
+APT = {'sido': '서울특별시', 'sigungu': '강남구', 'dong': '대치동', 'apt_name': '은마', 'area': '84.43',
+       'parcel_key': '116801060010977000', 'excel_path': '은마_84.43m2_매매.xlsx'}
+
+
+def test_save_session_stores_counts_not_trades(app_module, tmp_path):
+    apt = dict(APT, trades_data=[{'price': 1}, {'price': 2}], jeonse_data=None)
+    app = FakeApp(app_module, tmp_path, [apt])
+
+    app_module.RealEstateAnalyzerApp.save_session(app)
+
+    with open(tmp_path / 'cache' / app_module.SESSION_FILENAME, encoding='utf-8') as f:
+        saved = json.load(f)['selected_apts']
+    assert len(saved) == 1
+    assert not any(key.endswith('_data') for key in saved[0])
+    assert saved[0]['trade_counts'] == {'purchase': 2, 'jeonse': 0}
+    assert saved[0]['excel_path'] == APT['excel_path']
+
+
+def test_restore_session_loads_cached_trades(app_module, tmp_path):
+    saver = FakeApp(app_module, tmp_path, [dict(APT, trades_data=[{'price': 1}] * 3)])
+    app_module.RealEstateAnalyzerApp.save_session(saver)
+
+    app = FakeApp(app_module, tmp_path)
+    app.cached_trades['purchase'] = [{'price': 1}] * 3
+    app_module.RealEstateAnalyzerApp.restore_session(app)
+    assert app.restored.wait(5)
+
+    apt = app.selected_apts[0]
+    assert apt['parcel_key'] == '1168010600109770000'  # 이전 버전의 18자리 키는 다시 계산
+    assert apt['trades_data'] == [{'price': 1}] * 3
+    assert 'jeonse_data' not in apt  # 저장 당시 전세 거래 없음 -> 조회하지 않음
+    assert app.selected_apt_listbox.calls == ["은마 (84.43㎡) - 서울특별시 강남구 대치동"]
+    assert app.graph_button.calls == [{'state': 'normal', 'text': "📊 그래프 생성하기"}]
+
+
+def test_restore_session_keeps_current_selection(app_module, tmp_path):
+    saver = FakeApp(app_module, tmp_path, [dict(APT)])
+    app_module.RealEstateAnalyzerApp.save_session(saver)
+
+    app = FakeApp(app_module, tmp_path, [dict(APT, apt_name='래미안')])
+    app_module.RealEstateAnalyzerApp.restore_session(app)
+
+    assert [apt['apt_name'] for apt in app.selected_apts] == ['래미안']
+
+
+def test_session_trades_without_cache_or_workbook(app_module, tmp_path):
+    app = FakeApp(app_module, tmp_path)
+    apt = dict(APT, excel_path=str(tmp_path / 'missing.xlsx'))
+
+    assert app_module.RealEstateAnalyzerApp.load_session_trades(app, apt, 'purchase') == ([], None)
+    app.cached_trades['jeonse'] = [{'price': 5}]
+    assert app_module.RealEstateAnalyzerApp.load_session_trades(app, apt, 'jeonse') == ([{'price': 5}], '캐시')
@@ -0,0 +1,43 @@
+"""설정 파일 로드 테스트 - 이전 버전이 저장한 null 경로는 기본값으로 대체"""
+import json
+
+
+class FakeVar:
+    def __init__(self):
+        self.value = None
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class FakeApp:
+    """load_settings()가 쓰는 tkinter 변수만 흉내 내는 앱 (창 없이 실행)"""
+
+    def __getattr__(self, name):
+        var = FakeVar()
+        setattr(self, name, var)
+        return var
+
+
+def write_settings(path, **settings):
+    path.write_text(json.dumps(settings, ensure_ascii=False), encoding='utf-8')
+
+
+def test_load_settings_replaces_null_paths(app_module, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_settings(tmp_path / 'real_estate_analyzer_settings.json',
+                   download_path=str(tmp_path / 'downloads'), history_path=None, lawdong_path=None,
+                   complex_info_path='', trade_cache_path=None,
+                   graph_options={'show_monthly_avg': False})
+    app = FakeApp()
+
+    app_module.RealEstateAnalyzerApp.load_settings(app)
+
+    assert app.download_path == str(tmp_path / 'downloads')
+    assert app.trade_cache_path == app_module.DEFAULT_TRADE_CACHE_PATH
+    for name in ('history_path', 'lawdong_path', 'complex_info_path'):
+        assert isinstance(getattr(app, name), str) and getattr(app, name)
+    assert app.show_monthly_avg.get() is False  # 나머지 설정은 그대로 적용
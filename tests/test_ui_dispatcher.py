@@ -0,0 +1,82 @@
+"""UI 업데이트 전달 테스트 - 작업 스레드 업데이트는 대기열로, 같은 위젯/옵션은 마지막 값만 적용"""
+import threading
+
+
+class FakeRoot:
+    """after()로 예약만 기록하는 Tk 루트 (창 없이 실행)"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, func):
+        self.scheduled.append((delay, func))
+
+
+class FakeWidget:
+    def __init__(self, name):
+        self.name = name
+        self.history = []
+
+    def __str__(self):
+        return self.name
+
+    def configure(self, **options):
+        self.history.append(options)
+
+
+def in_thread(func):
+    worker = threading.Thread(target=func)
+    worker.start()
+    worker.join()
+
+
+def test_drain_applies_last_value_per_widget_option(app_module):
+    dispatcher = app_module.UIDispatcher(FakeRoot())
+    progress, label = FakeWidget('.progress'), FakeWidget('.label')
+
+    def worker():
+        for value in range(10):
+            dispatcher.set(progress, value=value)
+        dispatcher.set(label, text="수집 중")
+        dispatcher.set(progress, value=100)
+
+    in_thread(worker)
+
+    assert progress.history == []  # 작업 스레드에서는 바로 적용하지 않음
+    assert dispatcher.drain() == 2
+    assert progress.history == [{'value': 100}]
+    assert label.history == [{'text': "수집 중"}]
+    assert dispatcher.drain() == 0
+
+
+def test_calls_run_in_order_without_coalescing(app_module):
+    dispatcher = app_module.UIDispatcher(FakeRoot())
+    calls = []
+
+    in_thread(lambda: [dispatcher.call(calls.append, i) for i in range(3)])
+
+    dispatcher.drain()
+    assert calls == [0, 1, 2]
+
+
+def test_ui_thread_value_wins_over_older_queued_value(app_module):
+    dispatcher = app_module.UIDispatcher(FakeRoot())
+    progress = FakeWidget('.progress')
+
+    in_thread(lambda: dispatcher.set(progress, value=10))
+    dispatcher.set(progress, value=0)  # UI 스레드에서 바로 적용
+
+    dispatcher.drain()
+    assert progress.history == [{'value': 0}]
+
+
+def test_tick_reschedules_until_stopped(app_module):
+    root = FakeRoot()
+    dispatcher = app_module.UIDispatcher(root)
+    assert len(root.scheduled) == 1
+
+    root.scheduled.pop()[1]()
+    assert len(root.scheduled) == 1
+    dispatcher.stop()
+    root.scheduled.pop()[1]()
+    assert root.scheduled == []
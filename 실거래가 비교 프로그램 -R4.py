@@ -2,6 +2,130 @@
 """
 실거래가 비교 프로그램 -R4.py
 
+수정 내역 (2026-10-19) - R5:
+1. 필지 키 기반 단지정보 조인 🔑
+   - 시군구코드 + 법정동코드 + 대지구분(일반/산) + 본번 + 부번 (19자리 PNU) 필지 키를 수집 시점에 계산
+   - 단지정보 h열 주소도 로드 시 벡터 연산으로 필지 키 계산
+   - 선택 아파트 전체를 한 번에 키 조인, 실패 시에만 기존 주소 검색/선택 창 사용
+
+2. 매전갭 계산 벡터화 ⚡
+   - iterrows 반복 대신 pd.merge_asof 정렬 조인으로 거래별 직전 전세가 매칭
+   - 최소 갭뿐 아니라 전체 매전갭 시계열(gap_series) 생성
+   - --benchmark-gap 옵션으로 5,000건 단지 기준 기존 방식과 속도 비교
+
+3. 분석 엔진 분리 및 결과 메모이제이션 🧮
+   - 월평균/월최고가, 연복리, 전고점 대비 하락률, 매전갭, 최고가/최근가 어노테이션 계산을 순수 함수로 분리
+   - 결과는 TradeSummary 등 dataclass로 반환
+   - 입력 데이터 내용 지문(해시) 기준으로 결과 캐시 → 체크박스만 바꾼 재생성 시 재계산 없음
+
+4. 월별 집계(롤업) 증분 유지 📅
+   - 단지/면적/거래유형별 월별 건수, 합계, 최고, 최저, 마지막, 분위수(p10/p50/p90) 유지
+   - 월별 내용 지문 비교로 바뀐 월만 재집계 (최근 3개월 갱신 시 3개월만 계산)
+   - 그래프와 표는 월별 집계를 직접 사용, 거래 캐시 폴더의 rollups 폴더에 저장
+   - 거래 데이터 캐시 경로가 초기화 끝에서 None으로 덮어써지던 문제 수정
+
+5. 단지 일괄 비교 (20~50개 단지) 🏘
+   - 지역-월 단위 거래 저장소: (거래유형, 시군구, 계약월)당 API 1회, gzip 열 단위 파일로 보관
+   - 최근 3개월은 12시간마다 재조회, 이전 월은 저장본 재사용
+   - 개별 아파트 수집도 같은 저장소를 사용 (같은 동네 아파트 추가 시 API 호출 없음)
+   - 단지별 지표(거래수, 최근 12개월 중위가, 최고가, 하락률, 연복리)를 groupby 한 번으로 계산
+   - 상위 5개 단지 강조 + 지역 중위가 라인 + 순위표 이미지 생성 (상세 비교는 기존대로 최대 3개)
+
+6. 지역 가격지수 벤치마크 🧭
+   - 저장된 지역-월 매매 데이터로 동/시군구 월별 ㎡당 중위가와 반복매매 지수를 일괄 계산
+   - 반복매매 지수: 같은 단지/면적/층 연속 거래 쌍의 로그 가격비를 정규방정식(bincount)으로 회귀
+   - '🧭 지역지수' 체크 시 첫 번째 아파트 기준 벤치마크 선 표시 (API 추가 호출 없음)
+
+7. 해제·이상거래 필터 🚫
+   - 수집 시 해제여부(cdealType), 해제일(cdealDay), 거래유형(dealingGbn)을 지역-월 저장소에 함께 보관
+   - 지역-월 로드 시 한 번만 is_cancelled / is_outlier 플래그 계산 (단지·동 ㎡당 중위가 대비 비율, 직거래는 더 엄격)
+   - 그래프는 불리언 마스크로 제외 ('🚫 해제·이상거래 제외' 옵션, 기본 사용)
+   - 단지 일괄 비교와 지역 가격지수는 항상 제외
+
+8. 단지 전체 면적 일괄 수집 / 면적별 비교 📐
+   - 단지명/동으로만 필터한 단지 전체 거래를 한 번에 읽고 면적 구간(정수 ㎡)별로 분리
+   - 개별 면적 수집도 같은 단지 행 조회를 거쳐 면적만 추가 필터 (다른 면적 추가 시 API 호출 없음)
+   - '📐 면적별 비교' 버튼: 선택한 아파트의 면적별 월평균/월최고/전세 비교 차트와 요약표
+
+9. 월별 가격대(p10/p50/p90) 음영 🌫
+   - 월별 집계의 분위수를 사용, 선택 아파트 전체를 키 x 월 단일 groupby로 갱신 (바뀐 월만)
+   - '🌫 가격대(p10~p90)' 체크 시 거래 3건 이상인 월에 p10~p90 음영과 p50 선 표시 (매매/전세)
+
+10. 렌더링 프로필 (빠른 미리보기 / 백그라운드 고해상도 저장) 🖼
+   - 다중 비교 차트를 pyplot 전역 상태 없는 Figure 객체로 생성
+   - 빠른 미리보기(기본): 100dpi 미리보기(graph_<요청 지문>.jpg)를 바로 열고 600dpi 원본은 백그라운드 저장
+   - 설정 창에서 프로필 선택, 설정 파일 render_profile에 저장, 프로필별 소요 시간 로그 출력
+11. 차트 렌더링 워커 프로세스 ⚙
+   - 다중 비교 차트를 별도 프로세스(유지/재사용)에서 그려 저장 - 그래프 생성 중에도 UI 응답
+   - 거래/월별 데이터는 열 단위로 전달, 미리보기와 고해상도 내보내기를 서로 다른 워커에서 동시 렌더링
+   - 단지정보 조회(선택 대화상자 가능)는 UI에서 먼저 처리, 워커 프로세스 사용 불가 시 스레드로 대체
+12. 대화형 차트 보기 🖱
+   - '대화형 보기' 버튼: 차트를 창 안(FigureCanvasTkAgg)에 표시, 확대/이동 툴바 제공
+   - 실거래/월평균/월최고/가격대/지역지수/전세/가격 주석 레이어를 다시 그리기 한 번으로 켜고 끄기
+   - 레이어 토글은 메인 창 그래프 옵션과 연동, '이미지 저장'으로 현재 화면 그대로 파일 저장
+13. 레이블 배치 엔진 (adjustText 대체) 🏷
+   - 최고가/최근가 레이블(전세 포함)을 후보 위치 순서대로 시도하는 탐욕 배치로 겹침 해소
+   - 반복 400회 / 0.3초 예산, 초과 시 남은 레이블은 원래 위치 유지
+   - 같은 주석 목록과 축 범위면 이전 배치 재사용 (렌더링 워커 프로세스별 캐시)
+14. 대용량 시리즈 점 줄이기 🔬
+   - 점도표: 점 개수 상한(기본 20,000, 시리즈 수로 분배) 초과 시 격자 칸별 밀도 유지 표본 추출
+   - 선 그래프: 2,000점 초과 시 LTTB로 모양 유지, 최고/최저가 점은 항상 그대로 표시
+   - 설정 창 '차트 점 개수 상한' (0이면 제한 없음, 설정 파일 point_budget)
+15. 차트 이미지 캐시 🗂
+   - 입력 데이터/옵션/단지정보/점 개수 상한의 지문 + 해상도로 이미지 캐시 (trade_cache/charts)
+   - 같은 요청은 다시 그리지 않고 캐시 이미지 사용, 최대 500MB 초과 시 오래 안 쓴 파일부터 삭제
+   - 다중 비교 차트 파일명에 데이터 지문 8자리 추가 (데이터가 바뀐 차트가 기존 파일을 덮어쓰지 않음)
+16. 차트 이미지 피라미드 (썸네일 / 확대 타일) 🖼
+   - 차트 저장 시 렌더링 워커에서 썸네일, 화면 크기 이미지, 1/2 단계 512px 타일을 이미지 옆 .pyramid 폴더에 생성
+   - 그래프 팝업은 화면 크기 이미지를 바로 표시, 확대(Ctrl+휠/버튼) 시 보이는 영역 타일만 로드
+   - 히스토리 목록에서 항목 선택 시 하단에 썸네일 미리보기 (이전 이미지는 처음 열 때 생성)
+17. 히스토리 색인 (history_index.jsonl) 📋
+   - 차트 저장 시 다운로드 폴더의 색인 파일에 한 줄 추가 (지역/단지/면적/그래프 옵션/데이터 지문 포함)
+   - 히스토리 갱신은 폴더 스캔/파일명 해석 대신 색인에서 마지막으로 읽은 위치 이후 추가된 줄만 읽음
+   - 색인이 없으면 기존 이미지 파일명으로 한 번만 색인 생성, 삭제는 삭제 표시 줄 추가 (쌓이면 파일 재작성)
+   - 선택 삭제가 이미지/미리보기 폴더를 실제로 삭제하도록 수정, 히스토리 선택은 표시 순서 기준으로 항목 찾기
+18. 히스토리 엑셀 중복 제거 / 보관 정책 📦
+   - 히스토리 엑셀은 데이터 내용 해시로 history/objects에 한 번만 저장, history 폴더 파일은 하드링크 (불가 시 목록 참조)
+   - 같은 단지/면적/유형의 마지막 항목과 데이터가 같으면 새 항목을 만들지 않음 (수집 후 그래프 생성 시 중복 저장 제거)
+   - 보관 정책: 단지별 최근 N개(기본 5), 전체 최대 용량(기본 500MB) - 시작/저장 시 백그라운드 정리
+   - 기존 history_*.xlsx 파일은 처음 실행 시 내용 해시로 보관소에 이전 (같은 내용 사본은 하나로 합침)
+   - 설정 창 '히스토리 보관' (설정 파일 history_keep_per_apt, history_max_mb)
+19. 엑셀 저장 대기열 💾
+   - 수집/그래프 생성 스레드는 엑셀 저장 요청만 넣고 백그라운드 스레드 하나에서 순서대로 저장
+   - 같은 단지/면적/유형 요청이 대기 중에 다시 오면 최신 요청 하나만 저장 (병합)
+   - 마지막으로 저장한 데이터 지문과 같으면 저장 생략 (trade_cache/excel_exports.json, 다음 실행에도 유지)
+   - 저장마다 걸린 시간/대기 수 출력, 대기열이 비면 상태 표시줄에 누적 저장 수 표시, 종료 시 남은 저장 완료 후 종료
+20. 차트별 비교 엑셀 한 개 📑
+   - 다중 비교 차트와 같은 이름의 엑셀 한 개에 선택 단지 전체 저장: 요약(연복리 수익률 표)/매매/전세/월별 집계 시트
+   - 렌더링 요청의 열 단위 데이터에서 xlsxwriter constant_memory 모드로 행 순서대로 바로 기록 (DataFrame 복사/정렬 없음)
+   - 엑셀 저장 대기열에서 작성, 데이터 지문이 같으면 다시 쓰지 않음, 히스토리 항목의 엑셀로 연결
+   - 그래프 생성 시 단지/유형별 엑셀을 다시 쓰던 부분 제거 (수집 시 저장되는 단지별 엑셀은 유지)
+21. 저장된 거래 일괄 내보내기 (CSV / Parquet) 📤
+   - 명령줄: --export 경로 [--format csv|parquet] [--region 시군구코드/접두어] [--from YYYYMM] [--to YYYYMM]
+     [--type purchase|jeonse|all] [--apt 단지명] [--dong 법정동] [--exclude-anomalies] [--cache-dir 폴더]
+   - 지역-월 파일 하나씩 읽어 걸러서 바로 기록 (서울 전체 20년치도 메모리에는 한 달치만)
+   - CSV는 파일 하나(엑셀용 BOM), Parquet은 data_type=/lawd_cd=/year= 폴더 분할 (pyarrow 필요, 없으면 안내)
+22. 이전 세션 복원 🔁
+   - 종료 시 선택 아파트 목록을 거래 캐시 폴더의 session.json에 저장 (거래 데이터는 건수와 엑셀 경로 참조만)
+   - 시작 시 선택 목록을 바로 표시하고 거래 데이터는 백그라운드에서 거래 캐시 → 단지별 매매/전세 엑셀 순으로 로드
+   - 네트워크 조회 없이 어제 비교하던 단지로 바로 그래프 생성 가능
+
+23. 시작 속도 개선 (무거운 모듈 지연 로드) 🚀
+   - pandas/numpy/matplotlib/seaborn/PIL/requests는 처음 사용할 때 import (창을 먼저 표시)
+   - 창 표시 후 백그라운드 스레드에서 미리 로드하여 첫 조회/그래프 대기 시간 단축
+   - --profile-startup 옵션: 모듈별 import 시간과 초기화 단계별(설정/법정동/GUI/히스토리) 시간 출력
+
+24. 비동기 시작 (창 먼저 표시) ⏳
+   - 법정동 코드 파일과 검색 히스토리를 백그라운드 스레드에서 읽고 UI 스레드로 전달
+   - 로드 중에는 지역 선택/아파트 조회 버튼 비활성화 및 "불러오는 중" 표시
+   - 이전 세션 복원은 지역 정보와 히스토리 로드가 끝난 뒤 실행
+   - 설정에서 법정동 파일 경로 변경 시 시/도 목록도 다시 채움
+
+25. 작업 스레드 UI 업데이트 일원화 🧵
+   - 수집 스레드는 진행바/상태 메시지를 대기열에 넣기만 하고 Tk 루프가 약 30fps 주기로 적용
+   - 한 주기 안의 같은 위젯 업데이트는 마지막 값만 적용 (요청마다 update_idletasks 호출 제거)
+   - 작업 스레드에서 진행 창 닫기/오류 표시/safe_after 예약도 UI 스레드에서 실행
+
 수정 내역 (2026-01-07) - R4:
 1. 중복 지역명 처리 로직 개선 🔧
    - 시도 약어 생성 방식 개선: 첫 글자 → 전체 시도명 (접미사 제거)
@@ -63,35 +187,137 @@
    - 데이터 수집 진행 상황을 알 수 없던 문제 해결
 """
 
+import time
+_MODULE_LOAD_STARTED = time.perf_counter()  # 시작 시간 측정 (--profile-startup)
 import re  # 기존 import 구문들과 함께 추가
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import matplotlib
-matplotlib.use('Agg')  # GUI 없이 이미지만 생성하는 백엔드 설정 (tkinter 충돌 방지)
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from PIL import Image, ImageTk
-import pandas as pd
-import numpy as np
 import os
+import sys
 import json
-import requests
+import gzip
+import math
+import importlib
+import contextlib
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import logging
 import shutil
-from matplotlib import font_manager
-import time
 import concurrent.futures
+import concurrent.futures.process
+import multiprocessing
 import threading
+import queue
 import gc  # 가비지 컬렉션 추가
-import seaborn as sns  # seaborn 추가
-try:
-    from adjustText import adjust_text  # 레이블 자동 조정
-    ADJUSTTEXT_AVAILABLE = True
-except ImportError:
-    ADJUSTTEXT_AVAILABLE = False
-    print("adjustText 라이브러리가 설치되지 않았습니다. pip install adjustText 로 설치하세요.")
+import hashlib
+import functools
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+# 시작 단계별 소요 시간 [(구분, 이름, 초)] - import는 처음 사용할 때 기록
+STARTUP_TIMINGS = []
+_startup_timings_lock = threading.Lock()
+
+
+def record_startup_timing(kind, name, seconds):
+    """시작 시간 측정 기록"""
+    with _startup_timings_lock:
+        STARTUP_TIMINGS.append((kind, name, seconds))
+
+
+@contextlib.contextmanager
+def startup_step(name):
+    """초기화 단계 소요 시간 측정"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_startup_timing('init', name, time.perf_counter() - started)
+
+
+class LazyModule:
+    """무거운 모듈 대리 객체 - 처음 속성에 접근할 때 import (창을 먼저 띄우고 차트/데이터 모듈은 나중에)"""
+
+    _lock = threading.RLock()
+
+    def __init__(self, name, before=None, after=None):
+        self.__dict__.update(_name=name, _module=None, _before=before, _after=after)
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is not None:
+            return module
+        with LazyModule._lock:
+            if self.__dict__['_module'] is None:
+                if self._before:
+                    self._before()
+                started = time.perf_counter()
+                module = importlib.import_module(self._name)
+                record_startup_timing('import', self._name, time.perf_counter() - started)
+                if self._after:
+                    self._after(module)
+                self.__dict__['_module'] = module
+        return self.__dict__['_module']
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def _configure_matplotlib(module):
+    """matplotlib 처음 import 시 설정 - Agg 백엔드, 한글 폰트"""
+    module.use('Agg')  # GUI 없이 이미지만 생성하는 백엔드 설정 (tkinter 충돌 방지)
+    module.rcParams['font.family'] = 'Malgun Gothic'
+    module.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
+
+
+matplotlib = LazyModule('matplotlib', after=_configure_matplotlib)
+_load_matplotlib = matplotlib._load  # pyplot/seaborn보다 먼저 백엔드 설정
+plt = LazyModule('matplotlib.pyplot', before=_load_matplotlib)
+mdates = LazyModule('matplotlib.dates', before=_load_matplotlib)
+font_manager = LazyModule('matplotlib.font_manager', before=_load_matplotlib)
+sns = LazyModule('seaborn', before=_load_matplotlib)  # seaborn 추가
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+Image = LazyModule('PIL.Image')
+ImageTk = LazyModule('PIL.ImageTk')
+requests = LazyModule('requests')
+
+# 창 표시 후 백그라운드에서 미리 import할 순서 (의존성 순)
+PREWARM_MODULES = [np, pd, matplotlib, plt, sns, Image, ImageTk, requests]
+
+
+def prewarm_modules():
+    """무거운 모듈을 순서대로 미리 import (백그라운드 스레드)"""
+    for module in PREWARM_MODULES:
+        try:
+            module._load()
+        except Exception as e:
+            print(f"⚠️ 모듈 미리 로드 실패 ({module._name}): {str(e)}")
+
+
+def startup_report():
+    """--profile-startup 보고서 문자열 (import/초기화 단계별 시간)"""
+    with _startup_timings_lock:
+        timings = list(STARTUP_TIMINGS)
+    lines = ["⏱ 시작 시간 측정"]
+    for kind, title in (('module', '모듈 로드'), ('init', '초기화 단계'), ('first_frame', '첫 화면'),
+                        ('import', '지연 import (처음 사용/미리 로드)')):
+        items = [(name, seconds) for k, name, seconds in timings if k == kind]
+        if not items:
+            continue
+        lines.append(f"  [{title}] 합계 {sum(s for _, s in items):.3f}초")
+        for name, seconds in items:
+            lines.append(f"    {name:<28} {seconds * 1000:8.1f} ms")
+    return "\n".join(lines)
 
 
 # 로깅 설정
@@ -106,6 +332,283 @@ logging.basicConfig(
 # read: 데이터 읽기 대기 시간
 API_TIMEOUT = (5, 15)  # (connect timeout, read timeout)
 
+# 차트 렌더링 프로필 - 미리보기는 즉시 저장/표시, 고해상도 내보내기는 백그라운드 (None이면 미리보기 해상도로 바로 저장)
+RENDER_PROFILES = {
+    'fast': {'label': '빠른 미리보기 (100dpi, 600dpi 백그라운드 저장)', 'preview_dpi': 100, 'export_dpi': 600},
+    'balanced': {'label': '균형 (150dpi, 300dpi 백그라운드 저장)', 'preview_dpi': 150, 'export_dpi': 300},
+    'quality': {'label': '고품질 (600dpi 즉시 저장, 기존 방식)', 'preview_dpi': 600, 'export_dpi': None},
+}
+DEFAULT_RENDER_PROFILE = 'fast'
+PREVIEW_FILENAME = "graph.jpg"  # 히스토리에서 제외되는 미리보기 파일 (이전 버전 고정 이름)
+PREVIEW_KEEP = 10  # 다운로드 폴더에 남겨 둘 최근 미리보기 파일 수
+_PREVIEW_PATTERN = re.compile(r'^graph(_[0-9a-f]{8})?\.jpg$')
+
+
+def preview_filename(fingerprint):
+    """차트 요청별 미리보기 파일명 (graph_<지문 8자리>.jpg) - 동시에 렌더링하는 차트끼리 덮어쓰지 않음"""
+    return f"graph_{fingerprint[:8]}.jpg"
+
+
+def is_preview_file(filename):
+    """히스토리에서 제외되는 미리보기 파일 여부"""
+    return bool(_PREVIEW_PATTERN.match(filename))
+
+
+def prune_preview_files(folder, keep=PREVIEW_KEEP):
+    """오래된 미리보기 파일 정리 - 최근 keep개만 남김 (렌더링 중인 최신 미리보기는 유지)"""
+    try:
+        previews = [os.path.join(folder, name) for name in os.listdir(folder) if is_preview_file(name)]
+        previews.sort(key=os.path.getmtime, reverse=True)
+        for path in previews[keep:]:
+            os.remove(path)
+            shutil.rmtree(path + PYRAMID_SUFFIX, ignore_errors=True)
+    except Exception as e:
+        print(f"⚠️ 미리보기 파일 정리 실패: {str(e)}")
+
+
+def render_figure(fig, path, dpi):
+    """Figure를 이미지 파일로 저장하고 소요 시간(초) 반환"""
+    started = time.perf_counter()
+    fig.savefig(path, bbox_inches='tight', dpi=dpi, pad_inches=0.3)
+    return time.perf_counter() - started
+
+
+# 주석 레이블 배치 - 후보 위치를 순서대로 시도하는 탐욕 배치 (반복 횟수/시간 제한)
+LABEL_PLACEMENT_MAX_ITERATIONS = 400
+LABEL_PLACEMENT_TIME_BUDGET = 0.3  # 초
+LABEL_PLACEMENT_CACHE_SIZE = 64
+# 원래 오프셋 기준 이동 후보 (points) - 제자리, 상하, 좌우 순으로 가까운 위치부터
+LABEL_CANDIDATE_OFFSETS = [(dx, dy) for dy in (0, 25, -25, 50, -50, 75, -75) for dx in (0, -40, 40, -80, 80)]
+_label_placements = OrderedDict()  # 캐시 키 -> 레이블별 오프셋
+
+
+def _box_overlap(a, b):
+    """두 사각형 (x0, y0, x1, y1)의 겹친 면적"""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    return width * height if width > 0 and height > 0 else 0.0
+
+
+def _label_placement_key(ax, annotations):
+    """배치 캐시 키 - 주석 목록(문구/기준점/오프셋) + 축 범위/크기"""
+    fig = ax.figure
+    parts = [ax.get_xlim(), ax.get_ylim(), tuple(ax.get_position().bounds), tuple(fig.get_size_inches()), fig.dpi]
+    parts.extend((ann.get_text(), str(ann.xy), tuple(ann.xyann)) for ann in annotations)
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def place_labels(ax, annotations, max_iterations=LABEL_PLACEMENT_MAX_ITERATIONS,
+                 time_budget=LABEL_PLACEMENT_TIME_BUDGET):
+    """주석(offset points) 레이블 겹침 해소 - 앞 레이블부터 겹침/축 밖 면적이 가장 작은 후보 위치 선택
+    같은 주석 목록과 축 범위는 이전 배치 결과 재사용, 예산 초과 시 남은 레이블은 원래 위치 유지"""
+    if not annotations:
+        return
+    started = time.perf_counter()
+    key = _label_placement_key(ax, annotations)
+    cached = _label_placements.get(key)
+    if cached is not None:
+        _label_placements.move_to_end(key)
+        for ann, offset in zip(annotations, cached):
+            ann.xyann = offset
+        print(f"🏷 레이블 배치 캐시 사용: {len(annotations)}개")
+        return
+
+    from matplotlib.text import Text
+
+    renderer = ax.figure.canvas.get_renderer()
+    scale = ax.figure.dpi / 72.0  # points -> pixels
+    axes_box = tuple(ax.get_window_extent(renderer).extents)
+    placed = []
+    offsets = []
+    iterations = 0
+    exhausted = False
+
+    for ann in annotations:
+        # 화살표를 뺀 글상자 영역 기준
+        ann.update_positions(renderer)
+        x0, y0, x1, y1 = Text.get_window_extent(ann, renderer).extents
+        area = (x1 - x0) * (y1 - y0)
+        best_shift, best_box, best_cost = (0, 0), (x0, y0, x1, y1), None
+        for dx, dy in LABEL_CANDIDATE_OFFSETS:
+            if exhausted or iterations >= max_iterations or time.perf_counter() - started > time_budget:
+                exhausted = True
+                break
+            iterations += 1
+            box = (x0 + dx * scale, y0 + dy * scale, x1 + dx * scale, y1 + dy * scale)
+            cost = sum(_box_overlap(box, other) for other in placed) + (area - _box_overlap(box, axes_box))
+            if best_cost is None or cost < best_cost:
+                best_shift, best_box, best_cost = (dx, dy), box, cost
+            if cost <= 0:
+                break
+        placed.append(best_box)
+        offset_x, offset_y = ann.xyann
+        offsets.append((offset_x + best_shift[0], offset_y + best_shift[1]))
+
+    for ann, offset in zip(annotations, offsets):
+        ann.xyann = offset
+
+    # 예산 안에 끝난 배치만 캐시 (결과가 입력에만 의존하도록)
+    if not exhausted:
+        _label_placements[key] = offsets
+        while len(_label_placements) > LABEL_PLACEMENT_CACHE_SIZE:
+            _label_placements.popitem(last=False)
+    print(f"🏷 레이블 배치: {len(annotations)}개, {iterations}회 시도 "
+          f"({time.perf_counter() - started:.3f}초){' - 예산 초과로 일부 원래 위치 유지' if exhausted else ''}")
+
+
+# 차트 점 개수 상한 - 넘으면 점도표는 밀도 유지 표본, 선은 LTTB로 줄여 그림 (0이면 제한 없음)
+DEFAULT_POINT_BUDGET = 20000
+LINE_POINT_BUDGET = 2000
+DECIMATION_GRID = (120, 60)  # 점도표 표본 추출 격자 (x칸, y칸)
+
+
+def _plot_values(values):
+    """날짜/숫자 시리즈를 float 배열로 (날짜는 ns 단위)"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype='datetime64[ns]').astype('int64').astype(float)
+    return values.to_numpy(dtype=float)
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets - 선 모양을 유지하는 threshold개 점의 인덱스 (첫/끝 점 포함)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)  # 첫/끝 점 제외 구간 경계
+    selected = [0]
+    for b in range(threshold - 2):
+        start, end = edges[b], max(edges[b + 1], edges[b] + 1)
+        next_start, next_end = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        # 다음 구간 평균점 (마지막 구간은 끝 점)
+        if next_start < next_end and b + 2 < len(edges):
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        a = selected[-1]
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        selected.append(start + int(np.argmax(areas)))
+    selected.append(n - 1)
+    return np.asarray(selected)
+
+
+def _grid_cells(x, y, x_cells, y_cells):
+    """점마다 x_cells x y_cells 격자 칸 번호"""
+    x_bin = np.minimum(((x - x.min()) / (np.ptp(x) or 1) * x_cells).astype(int), x_cells - 1)
+    y_bin = np.minimum(((y - y.min()) / (np.ptp(y) or 1) * y_cells).astype(int), y_cells - 1)
+    return x_bin * y_cells + y_bin
+
+
+def scatter_sample_indices(x, y, budget):
+    """밀도 유지 점도표 표본 - 격자 칸마다 1개 + 남은 상한을 거래 수에 비례 배분, 최고/최저가는 항상 포함
+    거래가 있는 칸이 상한보다 많으면 격자를 절반씩 거칠게 (결과는 상한 + 극값 2개 이하), 같은 입력이면 같은 표본"""
+    n = len(x)
+    if not budget or n <= budget:
+        return np.arange(n)
+    x_cells, y_cells = DECIMATION_GRID
+    cell = _grid_cells(x, y, x_cells, y_cells)
+    while len(np.unique(cell)) > budget:
+        x_cells, y_cells = max(1, x_cells // 2), max(1, y_cells // 2)
+        cell = _grid_cells(x, y, x_cells, y_cells)
+
+    order = np.argsort(cell, kind='mergesort')
+    _, starts, counts = np.unique(cell[order], return_index=True, return_counts=True)
+    extra = np.floor(counts * ((budget - len(counts)) / n)).astype(int)
+    quotas = 1 + np.minimum(counts - 1, extra)
+    picked = [order[start + (np.arange(quota) * count // quota)]  # 칸 안에서 일정 간격 추출
+              for start, count, quota in zip(starts, counts, quotas)]
+    picked.append(np.array([np.argmax(y), np.argmin(y)]))  # 극값은 그대로 유지
+    return np.unique(np.concatenate(picked))
+
+
+def decimate_scatter(dates, prices, budget):
+    """점도표용 (날짜, 가격) - 상한 이하면 그대로"""
+    if not budget or len(prices) <= budget:
+        return dates, prices
+    keep = scatter_sample_indices(_plot_values(dates), _plot_values(prices), budget)
+    return pd.Series(dates).iloc[keep], pd.Series(prices).iloc[keep]
+
+
+def decimate_line(dates, values, budget=LINE_POINT_BUDGET):
+    """선 그래프용 (날짜, 값) - LTTB로 줄이고 최고/최저점은 그대로 유지"""
+    if not budget or len(values) <= budget:
+        return dates, values
+    y = _plot_values(values)
+    keep = np.union1d(lttb_indices(_plot_values(dates), y, budget), [np.argmax(y), np.argmin(y)])
+    return pd.Series(dates).iloc[keep], pd.Series(values).iloc[keep]
+
+
+# 차트 이미지 피라미드 - 저장 시 한 번 만들어 팝업(화면 크기 단계 + 확대 타일)과 히스토리 미리보기에 사용
+PYRAMID_SUFFIX = ".pyramid"  # 이미지 옆 폴더 (예: chart.jpg.pyramid/)
+PYRAMID_TILE_SIZE = 512
+PYRAMID_SCREEN_WIDTH = 1600  # 가장 작은 단계 최대 너비 (팝업 첫 화면)
+THUMBNAIL_SIZE = (360, 240)
+
+
+def pyramid_dir(image_path):
+    """이미지 피라미드 폴더 경로"""
+    return image_path + PYRAMID_SUFFIX
+
+
+def load_pyramid_manifest(image_path):
+    """이미지 피라미드 정보 (없거나 원본 이미지가 바뀌었으면 None)"""
+    try:
+        with open(os.path.join(pyramid_dir(image_path), 'pyramid.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        stat = os.stat(image_path)
+        if manifest['source_size'] != stat.st_size or manifest['source_mtime'] != int(stat.st_mtime):
+            return None
+        return manifest
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_image_pyramid(image_path):
+    """차트 이미지의 썸네일/화면 크기 이미지/확대 단계(1/2씩 축소, 512px 타일) 생성 - 이미 있으면 그대로 반환
+    렌더링 워커 프로세스에서 실행 가능 (tkinter 접근 없음)"""
+    manifest = load_pyramid_manifest(image_path)
+    if manifest is not None:
+        return manifest
+
+    started = time.perf_counter()
+    out_dir = pyramid_dir(image_path)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir, exist_ok=True)
+    stat = os.stat(image_path)
+    with Image.open(image_path) as source:
+        level_image = source.convert('RGB')
+
+    tile = PYRAMID_TILE_SIZE
+    levels = []
+    while True:
+        width, height = level_image.size
+        level_dir = os.path.join(out_dir, str(len(levels)))
+        os.makedirs(level_dir, exist_ok=True)
+        cols, rows = -(-width // tile), -(-height // tile)
+        for col in range(cols):
+            for row in range(rows):
+                box = (col * tile, row * tile, min((col + 1) * tile, width), min((row + 1) * tile, height))
+                level_image.crop(box).save(os.path.join(level_dir, f"{col}_{row}.jpg"), quality=85)
+        levels.append({'width': width, 'height': height, 'cols': cols, 'rows': rows})
+        if width <= PYRAMID_SCREEN_WIDTH:
+            break
+        level_image = level_image.reduce(2)
+
+    # 팝업 첫 화면(가장 작은 단계 한 장)과 히스토리 썸네일
+    level_image.save(os.path.join(out_dir, 'screen.jpg'), quality=90)
+    thumbnail = level_image.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE, Image.LANCZOS)
+    thumbnail.save(os.path.join(out_dir, 'thumb.jpg'), quality=85)
+
+    # 정보 파일은 마지막에 기록 (중간에 실패하면 다음에 다시 생성)
+    manifest = {'source_size': stat.st_size, 'source_mtime': int(stat.st_mtime),
+                'tile_size': tile, 'levels': levels}
+    with open(os.path.join(out_dir, 'pyramid.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    print(f"🖼 이미지 피라미드 생성: {os.path.basename(image_path)} "
+          f"({levels[0]['width']}x{levels[0]['height']}, {len(levels)}단계, {time.perf_counter() - started:.2f}초)")
+    return manifest
+
 # 항상 최상위에 표시되는 커스텀 messagebox 함수들
 def show_topmost_info(title, message, parent=None):
     """항상 최상위에 표시되는 정보 메시지박스"""
@@ -143,266 +646,3913 @@ def ask_topmost_yesno(title, message, parent=None):
         parent.attributes('-topmost', False)
     return result
 
-class RealEstateAnalyzerApp:
-    def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("📊 부태리의 실거래가 차트")  # 이모지 추가
-        self.root.geometry("1400x1200")  # 크기 증가 (세로 길이 더 늘림)
 
-        # 현대적인 색상 테마 정의
-        self.colors = {
-            'primary': '#2C3E50',      # 다크 블루 (제목)
-            'secondary': '#3498DB',    # 밝은 블루 (액센트)
-            'success': '#27AE60',      # 그린 (성공)
-            'warning': '#F39C12',      # 오렌지 (경고)
-            'danger': '#E74C3C',       # 레드 (위험)
-            'light': '#ECF0F1',        # 밝은 회색 (배경)
-            'dark': '#34495E',         # 다크 그레이
-            'white': '#FFFFFF',        # 흰색
-            'bg_main': '#F8F9FA',      # 메인 배경
-            'bg_frame': '#FFFFFF',     # 프레임 배경
-            'text_primary': '#2C3E50', # 주요 텍스트
-            'text_secondary': '#7F8C8D', # 보조 텍스트
-            'border': '#BDC3C7'        # 테두리
-        }
+# 필지 키 = 표준 PNU (시군구코드 5자리 + 법정동코드 5자리 + 대지구분 1자리(1: 일반, 2: 산) + 본번 4자리 + 부번 4자리 = 19자리)
+# 실거래 데이터와 단지정보를 주소 문자열 포함 검색 대신 키 조인으로 연결하기 위해 사용
+PARCEL_KEY_LENGTH = 19
 
-        # 배경색 설정
-        self.root.configure(bg=self.colors['bg_main'])
+# 단지정보 주소 파싱용 정규식: "서울특별시 강남구 대치동 316-2" -> 지역명 / 산 / 본번 / 부번
+_ADDRESS_JIBUN_PATTERN = r'^(?P<region>.+?)\s+(?P<san>산\s*)?(?P<bon>\d+)(?:-(?P<bu>\d+))?(?=\s|$)'
 
-        # 종료 플래그 (백그라운드 스레드에서 확인)
-        self.is_closing = False
 
-        # 안전한 UI 업데이트 헬퍼 함수
-        def safe_after(delay, func):
-            """종료 중이 아닐 때만 UI 업데이트 실행"""
-            if not self.is_closing:
-                try:
-                    self.root.after(delay, func)
-                except:
-                    pass
+def split_jibun(jibun):
+    """지번 문자열을 (본번, 부번, 산 여부)로 분리 (예: '316-2' -> (316, 2, False), '산 12-1' -> (12, 1, True))"""
+    if jibun is None:
+        return None
+    match = re.search(r'(산\s*)?(\d+)(?:-(\d+))?', str(jibun))
+    if not match:
+        return None
+    return int(match.group(2)), int(match.group(3) or 0), bool(match.group(1))
 
-        self.safe_after = safe_after
 
-        # 기본 설정
-        self.download_path = "C:\\Download"
-        self.history_path = os.path.join(self.download_path, "history")
-        self.lawdong_path = "C:/law-dong/law-dong.txt"
-        self.image_path = os.path.join(self.download_path, "graph.jpg")
-        self.excel_path = None
-        
-        # 그래프 옵션 변수 추가 - 여기에 정의
-        self.show_monthly_avg = tk.BooleanVar(value=True)
-        self.show_monthly_max = tk.BooleanVar(value=True)
-        self.show_scatter_plot = tk.BooleanVar(value=True)
-        
-        # 전세 그래프 옵션 추가
-        self.show_jeonse = tk.BooleanVar(value=True)  # 전세 데이터 표시 여부
+def make_parcel_key(sigungu_code, dong_code, bonbun, bubun=0, mountain=False):
+    """필지 키(PNU) 생성 - 코드가 올바르지 않으면 None 반환 (mountain: 산 번지 여부)"""
+    try:
+        sigungu_code = str(sigungu_code).strip()
+        dong_code = str(dong_code).strip()
+        if len(sigungu_code) != 5 or len(dong_code) != 5:
+            return None
+        return f"{sigungu_code}{dong_code}{2 if mountain else 1}{int(bonbun):04d}{int(bubun or 0):04d}"
+    except (TypeError, ValueError):
+        return None
+
+
+def parcel_key_from_item(item, sigungu_code=None, umd_code_lookup=None):
+    """RTMS XML item에서 필지 키 추출 (sggCd/umdCd/bonbun/bubun 우선, 없으면 jibun 파싱)"""
+    sgg_cd = item.findtext('sggCd', '').strip() or (sigungu_code or '')
+    umd_cd = item.findtext('umdCd', '').strip()
+    if not umd_cd and umd_code_lookup:
+        # 전월세 API 등 법정동 코드가 없는 경우 시군구코드 + 동이름으로 조회
+        umd_cd = umd_code_lookup.get((sgg_cd, item.findtext('umdNm', '').strip()), '')
+
+    bonbun = item.findtext('bonbun', '').strip()
+    bubun = item.findtext('bubun', '').strip()
+    parts = split_jibun(item.findtext('jibun', ''))
+    mountain = bool(parts and parts[2])  # 산 구분은 jibun 문자열에만 있음
+    if not bonbun:
+        if parts is None:
+            return None
+        bonbun, bubun, _ = parts
+    return make_parcel_key(sgg_cd, umd_cd, bonbun, bubun or 0, mountain)
+
+
+def add_parcel_keys(df, address_col, bjd_code_by_name):
+    """주소 열을 벡터 연산으로 파싱하여 'parcel_key' 열 추가 (단지정보 h열 등)"""
+    df = df.copy()
+    parsed = df[address_col].astype(str).str.extract(_ADDRESS_JIBUN_PATTERN)
+
+    # 지역명 공백 정규화 후 법정동 코드(10자리) 매핑
+    region = parsed['region'].str.split().str.join(' ')
+    bjd_code = region.map(bjd_code_by_name)
+
+    bonbun = parsed['bon'].str.lstrip('0').replace('', '0').str.zfill(4)
+    bubun = parsed['bu'].fillna('0').str.lstrip('0').replace('', '0').str.zfill(4)
+    land = parsed['san'].notna().map({True: '2', False: '1'})  # 대지구분 (1: 일반, 2: 산)
+
+    df['parcel_key'] = (bjd_code + land + bonbun + bubun).where(bjd_code.notna() & bonbun.notna())
+    return df
+
+
+def join_complex_info(complex_df, apt_infos):
+    """선택된 아파트들과 단지정보를 필지 키로 한 번에 조인 - {parcel_key: 단지정보 행} 반환"""
+    if complex_df is None or complex_df.empty or 'parcel_key' not in complex_df.columns:
+        return {}
+
+    keys = pd.DataFrame({'parcel_key': [apt.get('parcel_key') for apt in apt_infos]}).dropna()
+    if keys.empty:
+        return {}
+
+    # 같은 필지에 여러 단지가 등록된 경우 첫 번째 행 사용 (기존 정확 매칭과 동일한 규칙)
+    candidates = complex_df.dropna(subset=['parcel_key']).drop_duplicates('parcel_key', keep='first')
+    joined = keys.drop_duplicates().merge(candidates, on='parcel_key', how='inner')
+    return {row['parcel_key']: row for _, row in joined.iterrows()}
+
+
+# 매전갭 분석 함수들
+def compute_gap_series(maemae_df, jeonse_df, since=None):
+    """매매 거래별 직전 전세가와의 매전갭 시계열 계산 (정렬된 as-of 조인)"""
+    columns = ['date', 'price', 'jeonse_price', 'gap']
+    if maemae_df is None or jeonse_df is None or maemae_df.empty or jeonse_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    maemae = maemae_df[['date', 'price']]
+    jeonse = jeonse_df[['date', 'price']]
+    if since is not None:
+        maemae = maemae[maemae['date'] >= since]
+        jeonse = jeonse[jeonse['date'] >= since]
+    if maemae.empty or jeonse.empty:
+        return pd.DataFrame(columns=columns)
+
+    # 안정 정렬 - 같은 날짜 전세 거래가 여러 건이면 마지막 행이 선택됨 (기존 iloc[-1]과 동일)
+    maemae = maemae.sort_values('date', kind='mergesort')
+    jeonse = jeonse.sort_values('date', kind='mergesort').rename(columns={'price': 'jeonse_price'})
+
+    merged = pd.merge_asof(maemae, jeonse, on='date', direction='backward')
+    merged = merged.dropna(subset=['jeonse_price'])
+    merged['gap'] = merged['price'] - merged['jeonse_price']
+    return merged[columns].reset_index(drop=True)
+
+
+def min_gap_from_series(gap_series):
+    """매전갭 시계열에서 최소 갭과 그 날짜 반환 (없으면 (None, None))"""
+    if gap_series is None or gap_series.empty:
+        return None, None
+    row = gap_series.loc[gap_series['gap'].idxmin()]
+    return row['gap'], row['date']
+
+
+# 분석 엔진 - 차트/표 렌더링과 분리된 순수 계산 함수 (입력 데이터 지문 기준 메모이제이션)
+ANALYTICS_CACHE_SIZE = 256  # 메모이제이션 최대 항목 수
+_analytics_cache = OrderedDict()
+_analytics_cache_lock = threading.Lock()
+
+
+def dataset_fingerprint(df, columns=None):
+    """DataFrame 내용 지문 - 기본은 전체 열 (열 이름 포함), columns 지정 시 그 열만 (지정 열이 없으면 전체 열)"""
+    if df is None or len(df) == 0:
+        return 'empty'
+    cols = [c for c in (columns or ()) if c in df.columns] or list(df.columns)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(cols).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df[cols], index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def memoize_by_fingerprint(func):
+    """DataFrame 인자는 내용 지문으로, 나머지 인자는 값으로 결과를 캐시 (결과 객체는 수정하지 말 것)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        def key_of(value):
+            if isinstance(value, pd.DataFrame):
+                return ('df', dataset_fingerprint(value))
+            return repr(value)
+
+        key = (func.__name__,
+               tuple(key_of(a) for a in args),
+               tuple(sorted((k, key_of(v)) for k, v in kwargs.items())))
+
+        with _analytics_cache_lock:
+            if key in _analytics_cache:
+                _analytics_cache.move_to_end(key)
+                return _analytics_cache[key]
+
+        result = func(*args, **kwargs)
+
+        with _analytics_cache_lock:
+            _analytics_cache[key] = result
+            while len(_analytics_cache) > ANALYTICS_CACHE_SIZE:
+                _analytics_cache.popitem(last=False)
+        return result
+    return wrapper
+
+
+@dataclass(frozen=True)
+class TradeSummary:
+    """거래 요약 (연복리, 전고점 대비 하락률 등)"""
+    count: int
+    first_date: object
+    last_date: object
+    years: float
+    first_price: float
+    last_price: float
+    max_price: float
+    max_date: object
+    min_price: float
+    min_date: object
+    avg_price: float
+    median_price: float
+    change: float
+    decline_rate: float
+    cagr: float
+
+
+@dataclass(frozen=True)
+class HighLatestMarkers:
+    """월 최고가 중 최고점과 최근 월 정보 (차트 어노테이션용)"""
+    max_date: object
+    max_price: float
+    latest_date: object
+    latest_price: float
+    close_dates: bool  # 최고가와 최근가가 6개월 이내인지
+
+    @property
+    def show_latest(self):
+        """최근가 어노테이션 표시 여부 - 최고가와 다르고 6개월 이상 떨어진 경우만"""
+        return self.latest_date != self.max_date and not self.close_dates
+
+
+@dataclass(frozen=True)
+class GapAnalysis:
+    """매전갭 분석 결과"""
+    jeonse_price: float
+    gap: float
+    min_gap: object
+    min_gap_date: object
+    series: object = field(repr=False)  # 거래별 매전갭 시계열 DataFrame
+
+
+@dataclass(frozen=True)
+class PairGap:
+    """두 단지 월평균 매매가의 최소 갭"""
+    min_gap: float
+    date: object
+    price1: float
+    price2: float
+
+
+@memoize_by_fingerprint
+def monthly_price_stats(df):
+    """월별 평균가/최고가/거래건수 (date는 각 월의 첫 거래일)"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['year_month', 'date', 'avg_price', 'max_price', 'count'])
+
+    df_sorted = df[['date', 'price']].sort_values('date', kind='mergesort')
+    year_month = df_sorted['date'].dt.strftime('%Y-%m')
+    monthly = df_sorted.groupby(year_month).agg(
+        date=('date', 'first'),
+        avg_price=('price', 'mean'),
+        max_price=('price', 'max'),
+        count=('price', 'size')
+    )
+    monthly.index.name = 'year_month'
+    return monthly.reset_index().sort_values('date', kind='mergesort').reset_index(drop=True)
+
+
+@memoize_by_fingerprint
+def trade_summary(df):
+    """거래 요약 계산 - 거래 2건 미만이거나 기간이 0이면 None"""
+    if df is None or len(df) < 2:
+        return None
+
+    df_sorted = df[['date', 'price']].sort_values('date', kind='mergesort')
+    first_trade = df_sorted.iloc[0]
+    last_trade = df_sorted.iloc[-1]
+    max_trade = df_sorted.loc[df_sorted['price'].idxmax()]
+    min_trade = df_sorted.loc[df_sorted['price'].idxmin()]
+    years = (last_trade['date'] - first_trade['date']).days / 365.25
+
+    if years <= 0 or first_trade['price'] <= 0:
+        return None
+
+    cagr = ((last_trade['price'] / first_trade['price']) ** (1 / years) - 1) * 100
+    decline_rate = 0.0
+    if max_trade['price'] > 0:
+        decline_rate = ((max_trade['price'] - last_trade['price']) / max_trade['price']) * 100
+
+    return TradeSummary(
+        count=len(df_sorted),
+        first_date=first_trade['date'],
+        last_date=last_trade['date'],
+        years=years,
+        first_price=first_trade['price'],
+        last_price=last_trade['price'],
+        max_price=max_trade['price'],
+        max_date=max_trade['date'],
+        min_price=min_trade['price'],
+        min_date=min_trade['date'],
+        avg_price=df_sorted['price'].mean(),
+        median_price=df_sorted['price'].median(),
+        change=last_trade['price'] - first_trade['price'],
+        decline_rate=decline_rate,
+        cagr=cagr
+    )
+
+
+@memoize_by_fingerprint
+def high_latest_markers(monthly):
+    """월별 통계에서 최고가 월과 최근 월 추출"""
+    if monthly is None or monthly.empty:
+        return None
+    monthly_max = monthly.loc[monthly['max_price'].idxmax()]
+    monthly_latest = monthly.iloc[-1]
+    date_diff = abs((monthly_latest['date'] - monthly_max['date']).days)
+    return HighLatestMarkers(
+        max_date=monthly_max['date'],
+        max_price=monthly_max['max_price'],
+        latest_date=monthly_latest['date'],
+        latest_price=monthly_latest['max_price'],
+        close_dates=date_diff <= 180  # 6개월(180일) 이내
+    )
+
+
+@memoize_by_fingerprint
+def gap_analysis(maemae_df, jeonse_df, since=None):
+    """매전갭 분석 - 최근 매매가/전세가 갭과 기준일 이후 최소 갭"""
+    if maemae_df is None or jeonse_df is None or maemae_df.empty or jeonse_df.empty:
+        return None
+    last_price = maemae_df.sort_values('date', kind='mergesort')['price'].iloc[-1]
+    jeonse_price = jeonse_df.sort_values('date', kind='mergesort')['price'].iloc[-1]
+    series = compute_gap_series(maemae_df, jeonse_df, since=since)
+    min_gap, min_gap_date = min_gap_from_series(series)
+    return GapAnalysis(jeonse_price=jeonse_price, gap=last_price - jeonse_price,
+                       min_gap=min_gap, min_gap_date=min_gap_date, series=series)
+
+
+@memoize_by_fingerprint
+def pair_min_gap(df1, df2, since=None):
+    """두 단지 월평균 매매가 차이가 가장 작았던 월 (두 단지 모두 거래가 있는 월만 비교)"""
+    frames = []
+    for df in (df1, df2):
+        if df is None or df.empty:
+            return None
+        data = df[df['date'] >= since] if since is not None else df
+        if data.empty:
+            return None
+        frames.append(data.groupby(data['date'].dt.to_period('M'))['price'].mean())
+
+    common = pd.concat(frames, axis=1, keys=['price1', 'price2'], join='inner').sort_index()
+    if common.empty:
+        return None
+    gaps = (common['price1'] - common['price2']).abs()
+    month = gaps.idxmin()
+    return PairGap(min_gap=gaps[month], date=month.to_timestamp(),
+                   price1=common.at[month, 'price1'], price2=common.at[month, 'price2'])
+
+
+# 월별 집계(롤업) - 단지/면적/거래유형별로 유지하며 새로 들어온 월만 다시 집계
+ROLLUP_QUANTILES = {'p10': 0.1, 'p50': 0.5, 'p90': 0.9}  # 분위수 스케치
+ROLLUP_COLUMNS = ['year_month', 'date', 'count', 'sum', 'avg_price', 'max_price', 'min_price',
+                  'last_price'] + list(ROLLUP_QUANTILES) + ['digest']
+
+
+def _month_keys(df):
+    """거래 날짜 -> 'YYYY-MM' 문자열"""
+    return df['date'].dt.strftime('%Y-%m')
+
+
+def monthly_digests(df, group_cols=()):
+    """그룹/월별 내용 지문 (행 순서와 무관) - 변경된 월 판별용"""
+    hashed = pd.util.hash_pandas_object(df[['date', 'price']], index=False).values
+    keys = [df[c] for c in group_cols] + [_month_keys(df)]
+    # uint64 해시를 두 부분으로 나눠 합산 (오버플로 없이 순서 무관 지문 생성)
+    parts = pd.DataFrame({'lo': (hashed & 0x7FFFFFFF).astype('int64'),
+                          'hi': (hashed >> 33).astype('int64'),
+                          'n': 1}, index=df.index)
+    sums = parts.groupby(keys).sum()
+    return sums['lo'].astype(str) + ':' + sums['hi'].astype(str) + ':' + sums['n'].astype(str)
+
+
+def compute_monthly_rollups(df, group_cols=()):
+    """월별 집계 (건수/합계/평균/최고/최저/마지막/분위수) - group_cols별로 한 번에 계산"""
+    group_cols = list(group_cols)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=group_cols + ROLLUP_COLUMNS)
+
+    df_sorted = df.sort_values('date', kind='mergesort')
+    keys = [df_sorted[c] for c in group_cols] + [_month_keys(df_sorted).rename('year_month')]
+    grouped = df_sorted.groupby(keys, sort=True)
+
+    rollup = grouped.agg(
+        date=('date', 'first'),  # 각 월의 첫 거래일 (차트 x좌표)
+        count=('price', 'size'),
+        sum=('price', 'sum'),
+        max_price=('price', 'max'),
+        min_price=('price', 'min'),
+        last_price=('price', 'last')
+    )
+    rollup['avg_price'] = rollup['sum'] / rollup['count']
+
+    quantiles = grouped['price'].quantile(list(ROLLUP_QUANTILES.values())).unstack()
+    quantiles.columns = list(ROLLUP_QUANTILES)
+    rollup = rollup.join(quantiles)
+
+    digests = monthly_digests(df_sorted, group_cols)
+    digests.index.names = rollup.index.names
+    rollup['digest'] = digests
+
+    return rollup.reset_index()[group_cols + ROLLUP_COLUMNS]
+
+
+class MonthlyRollupStore:
+    """단지/면적/거래유형별 월별 집계 저장소 - 변경된 월만 다시 계산하고 파일로 유지"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._rollups = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(apt_info, data_type, exclude_anomalies=False):
+        """집계 키 생성 (시도/시군구/동/아파트/면적/거래유형, 해제/이상거래 제외 시 구분자 추가)"""
+        try:
+            area = f"{float(apt_info['area']):g}"
+        except (TypeError, ValueError):
+            area = str(apt_info.get('area', ''))
+        parts = [apt_info.get('sido', ''), apt_info.get('sigungu', ''), apt_info.get('dong', ''),
+                 apt_info.get('apt_name', ''), area, data_type]
+        if exclude_anomalies:
+            parts.append('filtered')  # 필터링한 거래의 집계는 전체 거래 집계와 따로 저장
+        return '|'.join(parts)
+
+    def _path(self, key):
+        """집계 파일 경로"""
+        if not self.cache_dir:
+            return None
+        name = hashlib.blake2b(key.encode('utf-8'), digest_size=12).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
 
-        # 전세가 옵션 변수들 아래에 추가
-        self.show_jeonse_scatter_plot = tk.BooleanVar(value=True)
+    def _load(self, key):
+        """파일에서 집계 로드"""
+        path = self._path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rollup = pd.DataFrame(data['columns'])
+            if rollup.empty:
+                return None
+            rollup['date'] = pd.to_datetime(rollup['date'])
+            return rollup[ROLLUP_COLUMNS]
+        except Exception as e:
+            print(f"⚠️ 월별 집계 로드 실패: {str(e)}")
+            return None
 
-        # 세부정보 가져오기 옵션 변수 추가 (기본값: False)
-        self.show_complex_info = tk.BooleanVar(value=False)
+    def _save(self, key, rollup):
+        """집계를 열 단위 JSON으로 저장"""
+        path = self._path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data = rollup.copy()
+            data['date'] = data['date'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'columns': data.to_dict('list')}, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"⚠️ 월별 집계 저장 실패: {str(e)}")
+
+    def get(self, key):
+        """저장된 집계 반환 (없으면 None)"""
+        with self._lock:
+            if key not in self._rollups:
+                loaded = self._load(key)
+                if loaded is None:
+                    return None
+                self._rollups[key] = loaded
+            return self._rollups[key]
+
+    def update(self, key, df):
+        """거래 데이터로 집계 갱신 - 지문이 바뀐 월만 다시 집계하고 갱신된 집계 반환"""
+        if df is None or df.empty:
+            return compute_monthly_rollups(df)
+        return self.update_many({key: df})[key]
+
+    def update_many(self, frames):
+        """여러 키의 집계를 한 번에 갱신 ({키: 거래 DataFrame}) - 지문 비교와 재집계를 키 x 월 단일 groupby로 수행"""
+        results = {key: compute_monthly_rollups(df) for key, df in frames.items() if df is None or df.empty}
+        frames = {key: df for key, df in frames.items() if key not in results}
+        if not frames:
+            return results
+
+        combined = pd.concat([df[['date', 'price']].assign(rollup_key=key) for key, df in frames.items()],
+                             ignore_index=True)
+        digests = monthly_digests(combined, ('rollup_key',))
+        digests.index.names = ['rollup_key', 'year_month']
+
+        previous = {key: self.get(key) for key in frames}
+        old_parts = {key: rollup.set_index('year_month')['digest'] for key, rollup in previous.items() if rollup is not None}
+        if old_parts:
+            old_digests = pd.concat(old_parts, names=['rollup_key', 'year_month'])
+            changed = digests.index[old_digests.reindex(digests.index).values != digests.values]
+        else:
+            changed = digests.index
+
+        # 바뀐 (키, 월)만 한 번에 재집계
+        row_keys = pd.MultiIndex.from_arrays([combined['rollup_key'], _month_keys(combined)])
+        recomputed = compute_monthly_rollups(combined[row_keys.isin(changed)], ('rollup_key',))
+        changed_months = pd.Series(changed.get_level_values('year_month'), index=changed.get_level_values('rollup_key'))
+
+        for key in frames:
+            months = digests.loc[key].index
+            key_changed = set(changed_months[changed_months.index == key])
+            old = previous[key]
+            if old is not None and not key_changed and len(old) == len(months):
+                results[key] = old
+                continue
 
+            fresh = recomputed[recomputed['rollup_key'] == key][ROLLUP_COLUMNS]
+            kept = None if old is None else old[old['year_month'].isin(months) & ~old['year_month'].isin(key_changed)]
+            rollup = fresh if kept is None or kept.empty else pd.concat([kept, fresh], ignore_index=True)
+            rollup = rollup.sort_values('date', kind='mergesort').reset_index(drop=True)
+
+            with self._lock:
+                self._rollups[key] = rollup
+            self._save(key, rollup)
+            print(f"🧮 월별 집계 갱신: {key} - {len(key_changed)}/{len(rollup)}개월 재계산")
+            results[key] = rollup
+        return results
+
+    def monthly_mean_frame(self, key):
+        """기존 월평균 DataFrame 형식(date, price)으로 변환"""
+        rollup = self.get(key)
+        if rollup is None:
+            return pd.DataFrame(columns=['date', 'price'])
+        return rollup[['date', 'avg_price']].rename(columns={'avg_price': 'price'})
+
+
+# 지역-월 거래 저장소 - 시군구 코드 x 계약월 단위로 전체 거래를 한 번만 조회하여 열 단위로 보관
+RTMS_ENDPOINTS = {
+    'purchase': "http://apis.data.go.kr/1613000/RTMSDataSvcAptTrade/getRTMSDataSvcAptTrade",
+    'jeonse': "http://apis.data.go.kr/1613000/RTMSDataSvcAptRent/getRTMSDataSvcAptRent",
+}
+REGION_MONTH_COLUMNS = ['apt_name', 'dong', 'area', 'date', 'price', 'monthly_rent',
+                        'floor', 'build_year', 'jibun', 'parcel_key',
+                        'cdeal_type', 'cdeal_day', 'dealing_gbn']
+REGION_MONTH_TEXT_COLUMNS = ['cdeal_type', 'cdeal_day', 'dealing_gbn']  # 이전 저장본에 없으면 빈 문자열
+REGION_MONTH_PAGE_SIZE = 5000
+REGION_MONTH_RECENT_MONTHS = 3          # 최근 3개월은 신고 지연을 반영해 재조회
+REGION_MONTH_RECENT_TTL = 12 * 60 * 60  # 최근 월 파일 유효 시간 (초)
+REGION_MONTH_MEMORY_FRAMES = 600        # 메모리에 유지할 지역-월 DataFrame 수
+
+
+def _to_int(text, default=0):
+    """'12,500' 같은 API 숫자 문자열을 정수로 변환"""
+    text = (text or '').replace(',', '').strip()
+    return int(text) if text else default
+
+
+def parse_rtms_response(xml_text, data_type, sigungu_code, umd_code_lookup=None):
+    """RTMS 응답 XML -> (열 단위 dict, totalCount) 변환 (지역-월 전체 거래)"""
+    root = ET.fromstring(xml_text)
+    columns = {c: [] for c in REGION_MONTH_COLUMNS}
+
+    for item in root.iter('item'):
+        try:
+            if data_type == 'purchase':
+                price = _to_int(item.findtext('dealAmount'))
+                monthly_rent = 0
+            else:
+                price = _to_int(item.findtext('deposit'))
+                monthly_rent = _to_int(item.findtext('monthlyRent'))
+            date = (f"{_to_int(item.findtext('dealYear')):04d}-"
+                    f"{_to_int(item.findtext('dealMonth')):02d}-"
+                    f"{_to_int(item.findtext('dealDay'), 1):02d}")
+            area = float(item.findtext('excluUseAr', '0') or 0)
+            floor = _to_int(item.findtext('floor'))
+        except (ValueError, TypeError):
+            continue
+
+        columns['apt_name'].append(item.findtext('aptNm', '').strip())
+        columns['dong'].append(item.findtext('umdNm', '').strip())
+        columns['area'].append(area)
+        columns['date'].append(date)
+        columns['price'].append(price)
+        columns['monthly_rent'].append(monthly_rent)
+        columns['floor'].append(floor)
+        columns['build_year'].append(item.findtext('buildYear', '').strip())
+        columns['jibun'].append(item.findtext('jibun', '').strip())
+        columns['parcel_key'].append(parcel_key_from_item(item, sigungu_code, umd_code_lookup))
+        columns['cdeal_type'].append(item.findtext('cdealType', '').strip())    # 해제 여부 ('O')
+        columns['cdeal_day'].append(item.findtext('cdealDay', '').strip())      # 해제 사유 발생일
+        columns['dealing_gbn'].append(item.findtext('dealingGbn', '').strip())  # 중개거래 / 직거래
+
+    total_count = _to_int(root.findtext('.//totalCount'), len(columns['date']))
+    return columns, total_count
+
+
+# 해제/이상거래 판정 - 같은 단지 월 ㎡당 중위가 대비 비율 (단지 표본 부족 시 동 중위가와 넓은 범위로 비교)
+ANOMALY_COMPLEX_MIN_TRADES = 3
+ANOMALY_DONG_MIN_TRADES = 5
+ANOMALY_COMPLEX_BAND = (0.6, 1.6)
+ANOMALY_DONG_BAND = (0.4, 2.5)
+ANOMALY_DIRECT_DEAL_LOW = 0.8  # 직거래는 단지 중위가의 80% 미만이면 이상거래
+
+
+def flag_anomalies(df):
+    """지역-월 DataFrame에 is_cancelled / is_outlier 플래그 추가 (벡터 연산, 지역-월당 1회)"""
+    if df.empty:
+        df['is_cancelled'] = pd.Series(dtype=bool)
+        df['is_outlier'] = pd.Series(dtype=bool)
+        return df
+
+    df['is_cancelled'] = df['cdeal_type'].ne('')
+    valid = ~df['is_cancelled'] & (df['area'] > 0) & (df['price'] > 0) & (df['monthly_rent'] == 0)
+    ppsm = (df['price'] / df['area']).where(valid)
+
+    by_complex = ppsm.groupby([df['dong'], df['apt_name']])
+    complex_ref = by_complex.transform('median').where(by_complex.transform('count') >= ANOMALY_COMPLEX_MIN_TRADES)
+    by_dong = ppsm.groupby(df['dong'])
+    dong_ref = by_dong.transform('median').where(by_dong.transform('count') >= ANOMALY_DONG_MIN_TRADES)
+
+    complex_ratio = ppsm / complex_ref
+    dong_ratio = ppsm / dong_ref
+    low = np.where(df['dealing_gbn'] == '직거래', ANOMALY_DIRECT_DEAL_LOW, ANOMALY_COMPLEX_BAND[0])
+    complex_outlier = (complex_ratio < low) | (complex_ratio > ANOMALY_COMPLEX_BAND[1])
+    dong_outlier = complex_ref.isna() & ((dong_ratio < ANOMALY_DONG_BAND[0]) | (dong_ratio > ANOMALY_DONG_BAND[1]))
+    df['is_outlier'] = valid & (complex_outlier | dong_outlier)
+    return df
+
+
+def anomaly_mask(df):
+    """해제/이상거래 행 마스크 (플래그 열이 없는 이전 캐시 데이터는 모두 False)"""
+    mask = pd.Series(False, index=df.index)
+    for column in ('is_cancelled', 'is_outlier'):
+        if column in df.columns:
+            mask |= df[column].fillna(False).astype(bool)
+    return mask
+
+
+def region_month_frame(columns):
+    """열 단위 dict -> DataFrame (date는 datetime으로 변환, 해제/이상거래 플래그 계산)"""
+    df = pd.DataFrame(columns, columns=REGION_MONTH_COLUMNS)
+    df[REGION_MONTH_TEXT_COLUMNS] = df[REGION_MONTH_TEXT_COLUMNS].fillna('').astype(str)
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    return flag_anomalies(df.dropna(subset=['date']).reset_index(drop=True))
+
+
+def trades_from_rows(rows, data_type):
+    """지역-월 거래 행 -> 기존 거래 dict 목록 (date는 datetime, 전세는 rent_type 포함)"""
+    trades = []
+    for date, price, floor, area, parcel_key, dealing_gbn, is_cancelled, is_outlier in zip(
+            rows['date'], rows['price'], rows['floor'], rows['area'], rows['parcel_key'],
+            rows['dealing_gbn'], rows['is_cancelled'], rows['is_outlier']):
+        trade = {
+            'date': date.to_pydatetime(),
+            'price': int(price),
+            'floor': int(floor),
+            'area': float(area),
+            'parcel_key': parcel_key,
+            'dealing_gbn': dealing_gbn,
+            'is_cancelled': bool(is_cancelled),
+            'is_outlier': bool(is_outlier)
+        }
+        if data_type != "purchase":
+            trade['rent_type'] = '전세'
+        trades.append(trade)
+    return trades
 
-        # 새로운 전세가 옵션 변수 추가
-        self.show_jeonse_monthly_avg = tk.BooleanVar(value=True)  # 전세 월평균가격 표시 여부
-        self.show_jeonse_monthly_max = tk.BooleanVar(value=True)  # 전세 월최고가 표시 여부
-        self.show_jeonse_scatter_plot = tk.BooleanVar(value=True)  # 전세 점도표 표시 여부
 
-        # 전세 데이터 수집 여부 옵션 추가 (기본값: True)
-        self.collect_jeonse_data = tk.BooleanVar(value=True)  # 전세 데이터 수집 여부
-        
-        # 설정 파일 로드
-        self.load_settings()
-        
-        # 폴더 생성
-        for path in [self.download_path, self.history_path]:
-            if not os.path.exists(path):
-                os.makedirs(path)
-        
-        # 폰트 설정
-        self.setup_fonts()
+def area_buckets(rows):
+    """전용면적 구간별 거래 행 분리 - [(구간 키, 표시 라벨, 행)] (면적 오름차순)
+    구간 키는 정수 ㎡ 반올림 값 (매매/전세 같은 구간 연결용), 표시 라벨은 구간 내 최빈 면적"""
+    if rows.empty:
+        return []
+    return [(f"{bucket:g}", f"{group['area'].mode().iloc[0]:g}", group)
+            for bucket, group in rows.groupby(rows['area'].round(0), sort=True)]
 
-        # ttk 스타일 설정
-        self.setup_styles()
 
-        # 법정동 코드 관련 변수 초기화
-        self.region_codes = {}
-        self.sido_list = []
-        self.sigungu_dict = {}
-        self.dong_dict = {}
-        
-        # 법정동 파일 로드
-        self.load_lawdong_file()
-        
-        # API 키 설정
-        self.service_key = "Vs5lXsSo6iEI8no3pP%2FT0udWF9s7Cc8oP1SIWnEI5F4h6dKq92fLvnKmxkoWGJxSeW2%2FSOLQECGxOJzWcjJEXQ%3D%3D"
-        
-        # GUI 설정
-        self.setup_gui()
-        
-        # 히스토리 로드
-        self.history_list = self.load_history()
-        self.update_history_display()
+class RegionMonthStore:
+    """지역-월 단위 거래 저장소 - 같은 (거래유형, 시군구, 계약월)은 한 번만 API 조회"""
 
-        # 윈도우 닫기 프로토콜 설정 (프로그램 종료 시 자동 저장)
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+    def __init__(self, cache_dir, service_key, umd_code_lookup=None, max_workers=16):
+        self.cache_dir = cache_dir
+        self.service_key = service_key
+        self.umd_code_lookup = umd_code_lookup or {}
+        self.max_workers = max_workers
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, data_type, lawd_cd, deal_ymd):
+        """지역-월 파일 경로"""
+        return os.path.join(self.cache_dir, 'region_month', data_type, str(lawd_cd), f"{deal_ymd}.json.gz")
+
+    @staticmethod
+    def _is_recent(deal_ymd):
+        """최근 N개월 여부 (신고 지연으로 데이터가 계속 추가되는 기간)"""
+        now = datetime.now()
+        months_ago = (now.year - int(deal_ymd[:4])) * 12 + (now.month - int(deal_ymd[4:6]))
+        return months_ago < REGION_MONTH_RECENT_MONTHS
+
+    def _is_fresh(self, path, deal_ymd):
+        """파일이 있고 (최근 월이면 유효 시간 이내) 재사용 가능한지"""
+        if not os.path.exists(path):
+            return False
+        if self._is_recent(deal_ymd):
+            return time.time() - os.path.getmtime(path) < REGION_MONTH_RECENT_TTL
+        return True
 
-        # 선택된 아파트 목록 저장 변수 추가
-        self.selected_apts = []
+    def _remember(self, path, df):
+        """메모리 LRU에 DataFrame 보관"""
+        with self._lock:
+            self._frames[path] = df
+            self._frames.move_to_end(path)
+            while len(self._frames) > REGION_MONTH_MEMORY_FRAMES:
+                self._frames.popitem(last=False)
+
+    def _load(self, path):
+        """파일에서 지역-월 DataFrame 로드"""
+        with self._lock:
+            if path in self._frames:
+                self._frames.move_to_end(path)
+                return self._frames[path]
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        df = region_month_frame(data['columns'])
+        self._remember(path, df)
+        return df
+
+    def _save(self, path, data_type, lawd_cd, deal_ymd, columns):
+        """지역-월 데이터를 열 단위 JSON(gzip)으로 저장 (임시 파일 후 교체)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'data_type': data_type, 'lawd_cd': lawd_cd, 'deal_ymd': deal_ymd,
+                       'fetched_at': datetime.now().isoformat(), 'columns': columns}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _fetch(self, session, data_type, lawd_cd, deal_ymd):
+        """API에서 지역-월 전체 거래 조회 (페이지 단위) - 실패 시 None"""
+        columns = {c: [] for c in REGION_MONTH_COLUMNS}
+        page = 1
+        while True:
+            url = (f"{RTMS_ENDPOINTS[data_type]}"
+                   f"?serviceKey={self.service_key}"
+                   f"&LAWD_CD={lawd_cd}"
+                   f"&DEAL_YMD={deal_ymd}"
+                   f"&numOfRows={REGION_MONTH_PAGE_SIZE}"
+                   f"&pageNo={page}")
+            try:
+                response = session.get(url, timeout=API_TIMEOUT)
+                if response.status_code != 200:
+                    return None
+                page_columns, total_count = parse_rtms_response(response.text, data_type, lawd_cd, self.umd_code_lookup)
+            except (requests.RequestException, ET.ParseError) as e:
+                print(f"⚠️ 지역-월 조회 실패 ({data_type} {lawd_cd} {deal_ymd}): {str(e)}")
+                return None
 
-        # 아파트 목록 캐시 (지역별로 저장)
-        # 키: (sigungu_code, dong) 튜플
-        # 값: 아파트 목록 리스트
-        self.apt_list_cache = {}
+            for name in REGION_MONTH_COLUMNS:
+                columns[name].extend(page_columns[name])
 
-        # 거래 데이터 파일 캐시 경로 초기화 (설정에서 로드됨)
-        self.trade_cache_path = None
+            if page * REGION_MONTH_PAGE_SIZE >= total_count or not page_columns['date']:
+                break
+            page += 1
 
+        path = self._path(data_type, lawd_cd, deal_ymd)
+        try:
+            self._save(path, data_type, lawd_cd, deal_ymd, columns)
+        except Exception as e:
+            print(f"⚠️ 지역-월 저장 실패: {str(e)}")
+        df = region_month_frame(columns)
+        self._remember(path, df)
+        return df
+
+    def clear_memory(self):
+        """메모리에 보관한 지역-월 데이터 비우기 (캐시 폴더 삭제 시)"""
+        with self._lock:
+            self._frames.clear()
+
+    def stored_months(self, data_type, lawd_cd):
+        """저장된 계약월(YYYYMM) 목록 (오래된 순)"""
+        folder = os.path.dirname(self._path(data_type, lawd_cd, '000000'))
+        if not os.path.isdir(folder):
+            return []
+        return sorted(f[:6] for f in os.listdir(folder) if f.endswith('.json.gz'))
 
-    def load_settings(self):
-        """설정 파일 로드 (단지정보 경로 포함)"""
-        settings_file = os.path.join(os.getcwd(), 'real_estate_analyzer_settings.json')
-        
-        # 기본 설정값 정의
-        default_settings = {
-            'download_path': os.path.join(os.path.expanduser('~'), 'Documents', 'RealEstateAnalyzer'),
-            'history_path': os.path.join(os.path.expanduser('~'), 'Documents', 'RealEstateAnalyzer', 'history'),
-            'lawdong_path': os.path.join(os.getcwd(), 'data', 'law-dong.txt'),
-            'complex_info_path': os.path.join(os.getcwd(), 'data', 'complex_info.xlsx'),  # 기본 단지정보 경로 추가
-            'trade_cache_path': os.path.join(os.path.expanduser('~'), 'Documents', 'RealEstateAnalyzer', 'trade_cache'),  # 거래 데이터 캐시 경로 추가
-            'graph_options': {
-                'show_monthly_avg': True,
-                'show_monthly_max': True,
-                'show_scatter_plot': True,
-                'show_jeonse': True,
-                'show_jeonse_monthly_avg': True,
-                'show_jeonse_monthly_max': True,
-                'show_jeonse_scatter_plot': True,
-                'collect_jeonse_data': True  # 전세 데이터 수집 여부
-            }
-        }
-        
-        # 설정 파일이 있으면 로드, 없으면 기본값 사용
-        if os.path.exists(settings_file):
+    def stored_month_versions(self, data_type, lawd_cd):
+        """저장된 계약월별 파일 버전 [(YYYYMM, 수정 시각 ns, 크기)] (오래된 순) - 최근 월 재조회 시 값이 바뀜"""
+        versions = []
+        for deal_ymd in self.stored_months(data_type, lawd_cd):
             try:
-                with open(settings_file, 'r', encoding='utf-8') as f:
-                    settings_data = json.load(f)
-                    
-                    # 기본 설정에 저장된 설정 병합 (누락된 설정은 기본값 유지)
-                    self.download_path = settings_data.get('download_path', default_settings['download_path'])
-                    self.history_path = settings_data.get('history_path', default_settings['history_path'])
-                    self.lawdong_path = settings_data.get('lawdong_path', default_settings['lawdong_path'])
-                    self.complex_info_path = settings_data.get('complex_info_path', default_settings['complex_info_path'])  # 단지정보 경로 로드
-                    self.trade_cache_path = settings_data.get('trade_cache_path', default_settings['trade_cache_path'])  # 거래 데이터 캐시 경로 로드
-                    
-                    # 그래프 옵션 로드
-                    # 그래프 옵션 로드 부분 수정
-                    if 'graph_options' in settings_data:
-                        graph_options = settings_data['graph_options']
-                        self.show_monthly_avg.set(graph_options.get('show_monthly_avg', True))
-                        self.show_monthly_max.set(graph_options.get('show_monthly_max', True))
-                        self.show_scatter_plot.set(graph_options.get('show_scatter_plot', True))
-                        self.show_jeonse.set(graph_options.get('show_jeonse', True))
-                        self.show_jeonse_monthly_avg.set(graph_options.get('show_jeonse_monthly_avg', True))
-                        self.show_jeonse_monthly_max.set(graph_options.get('show_jeonse_monthly_max', True))
-                        self.show_jeonse_scatter_plot.set(graph_options.get('show_jeonse_scatter_plot', True))
+                stat = os.stat(self._path(data_type, lawd_cd, deal_ymd))
+            except OSError:
+                continue
+            versions.append((deal_ymd, stat.st_mtime_ns, stat.st_size))
+        return versions
+
+    def get_months(self, data_type, lawd_cd, months, progress_callback=None, fetch_missing=True):
+        """여러 계약월(YYYYMM)의 지역 전체 거래 조회 - 저장된 월은 재사용, 없는 월만 병렬 조회
+        (fetch_missing=False면 API 호출 없이 저장된 월만 사용)"""
+        frames = []
+        missing = []
+        for deal_ymd in dict.fromkeys(months):  # 순서 유지 중복 제거
+            path = self._path(data_type, lawd_cd, deal_ymd)
+            if self._is_fresh(path, deal_ymd) or (not fetch_missing and os.path.exists(path)):
+                try:
+                    frames.append(self._load(path))
+                    continue
+                except Exception as e:
+                    print(f"⚠️ 지역-월 파일 손상, 재조회: {path} ({str(e)})")
+            missing.append(deal_ymd)
 
-                        # 세부정보 옵션 추가
-                        self.show_complex_info.set(graph_options.get('show_complex_info', False))
+        if missing and fetch_missing:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=self.max_workers,
+                                                    pool_maxsize=self.max_workers * 2, max_retries=1)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
 
-                        # 전세 데이터 수집 여부 옵션 추가
-                        self.collect_jeonse_data.set(graph_options.get('collect_jeonse_data', True))
-            except Exception as e:
-                print(f"설정 파일 로드 중 오류: {str(e)}")
-                self._apply_default_settings(default_settings)
-        else:
-            self._apply_default_settings(default_settings)
-            
-            # 기본 폴더 생성
-            for path in [self.download_path, self.history_path, self.trade_cache_path]:
-                if not os.path.exists(path):
-                    os.makedirs(path)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self._fetch, session, data_type, lawd_cd, ymd): ymd for ymd in missing}
+                for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                    df = future.result()
+                    if df is not None:
+                        frames.append(df)
+                    if progress_callback:
+                        progress_callback(done, len(missing))
+
+        print(f"🗂 지역-월 조회 ({data_type} {lawd_cd}): {len(months) - len(missing)}개월 저장소, {len(missing)}개월 API")
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return region_month_frame({c: [] for c in REGION_MONTH_COLUMNS})
+        return pd.concat(frames, ignore_index=True)
+
+
+def month_range(start_date, end_date):
+    """시작~종료 날짜 사이의 계약월(YYYYMM) 목록 (최신순)"""
+    months = []
+    year, month = end_date.year, end_date.month
+    while (year, month) >= (start_date.year, start_date.month):
+        months.append(f"{year:04d}{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return months
+
+
+SESSION_FILENAME = "session.json"  # 종료 시 선택 아파트 목록 (거래 캐시 폴더)
+SESSION_DATA_FIELDS = {'purchase': 'trades_data', 'jeonse': 'jeonse_data'}
+SESSION_EXCEL_FIELDS = {'purchase': 'excel_path', 'jeonse': 'jeonse_excel_path'}
+
+
+# 단지별 엑셀 거래내역 시트 컬럼 (거래 dict 키 -> 엑셀 컬럼명)
+APT_WORKBOOK_COLUMNS = {
+    'purchase': {'date': '거래일자', 'price': '가격(만원)', 'floor': '층', 'area': '면적(㎡)'},
+    'jeonse': {'date': '거래일자', 'price': '전세가(만원)', 'floor': '층', 'area': '면적(㎡)'},
+}
+
+
+def apt_workbook_trades(df, data_type):
+    """단지별 엑셀 거래내역 시트 데이터 - 시트 컬럼만 골라 한글 컬럼명으로 (필지 키/이상거래 표시 등은 제외), 최신순"""
+    columns = APT_WORKBOOK_COLUMNS['purchase' if data_type == "purchase" else 'jeonse']
+    trade_df = df.reindex(columns=list(columns)).rename(columns=columns)
+    if not trade_df.empty:
+        trade_df['거래일자'] = pd.to_datetime(trade_df['거래일자']).dt.strftime('%Y-%m-%d')
+        trade_df = trade_df.sort_values('거래일자', ascending=False)
+    return trade_df
+
+
+def trades_from_workbook(path, data_type):
+    """단지별 엑셀(거래내역 시트)에서 거래 dict 목록 복원 - 세션 복원 시 거래 캐시가 없을 때 사용"""
+    df = pd.read_excel(path, sheet_name='거래내역', engine='openpyxl')
+    if df.empty:
+        return []
+    price_column = '가격(만원)' if data_type == "purchase" else '전세가(만원)'
+    trades = []
+    for date, price, floor, area in zip(pd.to_datetime(df['거래일자']), df[price_column], df['층'], df['면적(㎡)']):
+        trade = {'date': date.to_pydatetime(), 'price': int(price), 'floor': int(floor), 'area': float(area)}
+        if data_type != "purchase":
+            trade['rent_type'] = '전세'
+        trades.append(trade)
+    return sorted(trades, key=lambda x: x['date'])
+
+
+EXPORT_FORMATS = ('csv', 'parquet')
+DEFAULT_TRADE_CACHE_PATH = os.path.join(os.path.expanduser('~'), 'Documents', 'RealEstateAnalyzer', 'trade_cache')
+
+
+def stored_region_months(cache_dir, data_types=('purchase', 'jeonse'), lawd_prefixes=None,
+                         start_ymd=None, end_ymd=None):
+    """저장된 지역-월 파일 목록 [(거래유형, 시군구코드, 계약월, 경로)] - 시군구코드 접두어/계약월 범위로 필터"""
+    months = []
+    for data_type in data_types:
+        type_dir = os.path.join(cache_dir, 'region_month', data_type)
+        if not os.path.isdir(type_dir):
+            continue
+        for lawd_cd in sorted(os.listdir(type_dir)):
+            if lawd_prefixes and not any(lawd_cd.startswith(prefix) for prefix in lawd_prefixes):
+                continue
+            for name in sorted(os.listdir(os.path.join(type_dir, lawd_cd))):
+                if not name.endswith('.json.gz'):
+                    continue
+                deal_ymd = name[:6]
+                if (start_ymd and deal_ymd < start_ymd) or (end_ymd and deal_ymd > end_ymd):
+                    continue
+                months.append((data_type, lawd_cd, deal_ymd, os.path.join(type_dir, lawd_cd, name)))
+    return months
 
-            # 단지정보 파일 경로 디렉토리 생성
-            complex_info_dir = os.path.dirname(self.complex_info_path)
-            if not os.path.exists(complex_info_dir):
-                os.makedirs(complex_info_dir)
 
-    def load_complex_info(self):
-        """단지정보 파일 로드"""
-        if not hasattr(self, 'complex_info_path') or not os.path.exists(self.complex_info_path):
-            return None
-        
+def export_region_store(cache_dir, out_path, fmt='csv', data_types=('purchase', 'jeonse'), lawd_prefixes=None,
+                        start_ymd=None, end_ymd=None, apt_names=None, dong=None, include_anomalies=True,
+                        progress_callback=None):
+    """저장된 거래를 CSV(파일 하나) 또는 Parquet(거래유형/시군구/연도별 폴더)으로 내보내기
+
+    지역-월 파일 하나씩 읽고 걸러서 바로 기록하므로 전체 기간/지역이어도 메모리에는 한 달치만 올라간다.
+    반환: {'rows', 'chunks', 'seconds', 'path'}
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (csv 또는 parquet)")
+    if fmt == 'parquet':
         try:
-            import pandas as pd
-            # 엑셀 파일 로드 - 첫 번째 행을 열 이름으로 사용
-            df = pd.read_excel(self.complex_info_path, engine='openpyxl')
-            
-            # 열 이름을 알파벳으로 설정
-            # 엑셀의 열 이름(A, B, C, ...)을 DataFrame의 열 이름으로 설정
-            alphabet_columns = []
-            for i in range(df.shape[1]):
-                if i < 26:
-                    col_name = chr(ord('a') + i)
-                else:
-                    # 26열 이상인 경우 aa, ab, ac... 로 설정
-                    first_letter = chr(ord('a') + (i // 26) - 1)
-                    second_letter = chr(ord('a') + (i % 26))
-                    col_name = first_letter + second_letter
-                alphabet_columns.append(col_name)
-            
-            df.columns = alphabet_columns
-            
-            return df
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다 (pip install pyarrow)")
+
+    started = time.perf_counter()
+    months = stored_region_months(cache_dir, data_types, lawd_prefixes, start_ymd, end_ymd)
+    apt_names = set(apt_names) if apt_names else None
+    rows = chunks = 0
+    header = True
+    if fmt == 'csv':
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        if os.path.exists(out_path):
+            os.remove(out_path)
+
+    for done, (data_type, lawd_cd, deal_ymd, path) in enumerate(months, start=1):
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                df = region_month_frame(json.load(f)['columns'])
         except Exception as e:
-            print(f"단지정보 파일 로드 중 오류: {str(e)}")
-            return None
-    
-    def _apply_default_settings(self, default_settings):
-        """기본 설정값 적용"""
-        self.download_path = default_settings['download_path']
-        self.history_path = default_settings['history_path']
-        self.lawdong_path = default_settings['lawdong_path']
-        self.complex_info_path = default_settings['complex_info_path']  # 단지정보 경로 추가
-        self.trade_cache_path = default_settings['trade_cache_path']  # 거래 데이터 캐시 경로 추가
-        
-        # 그래프 옵션 설정
-        graph_options = default_settings['graph_options']
-        self.show_monthly_avg.set(graph_options['show_monthly_avg'])
-        self.show_monthly_max.set(graph_options['show_monthly_max'])
-        self.show_scatter_plot.set(graph_options['show_scatter_plot'])
-        self.show_jeonse.set(graph_options['show_jeonse'])
-        self.show_jeonse_monthly_avg.set(graph_options['show_jeonse_monthly_avg'])
-        self.show_jeonse_monthly_max.set(graph_options['show_jeonse_monthly_max'])
-        self.show_jeonse_scatter_plot.set(graph_options['show_jeonse_scatter_plot'])
-        self.collect_jeonse_data.set(graph_options.get('collect_jeonse_data', True))
-
-
-    def setup_fonts(self):
-        """폰트 설정"""
-        # 기본 폰트 설정 (크기 증가)
-        self.font_normal = ('Malgun Gothic', 10)
-        self.font_large = ('Malgun Gothic', 12)
-        self.font_title = ('Malgun Gothic', 18, 'bold')
-        self.font_button = ('Malgun Gothic', 10)
+            print(f"⚠️ 지역-월 파일 읽기 실패, 건너뜀: {path} ({str(e)})")
+            continue
+
+        mask = np.ones(len(df), dtype=bool)
+        if apt_names is not None:
+            mask &= df['apt_name'].isin(apt_names).to_numpy()
+        if dong:
+            mask &= (df['dong'] == dong).to_numpy()
+        if not include_anomalies:
+            mask &= ~anomaly_mask(df).to_numpy()
+        df = df[mask].copy()
+        if not df.empty:
+            df.insert(0, 'data_type', data_type)
+            df.insert(1, 'lawd_cd', lawd_cd)
+            df.insert(2, 'deal_ymd', deal_ymd)
+            if fmt == 'csv':
+                # 엑셀에서 바로 열리도록 첫 조각만 BOM 포함 머리글
+                df.to_csv(out_path, mode='a', header=header, index=False,
+                          encoding='utf-8-sig' if header else 'utf-8', date_format='%Y-%m-%d')
+                header = False
+            else:
+                part_dir = os.path.join(out_path, f"data_type={data_type}", f"lawd_cd={lawd_cd}",
+                                        f"year={deal_ymd[:4]}")
+                os.makedirs(part_dir, exist_ok=True)
+                table = pa.Table.from_pandas(df.drop(columns=['data_type', 'lawd_cd']), preserve_index=False)
+                pq.write_table(table, os.path.join(part_dir, f"{deal_ymd}.parquet"))
+            rows += len(df)
+            chunks += 1
+        if progress_callback:
+            progress_callback(done, len(months), rows)
 
-        # matplotlib 폰트 설정
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-        plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
+    return {'rows': rows, 'chunks': chunks, 'seconds': time.perf_counter() - started, 'path': out_path}
 
-    def setup_styles(self):
-        """ttk 스타일 커스터마이징"""
-        style = ttk.Style()
-        style.theme_use('clam')  # 현대적인 테마
 
-        # 프레임 스타일
-        style.configure('TFrame', background=self.colors['bg_main'])
-        style.configure('Card.TFrame', background=self.colors['bg_frame'],
-                       relief='flat', borderwidth=0)
+def export_cli(argv):
+    """명령줄 내보내기 (--export) - GUI 없이 저장된 거래를 CSV/Parquet으로 내보내기
 
-        # 라벨프레임 스타일
+    예) --export 서울.csv --region 11 --from 200501 --to 202412 --type purchase
+        --export out_dir --format parquet --region 11680 --apt 은마 --apt 래미안대치팰리스
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="실거래가 비교 프로그램", description="저장된 실거래 데이터 내보내기")
+    parser.add_argument('--export', required=True, metavar='PATH', help="CSV 파일 경로 또는 Parquet 폴더")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help="기본: 경로가 .csv면 csv, 아니면 parquet")
+    parser.add_argument('--region', action='append', metavar='CODE',
+                        help="시군구코드 또는 접두어 (예: 11=서울 전체, 11680=강남구), 여러 번 지정 가능")
+    parser.add_argument('--from', dest='start_ymd', metavar='YYYYMM', help="시작 계약월")
+    parser.add_argument('--to', dest='end_ymd', metavar='YYYYMM', help="종료 계약월")
+    parser.add_argument('--type', choices=['purchase', 'jeonse', 'all'], default='all', help="거래유형")
+    parser.add_argument('--apt', action='append', metavar='NAME', help="단지명 (여러 번 지정 가능)")
+    parser.add_argument('--dong', help="법정동 이름")
+    parser.add_argument('--exclude-anomalies', action='store_true', help="해제/이상거래 제외")
+    parser.add_argument('--cache-dir', help="거래 데이터 캐시 폴더 (기본: 설정 파일의 trade_cache_path)")
+    args = parser.parse_args(argv)
+
+    cache_dir = args.cache_dir
+    if not cache_dir:
+        cache_dir = DEFAULT_TRADE_CACHE_PATH
+        settings_file = os.path.join(os.getcwd(), 'real_estate_analyzer_settings.json')
+        if os.path.exists(settings_file):
+            try:
+                with open(settings_file, 'r', encoding='utf-8') as f:
+                    cache_dir = json.load(f).get('trade_cache_path') or cache_dir  # 이전 버전은 null 저장
+            except Exception as e:
+                print(f"⚠️ 설정 파일 읽기 실패, 기본 캐시 폴더 사용: {str(e)}")
+    fmt = args.format or ('csv' if args.export.lower().endswith('.csv') else 'parquet')
+    data_types = ('purchase', 'jeonse') if args.type == 'all' else (args.type,)
+
+    def report(done, total, rows):
+        if done % 50 == 0 or done == total:
+            print(f"📤 {done}/{total}개월 처리, {rows:,}건 기록")
+
+    print(f"📤 내보내기 시작: {cache_dir} → {args.export} ({fmt})")
+    result = export_region_store(cache_dir, args.export, fmt, data_types, args.region, args.start_ymd,
+                                 args.end_ymd, args.apt, args.dong, not args.exclude_anomalies, report)
+    print(f"✅ 내보내기 완료: {result['rows']:,}건, {result['chunks']}개 조각, {result['seconds']:.1f}초 → {result['path']}")
+
+
+def compare_complexes(region_df, dong=None, target_area=84.0, area_tolerance=1.0,
+                      min_trades=3, max_complexes=50, recent_months=12):
+    """지역 거래에서 단지별 비교 지표와 월별 중위가를 한 번에 계산 (단지 수와 무관한 벡터 연산)"""
+    df = region_df[~anomaly_mask(region_df)]
+    if dong:
+        df = df[df['dong'] == dong]
+    df = df[(df['area'] - float(target_area)).abs() <= area_tolerance]
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame(), pd.Series(dtype=float)
+
+    df = df.sort_values('date', kind='mergesort')
+    keys = ['dong', 'apt_name']
+    grouped = df.groupby(keys, sort=False)
+
+    ranking = grouped.agg(
+        count=('price', 'size'),
+        first_date=('date', 'first'),
+        first_price=('price', 'first'),
+        last_date=('date', 'last'),
+        last_price=('price', 'last'),
+        max_price=('price', 'max')
+    )
+    ranking['max_date'] = df.loc[grouped['price'].idxmax(), keys + ['date']].set_index(keys)['date']
+
+    # 최근 N개월 중위가 (최근 거래가 없으면 마지막 거래가 사용)
+    cutoff = df['date'].max() - pd.DateOffset(months=recent_months)
+    recent = df[df['date'] >= cutoff].groupby(keys)['price'].median()
+    ranking['recent_median'] = recent.reindex(ranking.index).fillna(ranking['last_price'])
+
+    years = (ranking['last_date'] - ranking['first_date']).dt.days / 365.25
+    valid = (years > 0) & (ranking['first_price'] > 0)
+    ratio = ranking['last_price'] / ranking['first_price'].where(valid)
+    ranking['cagr'] = (ratio ** (1 / years.where(valid)) - 1) * 100
+    ranking['decline_rate'] = (ranking['max_price'] - ranking['last_price']) / ranking['max_price'] * 100
+
+    ranking = ranking[ranking['count'] >= min_trades]
+    ranking = ranking.sort_values('recent_median', ascending=False).head(max_complexes).reset_index()
+    ranking['label'] = np.where(ranking['apt_name'].duplicated(keep=False),
+                                ranking['apt_name'] + '(' + ranking['dong'] + ')', ranking['apt_name'])
+    ranking.insert(0, 'rank', np.arange(1, len(ranking) + 1))
+
+    # 월별 중위가 (단지 x 월) 및 지역 전체 월별 중위가
+    month = df['date'].dt.to_period('M').dt.to_timestamp()
+    selected = df.set_index(keys).index.isin(ranking.set_index(keys).index)
+    labels = ranking.set_index(keys)['label']
+    monthly = (df[selected].assign(month=month[selected])
+               .groupby(keys + ['month'])['price'].median()
+               .reset_index())
+    monthly['label'] = labels.reindex(pd.MultiIndex.from_frame(monthly[keys])).values
+    monthly_pivot = monthly.pivot(index='month', columns='label', values='price').sort_index()
+    region_monthly = df.groupby(month)['price'].median().sort_index()
+    return ranking, monthly_pivot, region_monthly
+
+
+# 지역 가격지수 - 월 표본이 이보다 적으면 ㎡당 중위가를 비움
+REGION_INDEX_MIN_TRADES = 5
+REPEAT_SALES_MAX_LOG_RATIO = math.log(3)  # 가격비 3배 초과 거래 쌍은 입력 오류로 보고 제외
+
+
+def _month_number(dates):
+    """날짜 -> 연속 월 번호 (year * 12 + month - 1)"""
+    return dates.dt.year * 12 + dates.dt.month - 1
+
+
+def _month_timestamp(month_numbers):
+    """연속 월 번호 -> 월 첫날 Timestamp"""
+    month_numbers = np.asarray(month_numbers, dtype=int)
+    return pd.to_datetime({'year': month_numbers // 12, 'month': month_numbers % 12 + 1, 'day': 1})
+
+
+def median_ppsm_index(region_df):
+    """월별 ㎡당 중위가(만원/㎡)와 거래수"""
+    df = region_df[region_df['area'] > 0]
+    if df.empty:
+        return pd.DataFrame(columns=['month', 'median_ppsm', 'count'])
+    ppsm = (df['price'] / df['area']).groupby(_month_number(df['date']))
+    result = pd.DataFrame({'median_ppsm': ppsm.median(), 'count': ppsm.size()})
+    result.loc[result['count'] < REGION_INDEX_MIN_TRADES, 'median_ppsm'] = np.nan
+    result.insert(0, 'month', _month_timestamp(result.index).values)
+    return result.reset_index(drop=True)
+
+
+def repeat_sales_index(region_df):
+    """반복매매 지수 (첫 달 = 100) - 같은 단지/면적/층의 연속 거래 쌍 로그 가격비를 월 더미로 회귀 (정규방정식)"""
+    empty = pd.DataFrame(columns=['month', 'repeat_index', 'pairs'])
+    df = region_df[region_df['price'] > 0]
+    if df.empty:
+        return empty
+
+    keys = ['dong', 'apt_name', 'area_key', 'floor']
+    df = df.assign(area_key=df['area'].round(0), month_no=_month_number(df['date']))
+    df = df.sort_values(keys + ['date'], kind='mergesort')
+    prev = df.groupby(keys, sort=False)[['month_no', 'price']].shift(1)
+
+    pairs = pd.DataFrame({'m0': prev['month_no'], 'm1': df['month_no'],
+                          'y': np.log(df['price'] / prev['price'])}).dropna()
+    pairs = pairs[(pairs['m0'] != pairs['m1']) & (pairs['y'].abs() <= REPEAT_SALES_MAX_LOG_RATIO)]
+    if pairs.empty:
+        return empty
+
+    start = int(pairs['m0'].min())
+    n = int(pairs['m1'].max()) - start + 1
+    i0 = pairs['m0'].to_numpy(dtype=int) - start
+    i1 = pairs['m1'].to_numpy(dtype=int) - start
+    y = pairs['y'].to_numpy()
+    ones = np.ones(len(pairs))
+
+    # X'X, X'y 를 bincount로 직접 구성 (X: 매도월 +1, 매수월 -1)
+    flat = np.concatenate([i0 * n + i0, i1 * n + i1, i0 * n + i1, i1 * n + i0])
+    xtx = np.bincount(flat, np.concatenate([ones, ones, -ones, -ones]), minlength=n * n).reshape(n, n)
+    xty = np.bincount(i1, y, minlength=n) - np.bincount(i0, y, minlength=n)
+
+    # 기준월(첫 달) 고정, 거래 쌍이 없는 달은 제외
+    observed = np.diag(xtx) > 0
+    observed[0] = False
+    idx = np.flatnonzero(observed)
+    log_index = np.full(n, np.nan)
+    log_index[0] = 0.0
+    if len(idx):
+        log_index[idx] = np.linalg.lstsq(xtx[np.ix_(idx, idx)], xty[idx], rcond=None)[0]
+
+    return pd.DataFrame({
+        'month': _month_timestamp(np.arange(start, start + n)).values,
+        'repeat_index': np.exp(log_index) * 100,
+        'pairs': np.bincount(i1, minlength=n)
+    })
+
+
+@memoize_by_fingerprint
+def region_price_index(region_df, dong=None):
+    """지역(동 또는 시군구 전체) 월별 가격지수 - ㎡당 중위가와 반복매매 지수를 한 번에 계산"""
+    df = region_df[~anomaly_mask(region_df)]
+    if dong is not None:
+        df = df[df['dong'] == dong]
+    median_index = median_ppsm_index(df)
+    repeat_index = repeat_sales_index(df)
+    if median_index.empty and repeat_index.empty:
+        return None
+    return median_index.merge(repeat_index, on='month', how='outer').sort_values('month').reset_index(drop=True)
+
+
+def benchmark_gap_analysis(n_trades=5000, repeat=3):
+    """매전갭 계산 벤치마크 - 기존 iterrows 방식과 as-of 조인 방식 비교 (python 파일 --benchmark-gap)"""
+    rng = np.random.default_rng(42)
+    start = datetime(2015, 1, 1)
+
+    def make_trades(base_price):
+        offsets = np.sort(rng.integers(0, 365 * 10, n_trades))
+        return pd.DataFrame({
+            'date': pd.to_datetime(start) + pd.to_timedelta(offsets, unit='D'),
+            'price': (base_price + rng.normal(0, base_price * 0.1, n_trades)).astype(int)
+        })
+
+    maemae_df = make_trades(100000)
+    jeonse_df = make_trades(60000)
+    cutoff_date = datetime(2020, 1, 1)
+
+    def legacy_min_gap():
+        maemae_2020 = maemae_df[maemae_df['date'] >= cutoff_date]
+        jeonse_2020 = jeonse_df[jeonse_df['date'] >= cutoff_date]
+        min_gap = float('inf')
+        min_gap_date = None
+        for _, maemae_row in maemae_2020.iterrows():
+            recent_jeonse = jeonse_2020[jeonse_2020['date'] <= maemae_row['date']]
+            if not recent_jeonse.empty:
+                gap = maemae_row['price'] - recent_jeonse.iloc[-1]['price']
+                if gap < min_gap:
+                    min_gap = gap
+                    min_gap_date = maemae_row['date']
+        return min_gap, min_gap_date
+
+    def asof_min_gap():
+        return min_gap_from_series(compute_gap_series(maemae_df, jeonse_df, since=cutoff_date))
+
+    timings = {}
+    results = {}
+    for name, func in [('iterrows', legacy_min_gap), ('merge_asof', asof_min_gap)]:
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[name] = func()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+
+    print(f"📏 매전갭 벤치마크 (매매 {n_trades:,}건 / 전세 {n_trades:,}건, 최소 {repeat}회 측정)")
+    for name, elapsed in timings.items():
+        print(f"   - {name:<10}: {elapsed * 1000:,.1f} ms  결과 {results[name]}")
+    if timings['merge_asof'] > 0:
+        print(f"   → {timings['iterrows'] / timings['merge_asof']:,.0f}배 빠름, 결과 일치: {results['iterrows'] == results['merge_asof']}")
+    return timings
+
+
+# 차트 렌더링 워커 - 열 단위 데이터를 받아 Agg Figure로 그리고 저장 (프로세스 유지)
+CHART_RENDER_WORKERS = 2
+CHART_OPTION_NAMES = ('show_monthly_avg', 'show_monthly_max', 'show_scatter_plot', 'show_jeonse',
+                      'show_jeonse_monthly_avg', 'show_jeonse_monthly_max', 'show_jeonse_scatter_plot',
+                      'show_complex_info', 'show_price_bands', 'show_region_index')
+# 대화형 차트 레이어 (아티스트 gid -> 표시에 필요한 옵션, 모두 켜져 있어야 표시)
+CHART_LAYERS = {
+    'scatter': ('show_scatter_plot',),
+    'monthly_avg': ('show_monthly_avg',),
+    'monthly_max': ('show_monthly_max',),
+    'max_annotation': ('show_monthly_max', 'show_annotations'),
+    'price_band': ('show_price_bands',),
+    'region_index': ('show_region_index',),
+    'jeonse_scatter': ('show_jeonse', 'show_jeonse_scatter_plot'),
+    'jeonse_monthly_avg': ('show_jeonse', 'show_jeonse_monthly_avg'),
+    'jeonse_monthly_max': ('show_jeonse', 'show_jeonse_monthly_max'),
+    'jeonse_max_annotation': ('show_jeonse', 'show_jeonse_monthly_max', 'show_annotations'),
+    'jeonse_price_band': ('show_jeonse', 'show_price_bands'),
+}
+CHART_LAYER_OPTIONS = sorted({name for names in CHART_LAYERS.values() for name in names} - {'show_annotations'})
+CHART_LEGEND_STYLE = dict(loc='upper left', bbox_to_anchor=(0.01, 0.99),
+                          fontsize=10, framealpha=0.95, frameon=True,
+                          fancybox=True, shadow=True,
+                          edgecolor='gray', facecolor='white')
+CHART_CACHE_VERSION = 1  # 차트 그리기 방식이 바뀌면 올려서 기존 캐시 무효화
+CHART_CACHE_MAX_BYTES = 500 * 1024 * 1024  # 차트 이미지 캐시 최대 용량
+_worker_region_stores = {}  # 워커 프로세스별 지역-월 저장소 (메모리 캐시 유지)
+
+
+def frame_to_columns(df):
+    """DataFrame -> 열 단위 dict (프로세스 간 전달용)"""
+    return {column: df[column].to_numpy() for column in df.columns}
+
+
+def columns_to_frame(columns):
+    """열 단위 dict -> DataFrame"""
+    return pd.DataFrame(columns)
+
+
+def worker_region_store(cache_dir):
+    """렌더링 워커 프로세스의 지역-월 저장소 (API 키 없이 저장된 월만 사용, 프로세스별 메모리 캐시 유지)"""
+    store = _worker_region_stores.get(cache_dir)
+    if store is None:
+        store = _worker_region_stores[cache_dir] = RegionMonthStore(cache_dir, None)
+    return store
+
+
+def stored_region_price_index(store, apt_info, dong=None):
+    """아파트 소재 시군구(또는 동)의 월별 가격지수 - 이미 저장된 지역-월 매매 데이터만 사용"""
+    sigungu_code = apt_info.get('sigungu_code')
+    months = store.stored_months('purchase', sigungu_code)
+    if not months:
+        return None
+    started = time.perf_counter()
+    region_df = store.get_months('purchase', sigungu_code, months, fetch_missing=False)
+    index = region_price_index(region_df, dong=dong)
+    print(f"⏱ 지역 가격지수 ({sigungu_code} {dong or '전체'}): {len(region_df):,}건, {len(months)}개월 "
+          f"({time.perf_counter() - started:.2f}초)")
+    return index
+
+
+def plot_price_band(ax, monthly_data, color, label, alpha=0.15, min_count=3, gid=None):
+    """월별 집계의 p10~p90 구간을 음영으로, p50을 가는 선으로 표시 (거래 min_count건 이상인 월만)"""
+    band = monthly_data[monthly_data['count'] >= min_count]
+    if band.empty:
+        return
+    ax.fill_between(band['date'], band['p10'], band['p90'], color=color, alpha=alpha,
+                    linewidth=0, label=label, zorder=1, gid=gid)
+    ax.plot(band['date'], band['p50'], color=color, linewidth=1, alpha=0.8, zorder=2, gid=gid)
+
+
+def multi_chart_filename(apt_dfs, chart_options, fingerprint=None):
+    """다중 비교 차트 파일명 (아파트명_면적 vs ... + 그래프 옵션 + 데이터 지문 앞 8자리)"""
+    filename = "multi_apt_comparison_"
+    for i, df in enumerate(apt_dfs):
+        if not df.empty:
+            apt_name = df['apt_name'].iloc[0]
+            area = df['area'].iloc[0]
+            apt_name_clean = ''.join(char for char in apt_name if char.isalnum() or char.isspace())
+            apt_name_clean = apt_name_clean.replace(' ', '_')
+            filename += f"{apt_name_clean}_{area}m2"
+            
+            # 다음 아파트가 있는 경우에만 vs 추가
+            if i < len(apt_dfs) - 1 and not apt_dfs[i+1].empty:
+                filename += "_vs_"
+    
+    # 그래프 옵션을 파일명에 추가
+    options = []
+    if chart_options['show_monthly_avg']:
+        options.append("avg")
+    if chart_options['show_monthly_max']:
+        options.append("max")
+    if chart_options['show_scatter_plot']:
+        options.append("scatter")
+    if chart_options['show_jeonse']:
+        options.append("jeonse")
+        
+    if options:
+        filename += "_" + "_".join(options)
+
+    # 데이터가 바뀐 차트는 다른 파일로 저장 (같은 이름 덮어쓰기 방지)
+    if fingerprint:
+        filename += f"_{fingerprint[:8]}"
+    
+    filename += ".jpg"
+    
+    return filename
+
+
+def draw_multi_chart(request):
+    """여러 아파트 비교 차트 Figure 생성 (tkinter/앱 상태 접근 없음) - 반환: (fig, 가격 그래프 ax)
+    request: prepare_chart_request()가 만든 열 단위 데이터와 옵션, 레이어별 아티스트에는 gid 지정 (CHART_LAYERS)"""
+    chart_options = request['options']
+    apts = request['apts']
+    complex_infos = request['complex_infos']
+    apt_dfs = [columns_to_frame(c) for c in request['apt_frames']]
+    monthly_dfs = [columns_to_frame(c) for c in request['monthly_frames']]
+    jeonse_dfs = [columns_to_frame(c) for c in request['jeonse_frames']]
+    monthly_jeonse_dfs = [columns_to_frame(c) for c in request['monthly_jeonse_frames']]
+    purchase_rollups = {key: columns_to_frame(c) for key, c in request['purchase_rollups'].items()}
+    jeonse_rollups = {key: columns_to_frame(c) for key, c in request['jeonse_rollups'].items()}
+    region_store = worker_region_store(request['region_cache_dir'])
+    # 점도표 점 개수 상한은 거래 시리즈(매매/전세) 수로 나눠 적용
+    series_count = sum(1 for df in apt_dfs + jeonse_dfs if not df.empty)
+    series_budget = request['point_budget'] // max(series_count, 1) if request['point_budget'] else 0
+
+    # seaborn 스타일 설정
+    sns.set_style("whitegrid")
+    sns.set_context("notebook", font_scale=1.1)
+
+    # seaborn 설정 후 한글 폰트 재설정 (seaborn이 폰트를 덮어쓰므로)
+    plt.rcParams['font.family'] = 'Malgun Gothic'
+    plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
+
+    # 매매가와 전세가 데이터 모두 있는 경우 레이아웃 조정
+    has_jeonse = jeonse_dfs and any(not df.empty for df in jeonse_dfs) and chart_options['show_jeonse']
+
+    # 단지세부정보 선택 여부에 따라 그래프 영역 크기 조정
+    from matplotlib.gridspec import GridSpec
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if chart_options['show_complex_info']:
+        # 하단에 단지세부정보 테이블이 있을 경우
+        fig = Figure(figsize=(18, 13))  # 크기 증가 (수익률 테이블 공간 추가)
+        FigureCanvasAgg(fig)  # Agg 캔버스 연결 (레이블 배치 렌더러용)
+        gs = GridSpec(18, 1, figure=fig, hspace=0.6)  # 행 증가 및 간격 증가
+        ax = fig.add_subplot(gs[0:9, 0])  # 그래프 영역: 0-8행 (9행)
+        ax_yield = fig.add_subplot(gs[10:12, 0])  # 수익률 테이블 영역: 10-11행 (2행) - 1행 간격 추가
+        # 단지세부정보 테이블은 나중에 gs[13:18, 0] 영역에 배치
+    else:
+        # 단지세부정보 없이 수익률 테이블만 표시
+        fig = Figure(figsize=(18, 11))  # 크기 증가
+        FigureCanvasAgg(fig)  # Agg 캔버스 연결 (레이블 배치 렌더러용)
+        gs = GridSpec(13, 1, figure=fig, hspace=0.6)  # 행 증가 및 간격 증가
+        ax = fig.add_subplot(gs[0:9, 0])  # 그래프 영역: 0-8행 (9행)
+        ax_yield = fig.add_subplot(gs[10:12, 0])  # 수익률 테이블 영역: 10-11행 (2행) - 1행 간격 추가
+
+    # 매매가 색상 - 더 진하고 가시성 좋은 색상
+    colors = [
+        '#E74C3C',  # 밝은 빨강 (매우 눈에 잘 띔)
+        '#3498DB',  # 밝은 파랑
+        '#2ECC71',  # 밝은 초록
+        '#F39C12',  # 밝은 주황
+        '#9B59B6',  # 보라
+        '#1ABC9C',  # 청록
+    ]
+    markers = ['o', 's', '^', 'D', 'X', 'P']
+
+    # 전세가 색상 (매매가보다 연한 색상)
+    jeonse_colors = [
+        '#F1948A',  # 연한 빨강
+        '#85C1E2',  # 연한 파랑
+        '#82E0AA',  # 연한 초록
+        '#F8C471',  # 연한 주황
+        '#BB8FCE',  # 연한 보라
+        '#76D7C4',  # 연한 청록
+    ]
+    jeonse_markers = ['v', 'd', '*', 'p', '8', 'h']
+    
+    max_price = 0
+    min_price = float('inf')
+    first_date = datetime.now()
+    last_date = datetime(1990, 1, 1)
+
+    # 연복리 계산 및 매전갭 정보를 저장할 변수
+    cagr_info = []
+
+    # 어노테이션 저장 리스트 (레이블 배치용)
+    annotations = []
+    labels_to_place = []
+
+    # 지역 가격지수 벤치마크 기준 아파트 (첫 번째 아파트)
+    benchmark_base = None
+
+    
+    # 1. 매매가 데이터 플롯
+    for i, df in enumerate(apt_dfs):
+        if df.empty:
+            continue
+            
+        apt_info = None
+        for apt in apts:
+            if apt['apt_name'] == df['apt_name'].iloc[0] and str(apt['area']) == str(df['area'].iloc[0]):
+                apt_info = apt
+                break
+                
+        if not apt_info:
+            continue
+            
+        apt_name = apt_info['apt_name']
+        area = apt_info['area']
+        
+        color = colors[i % len(colors)]
+        marker = markers[i % len(markers)]
+        
+        # 날짜 범위 업데이트
+        if df['date'].min() < first_date:
+            first_date = df['date'].min()
+        if df['date'].max() > last_date:
+            last_date = df['date'].max()
+        
+        # 점도표 (실거래가)
+        if chart_options['show_scatter_plot']:
+            alpha = 0.5 if len(apt_dfs) > 1 else 0.7
+            ax.scatter(*decimate_scatter(df['date'], df['price'], series_budget), 
+                       color=color, alpha=alpha, s=40, 
+                       marker=marker,
+                       label=f'{apt_name} ({area}㎡) 실거래', zorder=3, gid='scatter')
+        
+        # 월별 평균가/최고가 (월별 집계 - 새로 들어온 월만 재집계)
+        monthly_data = purchase_rollups.get(MonthlyRollupStore.make_key(apt_info, 'purchase', request['exclude_anomalies']))
+        if monthly_data is None:
+            monthly_data = compute_monthly_rollups(df)
+        if benchmark_base is None and len(monthly_data) > 0:
+            benchmark_base = (apt_info, monthly_data)
+
+        # 월별 p10~p90 가격대 (거래 3건 이상인 월만)
+        if chart_options['show_price_bands']:
+            plot_price_band(ax, monthly_data, color, f'{apt_name} ({area}㎡) p10~p90', gid='price_band')
+        
+        # 월 평균가격 그래프
+        if chart_options['show_monthly_avg']:
+            if len(monthly_data) > 0:
+                ax.plot(*decimate_line(monthly_data['date'], monthly_data['avg_price']), 
+                        color=color, linewidth=2.5, 
+                        label=f'{apt_name} ({area}㎡) 월평균', zorder=4, gid='monthly_avg')
+        
+        # 월 최고가 그래프
+        # 매매가 월 최고가 그래프에서 어노테이션 위치 조정
+        # 매매가 월 최고가 그래프에서 어노테이션 위치 조정
+        # 매매가 월 최고가 어노테이션 위치 조정 부분 수정
+        if chart_options['show_monthly_max']:
+            if len(monthly_data) > 0:
+                # 월 최고가 선 그래프
+                ax.plot(*decimate_line(monthly_data['date'], monthly_data['max_price']), 
+                        color=color, linewidth=1.5, linestyle='--', dashes=(2, 2),
+                        label=f'{apt_name} ({area}㎡) 월최고가', zorder=4, gid='monthly_max')
+                
+                # 월 최고가 중 최고점과 최근 월 (6개월 이내 여부 포함)
+                high_marks = high_latest_markers(monthly_data)
+                
+                # 상대적 가격 위치에 따른 어노테이션 위치 조정
+                # 현재 단지의 최고가
+                current_max_price = high_marks.max_price
+
+                # 요구사항 1, 2: 단지 수에 따른 위치 조정
+                # x 좌표를 기존 -40에서 -80으로 수정하여 더 왼쪽으로 이동
+                if len(apt_dfs) == 2:
+                    # 2개 단지 비교일 경우: 큰 값은 위로, 작은 값은 아래로
+                    # 다른 단지의 인덱스 구하기
+                    other_idx = 1 if i == 0 else 0
+                    if not apt_dfs[other_idx].empty:
+                        other_max_price = apt_dfs[other_idx]['price'].max()
+                        if current_max_price > other_max_price:
+                            max_xytext = (-100, 30)  # 더 높은 가격은 위로
+                        else:
+                            max_xytext = (-100, -30)  # 더 낮은 가격은 아래로
+                    else:
+                        max_xytext = (-100, 30)  # 다른 단지 데이터 없으면 위로
+                elif len(apt_dfs) >= 3:
+                    # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
+                    all_max_prices = [df['price'].max() for df in apt_dfs if not df.empty]
+                    sorted_prices = sorted(all_max_prices)
+
+                    if len(sorted_prices) >= 3:
+                        if current_max_price == sorted_prices[-1]:  # 가장 큰 값
+                            max_xytext = (-100, 50)  # 최상단
+                        elif current_max_price == sorted_prices[0]:  # 가장 작은 값
+                            max_xytext = (-100, -50)  # 최하단
+                        else:  # 중간값
+                            max_xytext = (-100, 0)  # 중앙
+                    else:
+                        # 정렬된 가격이 3개보다 적은 경우
+                        if current_max_price == max(sorted_prices):
+                            max_xytext = (-100, 30)  # 위로
+                        else:
+                            max_xytext = (-100, -30)  # 아래로
+                else:
+                    # 단일 단지인 경우
+                    max_xytext = (-80, 30)  # 좌측 위로
+                
+                # 최고가 점 표시
+                ax.scatter([high_marks.max_date], [high_marks.max_price],
+                          color='white', edgecolor=color, s=100, linewidth=2.5, zorder=5, gid='max_annotation')
+
+                # 최고가 어노테이션 추가 (더 세련된 스타일)
+                ann = ax.annotate(f"{high_marks.max_price:,.0f}만\n(최고가)",
+                          xy=(high_marks.max_date, high_marks.max_price),
+                          xytext=max_xytext,
+                          textcoords='offset points',
+                          bbox=dict(boxstyle='round,pad=0.6', fc='white', alpha=0.95,
+                                   edgecolor=color, linewidth=2),
+                          fontsize=10,
+                          color='red',
+                          fontweight='bold',
+                          zorder=6,
+                          gid='max_annotation',
+                          arrowprops=dict(
+                              arrowstyle='->',
+                              color=color,
+                              lw=1.5,
+                              alpha=0.8,
+                              connectionstyle="arc3,rad=0.2"
+                          ))
+                labels_to_place.append(ann)
+                
+                # 현재가 어노테이션 표시 조건 - 최고가와 다르고, 날짜가 충분히 떨어진 경우만
+                if high_marks.show_latest:
+                    
+                    # 요구사항 1, 2: 단지 수에 따른 위치 조정 (현재가)
+                    # 2개 단지 비교일 경우 코드 수정
+                    if len(apt_dfs) == 2:
+                        # 다른 단지의 인덱스 구하기
+                        other_idx = 1 if i == 0 else 0
+                        
+                        # 다른 단지의 데이터가 있는지 확인
+                        if not apt_dfs[other_idx].empty and len(monthly_dfs) > other_idx:
+                            other_monthly_data = monthly_dfs[other_idx]
+                            
+                            if not other_monthly_data.empty:
+                                # 다른 단지의 최근 월별 데이터
+                                other_latest = other_monthly_data.iloc[-1]
+                                
+                                # 현재 가격이 다른 단지보다 높으면 위로, 낮으면 아래로
+                                if high_marks.latest_price > other_latest['price']:
+                                    latest_xytext = (30, 30)  # 우측 위로
+                                else:
+                                    latest_xytext = (30, -30)  # 우측 아래로
+                            else:
+                                # 다른 단지의 월별 데이터가 없으면 기본값
+                                latest_xytext = (30, 0)
+                        else:
+                            # 다른 단지의 데이터가 없으면 기본값
+                            latest_xytext = (30, 0)
+                    # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
+                    elif len(apt_dfs) >= 3:
+                        # 모든 단지의 최근 가격을 비교
+                        latest_prices = []
+                        
+                        for j, monthly_df in enumerate(monthly_dfs):
+                            if j != i and not monthly_df.empty:  # 현재 단지가 아니고, 데이터가 있는 경우
+                                latest_prices.append(monthly_df.iloc[-1]['price'])
+                        
+                        if latest_prices:  # 다른 단지의, 비교할 데이터가 있는 경우
+                            current_price = high_marks.latest_price
+                            
+                            # 모든 가격 중 현재 가격의 상대적 위치 확인
+                            if current_price >= max(latest_prices):  # 가장 큰 값
+                                latest_xytext = (30, 50)  # 우측 위로
+                            elif current_price <= min(latest_prices):  # 가장 작은 값
+                                latest_xytext = (30, -50)  # 우측 아래로
+                            else:  # 중간값
+                                latest_xytext = (30, 0)  # 위치 변경 없음
+                        else:
+                            # 비교할 다른 단지 데이터가 없는 경우
+                            latest_xytext = (30, 0)
+                    else:
+                        # 단일 단지인 경우
+                        latest_xytext = (30, -30)  # 우측 아래로
+
+                    
+                    # 최근 거래가 점 표시
+                    ax.scatter([high_marks.latest_date], [high_marks.latest_price],
+                              color='white', edgecolor=color, s=100, linewidth=2.5, zorder=5, gid='max_annotation')
+
+                    # 현재가 어노테이션 추가 (더 세련된 스타일)
+                    ann = ax.annotate(f"{high_marks.latest_price:,.0f}만\n({high_marks.latest_date.strftime('%y.%m')})",
+                              xy=(high_marks.latest_date, high_marks.latest_price),
+                              xytext=latest_xytext,
+                              textcoords='offset points',
+                              bbox=dict(boxstyle='round,pad=0.6', fc='white', alpha=0.95,
+                                       edgecolor=color, linewidth=2),
+                              fontsize=10,
+                              color='green',
+                              fontweight='bold',
+                              zorder=6,
+                              gid='max_annotation',
+                              arrowprops=dict(
+                                  arrowstyle='->',
+                                  color=color,
+                                  lw=1.5,
+                                  alpha=0.8,
+                                  connectionstyle="arc3,rad=-0.2"
+                              ))
+                    labels_to_place.append(ann)
+                
+
+        
+        # 최대/최소 가격 갱신
+        if not df.empty:
+            if df['price'].max() > max_price:
+                max_price = df['price'].max()
+            if df['price'].min() < min_price:
+                min_price = df['price'].min()
+                
+        # 연복리 / 전고점 대비 하락률 (분석 엔진)
+        summary = trade_summary(df)
+        if summary is not None:
+            cagr_info.append({
+                'apt_name': apt_name,
+                'area': area,
+                'color': color,
+                'first_date': summary.first_date,
+                'last_date': summary.last_date,
+                'years': summary.years,
+                'first_price': summary.first_price,
+                'last_price': summary.last_price,
+                'max_price': summary.max_price,  # 최고거래가
+                'max_date': summary.max_date,    # 최고거래가 날짜
+                'decline_rate': summary.decline_rate,  # 전고점 대비 하락률
+                'change': summary.change,
+                'cagr': summary.cagr,
+                'type': '매매',
+                'jeonse_price': 0,  # 전세가 (기본값)
+                'gap': 0,  # 매전갭 (기본값)
+                'min_gap_2020': None,  # 2020년 이후 최소 갭 (기본값)
+                'min_gap_date_2020': None  # 2020년 이후 최소 갭 날짜 (기본값)
+            })
+    
+    # 지역 가격지수 벤치마크 (첫 번째 아파트 소재 지역, 저장된 지역-월 데이터 사용)
+    if chart_options['show_region_index'] and benchmark_base is not None:
+        base_info, base_monthly = benchmark_base
+        base_start = base_monthly['date'].min()
+        base_area = float(base_info['area'])
+        try:
+            # 동 ㎡당 중위가 x 면적 (같은 면적 동네 시세)
+            dong_index = stored_region_price_index(region_store, base_info, dong=base_info['dong'])
+            if dong_index is not None:
+                line = dong_index.dropna(subset=['median_ppsm'])
+                line = line[line['month'] >= base_start]
+                ax.plot(line['month'], line['median_ppsm'] * base_area,
+                        color='#7F8C8D', linewidth=1.8, linestyle=':',
+                        label=f"{base_info['dong']} ㎡당 중위가 × {base_area:g}㎡", zorder=2, gid='region_index')
+
+            # 시군구 반복매매 지수 (첫 월평균가 기준 환산 - 지역 상승률만큼 움직였을 때의 가격)
+            sigungu_index = stored_region_price_index(region_store, base_info)
+            if sigungu_index is not None:
+                line = sigungu_index.dropna(subset=['repeat_index'])
+                line = line[line['month'] >= base_start]
+                if not line.empty:
+                    scaled = line['repeat_index'] / line['repeat_index'].iloc[0] * base_monthly['avg_price'].iloc[0]
+                    ax.plot(line['month'], scaled,
+                            color='#34495E', linewidth=1.8, linestyle='-.',
+                            label=f"{base_info.get('sigungu', '')} 반복매매지수 환산", zorder=2, gid='region_index')
+        except Exception as e:
+            print(f"⚠️ 지역 가격지수 표시 실패: {str(e)}")
+    
+    # 2. 전세가 데이터 플롯 (매매가와 동일한 옵션 적용)
+    if jeonse_dfs and chart_options['show_jeonse']:
+        for i, df in enumerate(jeonse_dfs):
+            if df.empty:
+                continue
+                
+            apt_info = None
+            for apt in apts:
+                if apt['apt_name'] == df['apt_name'].iloc[0] and str(apt['area']) == str(df['area'].iloc[0]):
+                    apt_info = apt
+                    break
+                    
+            if not apt_info:
+                continue
+                
+            apt_name = apt_info['apt_name']
+            area = apt_info['area']
+            
+            color = jeonse_colors[i % len(jeonse_colors)]
+            marker = jeonse_markers[i % len(jeonse_markers)]
+            
+            # 날짜 범위 업데이트
+            if df['date'].min() < first_date:
+                first_date = df['date'].min()
+            if df['date'].max() > last_date:
+                last_date = df['date'].max()
+            
+            # 전세 점도표 (매매가와 동일한 옵션 적용)
+            if chart_options['show_jeonse_scatter_plot']:
+                alpha = 0.5 if len(jeonse_dfs) > 1 else 0.7
+                ax.scatter(*decimate_scatter(df['date'], df['price'], series_budget), 
+                          color=color, alpha=alpha, s=35, 
+                          marker=marker,
+                          label=f'{apt_name} ({area}㎡) 전세 실거래', zorder=2, gid='jeonse_scatter')
+            
+            # 월별 전세 평균가/최고가 (월별 집계 - 새로 들어온 월만 재집계)
+            monthly_data = jeonse_rollups.get(MonthlyRollupStore.make_key(apt_info, 'jeonse', request['exclude_anomalies']))
+            if monthly_data is None:
+                monthly_data = compute_monthly_rollups(df)
+
+            # 전세 월별 p10~p90 가격대
+            if chart_options['show_price_bands']:
+                plot_price_band(ax, monthly_data, color, f'{apt_name} ({area}㎡) 전세 p10~p90', alpha=0.1,
+                                gid='jeonse_price_band')
+            
+            # 전세 월평균가 추세선 (매매가와 동일한 옵션 적용)
+            if chart_options['show_jeonse_monthly_avg'] and len(monthly_data) > 0:
+                ax.plot(*decimate_line(monthly_data['date'], monthly_data['avg_price']), 
+                       color=color, linewidth=2, 
+                       label=f'{apt_name} ({area}㎡) 전세 월평균', zorder=3, gid='jeonse_monthly_avg')
+            
+            # 전세 월최고가 추세선 (매매가와 동일한 옵션 적용)
+            # 전세 월최고가 추세선에도 동일한 로직 적용
+            # 전세가 어노테이션 위치 조정 부분도 유사하게 수정
+            # 전세가 어노테이션 위치 조정 부분도 유사하게 수정
+            if chart_options['show_jeonse_monthly_max'] and len(monthly_data) > 0:
+                # 월 최고가 선 그래프
+                ax.plot(*decimate_line(monthly_data['date'], monthly_data['max_price']), 
+                       color=color, linewidth=1.5, linestyle='--', dashes=(2, 2),
+                       label=f'{apt_name} ({area}㎡) 전세 월최고가', zorder=3, gid='jeonse_monthly_max')
+                
+                # 전세 최고가 월과 최근 월
+                high_marks = high_latest_markers(monthly_data)
+                
+                # 요구사항 1, 2: 단지 수에 따른 위치 조정 (전세 최고가)
+                # x 좌표를 기존 -40에서 -80으로 수정하여 더 왼쪽으로 이동
+                if len(jeonse_dfs) == 2:
+                    # 2개 단지 비교일 경우: 큰 값은 위로, 작은 값은 아래로
+                    if i == 0:  # 첫 번째 단지
+                        jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
+                    else:  # 두 번째 단지
+                        jeonse_max_xytext = (-100, -30)  # 좌측 아래로 (x 값 -80)
+                elif len(jeonse_dfs) >= 3:
+                    # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
+                    sorted_prices = sorted([df['price'].max() for df in jeonse_dfs if not df.empty])
+                    if len(sorted_prices) >= 3:
+                        if df['price'].max() == sorted_prices[-1]:  # 가장 큰 값
+                            jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
+                        elif df['price'].max() == sorted_prices[0]:  # 가장 작은 값
+                            jeonse_max_xytext = (-100, -30)  # 좌측 아래로 (x 값 -80)
+                        else:  # 중간값
+                            jeonse_max_xytext = (-100, 0)  # 좌측으로만 이동 (x 값 -80)
+                    else:
+                        # 정렬된 가격이 3개보다 적은 경우
+                        if df['price'].max() == max(sorted_prices):
+                            jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
+                        else:
+                            jeonse_max_xytext = (-100, -30)  # 좌측 아래로 (x 값 -80)
+                else:
+                    # 단일 단지인 경우
+                    jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
+                
+                # 전세 최고가 점 표시
+                ax.scatter([high_marks.max_date], [high_marks.max_price], 
+                          color='white', edgecolor=color, s=70, linewidth=2, zorder=5, gid='jeonse_max_annotation')
+                
+                # 요구사항 3: 최고가는 항상 왼쪽에 위치 (x 값 -40)
+                ann = ax.annotate(f"전세 {high_marks.max_price:,.0f}만원 (최고가)\n"
+                           f"({high_marks.max_date.strftime('%Y-%m')})",
+                           xy=(high_marks.max_date, high_marks.max_price),
+                           xytext=jeonse_max_xytext, 
+                           textcoords='offset points',
+                           bbox=dict(boxstyle='round,pad=0.5', fc='white', alpha=0.8, edgecolor=color),
+                           fontsize=9,
+                           color='red',
+                           fontweight='bold',
+                           zorder=6,
+                           gid='jeonse_max_annotation',
+                           arrowprops=dict(
+                               arrowstyle='->',
+                               color=color,
+                               lw=1.2,
+                               alpha=0.7
+                           ))
+                labels_to_place.append(ann)
+                
+                # 현재가 어노테이션 표시 조건 - 최고가와 다르고, 날짜가 충분히 떨어진 경우만
+                if high_marks.show_latest:
+                    
+                    # 요구사항 1, 2: 단지 수에 따른 위치 조정 (전세 현재가)
+                    # 2개 단지 비교일 경우 코드 수정
+                    # 2개 단지 비교일 경우 코드 수정
+                    if len(jeonse_dfs) == 2:
+                        # 다른 단지의 인덱스 구하기
+                        other_idx = 1 if i == 0 else 0
+                        
+                        # 다른 단지의 데이터가 있는지 확인
+                        if not jeonse_dfs[other_idx].empty and len(monthly_jeonse_dfs) > other_idx:
+                            other_monthly_data = monthly_jeonse_dfs[other_idx]
+                            
+                            if not other_monthly_data.empty:
+                                # 다른 단지의 최근 월별 데이터
+                                other_latest = other_monthly_data.iloc[-1]
+                                
+                                # 현재 가격이 다른 단지보다 높으면 위로, 낮으면 아래로
+                                if high_marks.latest_price > other_latest['price']:
+                                    jeonse_latest_xytext = (30, 30)  # 우측 위로
+                                else:
+                                    jeonse_latest_xytext = (30, -30)  # 우측 아래로
+                            else:
+                                # 다른 단지의 월별 데이터가 없으면 기본값
+                                jeonse_latest_xytext = (30, 0)
+                        else:
+                            # 다른 단지의 데이터가 없으면 기본값
+                            jeonse_latest_xytext = (30, 0)
+                    # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
+                    elif len(jeonse_dfs) >= 3:
+                        # 모든 단지의 최근 가격을 비교
+                        latest_prices = []
+                        
+                        for j, monthly_df in enumerate(monthly_jeonse_dfs):
+                            if j != i and not monthly_df.empty:  # 현재 단지가 아니고, 데이터가 있는 경우
+                                latest_prices.append(monthly_df.iloc[-1]['price'])
+                        
+                        if latest_prices:  # 다른 단지의, 비교할 데이터가 있는 경우
+                            current_price = high_marks.latest_price
+                            
+                            # 모든 가격 중 현재 가격의 상대적 위치 확인
+                            if current_price >= max(latest_prices):  # 가장 큰 값
+                                jeonse_latest_xytext = (30, 50)  # 우측 위로
+                            elif current_price <= min(latest_prices):  # 가장 작은 값
+                                jeonse_latest_xytext = (30, -50)  # 우측 아래로
+                            else:  # 중간값
+                                jeonse_latest_xytext = (30, 0)  # 위치 변경 없음
+                        else:
+                            # 비교할 다른 단지 데이터가 없는 경우
+                            jeonse_latest_xytext = (30, 0)
+                    else:
+                        # 단일 단지인 경우
+                        jeonse_latest_xytext = (30, -30)  # 우측 아래로
+                    # 최근 전세가 점 표시
+                    ax.scatter([high_marks.latest_date], [high_marks.latest_price], 
+                              color='white', edgecolor=color, s=70, linewidth=2, zorder=5, gid='jeonse_max_annotation')
+                    
+                    # 요구사항 3: 현재가는 항상 오른쪽에 위치
+                    ann = ax.annotate(f"전세 {high_marks.latest_price:,.0f}만원\n"
+                               f"({high_marks.latest_date.strftime('%Y-%m')})",
+                               xy=(high_marks.latest_date, high_marks.latest_price),
+                               xytext=jeonse_latest_xytext, 
+                               textcoords='offset points',
+                               bbox=dict(boxstyle='round,pad=0.5', fc='white', alpha=0.8, edgecolor=color),
+                               fontsize=9, 
+                               zorder=6,
+                               gid='jeonse_max_annotation',
+                               arrowprops=dict(
+                                   arrowstyle='->',
+                                   color=color,
+                                   lw=1.2,
+                                   alpha=0.7
+                               ))
+                    labels_to_place.append(ann)
+                
+                # 최근 전세가와 최고가가 다르고, 6개월 이상 차이나는 경우에만
+  
+            
+            # 전세 최대/최소 가격도 전체 그래프 범위에 포함
+            if not df.empty:
+                if df['price'].max() > max_price:
+                    max_price = df['price'].max()
+                if df['price'].min() < min_price:
+                    min_price = df['price'].min()
+                    
+            # 전세 연복리 / 하락률 (분석 엔진)
+            summary = trade_summary(df)
+            if summary is not None:
+                jeonse_info = {
+                    'apt_name': apt_name,
+                    'area': area,
+                    'color': color,
+                    'first_date': summary.first_date,
+                    'last_date': summary.last_date,
+                    'years': summary.years,
+                    'first_price': summary.first_price,
+                    'last_price': summary.last_price,
+                    'max_price': summary.max_price,  # 최고거래가
+                    'max_date': summary.max_date,    # 최고거래가 날짜
+                    'decline_rate': summary.decline_rate,  # 전고점 대비 하락률
+                    'change': summary.change,
+                    'cagr': summary.cagr,
+                    'type': '전세'
+                }
+
+                # 매매 정보와 연결하여 매전갭 계산 (2020년 이후 최소 갭 포함)
+                for j, info in enumerate(cagr_info):
+                    if info['apt_name'] == apt_name and info['area'] == area and info['type'] == '매매':
+                        gap = gap_analysis(apt_dfs[i], df, since=datetime(2020, 1, 1))
+                        cagr_info[j]['jeonse_price'] = summary.last_price
+                        cagr_info[j]['gap'] = info['last_price'] - summary.last_price
+                        if gap is not None:
+                            cagr_info[j]['gap_series'] = gap.series
+                            if gap.min_gap is not None:
+                                cagr_info[j]['min_gap_2020'] = gap.min_gap
+                                cagr_info[j]['min_gap_date_2020'] = gap.min_gap_date
+                        break
+
+                # 전세 연복리 정보 추가
+                cagr_info.append(jeonse_info)
+    
+    # 날짜 범위 설정 (적절한 여백 추가)
+    date_range = (last_date - first_date).days
+    date_padding = timedelta(days=date_range * 0.05)  # 5% 여백
+    ax.set_xlim(first_date - date_padding, last_date + date_padding)
+    
+    # 가격 범위 설정 (적절한 여백 추가)
+    if min_price < float('inf') and max_price > 0:
+        price_range = max_price - min_price
+        price_padding = price_range * 0.1  # 10% 여백
+        ax.set_ylim(max(0, min_price - price_padding), max_price + price_padding)
+    
+    # 차트 제목 변경 - '부태리의 실거래가 비교 분석'으로 변경
+    title_text = "부태리의 실거래가 비교 분석\n"
+    
+    # 매매가 데이터의 아파트 정보 먼저 표시
+    for i, df in enumerate(apt_dfs):
+        if not df.empty:
+            # 해당 아파트 정보 찾기
+            apt_info = None
+            for apt in apts:
+                if apt['apt_name'] == df['apt_name'].iloc[0] and str(apt['area']) == str(df['area'].iloc[0]):
+                    apt_info = apt
+                    break
+            
+            if apt_info:
+                apt_name = apt_info['apt_name']
+                area = apt_info['area']
+                
+                # 준공연도 정보가 있으면 표시
+                build_year_text = ""
+                if 'build_year' in apt_info and apt_info['build_year']:
+                    current_year = datetime.now().year
+                    age = current_year - int(apt_info['build_year'])
+                    build_year_text = f", {apt_info['build_year']}년 준공({age}년차)"
+                
+                title_text += f"{apt_name} ({area}㎡{build_year_text})"
+                
+                if i < len(apt_dfs) - 1 and i < len(apt_dfs) - 1 and not apt_dfs[i+1].empty:
+                    title_text += " vs "
+    
+    ax.set_title(title_text, pad=20, fontsize=18, fontweight='bold')
+
+    ax.set_xlabel('', fontsize=12, labelpad=15)  # labelpad 추가로 여백 확보
+    ax.set_ylabel('가격(만원)', fontsize=12)
+    
+    # x축 날짜 형식 설정
+    if date_range > 365 * 5:  # 5년 이상
+        ax.xaxis.set_major_locator(mdates.YearLocator())
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+        ax.xaxis.set_minor_locator(mdates.MonthLocator([1, 7]))  # 1월, 7월에 minor tick
+    else:
+        ax.xaxis.set_major_locator(mdates.MonthLocator([1, 4, 7, 10]))  # 분기별
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+                
+    plt.setp(ax.get_xticklabels(), rotation=-45, ha='center')
+    
+    # y축 숫자 형식 설정 (천 단위 콤마)
+    import matplotlib.ticker as ticker
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+    
+    # 최고가/최근가 레이블 겹침 해소 (반복 횟수/시간 제한, 같은 차트는 배치 재사용)
+    try:
+        place_labels(ax, labels_to_place)
+    except Exception as e:
+        print(f"⚠️ 레이블 배치 중 경고 (무시 가능): {str(e)}")
+
+    # seaborn 스타일 그리드 설정
+    ax.grid(True, linestyle='--', alpha=0.3, linewidth=0.8, color='gray')
+    ax.set_axisbelow(True)  # 그리드를 데이터 아래로
+
+    # x축 tick label 패딩 추가 (테이블과 간격 확보)
+    ax.tick_params(axis='x', pad=10)
+
+    # 범례 설정 (seaborn 스타일)
+    legend = ax.legend(**CHART_LEGEND_STYLE)
+
+    # 2개 단지 비교 시 2020년 이후 두 단지 매매가 갭이 가장 작았던 시점 표시
+    if len(apt_dfs) == 2 and not apt_dfs[0].empty and not apt_dfs[1].empty:
+        # 2020년 이후 두 단지 모두 거래가 있는 월 중 월평균가 차이가 최소인 월 (분석 엔진)
+        pair_gap = pair_min_gap(apt_dfs[0], apt_dfs[1], since=datetime(2020, 1, 1))
+
+        if pair_gap is not None:
+            min_gap = pair_gap.min_gap
+            min_gap_date = pair_gap.date
+            # 그래프 하단에 표시 (그래프를 가리지 않도록)
+            avg_price = (pair_gap.price1 + pair_gap.price2) / 2
+            apt1_name = apt_dfs[0]['apt_name'].iloc[0]
+            apt2_name = apt_dfs[1]['apt_name'].iloc[0]
+
+            # y축 범위 가져오기
+            y_min, y_max = ax.get_ylim()
+            y_range = y_max - y_min
+
+            # 하단 20% 위치에 배치
+            label_y_position = y_min + (y_range * 0.2)
+
+            # 어노테이션 추가 (아래쪽으로 화살표)
+            ax.annotate(
+                f'📍 두 단지 최소 갭\n{min_gap_date.strftime("%Y.%m")}\n갭: {min_gap:,.0f}만원',
+                xy=(min_gap_date, avg_price),
+                xytext=(0, -120),  # 아래쪽으로 더 멀리 배치
+                textcoords='offset points',
+                fontsize=10,
+                fontweight='bold',
+                color='#E74C3C',
+                bbox=dict(boxstyle='round,pad=0.8', facecolor='#FFF3CD',
+                         edgecolor='#E74C3C', linewidth=2, alpha=0.95),
+                arrowprops=dict(arrowstyle='->', color='#E74C3C', lw=2,
+                              connectionstyle="arc3,rad=-0.3"),
+                zorder=15,
+                horizontalalignment='center'
+            )
+
+    # 매매·전세가 및 수익률 정보 테이블을 그래프 아래 별도 영역에 표시
+    # ax_yield 영역 설정
+    ax_yield.axis('off')  # 축 숨기기
+
+    if cagr_info:
+        # 테이블 데이터 준비
+        headers = ['아파트', '종류', '최고거래가', '최근가격', '매전갭', '하락률', '연복리']
+        table_data = []
+
+        for info in cagr_info:
+            apt_short = info['apt_name']
+            if len(apt_short) > 12:
+                apt_short = apt_short[:12] + ".."
+
+            # 1줄로 표기: 아파트명(면적)
+            apt_label = f"{apt_short}({info['area']}㎡)"
+            trade_type = info['type']
+            # 1줄로 표기: 99,000만원
+            max_price_text = f"{info['max_price']:,.0f}만원"
+            last_price = f"{info['last_price']:,.0f}만원"
+
+            gap = ''
+            if trade_type == '매매' and info['jeonse_price'] > 0:
+                gap = f"{info['gap']:,.0f}만원"
+
+            # 하락률에 마이너스 기호 추가
+            decline_text = f"-{info['decline_rate']:.1f}%"
+            cagr_value = f"{info['cagr']:.1f}%"
+
+            table_data.append([apt_label, trade_type, max_price_text, last_price, gap, decline_text, cagr_value])
+
+        # matplotlib 테이블 생성
+        table = ax_yield.table(cellText=table_data,
+                               colLabels=headers,
+                               cellLoc='center',
+                               loc='center',
+                               bbox=[0, 0, 1, 1])
+
+        # 테이블 스타일 설정
+        table.auto_set_font_size(False)
+        table.set_fontsize(10)
+        table.scale(1, 1.8)  # 행 높이 조정 (1줄 표기이므로 낮춤)
+
+        # 헤더 스타일
+        for i in range(len(headers)):
+            cell = table[(0, i)]
+            cell.set_facecolor('#4472C4')
+            cell.set_text_props(weight='bold', color='white', fontsize=11)
+            cell.set_edgecolor('white')
+            cell.set_linewidth(1.5)
+
+        # 데이터 셀 스타일
+        for i in range(len(table_data)):
+            # 배경색 교대로 설정
+            bg_color = '#f5f5f5' if i % 2 == 0 else 'white'
+
+            for j in range(len(headers)):
+                cell = table[(i+1, j)]
+
+                # 첫 번째 열(아파트명)은 아파트 색상으로 표시
+                if j == 0:
+                    cell.set_facecolor(cagr_info[i]['color'])
+                    cell.set_text_props(weight='bold', color='white', fontsize=10)
+                # 두 번째 열(종류)은 매매/전세 구분하여 눈에 띄는 색상
+                elif j == 1:
+                    trade_type = table_data[i][1]
+                    if trade_type == '매매':
+                        cell.set_facecolor('#E74C3C')  # 빨간색 (매매)
+                        cell.set_text_props(weight='bold', color='white', fontsize=11)
+                    else:  # 전세
+                        cell.set_facecolor('#3498DB')  # 파란색 (전세)
+                        cell.set_text_props(weight='bold', color='white', fontsize=11)
+                else:
+                    cell.set_facecolor(bg_color)
+                    cell.set_text_props(color='black', fontsize=9.5)
+
+                cell.set_edgecolor('#cccccc')
+                cell.set_linewidth(0.5)
+
+        # 테이블 제목
+        ax_yield.text(0.5, 1.05, '매매·전세가 및 수익률 정보',
+                     transform=ax_yield.transAxes,
+                     fontsize=12, fontweight='bold',
+                     horizontalalignment='center',
+                     verticalalignment='bottom')
+
+    # 단지세부정보가 선택된 경우에만 하단 테이블 표시
+    if chart_options['show_complex_info']:
+        # 단지정보 테이블 생성 함수 - 가격 정보 제외
+        # create_multi_chart 함수 내에서 단지정보 테이블 생성 함수 수정
+        def create_complex_info_table():
+            """단지정보 테이블 데이터 생성 - 가격 정보 제외"""
+            table_data = []
+            # 기본 헤더에서 가격 정보 제외
+            headers = ['아파트명']
+            
+            # 세부정보 가져오기가 선택된 경우만 추가 헤더
+            if chart_options['show_complex_info'] and complex_infos is not None:
+                headers.extend(['단지분류', '동수/세대수/최고층', '임대세대', '난방방식', '시공사', '주차대수'])
+
+            for i, df in enumerate(apt_dfs):
+                if df.empty:
+                    continue
+                    
+                apt_name = df['apt_name'].iloc[0]
+                area = df['area'].iloc[0]
+                
+                # 기본 정보만 담은 데이터 구성 (가격 정보 제외)
+                row_data = [
+                    f"{apt_name} ({area}㎡)"
+                ]
+                
+                # 세부정보 가져오기가 선택된 경우만 추가 정보 조회
+                if chart_options['show_complex_info'] and complex_infos is not None:
+                    # 아파트 정보 전체 전달
+                    apt_info = None
+                    for apt in apts:
+                        if apt['apt_name'] == apt_name and str(apt['area']) == str(area):
+                            apt_info = apt
+                            break
+                    
+                    if apt_info:
+                        # UI 프로세스에서 조회해 둔 단지정보 (필지 키 조인 또는 주소 검색)
+                        complex_info = complex_infos.get((apt_name, str(area)))
+                        
+                        if complex_info:
+                            # 동수/세대수/최고층 정보 결합
+                            building_info = f"{complex_info.get('n', 0)}동/"
+                            building_info += f"{complex_info.get('o', 0)}세대/"
+                            building_info += f"{complex_info.get('bo', 0)}층"
+                            
+                            # 단지분류 정보
+                            complex_type = complex_info.get('g', '-')
+                            
+                            # 임대세대수
+                            rental_units = complex_info.get('q', '-')
+                            
+                            # 난방방식
+                            heating_system = complex_info.get('u', '-')
+                            
+                            # 시공사
+                            constructor = complex_info.get('w', '-')
+                            
+                            # 주차대수 (세대당 주차대수 비율 추가)
+                            parking_spots = complex_info.get('ba', '-')
+                            total_households = complex_info.get('o', 0)
+                            
+                            # 주차대수와 세대당 주차대수 비율 계산
+                            parking_ratio = "-"
+                            if parking_spots != '-' and total_households and int(total_households) > 0:
+                                try:
+                                    # 문자열 타입인 경우를 대비해 정수로 변환
+                                    parking_spots_num = int(parking_spots)
+                                    total_households_num = int(total_households)
+                                    if total_households_num > 0:
+                                        ratio = parking_spots_num / total_households_num
+                                        parking_ratio = f"{parking_spots}(세대당 주차대수 {ratio:.1f})"
+                                    else:
+                                        parking_ratio = f"{parking_spots}"
+                                except (ValueError, TypeError):
+                                    parking_ratio = f"{parking_spots}"
+                            else:
+                                parking_ratio = f"{parking_spots}"
+                        else:
+                            # 단지정보를 찾을 수 없는 경우 기본값
+                            building_info = "-/-/-"
+                            complex_type = "-"
+                            rental_units = "-"
+                            heating_system = "-"
+                            constructor = "-"
+                            parking_ratio = "-"
+                    else:
+                        # 아파트 정보를 찾을 수 없는 경우 기본값
+                        building_info = "-/-/-"
+                        complex_type = "-"
+                        rental_units = "-"
+                        heating_system = "-"
+                        constructor = "-"
+                        parking_ratio = "-"
+                    
+                    # 세부정보 추가
+                    row_data.extend([
+                        complex_type,          # 단지분류
+                        building_info,         # 동수/세대수/최고층
+                        str(rental_units),     # 임대세대수
+                        heating_system,        # 난방방식
+                        constructor,           # 시공사
+                        parking_ratio          # 주차대수(세대당 주차대수 x.x)
+                    ])
+                
+                table_data.append(row_data)
+            
+            return table_data, headers
+
+        # 상세 정보 및 통계 테이블 (단지세부정보가 선택된 경우에만)
+        stats_ax = fig.add_subplot(gs[13:18, 0])  # GridSpec의 13-17행 (5행) 사용
+        stats_ax.axis('off')
+        
+        # 단지정보 테이블 데이터 생성
+        table_data, headers = create_complex_info_table()
+        
+        # 테이블 생성
+        if table_data:
+            table = stats_ax.table(
+                cellText=table_data,
+                colLabels=headers,
+                loc='center',
+                cellLoc='center',
+                colColours=['#f2f2f2'] * len(headers),
+                cellColours=[['#ffffff' if i % 2 == 0 else '#f9f9f9' for j in range(len(headers))] for i in range(len(table_data))]
+            )
+            
+            # 테이블 스타일 조정
+            table.auto_set_font_size(False)
+            table.set_fontsize(9)
+            table.scale(1, 1.5)  # 행 높이 조정
+            
+            # 열 너비 자동 조정
+            for key, cell in table.get_celld().items():
+                cell.set_linewidth(0.5)
+                cell.set_edgecolor('#cccccc')
+                
+                # 열별 너비 설정
+                if key[1] == 0:  # 아파트명
+                    cell.set_width(0.18)
+                elif key[1] == 1:  # 단지분류
+                    cell.set_width(0.10)
+                elif key[1] == 2:  # 동수/세대수/최고층
+                    cell.set_width(0.15)
+                elif key[1] == 3:  # 임대세대
+                    cell.set_width(0.10)
+                elif key[1] == 4:  # 난방방식
+                    cell.set_width(0.12)
+                elif key[1] == 5:  # 시공사
+                    cell.set_width(0.15)
+                elif key[1] == 6:  # 주차대수
+                    cell.set_width(0.20)
+    
+    # 워터마크 추가 (그래프 우측 하단에 위치)
+    ax.text(0.99, 0.01,
+            f'만든이 부태리 : https://blog.naver.com/landlover333',
+            fontsize=12,
+            color='#3366CC',
+            alpha=0.7,
+            transform=ax.transAxes,
+            verticalalignment='bottom',
+            horizontalalignment='right',
+            fontweight='bold',
+            bbox=dict(facecolor='white', alpha=0.6, pad=3, boxstyle='round,pad=0.5'),
+            zorder=10
+           )
+
+    # GridSpec 여백 조정은 이미 hspace=0.3으로 설정됨
+    # plt.tight_layout()은 GridSpec과 충돌할 수 있으므로 사용하지 않음
+
+    return fig, ax
+
+
+def render_multi_chart(request, path, dpi):
+    """여러 아파트 비교 차트를 그려 path에 저장 - 렌더링 워커 프로세스에서 실행
+    반환: 경로와 단계별 소요 시간"""
+    started = time.perf_counter()
+    fig, _ = draw_multi_chart(request)
+
+    # 저장 (그리기/저장 소요 시간 분리 기록)
+    drawn = time.perf_counter()
+    fig.savefig(path, bbox_inches='tight', dpi=dpi, pad_inches=0.3)
+    saved = time.perf_counter()
+    return {'path': path, 'dpi': dpi, 'pid': os.getpid(),
+            'draw_seconds': drawn - started, 'save_seconds': saved - drawn}
+
+
+def draw_area_comparison_chart(apt_info, area_dfs, jeonse_area_dfs, options, point_budget):
+    """같은 단지의 전용면적별 매매(전세) 월평균 비교 차트 + 면적별 요약표 Figure 생성 (pyplot 전역 상태/tkinter 접근 없음)
+    area_dfs: [(면적 구간 키, 라벨, 거래)], options: show_scatter_plot/show_monthly_avg/show_monthly_max/show_jeonse"""
+    sns.set_style("whitegrid")
+    sns.set_context("notebook", font_scale=1.1)
+    plt.rcParams['font.family'] = 'Malgun Gothic'
+    plt.rcParams['axes.unicode_minus'] = False
+
+    from matplotlib.gridspec import GridSpec
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import matplotlib.ticker as ticker
+
+    table_height = 0.4 * (len(area_dfs) + 1)
+    fig = Figure(figsize=(18, 9 + table_height))
+    FigureCanvasAgg(fig)
+    gs = GridSpec(2, 1, figure=fig, height_ratios=[9, table_height], hspace=0.15)
+    ax = fig.add_subplot(gs[0, 0])
+    ax_table = fig.add_subplot(gs[1, 0])
+
+    palette = sns.color_palette("tab10", len(area_dfs))
+    area_colors = {}
+    table_data = []
+    area_labels = {}
+    for color, (bucket, label, df) in zip(palette, area_dfs):
+        area_colors[bucket] = color
+        area_labels[bucket] = label
+        if options['show_scatter_plot']:
+            ax.scatter(*decimate_scatter(df['date'], df['price'], point_budget // len(area_dfs)),
+                       color=color, alpha=0.35, s=20, zorder=2)
+        monthly = monthly_price_stats(df)
+        if options['show_monthly_avg'] and len(monthly) > 0:
+            ax.plot(monthly['date'], monthly['avg_price'], color=color, linewidth=2.2,
+                    label=f"{label}㎡ 매매 월평균", zorder=4)
+        if options['show_monthly_max'] and len(monthly) > 0:
+            ax.plot(monthly['date'], monthly['max_price'], color=color, linewidth=1.2,
+                    linestyle='--', dashes=(2, 2), zorder=3)
+
+        summary = trade_summary(df)
+        area_value = float(label)
+        if summary is not None:
+            table_data.append([f"{label}㎡", f"{summary.count:,}", f"{summary.max_price:,.0f}만원",
+                               f"{summary.last_price:,.0f}만원", f"{summary.last_price / area_value:,.0f}만원",
+                               f"-{summary.decline_rate:.1f}%", f"{summary.cagr:.1f}%"])
+        else:
+            last_price = df['price'].iloc[-1]
+            table_data.append([f"{label}㎡", f"{len(df):,}", f"{df['price'].max():,.0f}만원",
+                               f"{last_price:,.0f}만원", f"{last_price / area_value:,.0f}만원", '-', '-'])
+
+    # 전세 월평균 (같은 색 점선)
+    if jeonse_area_dfs and options['show_jeonse']:
+        for bucket, _, df in jeonse_area_dfs:
+            monthly = monthly_price_stats(df)
+            if bucket in area_colors and len(monthly) > 0:  # 같은 면적 구간 매매와 같은 색
+                ax.plot(monthly['date'], monthly['avg_price'], color=area_colors[bucket], linewidth=1.5,
+                        linestyle=':', label=f"{area_labels[bucket]}㎡ 전세 월평균", zorder=3)
+
+    ax.set_title(f"{apt_info['apt_name']} 전용면적별 비교 ({apt_info.get('dong', '')})", fontsize=16, fontweight='bold')
+    ax.set_ylabel("거래가 (만원)")
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+    ax.xaxis.set_major_locator(mdates.YearLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+    ax.legend(loc='upper left', fontsize=10)
+
+    # 면적별 요약표
+    ax_table.axis('off')
+    headers = ['전용면적', '거래수', '최고거래가', '최근가격', '㎡당 최근가', '하락률', '연복리']
+    table = ax_table.table(cellText=table_data, colLabels=headers, cellLoc='center',
+                           loc='center', bbox=[0, 0, 1, 1])
+    table.auto_set_font_size(False)
+    table.set_fontsize(10)
+    for i in range(len(headers)):
+        cell = table[(0, i)]
+        cell.set_facecolor('#4472C4')
+        cell.set_text_props(weight='bold', color='white')
+    for i, (bucket, _, _) in enumerate(area_dfs, start=1):
+        table[(i, 0)].set_facecolor(area_colors[bucket])
+        table[(i, 0)].set_text_props(color='white', weight='bold')
+    return fig
+
+
+def render_area_comparison_chart(path, dpi, *args):
+    """면적별 비교 차트를 그려 path에 저장 - 렌더링 워커 프로세스에서 실행 (args: draw_area_comparison_chart 인자)"""
+    started = time.perf_counter()
+    fig = draw_area_comparison_chart(*args)
+    drawn = time.perf_counter()
+    fig.savefig(path, bbox_inches='tight', dpi=dpi, pad_inches=0.3)
+    saved = time.perf_counter()
+    return {'path': path, 'dpi': dpi, 'pid': os.getpid(),
+            'draw_seconds': drawn - started, 'save_seconds': saved - drawn}
+
+
+def draw_comparison_chart(ranking, monthly_pivot, region_monthly, region_label, target_area, highlight=5):
+    """단지 일괄 비교 차트 Figure 생성 (pyplot 전역 상태/tkinter 접근 없음)
+    전체 단지(회색) + 상위 단지 강조 + 지역 중위가, 하단 순위표"""
+    sns.set_style("whitegrid")
+    sns.set_context("notebook", font_scale=1.0)
+    plt.rcParams['font.family'] = 'Malgun Gothic'
+    plt.rcParams['axes.unicode_minus'] = False
+
+    from matplotlib.gridspec import GridSpec
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import matplotlib.ticker as ticker
+
+    # 순위표 행 수에 맞춰 그림 높이 조정
+    table_height = 0.32 * (len(ranking) + 1)
+    fig = Figure(figsize=(18, 8 + table_height))
+    FigureCanvasAgg(fig)
+    gs = GridSpec(2, 1, figure=fig, height_ratios=[8, table_height], hspace=0.15)
+    ax = fig.add_subplot(gs[0, 0])
+    ax_table = fig.add_subplot(gs[1, 0])
+
+    # 전체 단지 월별 중위가 (회색 얇은 선)
+    top_labels = list(ranking['label'].head(highlight))
+    for label in monthly_pivot.columns:
+        if label not in top_labels:
+            series = monthly_pivot[label].dropna()
+            ax.plot(series.index, series.values, color='#BDC3C7', linewidth=0.8, alpha=0.7, zorder=1)
+
+    # 상위 단지 강조
+    palette = sns.color_palette("tab10", len(top_labels))
+    label_colors = {}
+    for color, label in zip(palette, top_labels):
+        series = monthly_pivot[label].dropna()
+        ax.plot(series.index, series.values, color=color, linewidth=2, marker='o', markersize=3,
+                label=label, zorder=3)
+        label_colors[label] = color
+
+    # 지역 전체 월별 중위가
+    ax.plot(region_monthly.index, region_monthly.values, color='black', linewidth=3,
+            label=f"{region_label} 중위가", zorder=4)
+
+    ax.set_title(f"{region_label} {target_area:g}㎡ 단지 비교 ({len(ranking)}개 단지)", fontsize=16, fontweight='bold')
+    ax.set_ylabel("거래가 (만원, 월 중위)")
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+    ax.xaxis.set_major_locator(mdates.YearLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+    ax.legend(loc='upper left', fontsize=10)
+
+    # 순위표
+    ax_table.axis('off')
+    headers = ['순위', '단지', '동', '거래수', '최근12개월 중위가', '최고가', '하락률', '연복리']
+    table_data = []
+    for row in ranking.itertuples(index=False):
+        cagr_text = f"{row.cagr:.1f}%" if pd.notna(row.cagr) else '-'
+        table_data.append([row.rank, row.apt_name, row.dong, f"{row.count:,}",
+                           f"{row.recent_median:,.0f}만원", f"{row.max_price:,.0f}만원",
+                           f"-{row.decline_rate:.1f}%", cagr_text])
+
+    table = ax_table.table(cellText=table_data, colLabels=headers, cellLoc='center',
+                           loc='center', bbox=[0, 0, 1, 1])
+    table.auto_set_font_size(False)
+    table.set_fontsize(9)
+    for i in range(len(headers)):
+        cell = table[(0, i)]
+        cell.set_facecolor('#4472C4')
+        cell.set_text_props(weight='bold', color='white')
+    for i, label in enumerate(ranking['label'], start=1):
+        bg_color = '#f5f5f5' if i % 2 == 0 else 'white'
+        for j in range(len(headers)):
+            table[(i, j)].set_facecolor(bg_color)
+        if label in label_colors:
+            table[(i, 1)].set_facecolor(label_colors[label])
+            table[(i, 1)].set_text_props(color='white', weight='bold')
+    return fig
+
+
+def render_comparison_chart(path, dpi, *args):
+    """단지 일괄 비교 차트를 그려 path에 저장 - 렌더링 워커 프로세스에서 실행 (args: draw_comparison_chart 인자)"""
+    started = time.perf_counter()
+    fig = draw_comparison_chart(*args)
+    drawn = time.perf_counter()
+    fig.savefig(path, bbox_inches='tight', dpi=dpi, pad_inches=0.3)
+    saved = time.perf_counter()
+    return {'path': path, 'dpi': dpi, 'pid': os.getpid(),
+            'draw_seconds': drawn - started, 'save_seconds': saved - drawn}
+
+
+def _hash_value(digest, value):
+    """요청 값을 지문에 반영 (dict/list/배열/스칼라 재귀)"""
+    if isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(repr(key).encode('utf-8'))
+            _hash_value(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"[{len(value)}".encode('utf-8'))
+        for item in value:
+            _hash_value(digest, item)
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode('utf-8'))
+        if value.dtype.kind == 'O':
+            digest.update('\x1f'.join(map(str, value)).encode('utf-8'))
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+
+def chart_request_fingerprint(request):
+    """차트 요청 지문 - 입력 데이터(열 단위)/옵션/단지정보/점 개수 상한이 같으면 같은 값 (저장 경로는 제외)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"chart-v{CHART_CACHE_VERSION}".encode('utf-8'))
+    _hash_value(digest, {key: value for key, value in request.items() if key != 'region_cache_dir'})
+    return digest.hexdigest()
+
+
+class ChartArtifactCache:
+    """차트 이미지 캐시 - (요청 지문, 해상도)를 파일명으로 저장, 용량 초과 시 오래 쓰지 않은 파일부터 삭제"""
+
+    def __init__(self, cache_dir, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        """캐시 파일 경로"""
+        return os.path.join(self.cache_dir, f"{key}.jpg")
+
+    def fetch(self, key, target_path):
+        """캐시 적중 시 target_path로 복사하고 True (사용 시각 갱신)"""
+        path = self._path(key)
+        with self._lock:
+            if not os.path.exists(path):
+                return False
+            try:
+                if os.path.abspath(target_path) != os.path.abspath(path):
+                    shutil.copyfile(path, target_path)
+                os.utime(path)  # 최근 사용 표시 (삭제 순서 기준)
+                return True
+            except Exception as e:
+                print(f"⚠️ 차트 캐시 읽기 실패: {str(e)}")
+                return False
+
+    def store(self, key, source_path):
+        """렌더링된 이미지를 캐시에 저장 후 용량 정리"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temp_path = f"{path}.tmp"
+                shutil.copyfile(source_path, temp_path)
+                os.replace(temp_path, path)
+                self._evict()
+            except Exception as e:
+                print(f"⚠️ 차트 캐시 저장 실패: {str(e)}")
+
+    def _evict(self):
+        """최대 용량을 넘으면 사용 시각이 오래된 파일부터 삭제"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.jpg'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+            removed += 1
+        if removed:
+            print(f"🗑 차트 캐시 정리: {removed}개 삭제 (현재 {total / (1024 * 1024):.1f} MB)")
+
+
+HISTORY_INDEX_FILENAME = "history_index.jsonl"  # 다운로드 폴더의 차트 히스토리 색인
+HISTORY_INDEX_COMPACT_MIN = 200  # 삭제/대체된 줄이 이 수 이상이고 살아있는 항목보다 많으면 파일 재작성
+HISTORY_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def legacy_history_item(download_path, image_file, mtime):
+    """파일명에서 히스토리 항목 복원 (색인 도입 이전 이미지의 1회 이전용)"""
+    if image_file.startswith("area_comparison_"):
+        chart_title = "단지 면적별 비교"
+        apt_name = image_file[len("area_comparison_"):].rsplit('.', 1)[0].replace('_', ' ')
+        area = f"{apt_name} (전체 면적)"
+    elif image_file.startswith("bulk_comparison_"):
+        chart_title = "단지 일괄 비교"
+        apt_name = image_file[len("bulk_comparison_"):].rsplit('.', 1)[0].replace('_', ' ')
+        area = apt_name
+    elif image_file.startswith("multi_apt_comparison_"):
+        chart_title = "다중 아파트 비교 분석"
+        stem = image_file[len("multi_apt_comparison_"):].rsplit('.', 1)[0]
+        stem = re.sub(r'(_(avg|max|scatter|jeonse))*(_[0-9a-f]{8})?$', '', stem)  # 그래프 옵션/데이터 지문 제거
+        apt_parts = []
+        for part in stem.split('_vs_'):
+            if '_' in part and 'm2' in part:
+                name = '_'.join(part.split('_')[:-1]).replace('_', ' ')  # 마지막 부분(면적) 제외
+                area_part = part.split('_')[-1].replace('m2', '')
+                apt_parts.append(f"{name} ({area_part}㎡)")
+        apt_name = " vs ".join(apt_parts)
+        area = apt_name
+    else:
+        chart_title = "아파트 실거래가 분석"
+        name_part = image_file.split('.')[0]
+        parts = name_part.split('_')
+        if len(parts) >= 2 and 'm2' in parts[-1]:
+            apt_name = '_'.join(parts[:-1]).replace('_', ' ')
+            area = f"{apt_name} ({parts[-1].replace('m2', '')}㎡)"
+        else:
+            apt_name = name_part.replace('_', ' ')
+            area = apt_name
+
+    # 관련 엑셀 파일 (면적 정보가 있는 단일 아파트)
+    excel_path = None
+    area_match = re.search(r'\((\d+)㎡\)', area)
+    if area_match:
+        base = f"{apt_name.replace(' ', '_')}_{area_match.group(1)}m2"
+        for excel_filename in (f"{base}_매매.xlsx", f"{base}.xlsx"):
+            candidate = os.path.join(download_path, excel_filename)
+            if os.path.exists(candidate):
+                excel_path = candidate
+                break
+
+    return {
+        'image_path': os.path.join(download_path, image_file),
+        'excel_path': excel_path,
+        'apt_name': apt_name,
+        'area': area,
+        'search_date': mtime,
+        'chart_title': chart_title,
+        'type': 'multi' if image_file.startswith("multi_apt_comparison_") else 'single',
+    }
+
+
+class HistoryIndex:
+    """차트 히스토리 색인 (JSONL) - 차트 저장 시 한 줄씩 추가, 다시 읽을 때는 마지막으로 읽은 위치 이후만 읽음
+
+    한 줄은 히스토리 항목 하나 ({'image_path': ..., ...}) 또는 삭제 표시 ({'deleted': image_path}).
+    같은 image_path가 다시 기록되면 마지막 줄이 이전 항목을 대체한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._items = OrderedDict()  # image_path -> 히스토리 항목
+        self._offset = 0             # 지금까지 읽은 파일 위치 (바이트)
+        self._stale_lines = 0        # 삭제/대체되어 더 이상 쓰이지 않는 줄 수
+        self._file_id = None         # 읽던 파일 식별 (정리로 파일이 바뀌면 처음부터 다시 읽기)
+        self._lock = threading.Lock()
+
+    def exists(self):
+        """색인 파일 존재 여부"""
+        return os.path.exists(self.path)
+
+    def _apply(self, record):
+        """색인 한 줄을 메모리 항목에 반영"""
+        if 'deleted' in record:
+            if self._items.pop(record['deleted'], None) is not None:
+                self._stale_lines += 1
+            self._stale_lines += 1
+            return
+        image_path = record.get('image_path')
+        if not image_path:
+            return
+        if self._items.pop(image_path, None) is not None:
+            self._stale_lines += 1
+        self._items[image_path] = record
+
+    def _reset(self, file_id=None):
+        """메모리 항목 초기화"""
+        self._items.clear()
+        self._offset = 0
+        self._stale_lines = 0
+        self._file_id = file_id
+
+    def refresh(self):
+        """마지막으로 읽은 위치 이후에 추가된 줄만 읽어 반영"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                self._reset()
+                return
+            stat = os.stat(self.path)
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id != self._file_id or stat.st_size < self._offset:
+                # 파일이 다시 쓰였음 (정리/비우기) - 처음부터 다시 읽기
+                self._reset(file_id)
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b'\n') + 1  # 마지막 완전한 줄까지만 (쓰는 중인 줄 제외)
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    self._apply(json.loads(line.decode('utf-8')))
+                except Exception as e:
+                    print(f"⚠️ 히스토리 색인 줄 무시: {str(e)}")
+            self._offset += end
+
+    def _append(self, records):
+        """색인 파일 끝에 줄 추가 후 메모리에 반영"""
+        if not records:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            lines = ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        self.refresh()
+        self.compact()
+
+    def add(self, item):
+        """히스토리 항목 추가 (같은 이미지 경로는 대체)"""
+        self._append([item])
+
+    def add_many(self, items):
+        """여러 히스토리 항목 추가"""
+        self._append(list(items))
+
+    def remove(self, image_paths):
+        """히스토리 항목 삭제 표시 추가"""
+        self._append([{'deleted': path} for path in image_paths])
+
+    def _rewrite(self, records):
+        """레코드 목록으로 파일 교체 (임시 파일에 쓰고 바꿔치기)"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        os.replace(temp_path, self.path)
+        stat = os.stat(self.path)
+        self._offset = stat.st_size
+        self._stale_lines = 0
+        self._file_id = (stat.st_dev, stat.st_ino)
+
+    def clear(self):
+        """색인 비우기"""
+        with self._lock:
+            self._rewrite([])
+            self._items.clear()
+
+    def compact(self):
+        """쓰이지 않는 줄이 살아있는 항목보다 많으면 살아있는 항목만으로 파일 재작성"""
+        with self._lock:
+            if self._stale_lines < HISTORY_INDEX_COMPACT_MIN or self._stale_lines <= len(self._items):
+                return
+            try:
+                self._rewrite(list(self._items.values()))
+            except Exception as e:
+                print(f"⚠️ 히스토리 색인 정리 실패: {str(e)}")
+
+    def items(self):
+        """살아있는 히스토리 항목 목록 (기록 순서)"""
+        self.refresh()
+        with self._lock:
+            return [dict(item) for item in self._items.values()]
+
+
+HISTORY_STORE_MANIFEST = "history_store.json"  # 히스토리 폴더의 보관 목록
+HISTORY_OBJECTS_DIR = "objects"               # 내용 해시별 실제 파일 (히스토리 파일은 여기로의 하드링크)
+DEFAULT_HISTORY_KEEP_PER_APT = 5              # 단지/면적/유형별 보관 개수
+DEFAULT_HISTORY_MAX_MB = 500                  # 히스토리 전체 최대 용량
+_LEGACY_HISTORY_PATTERN = re.compile(r'^(history_.*?)_?\d{8}_\d{6}\.xlsx$')
+
+
+def file_content_hash(path):
+    """파일 내용 해시"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HistoryStore:
+    """히스토리 엑셀 보관소 - 내용 해시로 한 번만 저장하고 히스토리 파일은 하드링크(불가 시 참조)로 연결
+
+    같은 단지/면적/유형(key)의 마지막 항목과 내용이 같으면 새 항목을 만들지 않는다.
+    보관 정책(키별 최근 N개, 전체 최대 용량)은 백그라운드 정리 작업에서 적용한다.
+    """
+
+    def __init__(self, history_dir, keep_per_key=DEFAULT_HISTORY_KEEP_PER_APT,
+                 max_bytes=DEFAULT_HISTORY_MAX_MB * 1024 * 1024):
+        self.history_dir = history_dir
+        self.keep_per_key = keep_per_key
+        self.max_bytes = max_bytes
+        self._entries = None  # [{'file', 'object', 'key', 'created', 'size'}] (처음 사용 시 로드)
+        self._lock = threading.RLock()
+        self._compact_thread = None
+        self._compact_again = False
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.history_dir, HISTORY_STORE_MANIFEST)
+
+    def object_path(self, content_hash):
+        """내용 해시에 해당하는 실제 파일 경로"""
+        return os.path.join(self.history_dir, HISTORY_OBJECTS_DIR, content_hash[:2], f"{content_hash}.xlsx")
+
+    def entry_path(self, entry):
+        """히스토리 항목의 파일 경로 (하드링크가 없으면 실제 파일)"""
+        if entry.get('file'):
+            return os.path.join(self.history_dir, entry['file'])
+        return self.object_path(entry['object'])
+
+    def _load(self):
+        """보관 목록 로드 (처음 한 번) - 목록에 없는 이전 히스토리 파일은 보관소로 이전"""
+        if self._entries is not None:
+            return
+        self._entries = []
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f).get('entries', [])
+            except Exception as e:
+                print(f"⚠️ 히스토리 보관 목록 로드 실패: {str(e)}")
+        self._adopt_legacy_files()
+
+    def _save(self):
+        """보관 목록 저장 (임시 파일에 쓰고 바꿔치기)"""
+        os.makedirs(self.history_dir, exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self._entries}, f, ensure_ascii=False)
+        os.replace(temp_path, self.manifest_path)
+
+    def _link(self, object_path, filename):
+        """히스토리 파일을 실제 파일의 하드링크로 생성 - 실패하면 None (보관 목록의 참조만 유지)"""
+        link_path = os.path.join(self.history_dir, filename)
+        try:
+            if os.path.exists(link_path):
+                os.remove(link_path)
+            os.link(object_path, link_path)
+            return filename
+        except OSError as e:
+            print(f"⚠️ 하드링크 생성 불가, 참조로 보관: {str(e)}")
+            return None
+
+    def _store_object(self, source_path, content_hash, move=False):
+        """실제 파일 저장 (이미 있으면 그대로 사용)"""
+        object_path = self.object_path(content_hash)
+        if os.path.exists(object_path):
+            if move:
+                os.remove(source_path)
+            return object_path
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if move:
+            os.replace(source_path, object_path)
+        else:
+            temp_path = f"{object_path}.tmp"
+            shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, object_path)
+        return object_path
+
+    def _adopt_legacy_files(self):
+        """보관 목록에 없는 history_*.xlsx 파일을 내용 해시로 보관소에 이전 (같은 내용은 하나만 남음)"""
+        if not os.path.isdir(self.history_dir):
+            return
+        known = {entry['file'] for entry in self._entries if entry.get('file')}
+        adopted = 0
+        for filename in sorted(os.listdir(self.history_dir)):
+            match = _LEGACY_HISTORY_PATTERN.match(filename)
+            path = os.path.join(self.history_dir, filename)
+            if not match or filename in known or not os.path.isfile(path):
+                continue
+            try:
+                created = os.path.getmtime(path)
+                content_hash = file_content_hash(path)
+                object_path = self._store_object(path, content_hash, move=True)
+                self._entries.append({
+                    'file': self._link(object_path, filename),
+                    'object': content_hash,
+                    'key': match.group(1),
+                    'created': created,
+                    'size': os.path.getsize(object_path),
+                })
+                adopted += 1
+            except Exception as e:
+                print(f"⚠️ 히스토리 파일 이전 실패 ({filename}): {str(e)}")
+        if adopted:
+            self._save()
+            print(f"📦 이전 히스토리 파일 {adopted}개를 보관소로 이전")
+
+    def add(self, source_path, key, content_hash, filename):
+        """히스토리 항목 추가 - 같은 key의 마지막 항목과 내용이 같으면 기존 항목 경로 반환"""
+        with self._lock:
+            self._load()
+            same_key = [entry for entry in self._entries if entry['key'] == key]
+            if same_key:
+                latest = max(same_key, key=lambda entry: entry['created'])
+                if latest['object'] == content_hash and os.path.exists(self.entry_path(latest)):
+                    return self.entry_path(latest)
+
+            object_path = self._store_object(source_path, content_hash)
+            entry = {
+                'file': self._link(object_path, filename),
+                'object': content_hash,
+                'key': key,
+                'created': time.time(),
+                'size': os.path.getsize(object_path),
+            }
+            self._entries.append(entry)
+            self._save()
+        self.schedule_compaction()
+        return self.entry_path(entry)
+
+    def clear(self):
+        """모든 히스토리 항목과 실제 파일 삭제"""
+        with self._lock:
+            self._entries = []
+            shutil.rmtree(os.path.join(self.history_dir, HISTORY_OBJECTS_DIR), ignore_errors=True)
+            if os.path.exists(self.manifest_path):
+                os.remove(self.manifest_path)
+
+    def schedule_compaction(self):
+        """보관 정책 정리를 백그라운드 스레드에서 실행 (실행 중이면 끝난 뒤 한 번 더)"""
+        with self._lock:
+            if self._compact_thread is not None and self._compact_thread.is_alive():
+                self._compact_again = True
+                return
+            self._compact_thread = threading.Thread(target=self._compact_loop, daemon=True)
+            self._compact_thread.start()
+
+    def _compact_loop(self):
+        while True:
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"⚠️ 히스토리 정리 실패: {str(e)}")
+            with self._lock:
+                if not self._compact_again:
+                    return
+                self._compact_again = False
+
+    def compact(self):
+        """보관 정책 적용 - 키별 최근 N개, 전체 최대 용량 (키별 최신 항목은 유지), 참조 없는 실제 파일 삭제"""
+        with self._lock:
+            self._load()
+            # 사용자가 직접 지운 히스토리 파일은 목록에서도 제거
+            entries = [entry for entry in self._entries if os.path.exists(self.entry_path(entry))]
+            entries.sort(key=lambda entry: entry['created'], reverse=True)
+
+            kept, removed, per_key = [], [], {}
+            for entry in entries:
+                per_key[entry['key']] = per_key.get(entry['key'], 0) + 1
+                (kept if per_key[entry['key']] <= self.keep_per_key else removed).append(entry)
+
+            # 전체 용량 초과 시 오래된 항목부터 제거 (같은 실제 파일은 한 번만 계산)
+            sizes = {entry['object']: entry['size'] for entry in kept}
+            total = sum(sizes.values())
+            latest_per_key = {}
+            for entry in kept:
+                latest_per_key.setdefault(entry['key'], id(entry))
+            for entry in reversed(list(kept)):
+                if total <= self.max_bytes:
+                    break
+                if latest_per_key[entry['key']] == id(entry):
+                    continue
+                kept.remove(entry)
+                removed.append(entry)
+                if not any(other['object'] == entry['object'] for other in kept):
+                    total -= sizes.pop(entry['object'])
+
+            for entry in removed:
+                if entry.get('file'):
+                    try:
+                        os.remove(os.path.join(self.history_dir, entry['file']))
+                    except OSError:
+                        pass
+
+            # 참조 없는 실제 파일 삭제
+            live_objects = {entry['object'] for entry in kept}
+            objects_dir = os.path.join(self.history_dir, HISTORY_OBJECTS_DIR)
+            orphaned = 0
+            if os.path.isdir(objects_dir):
+                for root, _, files in os.walk(objects_dir, topdown=False):
+                    for name in files:
+                        if name.endswith('.xlsx') and name[:-len('.xlsx')] not in live_objects:
+                            os.remove(os.path.join(root, name))
+                            orphaned += 1
+                    if root != objects_dir and not os.listdir(root):
+                        os.rmdir(root)
+
+            changed = len(kept) != len(self._entries)
+            self._entries = kept
+            if changed:
+                self._save()
+            if removed or orphaned:
+                print(f"🗑 히스토리 정리: 항목 {len(removed)}개, 파일 {orphaned}개 삭제 "
+                      f"(현재 {len(kept)}개, {total / (1024 * 1024):.1f} MB)")
+
+
+EXCEL_EXPORT_STATE_FILENAME = "excel_exports.json"  # 키별 마지막으로 저장한 데이터 지문 (거래 캐시 폴더)
+EXCEL_EXPORT_SHUTDOWN_TIMEOUT = 30  # 종료 시 남은 엑셀 저장을 기다리는 최대 시간 (초)
+
+
+class ExcelExportQueue:
+    """엑셀 저장 대기열 - 백그라운드 스레드 하나에서 순서대로 저장
+
+    같은 키(단지/면적/유형)가 대기 중에 다시 들어오면 마지막 요청만 저장하고,
+    마지막으로 저장한 데이터 지문과 같으면(파일이 남아 있을 때) 저장하지 않는다.
+    """
+
+    def __init__(self, state_path=None, on_idle=None):
+        self.state_path = state_path
+        self.on_idle = on_idle  # on_idle(stats) - 대기열이 비었을 때 호출 (작업 스레드)
+        self._pending = OrderedDict()  # key -> (fingerprint, path, write, args)
+        self._written = {}             # key -> 마지막으로 저장한 데이터 지문
+        self._busy = False
+        self._closed = False
+        self._stats = {'written': 0, 'skipped': 0, 'coalesced': 0, 'failed': 0, 'write_seconds': 0.0}
+        self._cond = threading.Condition()
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    self._written = json.load(f)
+            except Exception as e:
+                print(f"⚠️ 엑셀 저장 기록 로드 실패: {str(e)}")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, key, fingerprint, path, write, args=()):
+        """저장 요청 - 바뀐 데이터면 대기열에 넣고 True, 이미 저장된 데이터면 False"""
+        with self._cond:
+            if key not in self._pending and self._written.get(key) == fingerprint and os.path.exists(path):
+                self._stats['skipped'] += 1
+                return False
+            if key in self._pending:
+                self._stats['coalesced'] += 1
+                del self._pending[key]  # 최신 요청으로 교체 (순서는 뒤로)
+            self._pending[key] = (fingerprint, path, write, args)
+            self._cond.notify()
+            return True
+
+    def depth(self):
+        """대기 중인 저장 수"""
+        with self._cond:
+            return len(self._pending) + (1 if self._busy else 0)
+
+    def stats(self):
+        """저장/생략/병합/실패 건수, 누적 저장 시간, 대기 수"""
+        with self._cond:
+            return dict(self._stats, depth=len(self._pending) + (1 if self._busy else 0))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                key, (fingerprint, path, write, args) = self._pending.popitem(last=False)
+                self._busy = True
+                waiting = len(self._pending)
+
+            started = time.perf_counter()
+            try:
+                write(*args)
+                error = None
+            except Exception as e:
+                error = e
+            elapsed = time.perf_counter() - started
+
+            with self._cond:
+                if error is None:
+                    self._written[key] = fingerprint
+                    self._stats['written'] += 1
+                    self._stats['write_seconds'] += elapsed
+                else:
+                    self._stats['failed'] += 1
+                idle = not self._pending
+                stats = dict(self._stats, depth=len(self._pending))
+
+            if error is None:
+                print(f"💾 엑셀 저장 {os.path.basename(path)}: {elapsed:.2f}초 (대기 {waiting}개)")
+            else:
+                print(f"⚠️ 엑셀 저장 실패 ({os.path.basename(path)}): {str(error)}")
+            if idle:
+                self._save_state()
+                if self.on_idle:
+                    try:
+                        self.on_idle(stats)
+                    except Exception as e:
+                        print(f"⚠️ 엑셀 저장 대기열 알림 실패: {str(e)}")
+            with self._cond:
+                self._busy = False  # 기록 저장까지 끝난 뒤 flush 대기 해제
+                self._cond.notify_all()
+
+    def _save_state(self):
+        """키별 마지막 저장 지문 기록 (다음 실행에서도 같은 데이터는 저장 생략)"""
+        if not self.state_path:
+            return
+        try:
+            with self._cond:
+                state = dict(self._written)
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(temp_path, self.state_path)
+        except Exception as e:
+            print(f"⚠️ 엑셀 저장 기록 저장 실패: {str(e)}")
+
+    def flush(self, timeout=None):
+        """대기 중인 저장이 모두 끝날 때까지 대기 - 시간 안에 끝나면 True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def shutdown(self, timeout=EXCEL_EXPORT_SHUTDOWN_TIMEOUT):
+        """남은 저장을 마치고 작업 스레드 종료 (프로그램 종료 시)"""
+        if not self.flush(timeout):
+            print(f"⚠️ 엑셀 저장 {self.depth()}개를 마치지 못하고 종료")
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+COMPARISON_WORKBOOK_CHUNK_ROWS = 10000  # 거래 시트를 쓸 때 한 번에 파이썬 값으로 바꾸는 행 수
+COMPARISON_TRADE_COLUMNS = [  # (열 이름, 시트 머리글) - 데이터에 있는 열만 기록
+    ('date', '거래일자'), ('price', '가격(만원)'), ('floor', '층'), ('dealing_gbn', '거래구분'),
+    ('is_cancelled', '해제'), ('is_outlier', '이상거래'),
+]
+COMPARISON_ROLLUP_COLUMNS = [
+    ('year_month', '년월'), ('count', '거래건수'), ('avg_price', '평균가(만원)'), ('max_price', '최고가(만원)'),
+    ('min_price', '최저가(만원)'), ('p10', '하위10%'), ('p50', '중위가'), ('p90', '상위10%'),
+]
+
+
+def _date_strings(values):
+    """날짜 배열 -> 'YYYY-MM-DD' 문자열 배열 (벡터 변환)"""
+    return np.asarray(values, dtype='datetime64[ns]').astype('datetime64[D]').astype(str)
+
+
+def _column_summary(columns):
+    """열 단위 거래 데이터 요약 (trade_summary와 같은 기준) - 거래 2건 미만/기간 0이면 None"""
+    dates = np.asarray(columns.get('date', []), dtype='datetime64[ns]')
+    prices = np.asarray(columns.get('price', []), dtype=float)
+    if len(dates) < 2:
+        return None
+    order = np.argsort(dates, kind='mergesort')
+    first, last = order[0], order[-1]
+    years = (dates[last] - dates[first]) / np.timedelta64(1, 'D') / 365.25
+    if years <= 0 or prices[first] <= 0:
+        return None
+    peak = int(np.argmax(prices))
+    return {
+        'count': len(dates),
+        'first_date': dates[first], 'first_price': prices[first],
+        'last_date': dates[last], 'last_price': prices[last],
+        'max_date': dates[peak], 'max_price': prices[peak],
+        'decline_rate': (prices[peak] - prices[last]) / prices[peak] * 100 if prices[peak] > 0 else 0.0,
+        'cagr': ((prices[last] / prices[first]) ** (1 / years) - 1) * 100,
+    }
+
+
+def write_comparison_workbook(request, path):
+    """차트 요청(열 단위 데이터)으로 비교 엑셀 한 개 작성 - 요약(CAGR)/매매/전세/월별 집계 시트
+
+    xlsxwriter constant_memory 모드로 행 순서대로 바로 기록하므로 단지 수가 늘어도 메모리는 거의 일정하다.
+    """
+    import xlsxwriter
+
+    apts = request['apts']
+    sections = [('매매', 'purchase', request['apt_frames'], request['purchase_rollups']),
+                ('전세', 'jeonse', request['jeonse_frames'], request['jeonse_rollups'])]
+
+    def apt_of(columns):
+        # 거래 데이터의 단지명/면적으로 선택 아파트 정보 찾기
+        if not len(columns.get('apt_name', [])):
+            return None
+        name, area = columns['apt_name'][0], str(columns['area'][0])
+        return next((apt for apt in apts if apt['apt_name'] == name and str(apt['area']) == area), None)
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True})
+    try:
+        header = workbook.add_format({'bold': True, 'bg_color': '#4472C4', 'font_color': 'white', 'border': 1})
+        number = workbook.add_format({'num_format': '#,##0'})
+        percent = workbook.add_format({'num_format': '0.0"%"'})
+
+        # 요약 (단지별 연복리 수익률 표)
+        summary_sheet = workbook.add_worksheet('요약')
+        summary_headers = ['단지명', '지역', '전용면적(㎡)', '유형', '거래건수', '첫 거래일', '첫 거래가(만원)',
+                           '최근 거래일', '최근 거래가(만원)', '최고가(만원)', '최고가 거래일', '최고가 대비 하락률', '연복리 수익률']
+        summary_sheet.write_row(0, 0, summary_headers, header)
+        summary_sheet.set_column(0, 1, 22)
+        summary_sheet.set_column(2, len(summary_headers) - 1, 14)
+        row = 1
+        for type_label, _, frames, _ in sections:
+            for columns in frames:
+                apt = apt_of(columns)
+                summary = _column_summary(columns)
+                if apt is None or summary is None:
+                    continue
+                region = f"{apt.get('sido', '')} {apt.get('sigungu', '')} {apt.get('dong', '')}".strip()
+                dates = _date_strings([summary['first_date'], summary['last_date'], summary['max_date']])
+                summary_sheet.write_row(row, 0, [apt['apt_name'], region, str(apt['area']), type_label,
+                                                 summary['count'], dates[0]])
+                summary_sheet.write_number(row, 6, summary['first_price'], number)
+                summary_sheet.write_string(row, 7, dates[1])
+                summary_sheet.write_number(row, 8, summary['last_price'], number)
+                summary_sheet.write_number(row, 9, summary['max_price'], number)
+                summary_sheet.write_string(row, 10, dates[2])
+                summary_sheet.write_number(row, 11, -summary['decline_rate'], percent)
+                summary_sheet.write_number(row, 12, summary['cagr'], percent)
+                row += 1
+
+        # 매매/전세 거래 시트 (단지별로 이어서, 최근 거래부터)
+        for type_label, _, frames, _ in sections:
+            sheet = workbook.add_worksheet(type_label)
+            present = [(key, label) for key, label in COMPARISON_TRADE_COLUMNS
+                       if any(key in columns for columns in frames)]
+            sheet.write_row(0, 0, ['단지명', '전용면적(㎡)'] + [label for _, label in present], header)
+            sheet.set_column(0, 0, 22)
+            sheet.set_column(1, len(present) + 1, 12)
+            row = 1
+            for columns in frames:
+                if not len(columns.get('date', [])):
+                    continue
+                name, area = columns['apt_name'][0], str(columns['area'][0])
+                order = np.argsort(np.asarray(columns['date'], dtype='datetime64[ns]'), kind='mergesort')[::-1]
+                for start in range(0, len(order), COMPARISON_WORKBOOK_CHUNK_ROWS):
+                    chunk = order[start:start + COMPARISON_WORKBOOK_CHUNK_ROWS]
+                    values = []
+                    for key, _ in present:
+                        if key not in columns:
+                            values.append([''] * len(chunk))
+                        elif key == 'date':
+                            values.append(_date_strings(np.asarray(columns[key])[chunk]).tolist())
+                        else:
+                            values.append(np.asarray(columns[key])[chunk].tolist())
+                    for record in zip(*values):
+                        sheet.write_row(row, 0, (name, area) + record)
+                        row += 1
+
+        # 월별 집계 (매매/전세, 분위수 포함)
+        rollup_sheet = workbook.add_worksheet('월별 집계')
+        rollup_sheet.write_row(0, 0, ['단지명', '전용면적(㎡)', '유형'] + [label for _, label in COMPARISON_ROLLUP_COLUMNS], header)
+        rollup_sheet.set_column(0, 0, 22)
+        row = 1
+        for type_label, data_type, frames, rollups in sections:
+            for columns in frames:
+                apt = apt_of(columns)
+                rollup = rollups.get(MonthlyRollupStore.make_key(apt, data_type, request['exclude_anomalies'])) if apt else None
+                if not rollup or not len(rollup.get('year_month', [])):
+                    continue
+                values = [np.asarray(rollup[key]).tolist() if key in rollup else [''] * len(rollup['year_month'])
+                          for key, _ in COMPARISON_ROLLUP_COLUMNS]
+                for record in zip(*values):
+                    record = ['' if isinstance(value, float) and np.isnan(value) else value for value in record]
+                    rollup_sheet.write_row(row, 0, [apt['apt_name'], str(apt['area']), type_label] + record)
+                    row += 1
+    finally:
+        workbook.close()
+    return path
+
+
+class ChartRenderer:
+    """차트 렌더링 워커 프로세스 풀 - 프로세스를 유지해 재사용, 프로세스 사용 불가 시 스레드로 대체"""
+
+    def __init__(self, max_workers=CHART_RENDER_WORKERS):
+        self.max_workers = max_workers
+        self._pool = None
+        self._threads = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def prewarm(self):
+        """워커 프로세스를 미리 띄워 첫 렌더링 대기 시간 단축"""
+        try:
+            self._get_pool().submit(os.getpid)
+        except Exception as e:
+            print(f"⚠️ 렌더링 프로세스 준비 실패: {str(e)}")
+
+    def submit(self, func, args, callback=None):
+        """워커 프로세스에서 func(*args) 실행 - 완료 시 callback(result, error) 호출 (UI 스레드가 아니므로 safe_after로 넘길 것)"""
+        def on_thread_done(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                if callback:
+                    callback(None, e)
+                else:
+                    print(f"⚠️ 렌더링 작업 실패: {str(e)}")
+                return
+            if callback:
+                callback(result, None)
+
+        def on_process_done(future):
+            try:
+                future.result()
+            except concurrent.futures.process.BrokenProcessPool as e:
+                print(f"⚠️ 렌더링 프로세스 중단, 스레드 렌더링으로 재시도: {str(e)}")
+                self._reset_pool()
+                self._threads.submit(func, *args).add_done_callback(on_thread_done)
+                return
+            except Exception:
+                pass
+            on_thread_done(future)
+
+        try:
+            future = self._get_pool().submit(func, *args)
+            future.add_done_callback(on_process_done)
+        except Exception as e:
+            print(f"⚠️ 렌더링 프로세스 사용 불가, 스레드 렌더링 사용: {str(e)}")
+            future = self._threads.submit(func, *args)
+            future.add_done_callback(on_thread_done)
+        return future
+
+    def render(self, request, path, dpi, callback):
+        """차트 렌더링 요청 - 완료 시 callback(result, error) 호출"""
+        return self.submit(render_multi_chart, (request, path, dpi), callback)
+
+    def shutdown(self):
+        """워커 종료 (프로그램 종료 시)"""
+        self._reset_pool()
+        self._threads.shutdown(wait=False)
+
+
+def read_lawdong_file(lawdong_path):
+    """법정동 코드 파일 읽기 - 동일 이름 시군구 구분 (간결한 표시명), UI 접근 없음 (백그라운드 스레드용)
+    반환: 지역 선택/지역 코드 테이블 dict, 파일이 없거나 읽을 수 없으면 예외"""
+    if not os.path.exists(lawdong_path):
+        raise FileNotFoundError("법정동 코드 파일이 존재하지 않습니다.")
+
+    for encoding in ['cp949', 'euc-kr', 'utf-8']:
+        try:
+            with open(lawdong_path, 'r', encoding=encoding) as file:
+                # 법정동 정보를 완전히 저장
+                law_dong_data = []
+                
+                for line in file:
+                    parts = line.strip().split('\t')
+                    if len(parts) < 2:
+                        continue
+                    
+                    code = parts[0].strip()
+                    name = parts[1].strip()
+                    
+                    # 폐지된 동 필터링
+                    if any('폐지' in part for part in parts):
+                        continue
+                        
+                    # 법정동 코드에서 시도, 시군구, 읍면동 코드 추출
+                    sido_code = code[:2]  # 앞 2자리는 시도코드
+                    sigungu_code = code[2:5]  # 다음 3자리는 시군구코드
+                    dong_code = code[5:]  # 나머지 5자리는 읍면동코드
+                    
+                    # 코드와 이름을 리스트에 저장
+                    law_dong_data.append({
+                        'code': code,
+                        'name': name,
+                        'sido_code': sido_code,
+                        'sigungu_code': sigungu_code, 
+                        'dong_code': dong_code
+                    })
+                
+                # 시도 목록 초기화
+                sido_list = []
+                sigungu_dict = {}
+                dong_dict = {}
+                region_codes = {}
+
+                # 시군구 이름 정보 저장을 위한 매핑
+                sigungu_to_full_info = {}  # 시군구이름 -> (시도, 시도코드, 시군구코드)
+                special_sigungu_names = {}  # 중복 이름 시군구 관리 (강서구, 중구 등)
+
+                # 필지 키 계산용 매핑 (전체 법정동명 -> 10자리 코드, (시군구코드, 동이름) -> 법정동코드)
+                bjd_code_by_name = {}
+                umd_code_lookup = {}
+                for item in law_dong_data:
+                    if item['dong_code'] == '00000':
+                        continue
+                    full_name = ' '.join(item['name'].split())
+                    bjd_code_by_name[full_name] = item['code'][:10]
+                    sigungu_5 = f"{item['sido_code']}{item['sigungu_code']}"
+                    umd_code_lookup.setdefault((sigungu_5, full_name.split()[-1]), item['code'][5:10])
+
+                # 시도 정보 추출 (앞 2자리 코드가 같고 나머지가 0인 항목)
+                sido_data = [item for item in law_dong_data if item['code'].endswith('00000000')]
+                for sido in sido_data:
+                    sido_name = sido['name']
+                    sido_code = sido['sido_code']
+                    sido_list.append(sido_name)
+                    sigungu_dict[sido_name] = []
+
+                # 시군구 정보 추출 및 중복 이름 식별
+                sigungu_data = [item for item in law_dong_data if item['dong_code'] == '00000' and not item['code'].endswith('00000000')]
+
+                # 모든 시군구 이름과 그 개수 확인 (중복 확인용)
+                sigungu_name_count = {}
+                for item in sigungu_data:
+                    names = item['name'].split()
+                    if len(names) >= 2:
+                        sigungu_name = names[1]  # 두 번째 부분이 시군구명
+                        sigungu_name_count[sigungu_name] = sigungu_name_count.get(sigungu_name, 0) + 1
+
+                # 중복된 이름을 가진 시군구 목록 생성
+                duplicate_sigungu_names = {name for name, count in sigungu_name_count.items() if count > 1}
+
+                # 각 시도의 시군구 정보 처리
+                for item in sigungu_data:
+                    names = item['name'].split()
+                    if len(names) >= 2:
+                        sido_name = names[0]  # 첫 부분이 시도명
+                        sigungu_name = names[1]  # 두 번째 부분이 시군구명
+
+                        if sido_name in sido_list:
+                            # 시군구 코드 추출
+                            sigungu_full_code = f"{item['sido_code']}{item['sigungu_code']}"
+
+                            # 표시 이름 설정 - 기본적으로는 시군구명만 사용
+                            display_name = sigungu_name
+
+                            # 중복된 이름을 가진 시군구는 특별 처리
+                            if sigungu_name in duplicate_sigungu_names:
+                                # 시도명 약어 생성 (충돌 방지를 위해 첫 2글자 사용)
+                                sido_abbr = sido_name[:2]  # 첫 2글자 사용 (대구광역시 -> 대구, 대전광역시 -> 대전)
+                                if "특별시" in sido_name:
+                                    sido_abbr = sido_name.replace("특별시", "")  # 서울특별시 -> 서울
+                                elif "광역시" in sido_name:
+                                    sido_abbr = sido_name.replace("광역시", "")  # 대구광역시 -> 대구
+                                elif "특별자치시" in sido_name:
+                                    sido_abbr = sido_name.replace("특별자치시", "")  # 세종특별자치시 -> 세종
+                                elif "특별자치도" in sido_name:
+                                    sido_abbr = sido_name.replace("특별자치도", "")  # 제주특별자치도 -> 제주
+                                elif sido_name.endswith("도"):
+                                    sido_abbr = sido_name.replace("도", "")  # 경기도 -> 경기
+
+                                # 시군구 표시명에 시도 약어 추가
+                                display_name = f"{sigungu_name}({sido_abbr})"
+
+                                # 특별 시군구 목록에 추가
+                                special_sigungu_names[display_name] = (sido_name, sigungu_name)
+
+                            # 시군구 정보 저장
+                            sigungu_to_full_info[display_name] = (sido_name, sigungu_name, sigungu_full_code)
+
+                            # 시도별 시군구 목록에 추가
+                            if display_name not in sigungu_dict[sido_name]:
+                                sigungu_dict[sido_name].append(display_name)
+                                dong_dict[display_name] = []
+
+                # 읍면동 정보 추출
+                for item in law_dong_data:
+                    if item['dong_code'] != '00000' and not item['code'].endswith('00000'):
+                        names = item['name'].split()
+                        if len(names) >= 3:
+                            sido_name = names[0]  # 첫 부분이 시도명
+                            sigungu_name = names[1]  # 두 번째 부분이 시군구명
+                            dong_name = names[2]  # 세 번째 부분이 읍면동명
+
+                            # 시군구 표시명 찾기
+                            display_name = sigungu_name
+
+                            # 중복 이름 시군구 처리
+                            if sigungu_name in duplicate_sigungu_names:
+                                # 시도명 약어 생성 (충돌 방지를 위해 첫 2글자 사용)
+                                sido_abbr = sido_name[:2]  # 첫 2글자 사용 (대구광역시 -> 대구, 대전광역시 -> 대전)
+                                if "특별시" in sido_name:
+                                    sido_abbr = sido_name.replace("특별시", "")  # 서울특별시 -> 서울
+                                elif "광역시" in sido_name:
+                                    sido_abbr = sido_name.replace("광역시", "")  # 대구광역시 -> 대구
+                                elif "특별자치시" in sido_name:
+                                    sido_abbr = sido_name.replace("특별자치시", "")  # 세종특별자치시 -> 세종
+                                elif "특별자치도" in sido_name:
+                                    sido_abbr = sido_name.replace("특별자치도", "")  # 제주특별자치도 -> 제주
+                                elif sido_name.endswith("도"):
+                                    sido_abbr = sido_name.replace("도", "")  # 경기도 -> 경기
+
+                                display_name = f"{sigungu_name}({sido_abbr})"
+
+                            # 해당 시군구가 존재하는지 확인
+                            if display_name in dong_dict:
+                                # 동이 아직 추가되지 않았다면 추가
+                                if dong_name not in dong_dict[display_name]:
+                                    dong_dict[display_name].append(dong_name)
+
+                                    # 지역 코드 저장
+                                    sigungu_code_5digits = f"{item['sido_code']}{item['sigungu_code']}"
+                                    region_codes[(sido_name, display_name, dong_name)] = (item['code'], sigungu_code_5digits)
+                
+                # 중복 제거 및 정렬
+                sido_list = sorted(set(sido_list))
+                for sido in sido_list:
+                    sigungu_dict[sido] = sorted(set(sigungu_dict[sido]))
+                    
+                for sigungu in dong_dict:
+                    dong_dict[sigungu] = sorted(set(dong_dict[sigungu]))
+                
+                return {
+                    'region_codes': region_codes,
+                    'sido_list': sido_list,
+                    'sigungu_dict': sigungu_dict,
+                    'dong_dict': dong_dict,
+                    'sigungu_to_full_info': sigungu_to_full_info,
+                    'special_sigungu_names': special_sigungu_names,
+                    'bjd_code_by_name': bjd_code_by_name,
+                    'umd_code_lookup': umd_code_lookup,
+                }
+
+        except UnicodeDecodeError:
+            continue
+
+    raise ValueError("법정동 코드 파일을 읽을 수 없습니다. 인코딩을 확인해주세요.")
+
+
+UI_FRAME_INTERVAL_MS = 33  # 작업 스레드 UI 업데이트 적용 주기 (약 30fps)
+
+
+class UIDispatcher:
+    """작업 스레드 → Tk UI 업데이트 전달 - 스레드는 대기열에 넣기만 하고 Tk 루프가 일정 주기로 비워서 적용
+    한 주기 안에서 같은 위젯/옵션 업데이트는 마지막 값만 적용 (요청이 많아도 위젯당 한 번만 다시 그림)
+    UI 스레드에서 호출하면 바로 적용하고, 그보다 먼저 대기열에 들어온 같은 위젯/옵션 값은 버림"""
+
+    def __init__(self, root, interval_ms=UI_FRAME_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._events = queue.SimpleQueue()
+        self._sequence = itertools.count()
+        self._applied = {}  # 위젯/옵션 키 -> UI 스레드에서 바로 적용한 순번 (UI 스레드 전용)
+        self._ui_thread = threading.current_thread()
+        self._stopped = False
+        self._tick()
+
+    def set(self, widget, **options):
+        """위젯 옵션 변경 (text, value 등) - 어느 스레드에서나 호출 가능"""
+        on_ui_thread = threading.current_thread() is self._ui_thread
+        for name, value in options.items():
+            key, seq = (str(widget), name), next(self._sequence)
+            func = functools.partial(widget.configure, **{name: value})
+            if on_ui_thread:
+                self._applied[key] = seq
+                self._run(func)
+            else:
+                self._events.put((key, seq, func))
+
+    def call(self, func, *args, **kwargs):
+        """UI 스레드에서 실행할 작업 (병합 없이 예약 순서대로 실행) - 어느 스레드에서나 호출 가능"""
+        func = functools.partial(func, *args, **kwargs)
+        if threading.current_thread() is self._ui_thread:
+            self._run(func)
+        else:
+            self._events.put((None, next(self._sequence), func))
+
+    def drain(self):
+        """대기 중인 업데이트 적용 (UI 스레드 전용) - 반환: 적용한 업데이트 수"""
+        pending = OrderedDict()
+        while True:
+            try:
+                key, seq, func = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if key is None:
+                key = object()
+            elif seq < self._applied.get(key, -1):
+                continue  # UI 스레드에서 이미 더 최근 값 적용
+            pending.pop(key, None)  # 같은 위젯/옵션은 마지막 값만, 순서는 마지막 예약 기준
+            pending[key] = func
+        for func in pending.values():
+            self._run(func)
+        return len(pending)
+
+    def _run(self, func):
+        try:
+            func()
+        except tk.TclError:
+            pass  # 이미 닫힌 창의 위젯
+        except Exception as e:
+            print(f"⚠️ UI 업데이트 실패: {str(e)}")
+
+    def _tick(self):
+        if self._stopped:
+            return
+        self.drain()
+        try:
+            self.root.after(self.interval_ms, self._tick)
+        except tk.TclError:
+            self._stopped = True  # 창이 닫힘
+
+    def stop(self):
+        """주기 적용 중지 (프로그램 종료 시)"""
+        self._stopped = True
+
+
+class RealEstateAnalyzerApp:
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("📊 부태리의 실거래가 차트")  # 이모지 추가
+        self.root.geometry("1400x1200")  # 크기 증가 (세로 길이 더 늘림)
+
+        # 현대적인 색상 테마 정의
+        self.colors = {
+            'primary': '#2C3E50',      # 다크 블루 (제목)
+            'secondary': '#3498DB',    # 밝은 블루 (액센트)
+            'success': '#27AE60',      # 그린 (성공)
+            'warning': '#F39C12',      # 오렌지 (경고)
+            'danger': '#E74C3C',       # 레드 (위험)
+            'light': '#ECF0F1',        # 밝은 회색 (배경)
+            'dark': '#34495E',         # 다크 그레이
+            'white': '#FFFFFF',        # 흰색
+            'bg_main': '#F8F9FA',      # 메인 배경
+            'bg_frame': '#FFFFFF',     # 프레임 배경
+            'text_primary': '#2C3E50', # 주요 텍스트
+            'text_secondary': '#7F8C8D', # 보조 텍스트
+            'border': '#BDC3C7'        # 테두리
+        }
+
+        # 배경색 설정
+        self.root.configure(bg=self.colors['bg_main'])
+
+        # 종료 플래그 (백그라운드 스레드에서 확인)
+        self.is_closing = False
+
+        # 안전한 UI 업데이트 헬퍼 함수
+        def safe_after(delay, func):
+            """종료 중이 아닐 때만 UI 업데이트 실행 (작업 스레드에서 호출하면 UI 업데이트 대기열을 거쳐 예약)"""
+            if not self.is_closing:
+                try:
+                    self.ui.call(self.root.after, delay, func)
+                except:
+                    pass
+
+        self.safe_after = safe_after
+
+        # 작업 스레드의 진행 상황 표시는 대기열로 보내 Tk 루프에서 일정 주기로 적용
+        self.ui = UIDispatcher(self.root)
+
+        # 기본 설정
+        self.download_path = "C:\\Download"
+        self.history_path = os.path.join(self.download_path, "history")
+        self.lawdong_path = "C:/law-dong/law-dong.txt"
+        self.image_path = os.path.join(self.download_path, "graph.jpg")
+        self.excel_path = None
+        
+        # 그래프 옵션 변수 추가 - 여기에 정의
+        self.show_monthly_avg = tk.BooleanVar(value=True)
+        self.show_monthly_max = tk.BooleanVar(value=True)
+        self.show_scatter_plot = tk.BooleanVar(value=True)
+        self.show_region_index = tk.BooleanVar(value=False)  # 지역 가격지수 벤치마크 표시 여부
+        self.exclude_anomalies = tk.BooleanVar(value=True)  # 해제/이상거래 제외 여부
+        self.show_price_bands = tk.BooleanVar(value=False)  # 월별 p10~p90 가격대 표시 여부
+        
+        # 전세 그래프 옵션 추가
+        self.show_jeonse = tk.BooleanVar(value=True)  # 전세 데이터 표시 여부
+
+        # 전세가 옵션 변수들 아래에 추가
+        self.show_jeonse_scatter_plot = tk.BooleanVar(value=True)
+
+        # 세부정보 가져오기 옵션 변수 추가 (기본값: False)
+        self.show_complex_info = tk.BooleanVar(value=False)
+
+
+        # 새로운 전세가 옵션 변수 추가
+        self.show_jeonse_monthly_avg = tk.BooleanVar(value=True)  # 전세 월평균가격 표시 여부
+        self.show_jeonse_monthly_max = tk.BooleanVar(value=True)  # 전세 월최고가 표시 여부
+        self.show_jeonse_scatter_plot = tk.BooleanVar(value=True)  # 전세 점도표 표시 여부
+
+        # 전세 데이터 수집 여부 옵션 추가 (기본값: True)
+        self.collect_jeonse_data = tk.BooleanVar(value=True)  # 전세 데이터 수집 여부
+        
+        # 설정 파일 로드
+        with startup_step('load_settings'):
+            self.load_settings()
+        
+        # 폴더 생성
+        with startup_step('folders/history_store'):
+            for path in [self.download_path, self.history_path]:
+                if not os.path.exists(path):
+                    os.makedirs(path)
+
+            # 히스토리 색인 (차트 저장 시 추가, 폴더 스캔 대신 사용)
+            self.history_index = HistoryIndex(os.path.join(self.download_path, HISTORY_INDEX_FILENAME))
+
+            # 히스토리 엑셀 보관소 (내용 해시 중복 제거 + 보관 정책) - 시작 시 백그라운드 정리
+            self.history_store = HistoryStore(self.history_path, self.history_keep_per_apt,
+                                              self.history_max_mb * 1024 * 1024)
+            self.history_store.schedule_compaction()
+        
+        # 폰트/ttk 스타일 설정
+        with startup_step('setup_fonts/styles'):
+            self.setup_fonts()
+            self.setup_styles()
+
+        # 법정동 코드 관련 변수 초기화
+        self.region_codes = {}
+        self.sido_list = []
+        self.sigungu_dict = {}
+        self.dong_dict = {}
+        self.bjd_code_by_name = {}
+        self.umd_code_lookup = {}
+        self.sigungu_to_full_info = {}
+        self.special_sigungu_names = {}
+
+        # 백그라운드 시작 로드 진행 중 항목 (법정동/히스토리) - 모두 끝나면 세션 복원
+        self.startup_loads = {'region', 'history'}
+        self.startup_loaded = threading.Event()
+        
+        # API 키 설정
+        self.service_key = "Vs5lXsSo6iEI8no3pP%2FT0udWF9s7Cc8oP1SIWnEI5F4h6dKq92fLvnKmxkoWGJxSeW2%2FSOLQECGxOJzWcjJEXQ%3D%3D"
+        
+        # GUI 설정
+        with startup_step('setup_gui'):
+            self.setup_gui()
+        
+        # 법정동 파일/히스토리는 창 표시 후 백그라운드에서 로드 (로드 중에는 지역 선택 비활성화)
+        self.history_list = []
+        self.load_region_index()
+        self.load_history_async()
+
+        # 윈도우 닫기 프로토콜 설정 (프로그램 종료 시 자동 저장)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        # 선택된 아파트 목록 저장 변수 추가
+        self.selected_apts = []
+
+        # 아파트 목록 캐시 (지역별로 저장)
+        # 키: (sigungu_code, dong) 튜플
+        # 값: 아파트 목록 리스트
+        self.apt_list_cache = {}
+
+        # 아파트별 필지 키 (키: (sigungu_code, dong, apt_name), 값: 19자리 필지 키 - PARCEL_KEY_LENGTH)
+        self.apt_parcel_keys = {}
+
+        # 월별 집계 저장소 (거래 데이터 캐시 폴더 아래 rollups 폴더에 유지)
+        self.monthly_rollups = MonthlyRollupStore(os.path.join(self.trade_cache_path, 'rollups'))
+
+        # 차트 이미지 캐시 (같은 데이터/옵션/해상도 요청은 다시 그리지 않음)
+        self.chart_cache = ChartArtifactCache(os.path.join(self.trade_cache_path, 'charts'))
+
+        # 지역-월 거래 저장소 (같은 시군구/월은 아파트 수와 무관하게 한 번만 조회)
+        self.region_store = RegionMonthStore(self.trade_cache_path, self.service_key, self.umd_code_lookup)
+
+        # 차트 렌더링 워커 프로세스 (첫 그래프 생성 시 시작, 이후 재사용)
+        self.chart_renderer = ChartRenderer()
+
+        # 엑셀 저장 대기열 (수집/그래프 스레드는 요청만 넣고 저장은 백그라운드에서 한 번만)
+        self.excel_queue = ExcelExportQueue(os.path.join(self.trade_cache_path, EXCEL_EXPORT_STATE_FILENAME),
+                                            on_idle=self.on_excel_queue_idle)
+
+        # 창이 뜬 뒤 무거운 모듈(pandas/matplotlib 등) 백그라운드 미리 로드
+        self.safe_after(0, self.on_first_frame)
+
+    def on_first_frame(self):
+        """첫 화면 표시 후 - 시작 시간 기록, 무거운 모듈 미리 로드 (--profile-startup이면 보고서 출력)"""
+        record_startup_timing('first_frame', '창 표시까지', time.perf_counter() - _MODULE_LOAD_STARTED)
+
+        def worker():
+            prewarm_modules()
+            if '--profile-startup' in sys.argv:
+                self.startup_loaded.wait(timeout=60)
+                print(startup_report())
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def load_settings(self):
+        """설정 파일 로드 (단지정보 경로 포함)"""
+        settings_file = os.path.join(os.getcwd(), 'real_estate_analyzer_settings.json')
+        
+        # 기본 설정값 정의
+        default_settings = {
+            'download_path': os.path.join(os.path.expanduser('~'), 'Documents', 'RealEstateAnalyzer'),
+            'history_path': os.path.join(os.path.expanduser('~'), 'Documents', 'RealEstateAnalyzer', 'history'),
+            'lawdong_path': os.path.join(os.getcwd(), 'data', 'law-dong.txt'),
+            'complex_info_path': os.path.join(os.getcwd(), 'data', 'complex_info.xlsx'),  # 기본 단지정보 경로 추가
+            'trade_cache_path': DEFAULT_TRADE_CACHE_PATH,  # 거래 데이터 캐시 경로 추가
+            'render_profile': DEFAULT_RENDER_PROFILE,  # 차트 렌더링 프로필
+            'point_budget': DEFAULT_POINT_BUDGET,  # 차트 점 개수 상한 (0이면 제한 없음)
+            'history_keep_per_apt': DEFAULT_HISTORY_KEEP_PER_APT,  # 히스토리 단지별 보관 개수
+            'history_max_mb': DEFAULT_HISTORY_MAX_MB,  # 히스토리 최대 용량 (MB)
+            'graph_options': {
+                'show_monthly_avg': True,
+                'show_monthly_max': True,
+                'show_scatter_plot': True,
+                'show_region_index': False,
+                'exclude_anomalies': True,
+                'show_price_bands': False,
+                'show_jeonse': True,
+                'show_jeonse_monthly_avg': True,
+                'show_jeonse_monthly_max': True,
+                'show_jeonse_scatter_plot': True,
+                'collect_jeonse_data': True  # 전세 데이터 수집 여부
+            }
+        }
+        
+        # 설정 파일이 있으면 로드, 없으면 기본값 사용
+        if os.path.exists(settings_file):
+            try:
+                with open(settings_file, 'r', encoding='utf-8') as f:
+                    settings_data = json.load(f)
+                    
+                    # 기본 설정에 저장된 설정 병합 (누락되었거나 null/빈 경로는 기본값 사용 - 이전 버전은 null 저장)
+                    self.download_path = settings_data.get('download_path') or default_settings['download_path']
+                    self.history_path = settings_data.get('history_path') or default_settings['history_path']
+                    self.lawdong_path = settings_data.get('lawdong_path') or default_settings['lawdong_path']
+                    self.complex_info_path = settings_data.get('complex_info_path') or default_settings['complex_info_path']  # 단지정보 경로 로드
+                    self.trade_cache_path = settings_data.get('trade_cache_path') or default_settings['trade_cache_path']  # 거래 데이터 캐시 경로 로드
+                    self.render_profile = settings_data.get('render_profile', default_settings['render_profile'])
+                    if self.render_profile not in RENDER_PROFILES:
+                        self.render_profile = DEFAULT_RENDER_PROFILE
+                    try:
+                        self.point_budget = max(0, int(settings_data.get('point_budget', default_settings['point_budget'])))
+                    except (TypeError, ValueError):
+                        self.point_budget = DEFAULT_POINT_BUDGET
+                    try:
+                        self.history_keep_per_apt = max(1, int(settings_data.get('history_keep_per_apt', default_settings['history_keep_per_apt'])))
+                        self.history_max_mb = max(1, int(settings_data.get('history_max_mb', default_settings['history_max_mb'])))
+                    except (TypeError, ValueError):
+                        self.history_keep_per_apt = DEFAULT_HISTORY_KEEP_PER_APT
+                        self.history_max_mb = DEFAULT_HISTORY_MAX_MB
+                    
+                    # 그래프 옵션 로드
+                    # 그래프 옵션 로드 부분 수정
+                    if 'graph_options' in settings_data:
+                        graph_options = settings_data['graph_options']
+                        self.show_monthly_avg.set(graph_options.get('show_monthly_avg', True))
+                        self.show_monthly_max.set(graph_options.get('show_monthly_max', True))
+                        self.show_scatter_plot.set(graph_options.get('show_scatter_plot', True))
+                        self.show_region_index.set(graph_options.get('show_region_index', False))
+                        self.exclude_anomalies.set(graph_options.get('exclude_anomalies', True))
+                        self.show_price_bands.set(graph_options.get('show_price_bands', False))
+                        self.show_jeonse.set(graph_options.get('show_jeonse', True))
+                        self.show_jeonse_monthly_avg.set(graph_options.get('show_jeonse_monthly_avg', True))
+                        self.show_jeonse_monthly_max.set(graph_options.get('show_jeonse_monthly_max', True))
+                        self.show_jeonse_scatter_plot.set(graph_options.get('show_jeonse_scatter_plot', True))
+
+                        # 세부정보 옵션 추가
+                        self.show_complex_info.set(graph_options.get('show_complex_info', False))
+
+                        # 전세 데이터 수집 여부 옵션 추가
+                        self.collect_jeonse_data.set(graph_options.get('collect_jeonse_data', True))
+            except Exception as e:
+                print(f"설정 파일 로드 중 오류: {str(e)}")
+                self._apply_default_settings(default_settings)
+        else:
+            self._apply_default_settings(default_settings)
+            
+            # 기본 폴더 생성
+            for path in [self.download_path, self.history_path, self.trade_cache_path]:
+                if not os.path.exists(path):
+                    os.makedirs(path)
+
+            # 단지정보 파일 경로 디렉토리 생성
+            complex_info_dir = os.path.dirname(self.complex_info_path)
+            if not os.path.exists(complex_info_dir):
+                os.makedirs(complex_info_dir)
+
+    def load_complex_info(self):
+        """단지정보 파일 로드"""
+        if not hasattr(self, 'complex_info_path') or not os.path.exists(self.complex_info_path):
+            return None
+        
+        try:
+            import pandas as pd
+            # 엑셀 파일 로드 - 첫 번째 행을 열 이름으로 사용
+            df = pd.read_excel(self.complex_info_path, engine='openpyxl')
+            
+            # 열 이름을 알파벳으로 설정
+            # 엑셀의 열 이름(A, B, C, ...)을 DataFrame의 열 이름으로 설정
+            alphabet_columns = []
+            for i in range(df.shape[1]):
+                if i < 26:
+                    col_name = chr(ord('a') + i)
+                else:
+                    # 26열 이상인 경우 aa, ab, ac... 로 설정
+                    first_letter = chr(ord('a') + (i // 26) - 1)
+                    second_letter = chr(ord('a') + (i % 26))
+                    col_name = first_letter + second_letter
+                alphabet_columns.append(col_name)
+            
+            df.columns = alphabet_columns
+
+            # h열(법정동 주소)에서 필지 키 계산 - 실거래 데이터와 키 조인에 사용
+            if 'h' in df.columns and getattr(self, 'bjd_code_by_name', None):
+                df = add_parcel_keys(df, 'h', self.bjd_code_by_name)
+                print(f"🔑 단지정보 필지 키 생성: {df['parcel_key'].notna().sum()}/{len(df)}건")
+
+            return df
+        except Exception as e:
+            print(f"단지정보 파일 로드 중 오류: {str(e)}")
+            return None
+    
+    def _apply_default_settings(self, default_settings):
+        """기본 설정값 적용"""
+        self.download_path = default_settings['download_path']
+        self.history_path = default_settings['history_path']
+        self.lawdong_path = default_settings['lawdong_path']
+        self.complex_info_path = default_settings['complex_info_path']  # 단지정보 경로 추가
+        self.trade_cache_path = default_settings['trade_cache_path']  # 거래 데이터 캐시 경로 추가
+        self.render_profile = default_settings['render_profile']
+        self.point_budget = default_settings['point_budget']
+        self.history_keep_per_apt = default_settings['history_keep_per_apt']
+        self.history_max_mb = default_settings['history_max_mb']
+        
+        # 그래프 옵션 설정
+        graph_options = default_settings['graph_options']
+        self.show_monthly_avg.set(graph_options['show_monthly_avg'])
+        self.show_monthly_max.set(graph_options['show_monthly_max'])
+        self.show_scatter_plot.set(graph_options['show_scatter_plot'])
+        self.show_region_index.set(graph_options['show_region_index'])
+        self.exclude_anomalies.set(graph_options['exclude_anomalies'])
+        self.show_price_bands.set(graph_options['show_price_bands'])
+        self.show_jeonse.set(graph_options['show_jeonse'])
+        self.show_jeonse_monthly_avg.set(graph_options['show_jeonse_monthly_avg'])
+        self.show_jeonse_monthly_max.set(graph_options['show_jeonse_monthly_max'])
+        self.show_jeonse_scatter_plot.set(graph_options['show_jeonse_scatter_plot'])
+        self.collect_jeonse_data.set(graph_options.get('collect_jeonse_data', True))
+
+
+    def setup_fonts(self):
+        """폰트 설정"""
+        # 기본 폰트 설정 (크기 증가)
+        self.font_normal = ('Malgun Gothic', 10)
+        self.font_large = ('Malgun Gothic', 12)
+        self.font_title = ('Malgun Gothic', 18, 'bold')
+        self.font_button = ('Malgun Gothic', 10)
+
+        # matplotlib 폰트 설정은 matplotlib 처음 import 시 적용 (_configure_matplotlib)
+
+    def setup_styles(self):
+        """ttk 스타일 커스터마이징"""
+        style = ttk.Style()
+        style.theme_use('clam')  # 현대적인 테마
+
+        # 프레임 스타일
+        style.configure('TFrame', background=self.colors['bg_main'])
+        style.configure('Card.TFrame', background=self.colors['bg_frame'],
+                       relief='flat', borderwidth=0)
+
+        # 라벨프레임 스타일
         style.configure('TLabelframe', background=self.colors['bg_frame'],
                        foreground=self.colors['primary'], borderwidth=2,
                        relief='solid')
@@ -459,286 +4609,128 @@ class RealEstateAnalyzerApp:
                        troughcolor=self.colors['light'],
                        background=self.colors['secondary'])
         
-    def load_lawdong_file(self):
-        """법정동 코드 파일 로드 - 동일 이름 시군구 구분 개선 (간결한 표시명)"""
-        try:
-            if not os.path.exists(self.lawdong_path):
-                show_topmost_error("오류", "법정동 코드 파일이 존재하지 않습니다.", parent=self.root)
-                return False
-                
-            for encoding in ['cp949', 'euc-kr', 'utf-8']:
+    def load_region_index(self):
+        """법정동 코드 파일을 백그라운드에서 읽고 UI 스레드에서 적용 (읽는 동안 지역 선택 비활성화)"""
+        self.set_region_loading(True)
+        lawdong_path = self.lawdong_path
+
+        def worker():
+            tables, error = None, None
+            with startup_step('load_lawdong_file'):
                 try:
-                    with open(self.lawdong_path, 'r', encoding=encoding) as file:
-                        # 법정동 정보를 완전히 저장
-                        law_dong_data = []
-                        
-                        for line in file:
-                            parts = line.strip().split('\t')
-                            if len(parts) < 2:
-                                continue
-                            
-                            code = parts[0].strip()
-                            name = parts[1].strip()
-                            
-                            # 폐지된 동 필터링
-                            if any('폐지' in part for part in parts):
-                                continue
-                                
-                            # 법정동 코드에서 시도, 시군구, 읍면동 코드 추출
-                            sido_code = code[:2]  # 앞 2자리는 시도코드
-                            sigungu_code = code[2:5]  # 다음 3자리는 시군구코드
-                            dong_code = code[5:]  # 나머지 5자리는 읍면동코드
-                            
-                            # 코드와 이름을 리스트에 저장
-                            law_dong_data.append({
-                                'code': code,
-                                'name': name,
-                                'sido_code': sido_code,
-                                'sigungu_code': sigungu_code, 
-                                'dong_code': dong_code
-                            })
-                        
-                        # 시도 목록 초기화
-                        self.sido_list = []
-                        self.sigungu_dict = {}
-                        self.dong_dict = {}
-                        self.region_codes = {}
-
-                        # 시군구 이름 정보 저장을 위한 매핑
-                        self.sigungu_to_full_info = {}  # 시군구이름 -> (시도, 시도코드, 시군구코드)
-                        self.special_sigungu_names = {}  # 중복 이름 시군구 관리 (강서구, 중구 등)
-
-                        # 시도 정보 추출 (앞 2자리 코드가 같고 나머지가 0인 항목)
-                        sido_data = [item for item in law_dong_data if item['code'].endswith('00000000')]
-                        for sido in sido_data:
-                            sido_name = sido['name']
-                            sido_code = sido['sido_code']
-                            self.sido_list.append(sido_name)
-                            self.sigungu_dict[sido_name] = []
-
-                        # 시군구 정보 추출 및 중복 이름 식별
-                        sigungu_data = [item for item in law_dong_data if item['dong_code'] == '00000' and not item['code'].endswith('00000000')]
-
-                        # 모든 시군구 이름과 그 개수 확인 (중복 확인용)
-                        sigungu_name_count = {}
-                        for item in sigungu_data:
-                            names = item['name'].split()
-                            if len(names) >= 2:
-                                sigungu_name = names[1]  # 두 번째 부분이 시군구명
-                                sigungu_name_count[sigungu_name] = sigungu_name_count.get(sigungu_name, 0) + 1
-
-                        # 중복된 이름을 가진 시군구 목록 생성
-                        duplicate_sigungu_names = {name for name, count in sigungu_name_count.items() if count > 1}
-
-                        # 각 시도의 시군구 정보 처리
-                        for item in sigungu_data:
-                            names = item['name'].split()
-                            if len(names) >= 2:
-                                sido_name = names[0]  # 첫 부분이 시도명
-                                sigungu_name = names[1]  # 두 번째 부분이 시군구명
-
-                                if sido_name in self.sido_list:
-                                    # 시군구 코드 추출
-                                    sigungu_full_code = f"{item['sido_code']}{item['sigungu_code']}"
-
-                                    # 표시 이름 설정 - 기본적으로는 시군구명만 사용
-                                    display_name = sigungu_name
-
-                                    # 중복된 이름을 가진 시군구는 특별 처리
-                                    if sigungu_name in duplicate_sigungu_names:
-                                        # 시도명 약어 생성 (충돌 방지를 위해 첫 2글자 사용)
-                                        sido_abbr = sido_name[:2]  # 첫 2글자 사용 (대구광역시 -> 대구, 대전광역시 -> 대전)
-                                        if "특별시" in sido_name:
-                                            sido_abbr = sido_name.replace("특별시", "")  # 서울특별시 -> 서울
-                                        elif "광역시" in sido_name:
-                                            sido_abbr = sido_name.replace("광역시", "")  # 대구광역시 -> 대구
-                                        elif "특별자치시" in sido_name:
-                                            sido_abbr = sido_name.replace("특별자치시", "")  # 세종특별자치시 -> 세종
-                                        elif "특별자치도" in sido_name:
-                                            sido_abbr = sido_name.replace("특별자치도", "")  # 제주특별자치도 -> 제주
-                                        elif sido_name.endswith("도"):
-                                            sido_abbr = sido_name.replace("도", "")  # 경기도 -> 경기
-
-                                        # 시군구 표시명에 시도 약어 추가
-                                        display_name = f"{sigungu_name}({sido_abbr})"
-
-                                        # 특별 시군구 목록에 추가
-                                        self.special_sigungu_names[display_name] = (sido_name, sigungu_name)
-
-                                    # 시군구 정보 저장
-                                    self.sigungu_to_full_info[display_name] = (sido_name, sigungu_name, sigungu_full_code)
-
-                                    # 시도별 시군구 목록에 추가
-                                    if display_name not in self.sigungu_dict[sido_name]:
-                                        self.sigungu_dict[sido_name].append(display_name)
-                                        self.dong_dict[display_name] = []
-
-                        # 읍면동 정보 추출
-                        for item in law_dong_data:
-                            if item['dong_code'] != '00000' and not item['code'].endswith('00000'):
-                                names = item['name'].split()
-                                if len(names) >= 3:
-                                    sido_name = names[0]  # 첫 부분이 시도명
-                                    sigungu_name = names[1]  # 두 번째 부분이 시군구명
-                                    dong_name = names[2]  # 세 번째 부분이 읍면동명
-
-                                    # 시군구 표시명 찾기
-                                    display_name = sigungu_name
-
-                                    # 중복 이름 시군구 처리
-                                    if sigungu_name in duplicate_sigungu_names:
-                                        # 시도명 약어 생성 (충돌 방지를 위해 첫 2글자 사용)
-                                        sido_abbr = sido_name[:2]  # 첫 2글자 사용 (대구광역시 -> 대구, 대전광역시 -> 대전)
-                                        if "특별시" in sido_name:
-                                            sido_abbr = sido_name.replace("특별시", "")  # 서울특별시 -> 서울
-                                        elif "광역시" in sido_name:
-                                            sido_abbr = sido_name.replace("광역시", "")  # 대구광역시 -> 대구
-                                        elif "특별자치시" in sido_name:
-                                            sido_abbr = sido_name.replace("특별자치시", "")  # 세종특별자치시 -> 세종
-                                        elif "특별자치도" in sido_name:
-                                            sido_abbr = sido_name.replace("특별자치도", "")  # 제주특별자치도 -> 제주
-                                        elif sido_name.endswith("도"):
-                                            sido_abbr = sido_name.replace("도", "")  # 경기도 -> 경기
-
-                                        display_name = f"{sigungu_name}({sido_abbr})"
-
-                                    # 해당 시군구가 존재하는지 확인
-                                    if display_name in self.dong_dict:
-                                        # 동이 아직 추가되지 않았다면 추가
-                                        if dong_name not in self.dong_dict[display_name]:
-                                            self.dong_dict[display_name].append(dong_name)
-
-                                            # 지역 코드 저장
-                                            sigungu_code_5digits = f"{item['sido_code']}{item['sigungu_code']}"
-                                            self.region_codes[(sido_name, display_name, dong_name)] = (item['code'], sigungu_code_5digits)
-                        
-                        # 중복 제거 및 정렬
-                        self.sido_list = sorted(set(self.sido_list))
-                        for sido in self.sido_list:
-                            self.sigungu_dict[sido] = sorted(set(self.sigungu_dict[sido]))
-                            
-                        for sigungu in self.dong_dict:
-                            self.dong_dict[sigungu] = sorted(set(self.dong_dict[sigungu]))
-                        
-                        return True
-                        
-                except UnicodeDecodeError:
-                    continue
-            
-            show_topmost_error("오류", "법정동 코드 파일을 읽을 수 없습니다. 인코딩을 확인해주세요.", parent=self.root)
-            return False
-                    
-        except Exception as e:
-            show_topmost_error("오류", f"법정동 코드 파일 로드 중 오류: {str(e)}", parent=self.root)
-            import traceback
-            traceback.print_exc()
-            return False
+                    tables = read_lawdong_file(lawdong_path)
+                except Exception as e:
+                    error = e
+            self.safe_after(0, lambda: self.apply_region_index(tables, error))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def apply_region_index(self, tables, error=None):
+        """읽어 온 법정동 테이블 적용 - 시/도 목록 갱신 후 지역 선택 활성화 (UI 스레드)"""
+        if error is not None:
+            message = str(error)
+            if not isinstance(error, (FileNotFoundError, ValueError)):
+                message = f"법정동 코드 파일 로드 중 오류: {str(error)}"
+            show_topmost_error("오류", message, parent=self.root)
+        else:
+            for name, value in tables.items():
+                setattr(self, name, value)
+            if hasattr(self, 'region_store'):
+                self.region_store.umd_code_lookup = self.umd_code_lookup
+            self.update_sido_combobox()
+        self.set_region_loading(False)
+        self.startup_loads.discard('region')
+        self.on_startup_load_done()
 
     
+    def load_history_async(self):
+        """시작 시 히스토리 색인을 백그라운드에서 읽고 (필요하면 최초 색인 생성) UI 스레드에서 목록 표시"""
+        self.history_preview.config(image='', text="⏳ 히스토리를 불러오는 중...")
+
+        def worker():
+            with startup_step('load_history'):
+                history_list = self.load_history()
+            self.safe_after(0, lambda: self.apply_history(history_list))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def apply_history(self, history_list):
+        """백그라운드에서 읽은 히스토리 목록 표시 (UI 스레드)"""
+        if not self.history_list:  # 로드 중 차트 저장으로 이미 다시 읽었으면 그 목록 유지
+            self.history_list = history_list
+            self.update_history_display()
+        self.history_preview.config(text="")
+        self.startup_loads.discard('history')
+        self.on_startup_load_done()
+
+    def on_startup_load_done(self):
+        """백그라운드 시작 로드가 모두 끝나면 상태 표시 정리 후 이전 세션 복원 (최초 1회)"""
+        if self.startup_loads or self.startup_loaded.is_set():
+            return
+        self.startup_loaded.set()
+        # 이전 세션의 선택 아파트 복원 (거래 데이터는 캐시/엑셀에서 백그라운드 로드)
+        self.restore_session()
+
     # 1. 히스토리 로드 함수 수정 - 그래프 이미지 파일 기준으로 변경
     # 1. 히스토리 로드 함수 수정 - 그래프 이미지 파일 기준으로 변경
     def load_history(self):
-        """저장된 히스토리 목록 로드 - 그래프 이미지 파일 기준으로 수정된 버전 (개선)"""
-        history_list = []
-        if os.path.exists(self.download_path):
-            try:
-                # 이미지 파일 기준으로 히스토리 생성
-                image_extensions = ['.jpg', '.jpeg', '.png']
-                image_files = {}
-                
-                for f in os.listdir(self.download_path):
-                    file_lower = f.lower()
-                    if any(f.endswith(ext) for ext in image_extensions) and f != "graph.jpg":
-                        file_path = os.path.join(self.download_path, f)
-                        image_files[f] = os.path.getmtime(file_path)
-                
-                print(f"[디버그] 발견된 이미지 파일 수: {len(image_files)}")
-                
-                for image_file in image_files:
-                    file_path = os.path.join(self.download_path, image_file)
-                    try:
-                        # 파일명에서 아파트 정보 추출
-                        print(f"[디버그] 처리 중인 파일: {image_file}")
-                        
-                        if image_file.startswith("multi_apt_comparison_"):
-                            # 다중 아파트 비교 그래프인 경우
-                            chart_title = "다중 아파트 비교 분석"
-                            
-                            # 파일명에서 아파트명과 면적 추출
-                            parts = image_file[len("multi_apt_comparison_"):].split('_vs_')
-                            apt_parts = []
-                            for part in parts:
-                                if '_' in part and 'm2' in part:
-                                    try:
-                                        apt_name = '_'.join(part.split('_')[:-1])  # 마지막 부분(면적) 제외
-                                        area = part.split('_')[-1].replace('m2', '').split('.')[0]  # 확장자 제거
-                                        apt_name = apt_name.replace('_', ' ')  # 언더스코어를 공백으로 치환
-                                        apt_parts.append(f"{apt_name} ({area}㎡)")
-                                    except:
-                                        apt_parts.append(part.split('.')[0])  # 확장자 제거
-                            
-                            apt_name = " vs ".join(apt_parts)
-                            area = apt_name  # 비교아파트 정보를 area 필드에 저장
-                            
-                        else:
-                            # 단일 아파트 그래프인 경우
-                            chart_title = "아파트 실거래가 분석"
-                            name_part = image_file.split('.')[0]  # 확장자 제거
-                            
-                            # 이름과 면적 분리
-                            if '_' in name_part and 'm2' in name_part:
-                                parts = name_part.split('_')
-                                if len(parts) >= 2 and 'm2' in parts[-1]:
-                                    apt_name = '_'.join(parts[:-1])  # 마지막 부분(면적) 제외
-                                    area_part = parts[-1].replace('m2', '')  # m2 제거
-                                    apt_name = apt_name.replace('_', ' ')  # 언더스코어를 공백으로 치환
-                                    area = f"{apt_name} ({area_part}㎡)"  # 비교아파트 정보 형식으로 저장
-                                else:
-                                    apt_name = name_part.replace('_', ' ')
-                                    area = apt_name
-                            else:
-                                apt_name = name_part.replace('_', ' ')
-                                area = apt_name
-                        
-                        # 관련 엑셀 파일 찾기
-                        excel_filename = None
-                        if area and '(' in area and ')' in area:
-                            # 면적 정보가 있는 경우
-                            area_match = re.search(r'\((\d+)㎡\)', area)
-                            if area_match:
-                                area_num = area_match.group(1)
-                                apt_name_for_excel = apt_name.replace(' ', '_')
-                                excel_filename = f"{apt_name_for_excel}_{area_num}m2_매매.xlsx"
-                                if not os.path.exists(os.path.join(self.download_path, excel_filename)):
-                                    excel_filename = f"{apt_name_for_excel}_{area_num}m2.xlsx"
-                        
-                        excel_path = None
-                        if excel_filename:
-                            excel_path = os.path.join(self.download_path, excel_filename)
-                            if not os.path.exists(excel_path):
-                                excel_path = None
-                        
-                        history_item = {
-                            'image_path': file_path,
-                            'excel_path': excel_path,
-                            'apt_name': apt_name,
-                            'area': area,  # 비교아파트 정보
-                            'search_date': image_files[image_file],
-                            'chart_title': chart_title,
-                            'type': 'multi' if "multi_apt_comparison_" in image_file else 'single'
-                        }
-                        
-                        history_list.append(history_item)
-                        print(f"[디버그] 히스토리 항목 추가: {apt_name} - {area}")
-                        
-                    except Exception as e:
-                        print(f"[디버그] 이미지 파일 처리 중 오류 ({image_file}): {str(e)}")
-            except Exception as e:
-                print(f"[디버그] 히스토리 로드 중 오류: {str(e)}")
-                        
-        print(f"[디버그] 총 히스토리 항목 수: {len(history_list)}")
+        """저장된 히스토리 목록 로드 - 히스토리 색인에서 읽음 (색인이 없으면 다운로드 폴더를 한 번 훑어 색인 생성)"""
+        try:
+            if not self.history_index.exists():
+                self.migrate_history_index()
+            history_list = self.history_index.items()
+        except Exception as e:
+            print(f"⚠️ 히스토리 로드 중 오류: {str(e)}")
+            history_list = []
         return sorted(history_list, key=lambda x: x['search_date'], reverse=True)
-    
+
+    def migrate_history_index(self):
+        """색인 도입 이전에 저장된 그래프 이미지를 파일명 기준으로 색인에 등록 (최초 1회)"""
+        items = []
+        if os.path.exists(self.download_path):
+            for image_file in os.listdir(self.download_path):
+                if not image_file.lower().endswith(HISTORY_IMAGE_EXTENSIONS) or is_preview_file(image_file):
+                    continue
+                try:
+                    mtime = os.path.getmtime(os.path.join(self.download_path, image_file))
+                    items.append(legacy_history_item(self.download_path, image_file, mtime))
+                except Exception as e:
+                    print(f"⚠️ 히스토리 이전 실패 ({image_file}): {str(e)}")
+        items.sort(key=lambda x: x['search_date'])
+        self.history_index.clear()
+        self.history_index.add_many(items)
+        print(f"📋 히스토리 색인 생성: {len(items)}개 항목")
+
+    def record_history(self, image_path, chart_title, display, history_type='single', apts=(),
+                       options=None, fingerprint=None, excel_path=None, regions=None):
+        """차트 저장 시 히스토리 색인에 항목 추가 (지역/단지/면적/옵션/데이터 지문 포함)"""
+        try:
+            apts = [
+                {key: apt.get(key) for key in ('sido', 'sigungu', 'dong', 'apt_name', 'area', 'sigungu_code')}
+                for apt in apts
+            ]
+            if regions is None:
+                regions = []
+                for apt in apts:
+                    region = " ".join(str(apt[key]) for key in ('sido', 'sigungu', 'dong') if apt.get(key))
+                    if region and region not in regions:
+                        regions.append(region)
+            self.history_index.add({
+                'image_path': image_path,
+                'excel_path': excel_path,
+                'apt_name': display,
+                'area': display,
+                'search_date': time.time(),
+                'chart_title': chart_title,
+                'type': history_type,
+                'regions': regions,
+                'apts': apts,
+                'options': options or {},
+                'fingerprint': fingerprint,
+            })
+        except Exception as e:
+            print(f"⚠️ 히스토리 기록 실패: {str(e)}")
+
     def collect_jeonse_data_btn(self):
         """전세거래가 수집 버튼 처리 함수 - 매매가 수집과 동일한 고속 병렬 처리 방식 적용"""
         if not self.selected_apts:
@@ -844,7 +4836,7 @@ class RealEstateAnalyzerApp:
                                   lambda: setattr(cancel_flag, 0, True) or progress_window.destroy())
             
             # 각 아파트별 데이터 수집 함수 정의
-            def collect_apt_data(apt_info, lock):
+            def collect_apt_data(apt_info):
                 if cancel_flag[0]:
                     return None
                         
@@ -854,11 +4846,9 @@ class RealEstateAnalyzerApp:
                 
                 # UI 업데이트
                 def update_ui(progress_val, message):
-                    with lock:
-                        if not cancel_flag[0]:
-                            apt_progress_bars[key]['value'] = progress_val
-                            apt_labels[key].config(text=message)
-                            progress_window.update_idletasks()
+                    if not cancel_flag[0]:
+                        self.ui.set(apt_progress_bars[key], value=progress_val)
+                        self.ui.set(apt_labels[key], text=message)
                 
                 update_ui(0, "수집 시작...")
                 
@@ -1166,19 +5156,17 @@ class RealEstateAnalyzerApp:
             # 전체 진행 상황 업데이트 함수
             def update_main_progress(value, message):
                 if not cancel_flag[0]:
-                    main_progress['value'] = value
-                    main_status.config(text=message)
-                    progress_window.update_idletasks()
+                    self.ui.set(main_progress, value=value)
+                    self.ui.set(main_status, text=message)
             
             # 병렬 처리 실행 - 아파트 병렬 처리 수준 상향
             def run_parallel_collection():
                 results = []
-                lock = threading.Lock()
                 
                 with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(apts_to_collect), 3)) as executor:
                     # 각 아파트별 데이터 수집 함수 제출
                     future_to_apt = {
-                        executor.submit(collect_apt_data, apt_info, lock): apt_info
+                        executor.submit(collect_apt_data, apt_info): apt_info
                         for apt_info in apts_to_collect
                     }
                     
@@ -1228,7 +5216,7 @@ class RealEstateAnalyzerApp:
                 
                 # 진행 창 닫기 (약간의 지연 후)
                 if not cancel_flag[0]:
-                    self.root.after(500, progress_window.destroy)
+                    self.ui.call(self.root.after, 500, progress_window.destroy)
 
                     # 히스토리 업데이트 (메인 스레드에서)
                     def update_ui():
@@ -1241,13 +5229,13 @@ class RealEstateAnalyzerApp:
                         # 그래프 생성 버튼 활성화 (텍스트도 복원)
                         self.graph_button.config(state="normal", text="📊 그래프 생성하기")
 
-                    self.root.after(0, update_ui)
+                    self.ui.call(update_ui)
 
                     # 3초 후 진행바 초기화
-                    self.root.after(3000, lambda: self.update_progress(0, ""))
+                    self.ui.call(self.root.after, 3000, lambda: self.update_progress(0, ""))
                 else:
                     # 취소된 경우에도 그래프 버튼 활성화 (텍스트도 복원)
-                    self.root.after(0, lambda: self.graph_button.config(state="normal", text="📊 그래프 생성하기"))
+                    self.ui.set(self.graph_button, state="normal", text="📊 그래프 생성하기")
 
             # 별도 스레드에서 병렬 처리 실행
             threading.Thread(target=run_parallel_collection, daemon=True).start()
@@ -1322,15 +5310,14 @@ class RealEstateAnalyzerApp:
                         
                     # 진행 상태 업데이트
                     progress = min(100, (month / max_months) * 100)
-                    progress_bar['value'] = progress
+                    self.ui.set(progress_bar, value=progress)
                     
                     # 수집한 데이터 개수에 따라 진행 상태 메시지 업데이트
                     if jeonse_trades:
-                        progress_label.config(text=f"{progress:.1f}% 완료 - {len(jeonse_trades)}건 수집됨 ({month+1}/{max_months}개월)")
+                        self.ui.set(progress_label, text=f"{progress:.1f}% 완료 - {len(jeonse_trades)}건 수집됨 ({month+1}/{max_months}개월)")
                     else:
-                        progress_label.config(text=f"{progress:.1f}% 완료 ({month+1}/{max_months}개월)")
+                        self.ui.set(progress_label, text=f"{progress:.1f}% 완료 ({month+1}/{max_months}개월)")
                     
-                    progress_window.update_idletasks()
                     
                     # 현재 조회할 월 계산
                     search_date = current_date - timedelta(days=30 * month)
@@ -1409,8 +5396,7 @@ class RealEstateAnalyzerApp:
                                 jeonse_trades.extend(monthly_trades)  # 전체 거래 목록에 추가
                                 
                                 # 진행 상태 업데이트
-                                progress_label.config(text=f"{progress:.1f}% 완료 - {len(jeonse_trades)}건 수집됨 ({month+1}/{max_months}개월)")
-                                progress_window.update_idletasks()
+                                self.ui.set(progress_label, text=f"{progress:.1f}% 완료 - {len(jeonse_trades)}건 수집됨 ({month+1}/{max_months}개월)")
                                 
                                 logging.info(f"{deal_ymd}: {len(monthly_trades)}건 데이터 추가됨")
                             else:
@@ -1433,9 +5419,8 @@ class RealEstateAnalyzerApp:
                         continue
                 
                 # 진행 상태 100%로 설정
-                progress_bar['value'] = 100
-                progress_label.config(text=f"100% 완료 - 총 {len(jeonse_trades)}건 수집됨")
-                progress_window.update_idletasks()
+                self.ui.set(progress_bar, value=100)
+                self.ui.set(progress_label, text=f"100% 완료 - 총 {len(jeonse_trades)}건 수집됨")
                 
                 # 결과 로그
                 logging.info(f"전세 데이터 수집 완료: 총 {len(jeonse_trades)}건")
@@ -1443,14 +5428,14 @@ class RealEstateAnalyzerApp:
                 # 잠시 후 창 닫기
                 time.sleep(0.5)
                 if not cancel_flag[0]:
-                    progress_window.destroy()
+                    self.ui.call(progress_window.destroy)
                     
             except Exception as e:
                 logging.error(f"데이터 수집 중 오류 발생: {str(e)}")
                 import traceback
                 logging.error(traceback.format_exc())
-                show_topmost_error("오류", f"데이터 수집 중 오류 발생: {str(e)}", parent=self.root)
-                progress_window.destroy()
+                self.ui.call(show_topmost_error, "오류", f"데이터 수집 중 오류 발생: {str(e)}", parent=self.root)
+                self.ui.call(progress_window.destroy)
         
         # 별도 스레드로 데이터 수집 실행
         thread = threading.Thread(target=collect_data)
@@ -1588,7 +5573,7 @@ class RealEstateAnalyzerApp:
                                   lambda: setattr(cancel_flag, 0, True) or progress_window.destroy())
             
             # 각 아파트별 데이터 수집 함수 정의
-            def collect_apt_data(apt_info, lock):
+            def collect_apt_data(apt_info):
                 if cancel_flag[0]:
                     return None
                         
@@ -1598,11 +5583,9 @@ class RealEstateAnalyzerApp:
                 
                 # UI 업데이트
                 def update_ui(progress_val, message):
-                    with lock:
-                        if not cancel_flag[0]:
-                            apt_progress_bars[key]['value'] = progress_val
-                            apt_labels[key].config(text=message)
-                            progress_window.update_idletasks()
+                    if not cancel_flag[0]:
+                        self.ui.set(apt_progress_bars[key], value=progress_val)
+                        self.ui.set(apt_labels[key], text=message)
                 
                 update_ui(0, "수집 시작...")
                 
@@ -1903,19 +5886,17 @@ class RealEstateAnalyzerApp:
             # 전체 진행 상황 업데이트 함수
             def update_main_progress(value, message):
                 if not cancel_flag[0]:
-                    main_progress['value'] = value
-                    main_status.config(text=message)
-                    progress_window.update_idletasks()
+                    self.ui.set(main_progress, value=value)
+                    self.ui.set(main_status, text=message)
             
             # 병렬 처리 실행 - 아파트 병렬 처리 수준은 3개로 제한 (안정성 위해)
             def run_parallel_collection():
                 results = []
-                lock = threading.Lock()
                 
                 with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(apts_to_collect), 3)) as executor:
                     # 각 아파트별 데이터 수집 함수 제출
                     future_to_apt = {
-                        executor.submit(collect_apt_data, apt_info, lock): apt_info
+                        executor.submit(collect_apt_data, apt_info): apt_info
                         for apt_info in apts_to_collect
                     }
                     
@@ -1968,7 +5949,7 @@ class RealEstateAnalyzerApp:
                 
                 # 진행 창 닫기 (약간의 지연 후)
                 if not cancel_flag[0]:
-                    self.root.after(500, progress_window.destroy)
+                    self.ui.call(self.root.after, 500, progress_window.destroy)
 
                     # 히스토리 업데이트 (메인 스레드에서)
                     def update_ui():
@@ -1981,13 +5962,13 @@ class RealEstateAnalyzerApp:
                         # 그래프 생성 버튼 활성화 (텍스트도 복원)
                         self.graph_button.config(state="normal", text="📊 그래프 생성하기")
 
-                    self.root.after(0, update_ui)
+                    self.ui.call(update_ui)
 
                     # 3초 후 진행바 초기화
-                    self.root.after(3000, lambda: self.update_progress(0, ""))
+                    self.ui.call(self.root.after, 3000, lambda: self.update_progress(0, ""))
                 else:
                     # 취소된 경우에도 그래프 버튼 활성화 (텍스트도 복원)
-                    self.root.after(0, lambda: self.graph_button.config(state="normal", text="📊 그래프 생성하기"))
+                    self.ui.set(self.graph_button, state="normal", text="📊 그래프 생성하기")
 
             # 별도 스레드에서 병렬 처리 실행
             threading.Thread(target=run_parallel_collection, daemon=True).start()
@@ -2010,6 +5991,7 @@ class RealEstateAnalyzerApp:
         
         # 최신 순으로 정렬
         sorted_history = sorted(self.history_list, key=lambda x: x['search_date'], reverse=True)
+        self.history_items_by_iid = {}  # 트리 항목 -> 히스토리 항목 (미리보기용)
         
         # 새로운 항목 추가
         for item in sorted_history:
@@ -2021,11 +6003,72 @@ class RealEstateAnalyzerApp:
                 compare_apt = item['apt_name']  # 다중 비교인 경우 전체 비교 정보 표시
             
             # 더 간소화된 컬럼으로 표시 (차트제목 열 제거)
-            self.history_tree.insert("", "end", values=(
+            iid = self.history_tree.insert("", "end", values=(
                 search_date.strftime("%Y-%m-%d %H:%M"),
                 compare_apt
             ))
+            self.history_items_by_iid[iid] = item
+
+    def show_history_preview(self, event=None):
+        """선택한 히스토리 항목의 썸네일 표시 (이미지 피라미드의 썸네일 사용, 없으면 백그라운드 생성)"""
+        selection = self.history_tree.selection()
+        item = self.history_items_by_iid.get(selection[0]) if selection else None
+        image_path = item.get('image_path') if item else None
+        if not image_path or not os.path.exists(image_path):
+            self.history_preview.config(image='', text="미리보기 없음")
+            return
+
+        thumb_path = os.path.join(pyramid_dir(image_path), 'thumb.jpg')
+        if load_pyramid_manifest(image_path) is None:
+            # 이전에 저장된 이미지 - 썸네일 생성 후 다시 표시
+            self.history_preview.config(image='', text="미리보기 생성 중...")
+            self.chart_renderer.submit(build_image_pyramid, (image_path,),
+                                       lambda *_: self.safe_after(0, self.show_history_preview))
+            return
+        try:
+            with Image.open(thumb_path) as thumb:
+                self.history_preview_photo = ImageTk.PhotoImage(thumb)
+            self.history_preview.config(image=self.history_preview_photo, text="")
+        except Exception as e:
+            print(f"⚠️ 미리보기 로드 실패: {str(e)}")
+            self.history_preview.config(image='', text="미리보기 없음")
     
+    def update_sido_combobox(self):
+        """시/도 목록 갱신 - 주요 도시 우선 정렬"""
+        priority_cities = ['서울특별시', '경기도', '인천광역시', '부산광역시', '대전광역시', '대구광역시', '광주광역시']
+        sorted_sido_list = []
+
+        # 우선 순위 도시 먼저 추가
+        for city in priority_cities:
+            if city in self.sido_list:
+                sorted_sido_list.append(city)
+
+        # 나머지 도시 알파벳 순으로 추가
+        for city in sorted(self.sido_list):
+            if city not in priority_cities:
+                sorted_sido_list.append(city)
+
+        self.sido_combobox['values'] = sorted_sido_list
+        self.sido_combobox.set("시/도 선택")
+        self.sigungu_combobox['values'] = []
+        self.sigungu_combobox.set("시/군/구 선택")
+        self.dong_combobox['values'] = []
+        self.dong_combobox.set("읍/면/동 선택")
+
+    def set_region_loading(self, loading):
+        """법정동 정보 로드 중에는 지역 선택/아파트 조회 비활성화하고 로딩 표시"""
+        state = "disabled" if loading else "normal"
+        for widget in (self.sido_combobox, self.sigungu_combobox, self.dong_combobox,
+                       self.apt_list_button, self.bulk_compare_button):
+            widget.config(state=state)
+        if loading:
+            self.region_loading_label.grid()
+            self.status_label.config(text=self.region_loading_label.cget('text'))
+        else:
+            self.region_loading_label.grid_remove()
+            if self.status_label.cget('text') == self.region_loading_label.cget('text'):
+                self.status_label.config(text="")
+
     def setup_gui(self):
         """GUI 구성 - 매매/전세 수집 버튼 제거 및 자동 데이터 수집 적용"""
         # 메인 프레임 (좌측: 컨텐츠, 우측: 히스토리)
@@ -2066,22 +6109,6 @@ class RealEstateAnalyzerApp:
         # 지역 선택 콤보박스들
         ttk.Label(region_frame, text="시/도:").grid(row=0, column=0, sticky="w", pady=5)
         self.sido_combobox = ttk.Combobox(region_frame, width=20)
-
-        # 주요 도시 우선 정렬
-        priority_cities = ['서울특별시', '경기도', '인천광역시', '부산광역시', '대전광역시', '대구광역시', '광주광역시']
-        sorted_sido_list = []
-
-        # 우선 순위 도시 먼저 추가
-        for city in priority_cities:
-            if city in self.sido_list:
-                sorted_sido_list.append(city)
-
-        # 나머지 도시 알파벳 순으로 추가
-        for city in sorted(self.sido_list):
-            if city not in priority_cities:
-                sorted_sido_list.append(city)
-
-        self.sido_combobox['values'] = sorted_sido_list
         self.sido_combobox.set("시/도 선택")
         self.sido_combobox.grid(row=0, column=1, padx=5, pady=5)
         self.sido_combobox.bind('<<ComboboxSelected>>', self.on_sido_selected)
@@ -2104,6 +6131,16 @@ class RealEstateAnalyzerApp:
                                           style='Accent.TButton')
         self.apt_list_button.grid(row=3, column=0, columnspan=2, pady=15)
 
+        # 단지 일괄 비교 버튼 (지역 내 여러 단지 순위 비교)
+        self.bulk_compare_button = ttk.Button(region_frame, text="🏘 단지 일괄 비교",
+                                              command=self.show_bulk_compare_dialog)
+        self.bulk_compare_button.grid(row=4, column=0, columnspan=2, pady=(0, 10))
+
+        # 법정동 정보 로드 중 표시 (로드 완료 시 숨김)
+        self.region_loading_label = ttk.Label(region_frame, text="⏳ 지역 정보를 불러오는 중...",
+                                              foreground="gray")
+        self.region_loading_label.grid(row=5, column=0, columnspan=2)
+
         # 선택된 아파트 정보 표시 프레임 (개선된 스타일)
         selected_apt_frame = ttk.LabelFrame(main_frame, text="✅ 선택된 아파트 목록", padding=15)
         selected_apt_frame.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(5,10))
@@ -2154,6 +6191,10 @@ class RealEstateAnalyzerApp:
         clear_apt_btn = ttk.Button(apt_btn_frame, text="모두 삭제", command=self.clear_all_apts)
         clear_apt_btn.pack(side="left", padx=5)
 
+        # 면적별 비교 버튼 (선택한 아파트의 모든 전용면적 비교)
+        self.area_compare_button = ttk.Button(apt_btn_frame, text="📐 면적별 비교", command=self.show_area_comparison)
+        self.area_compare_button.pack(side="left", padx=5)
+
         # 캐시 초기화 버튼
         clear_cache_btn = ttk.Button(apt_btn_frame, text="🗑 캐시 초기화", command=self.clear_cache)
         clear_cache_btn.pack(side="right", padx=5)
@@ -2170,6 +6211,8 @@ class RealEstateAnalyzerApp:
         ttk.Checkbutton(purchase_frame, text="📊 월평균", variable=self.show_monthly_avg).pack(side="left", padx=10, pady=5)
         ttk.Checkbutton(purchase_frame, text="📈 월최고", variable=self.show_monthly_max).pack(side="left", padx=10, pady=5)
         ttk.Checkbutton(purchase_frame, text="⚫ 점도표", variable=self.show_scatter_plot).pack(side="left", padx=10, pady=5)
+        ttk.Checkbutton(purchase_frame, text="🌫 가격대(p10~p90)", variable=self.show_price_bands).pack(side="left", padx=10, pady=5)
+        ttk.Checkbutton(purchase_frame, text="🧭 지역지수", variable=self.show_region_index).pack(side="left", padx=10, pady=5)
 
         # 전세가 옵션 프레임
         jeonse_frame = ttk.LabelFrame(graph_options_frame, text="🏠 전세가", padding=10)
@@ -2180,13 +6223,25 @@ class RealEstateAnalyzerApp:
         ttk.Checkbutton(jeonse_frame, text="📈 월최고", variable=self.show_jeonse_monthly_max).pack(side="left", padx=10, pady=5)
         ttk.Checkbutton(jeonse_frame, text="⚫ 점도표", variable=self.show_jeonse_scatter_plot).pack(side="left", padx=10, pady=5)
 
+        # 데이터 정제 옵션 프레임
+        filter_frame = ttk.LabelFrame(graph_options_frame, text="🧹 데이터 정제", padding=10)
+        filter_frame.grid(row=2, column=0, sticky="ew", padx=5, pady=5)
+        ttk.Checkbutton(filter_frame, text="🚫 해제·이상거래 제외", variable=self.exclude_anomalies).pack(side="left", padx=10, pady=5)
+
         # 그래프 생성 버튼 (더 크고 눈에 띄게)
         # 초기 상태: 비활성화 (데이터 수집 완료 후 활성화)
-        self.graph_button = ttk.Button(main_frame, text="📊 그래프 생성하기",
+        graph_btn_frame = ttk.Frame(main_frame)
+        graph_btn_frame.grid(row=5, column=0, columnspan=2, pady=15)
+        self.graph_button = ttk.Button(graph_btn_frame, text="📊 그래프 생성하기",
                                       command=self.create_graph_only,
                                       style='Success.TButton',
                                       state="disabled")
-        self.graph_button.grid(row=5, column=0, columnspan=2, pady=15, ipady=10)
+        self.graph_button.pack(side="left", padx=5, ipady=10)
+
+        # 대화형 차트 (창 안에서 레이어 켜고 끄기, 확대/이동)
+        self.interactive_button = ttk.Button(graph_btn_frame, text="🖱 대화형 보기",
+                                             command=self.show_interactive_chart)
+        self.interactive_button.pack(side="left", padx=5, ipady=10)
         
         # 프로그레스 바와 상태 레이블
         self.progress = ttk.Progressbar(main_frame, orient="horizontal", length=300, mode="determinate")
@@ -2228,11 +6283,17 @@ class RealEstateAnalyzerApp:
         scrollbar = ttk.Scrollbar(history_frame, orient="vertical", command=self.history_tree.yview)
         self.history_tree.configure(yscrollcommand=scrollbar.set)
         
+        # 선택한 항목 미리보기 (썸네일)
+        self.history_items_by_iid = {}
+        self.history_preview = ttk.Label(history_frame, text="", anchor="center", compound="top")
+        self.history_preview.pack(side="bottom", fill="x", pady=(10, 0))
+
         self.history_tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
         # 히스토리 클릭 이벤트 바인딩
         self.history_tree.bind('<Double-1>', self.on_history_select)
+        self.history_tree.bind('<<TreeviewSelect>>', self.show_history_preview)
         
         # 하단 정보 레이블 - 만든이 정보 추가 및 클릭 이벤트 설정
         self.footer_label = ttk.Label(main_frame, text="만든이 부태리", 
@@ -2261,11 +6322,11 @@ class RealEstateAnalyzerApp:
         webbrowser.open_new(blog_url)
     
     
-    def create_graph_only(self):
-        """거래 데이터를 사용하여 그래프만 생성 (데이터 수집 제외)"""
+    def get_apts_with_data(self):
+        """거래 데이터가 수집된 선택 아파트 목록 (없으면 오류 표시 후 None)"""
         if not self.selected_apts:
             show_topmost_error("오류", "선택된 아파트가 없습니다.", parent=self.root)
-            return
+            return None
         
         # 데이터가 수집되었는지 확인 (매매거래 또는 전세거래 데이터 중 하나만 있으면 됨)
         apts_with_data = [apt for apt in self.selected_apts 
@@ -2274,6 +6335,72 @@ class RealEstateAnalyzerApp:
         
         if not apts_with_data:
             show_topmost_error("오류", "수집된 거래 데이터가 없습니다. 먼저 '매매거래가 수집' 또는 '전세거래가 수집' 버튼을 클릭하세요.", parent=self.root)
+            return None
+        return apts_with_data
+
+    def build_chart_frames(self, apts_with_data):
+        """차트용 데이터프레임 준비 - 반환: (매매, 매매 월별, 전세, 전세 월별) 데이터프레임 목록"""
+        apt_dfs = []        # 매매 데이터프레임
+        monthly_dfs = []    # 매매 월별 데이터프레임
+        jeonse_dfs = []     # 전세 데이터프레임
+        monthly_jeonse_dfs = [] # 전세 월별 데이터프레임
+        purchase_frames = []  # 월별 집계용 (apt_info, df)
+        jeonse_frames = []
+        exclude_anomalies = self.exclude_anomalies.get()
+    
+        for i, apt_info in enumerate(apts_with_data):
+            # 매매 거래 데이터 처리
+            if 'trades_data' in apt_info and apt_info['trades_data']:
+                trades = apt_info['trades_data']
+                # 데이터 정렬
+                trades = sorted(trades, key=lambda x: x['date'])
+            
+                # 데이터프레임 생성
+                df = pd.DataFrame(trades)
+                if exclude_anomalies:
+                    df = df[~anomaly_mask(df)].reset_index(drop=True)  # 해제/이상거래 제외
+                df['apt_name'] = apt_info['apt_name']
+                df['area'] = apt_info['area']
+                df['data_type'] = 'purchase'  # 매매 데이터 타입 표시
+            
+                apt_dfs.append(df)
+                purchase_frames.append((apt_info, df))
+        
+            # 전세 거래 데이터 처리
+            if 'jeonse_data' in apt_info and apt_info['jeonse_data']:
+                jeonse_trades = apt_info['jeonse_data']
+                # 데이터 정렬
+                jeonse_trades = sorted(jeonse_trades, key=lambda x: x['date'])
+            
+                # 데이터프레임 생성
+                jeonse_df = pd.DataFrame(jeonse_trades)
+                if exclude_anomalies:
+                    jeonse_df = jeonse_df[~anomaly_mask(jeonse_df)].reset_index(drop=True)  # 이상거래 제외
+                jeonse_df['apt_name'] = apt_info['apt_name']
+                jeonse_df['area'] = apt_info['area']
+                jeonse_df['data_type'] = 'jeonse'  # 전세 데이터 타입 표시
+            
+                jeonse_dfs.append(jeonse_df)
+                jeonse_frames.append((apt_info, jeonse_df))
+
+        # 월별 평균가격 (전체 아파트 월별 집계를 한 번에 갱신 - 변경된 월만 재집계)
+        for frames, data_type, monthly_list in [(purchase_frames, 'purchase', monthly_dfs),
+                                                (jeonse_frames, 'jeonse', monthly_jeonse_dfs)]:
+            self.get_monthly_rollups(frames, data_type, exclude_anomalies)
+            for apt_info, _ in frames:
+                monthly = self.monthly_rollups.monthly_mean_frame(
+                    MonthlyRollupStore.make_key(apt_info, data_type, exclude_anomalies))
+                monthly['apt_name'] = apt_info['apt_name']
+                monthly['area'] = apt_info['area']
+                monthly['data_type'] = data_type  # 데이터 타입 표시
+                monthly_list.append(monthly)
+        
+        return apt_dfs, monthly_dfs, jeonse_dfs, monthly_jeonse_dfs
+
+    def create_graph_only(self):
+        """거래 데이터를 사용하여 그래프만 생성 (데이터 수집 제외)"""
+        apts_with_data = self.get_apts_with_data()
+        if not apts_with_data:
             return
         
         try:
@@ -2283,74 +6410,38 @@ class RealEstateAnalyzerApp:
             self.update_progress(10, "그래프 생성 준비 중...")
             
             # 데이터프레임 및 월별 데이터 준비
-            apt_dfs = []        # 매매 데이터프레임
-            monthly_dfs = []    # 매매 월별 데이터프레임
-            jeonse_dfs = []     # 전세 데이터프레임
-            monthly_jeonse_dfs = [] # 전세 월별 데이터프레임
-            
-            for i, apt_info in enumerate(apts_with_data):
-                # 매매 거래 데이터 처리
-                if 'trades_data' in apt_info and apt_info['trades_data']:
-                    trades = apt_info['trades_data']
-                    # 데이터 정렬
-                    trades = sorted(trades, key=lambda x: x['date'])
-                    
-                    # 데이터프레임 생성
-                    df = pd.DataFrame(trades)
-                    df['apt_name'] = apt_info['apt_name']
-                    df['area'] = apt_info['area']
-                    df['data_type'] = 'purchase'  # 매매 데이터 타입 표시
-                    
-                    apt_dfs.append(df)
-                    
-                    # 월별 평균가격 계산
-                    df_monthly = df.groupby(pd.Grouper(key='date', freq='ME')).agg({'price': 'mean'}).reset_index()
-                    df_monthly['apt_name'] = apt_info['apt_name']
-                    df_monthly['area'] = apt_info['area']
-                    df_monthly['data_type'] = 'purchase'  # 매매 데이터 타입 표시
-                    monthly_dfs.append(df_monthly)
-                
-                # 전세 거래 데이터 처리
-                if 'jeonse_data' in apt_info and apt_info['jeonse_data']:
-                    jeonse_trades = apt_info['jeonse_data']
-                    # 데이터 정렬
-                    jeonse_trades = sorted(jeonse_trades, key=lambda x: x['date'])
-                    
-                    # 데이터프레임 생성
-                    jeonse_df = pd.DataFrame(jeonse_trades)
-                    jeonse_df['apt_name'] = apt_info['apt_name']
-                    jeonse_df['area'] = apt_info['area']
-                    jeonse_df['data_type'] = 'jeonse'  # 전세 데이터 타입 표시
-                    
-                    jeonse_dfs.append(jeonse_df)
-                    
-                    # 월별 평균가격 계산
-                    jeonse_monthly = jeonse_df.groupby(pd.Grouper(key='date', freq='ME')).agg({'price': 'mean'}).reset_index()
-                    jeonse_monthly['apt_name'] = apt_info['apt_name']
-                    jeonse_monthly['area'] = apt_info['area']
-                    jeonse_monthly['data_type'] = 'jeonse'  # 전세 데이터 타입 표시
-                    monthly_jeonse_dfs.append(jeonse_monthly)
+            apt_dfs, monthly_dfs, jeonse_dfs, monthly_jeonse_dfs = self.build_chart_frames(apts_with_data)
             
             self.update_progress(30, "그래프 생성 중...")
             
-            # 그래프 생성
+            def on_chart_done(image_path, error):
+                # 렌더링 워커 완료 후 UI 스레드에서 호출
+                try:
+                    if error is not None:
+                        show_topmost_error("오류", f"그래프 생성 중 오류 발생: {str(error)}", parent=self.root)
+                        self.update_progress(0, "")
+                        return
+                    self.update_progress(90, "그래프 생성 완료!")
+
+                    # 그래프 이미지 표시
+                    if os.path.exists(image_path):
+                        os.startfile(image_path)
+
+                    # 3초 후 메시지 초기화
+                    self.root.after(3000, lambda: self.update_progress(0, ""))
+                finally:
+                    # 그래프 생성 버튼 다시 활성화 (완료 또는 오류 시)
+                    self.graph_button.config(state="normal")
+
+            # 그래프 생성 (렌더링 워커에서 진행 - UI는 계속 응답)
             try:
-                self.create_multi_chart(apt_dfs, monthly_dfs, jeonse_dfs, monthly_jeonse_dfs)
-                self.update_progress(90, "그래프 생성 완료!")
-                
-                # 그래프 이미지 표시
-                if os.path.exists(self.image_path):
-                    os.startfile(self.image_path)
-                    
-                # 3초 후 메시지 초기화
-                self.root.after(3000, lambda: self.update_progress(0, ""))
+                self.create_multi_chart(apt_dfs, monthly_dfs, jeonse_dfs, monthly_jeonse_dfs, on_done=on_chart_done)
+                self.update_progress(50, "그래프 렌더링 중...")
             except Exception as e:
                 show_topmost_error("오류", f"그래프 생성 중 오류 발생: {str(e)}", parent=self.root)
                 self.update_progress(0, "")
                 import traceback
                 traceback.print_exc()
-            finally:
-                # 그래프 생성 버튼 다시 활성화 (완료 또는 오류 시)
                 self.graph_button.config(state="normal")
             
         except Exception as e:
@@ -2359,6 +6450,45 @@ class RealEstateAnalyzerApp:
             # 오류 발생 시에도 그래프 버튼 활성화
             self.graph_button.config(state="normal")
         
+    def show_interactive_chart(self):
+        """대화형 차트 창 열기 - 모든 레이어를 한 번 그려 두고 표시 여부만 바꿔 다시 그리기"""
+        apts_with_data = self.get_apts_with_data()
+        if not apts_with_data:
+            return
+
+        try:
+            self.update_progress(10, "대화형 차트 준비 중...")
+            frames = self.build_chart_frames(apts_with_data)
+            request = self.prepare_chart_request(*frames)
+            filename = multi_chart_filename(frames[0], request['options'])
+            # 레이어 토글용 옵션은 모두 켜서 그리고 창에서 표시 여부 조정
+            request['options'].update({name: True for name in CHART_LAYER_OPTIONS})
+        except Exception as e:
+            show_topmost_error("오류", f"그래프 준비 중 오류 발생: {str(e)}", parent=self.root)
+            self.update_progress(0, "")
+            return
+
+        self.interactive_button.config(state="disabled")
+        self.update_progress(30, "대화형 차트 생성 중...")
+
+        def build_chart():
+            # Figure 생성은 백그라운드 스레드, 창 임베드는 UI 스레드
+            try:
+                started = time.perf_counter()
+                fig, ax = draw_multi_chart(request)
+                print(f"⏱ 대화형 차트 그리기: {time.perf_counter() - started:.2f}초")
+                self.safe_after(0, lambda: InteractiveChartWindow(self, fig, ax, filename, request['apts']))
+                self.safe_after(0, lambda: self.update_progress(0, ""))
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                self.safe_after(0, lambda err=str(e): show_topmost_error("오류", f"그래프 생성 중 오류 발생: {err}", parent=self.root))
+                self.safe_after(0, lambda: self.update_progress(0, ""))
+            finally:
+                self.safe_after(0, lambda: self.interactive_button.config(state="normal"))
+
+        threading.Thread(target=build_chart, daemon=True).start()
+
     def delete_selected_apt(self):
         """선택된 아파트 목록에서 선택한 항목 삭제"""
         selection = self.selected_apt_listbox.curselection()
@@ -2507,7 +6637,7 @@ class RealEstateAnalyzerApp:
             file_count = 0
             for root, dirs, files in os.walk(self.trade_cache_path):
                 for file in files:
-                    if file.endswith('.json'):
+                    if file.endswith(('.json', '.json.gz', '.jpg')):
                         file_path = os.path.join(root, file)
                         total_size += os.path.getsize(file_path)
                         file_count += 1
@@ -2529,6 +6659,7 @@ class RealEstateAnalyzerApp:
             if response:
                 shutil.rmtree(self.trade_cache_path)
                 os.makedirs(self.trade_cache_path, exist_ok=True)
+                self.region_store.clear_memory()
                 show_topmost_info("캐시 삭제", f"{file_count}개의 캐시 파일이 삭제되었습니다.", parent=self.root)
                 print(f"🗑 거래 데이터 캐시 삭제 완료 ({file_count}개 파일, {size_mb:.2f} MB)")
         except Exception as e:
@@ -2536,14 +6667,65 @@ class RealEstateAnalyzerApp:
 
 
 
-    def collect_apt_data_background(self, apt_info, data_type):
-        """단일 아파트의 거래 데이터를 백그라운드에서 수집 - 모든 월별 데이터 수집 (캐시 지원)"""
+    def collect_complex_rows(self, apt_info, data_type, months):
+        """단지 전체(모든 면적) 거래 행 조회 - 지역-월 저장소에서 배치 단위로 읽어 단지명/동으로만 필터"""
+        apt_name = apt_info['apt_name']
+        dong = apt_info['dong']
+        sigungu_code = apt_info['sigungu_code']
+
+        batch_size = 24  # 한 번에 24개월 처리 (2년)
+        batches = [months[i:i+batch_size] for i in range(0, len(months), batch_size)]
+
+        # 연속 빈 배치 카운터 (4년(48개월) 동안 데이터가 없으면 중단)
+        consecutive_empty_batches = 0
+        max_consecutive_empty = 2
+
+        frames = []
+        for completed_batches, batch in enumerate(batches, start=1):
+            if consecutive_empty_batches >= max_consecutive_empty:
+                print(f"연속 {consecutive_empty_batches * batch_size}개월 동안 데이터가 없어 조기 종료")
+                break
+
+            # 배치 내 월은 지역-월 저장소에서 조회 (저장된 월은 API 호출 없음)
+            region_df = self.region_store.get_months(data_type, sigungu_code, batch)
+            mask = (region_df['apt_name'] == apt_name) & (region_df['dong'] == dong)
+            if data_type != "purchase":
+                mask &= region_df['monthly_rent'] == 0  # 월세 제외 (전세만)
+            rows = region_df[mask]
+
+            if rows.empty:
+                consecutive_empty_batches += 1
+            else:
+                frames.append(rows)
+                consecutive_empty_batches = 0
+
+            progress = (completed_batches / len(batches)) * 100
+            print(f"진행: {progress:.1f}% 완료 - {batch[-1][:4]}-{batch[0][:4]} 기간 {len(rows)}건 수집됨")
+
+        if not frames:
+            return region_month_frame({c: [] for c in REGION_MONTH_COLUMNS})
+        return pd.concat(frames, ignore_index=True)
+
+    def collect_complex_all_areas(self, apt_info, data_type):
+        """단지의 모든 전용면적 거래를 한 번에 수집 - [(면적 구간 키, 면적 라벨, 거래 목록)] (면적 오름차순)"""
+        build_year = 1990
+        try:
+            build_year = int(apt_info.get('build_year') or build_year)
+        except ValueError:
+            pass
+
+        months = month_range(datetime(build_year, 1, 1), datetime.now())
+        rows = self.collect_complex_rows(apt_info, data_type, months)
+        return [(bucket, label, trades_from_rows(group, data_type)) for bucket, label, group in area_buckets(rows)]
+
+    def collect_apt_data_background(self, apt_info, data_type, exclude_anomalies=False):
+        """단일 아파트의 거래 데이터를 백그라운드에서 수집 - 모든 월별 데이터 수집 (캐시 지원)
+        exclude_anomalies: 차트와 같은 해제/이상거래 제외 상태로 월별 집계를 미리 갱신"""
         try:
             apt_name = apt_info['apt_name']
             dong = apt_info['dong']
             sido = apt_info.get('sido', '')
             sigungu = apt_info.get('sigungu', '')
-            sigungu_code = apt_info['sigungu_code']
             target_area = float(apt_info['area'])
 
             # 캐시에서 먼저 로드 시도
@@ -2569,29 +6751,10 @@ class RealEstateAnalyzerApp:
                 old_trades = []
                 recent_months_only = False
 
-            # 데이터 유형에 따라 API 엔드포인트 설정
-            if data_type == "purchase":
-                api_endpoint = "http://apis.data.go.kr/1613000/RTMSDataSvcAptTrade/getRTMSDataSvcAptTrade"
-            else:  # jeonse
-                api_endpoint = "http://apis.data.go.kr/1613000/RTMSDataSvcAptRent/getRTMSDataSvcAptRent"
-
             # 데이터 수집 관련 설정
             trades = []
             current_date = datetime.now()
             
-            # 병렬 처리 설정
-            concurrent_requests = 36  # 동시 요청 수 증가 (성능 향상)
-            
-            # HTTP 세션 최적화
-            session = requests.Session()
-            adapter = requests.adapters.HTTPAdapter(
-                pool_connections=concurrent_requests,
-                pool_maxsize=concurrent_requests * 2,
-                max_retries=1
-            )
-            session.mount('http://', adapter)
-            session.mount('https://', adapter)
-            
             # 모든 월별 데이터 수집을 위한 연도 범위 설정
             # 준공년도 확인하여 그 이후부터 데이터 수집
             build_year = 1990  # 기본값
@@ -2625,147 +6788,9 @@ class RealEstateAnalyzerApp:
                         except ValueError:
                             continue
             
-            # 필터링 함수 - 데이터 처리 최적화
-            def process_item(item, apt_name, dong, target_area):
-                # 빠른 필터링
-                item_apt = item.findtext('aptNm', '').strip()
-                if item_apt != apt_name:
-                    return None
-                
-                item_dong = item.findtext('umdNm', '').strip()
-                if item_dong != dong:
-                    return None
-                
-                item_area = float(item.findtext('excluUseAr', '0'))
-                if abs(item_area - target_area) > 1:
-                    return None
-                
-                # 데이터 유형에 따라 처리
-                if data_type == "purchase":
-                    # 매매 데이터
-                    try:
-                        deal_amount = item.findtext('dealAmount', '0').replace(',', '')
-                        trade = {
-                            'date': datetime(
-                                int(item.findtext('dealYear', '0')),
-                                int(item.findtext('dealMonth', '0')),
-                                int(item.findtext('dealDay', '1') or '1')
-                            ),
-                            'price': int(deal_amount),
-                            'floor': int(item.findtext('floor', '0')),
-                            'area': item_area
-                        }
-                        return trade
-                    except (ValueError, TypeError):
-                        return None
-                else:
-                    # 전세 데이터
-                    try:
-                        monthly_rent = item.findtext('monthlyRent', '0').replace(',', '')
-                        is_monthly = monthly_rent and int(monthly_rent) > 0
-                        
-                        if not is_monthly:
-                            deposit = item.findtext('deposit', '0').replace(',', '')
-                            trade = {
-                                'date': datetime(
-                                    int(item.findtext('dealYear', '0')),
-                                    int(item.findtext('dealMonth', '0')),
-                                    int(item.findtext('dealDay', '1') or '1')
-                                ),
-                                'price': int(deposit),
-                                'floor': int(item.findtext('floor', '0')),
-                                'area': item_area,
-                                'rent_type': '전세'
-                            }
-                            return trade
-                        return None
-                    except (ValueError, TypeError):
-                        return None
-            
-            # 모든 월별 데이터를 배치 단위로 수집
-            def collect_all_monthly_data():
-                all_data = []
-                batch_size = 24  # 한 번에 24개월 처리 (2년)
-                batches = [all_months[i:i+batch_size] for i in range(0, len(all_months), batch_size)]
-                
-                # 연속 빈 배치 카운터 (연속으로 6개 배치가 비어있으면 중단)
-                consecutive_empty_batches = 0
-                max_consecutive_empty = 2  # 4년(48개월) 동안 데이터가 없으면 중단
-                
-                # 진행률 모니터링
-                total_batches = len(batches)
-                completed_batches = 0
-                
-                # 배치 단위로 처리
-                for batch in batches:
-                    completed_batches += 1
-                    
-                    # 연속으로 빈 배치가 max_consecutive_empty개 이상이면 중단
-                    if consecutive_empty_batches >= max_consecutive_empty:
-                        print(f"연속 {consecutive_empty_batches * batch_size}개월 동안 데이터가 없어 조기 종료")
-                        break
-                    
-                    batch_data = []
-                    
-                    # 각 배치를 병렬 처리
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_requests) as executor:
-                        future_results = {}
-                        
-                        # 배치내 모든 월 요청 준비
-                        for search_date, deal_ymd in batch:
-                            url = (f"{api_endpoint}"
-                                   f"?serviceKey={self.service_key}"
-                                   f"&LAWD_CD={sigungu_code}"
-                                   f"&DEAL_YMD={deal_ymd}"
-                                   f"&numOfRows=5000")
-                            
-                            future = executor.submit(session.get, url, timeout=API_TIMEOUT)
-                            future_results[future] = (search_date, deal_ymd)
-                        
-                        # 결과 수집
-                        for future in concurrent.futures.as_completed(future_results.keys()):
-                            search_date, deal_ymd = future_results[future]
-                            
-                            try:
-                                response = future.result()
-                                
-                                if response.status_code == 200:
-                                    try:
-                                        root = ET.fromstring(response.text)
-                                        items = root.findall('.//item')
-                                        
-                                        # 병렬 처리로 아이템 필터링
-                                        monthly_trades = []
-                                        for item in items:
-                                            trade = process_item(item, apt_name, dong, target_area)
-                                            if trade:
-                                                monthly_trades.append(trade)
-                                        
-                                        if monthly_trades:
-                                            batch_data.extend(monthly_trades)
-                                    except ET.ParseError:
-                                        pass
-                                
-                            except (requests.RequestException, requests.Timeout):
-                                continue
-                    
-                    # 이번 배치에서 데이터가 있는지 확인
-                    if batch_data:
-                        all_data.extend(batch_data)
-                        consecutive_empty_batches = 0  # 데이터가 있으면 카운터 리셋
-                    else:
-                        consecutive_empty_batches += 1  # 데이터가 없으면 카운터 증가
-                    
-                    # 진행 상태 로그
-                    progress = (completed_batches / total_batches) * 100
-                    year_range = f"{batch[-1][0].year}-{batch[0][0].year}"
-                    print(f"진행: {progress:.1f}% 완료 - {year_range} 기간 {len(batch_data)}건 수집됨")
-                
-                return all_data
-            
-            # 모든 월별 데이터 수집 실행
-            all_trades = collect_all_monthly_data()
-            trades.extend(all_trades)
+            # 단지 전체 거래를 조회한 뒤 대상 면적만 추출
+            complex_rows = self.collect_complex_rows(apt_info, data_type, [deal_ymd for _, deal_ymd in all_months])
+            trades.extend(trades_from_rows(complex_rows[(complex_rows['area'] - target_area).abs() <= 1], data_type))
 
             # 캐시된 구 데이터와 병합
             if old_trades:
@@ -2795,6 +6820,10 @@ class RealEstateAnalyzerApp:
                 # 데이터프레임 생성
                 df = pd.DataFrame(trades)
 
+                # 월별 집계 갱신 (최근 3개월 재조회 시 해당 월만 재집계) - 차트와 같은 필터 적용
+                rollup_df = df[~anomaly_mask(df)].reset_index(drop=True) if exclude_anomalies else df
+                self.get_monthly_rollup(apt_info, rollup_df, data_type, exclude_anomalies)
+
                 # 결과 반환
                 return {'apt_info': apt_info, 'trades': trades, 'df': df}
             else:
@@ -2833,6 +6862,11 @@ class RealEstateAnalyzerApp:
 
         print(f"[디버그] ✅ 모든 필수 필드 확인 완료")
         print(f"[디버그] sigungu_code: {apt_info['sigungu_code']}")
+
+        # 필지 키 연결 (단지정보 키 조인용, 이전 18자리 키는 다시 계산)
+        if len(apt_info.get('parcel_key') or '') != PARCEL_KEY_LENGTH:
+            apt_info['parcel_key'] = self.resolve_parcel_key(apt_info)
+        print(f"[디버그] parcel_key: {apt_info['parcel_key']}")
                 
         # 목록에 추가
         self.selected_apts.append(apt_info)
@@ -2848,94 +6882,97 @@ class RealEstateAnalyzerApp:
 
         # tkinter 변수들을 미리 읽어두기 (스레드에서 직접 접근 방지)
         should_collect_jeonse = self.collect_jeonse_data.get()
+        exclude_anomalies = self.exclude_anomalies.get()
+
+        def store_result(data_type, trades, excel_path):
+            """수집 결과를 선택 아파트 정보에 반영 (UI 스레드 - 목록을 읽는 UI 작업과 겹치지 않도록)"""
+            data_field, excel_field = ('trades_data', 'excel_path') if data_type == "purchase" else ('jeonse_data', 'jeonse_excel_path')
+            for selected_apt in self.selected_apts:
+                if selected_apt['apt_name'] == apt_info['apt_name'] and str(selected_apt['area']) == str(apt_info['area']):
+                    selected_apt[data_field] = trades
+                    if excel_path:
+                        selected_apt[excel_field] = excel_path
+                    break
+
+        def save_result_excel(result, data_type):
+            """수집 결과 엑셀 저장 요청 (저장 대기열) - 반환: 엑셀 경로 (없거나 실패하면 None)"""
+            if 'df' not in result or result['df'] is None or result['df'].empty:
+                return None
+            try:
+                return self.save_apt_data_to_excel(result['df'], apt_info, data_type)
+            except Exception as e:
+                print(f"{'매매' if data_type == 'purchase' else '전세'} 데이터 엑셀 저장 중 오류: {str(e)}")
+                return None
+
+        def finish_collection(purchase_count, jeonse_count):
+            """수집 완료 후 UI 업데이트 (UI 스레드)"""
+            update_message = f"✅ {apt_info['apt_name']} ({apt_info['area']}㎡) 수집 완료 - 매매: {purchase_count}건 / 전세: {jeonse_count}건"
+            self.status_label.config(text=update_message)
+
+            # 데이터 수집 완료 확인 - 매매 또는 전세 데이터가 있으면 그래프 버튼 활성화
+            has_data = any(('trades_data' in apt and apt.get('trades_data')) or
+                          ('jeonse_data' in apt and apt.get('jeonse_data'))
+                          for apt in self.selected_apts)
+
+            # 완료 메시지와 함께 그래프 버튼 활성화 안내
+            if has_data:
+                final_message = f"🎉 데이터 수집 완료! 이제 '📊 그래프 생성하기' 버튼을 눌러주세요."
+                self.safe_after(100, lambda: self.status_label.config(text=final_message))
+                self.safe_after(100, lambda: self.graph_button.config(state="normal", text="📊 그래프 생성하기"))
+                # 3초 후 프로그레스바 초기화
+                self.safe_after(3000, lambda: self.update_progress(0, final_message))
+            else:
+                # 데이터가 없는 경우에도 그래프 버튼 활성화 (사용자가 다시 시도할 수 있도록)
+                warning_message = "⚠️ 수집된 데이터가 없습니다. 다른 아파트를 선택해주세요."
+                self.safe_after(100, lambda: self.status_label.config(text=warning_message))
+                self.safe_after(100, lambda: self.graph_button.config(state="normal", text="📊 그래프 생성하기"))
+                self.safe_after(100, lambda: self.update_progress(0, ""))
 
-        # 백그라운드에서 매매 및 전세 데이터 수집 시작
+        # 백그라운드에서 매매 및 전세 데이터 수집 시작 (진행 표시는 UI 업데이트 대기열, 결과 반영은 UI 스레드)
         def background_collection():
             # 필요한 정보 준비
             apt_info_copy = apt_info.copy()
 
             # 1단계: 매매 데이터 수집 (0-50%)
-            self.root.after(0, lambda: self.update_progress(10, "📊 매매 데이터 수집 중..."))
-            purchase_result = self.collect_apt_data_background(apt_info_copy, "purchase")
+            self.update_progress(10, "📊 매매 데이터 수집 중...")
+            purchase_result = self.collect_apt_data_background(apt_info_copy, "purchase", exclude_anomalies)
 
             purchase_count = 0
             if purchase_result and 'trades' in purchase_result and purchase_result['trades']:
                 purchase_count = len(purchase_result['trades'])
-                # 매매 데이터 저장
-                for i, selected_apt in enumerate(self.selected_apts):
-                    if selected_apt['apt_name'] == apt_info['apt_name'] and str(selected_apt['area']) == str(apt_info['area']):
-                        self.selected_apts[i]['trades_data'] = purchase_result['trades']
-
-                        # 엑셀 파일 저장
-                        if 'df' in purchase_result and purchase_result['df'] is not None and not purchase_result['df'].empty:
-                            try:
-                                excel_path = self.save_apt_data_to_excel(purchase_result['df'], apt_info, "purchase")
-                                self.selected_apts[i]['excel_path'] = excel_path
-                            except Exception as e:
-                                print(f"매매 데이터 엑셀 저장 중 오류: {str(e)}")
-                        break
+                purchase_excel_path = save_result_excel(purchase_result, "purchase")
+                self.safe_after(0, lambda: store_result("purchase", purchase_result['trades'], purchase_excel_path))
 
-            self.root.after(0, lambda: self.update_progress(50, f"✅ 매매 {purchase_count}건 수집 완료"))
+            self.update_progress(50, f"✅ 매매 {purchase_count}건 수집 완료")
 
             # 2단계: 전세 데이터 수집 (50-100%) - 선택적
             jeonse_count = 0
             if should_collect_jeonse:
-                self.root.after(0, lambda: self.update_progress(60, "🏠 전세 데이터 수집 중..."))
+                self.update_progress(60, "🏠 전세 데이터 수집 중...")
                 try:
-                    jeonse_result = self.collect_apt_data_background(apt_info_copy, "jeonse")
+                    jeonse_result = self.collect_apt_data_background(apt_info_copy, "jeonse", exclude_anomalies)
 
                     if jeonse_result and 'trades' in jeonse_result and jeonse_result['trades']:
                         jeonse_count = len(jeonse_result['trades'])
-                        # 전세 데이터 저장
-                        for i, selected_apt in enumerate(self.selected_apts):
-                            if selected_apt['apt_name'] == apt_info['apt_name'] and str(selected_apt['area']) == str(apt_info['area']):
-                                self.selected_apts[i]['jeonse_data'] = jeonse_result['trades']
-
-                                # 엑셀 파일 저장
-                                if 'df' in jeonse_result and jeonse_result['df'] is not None and not jeonse_result['df'].empty:
-                                    try:
-                                        excel_path = self.save_apt_data_to_excel(jeonse_result['df'], apt_info, "jeonse")
-                                        self.selected_apts[i]['jeonse_excel_path'] = excel_path
-                                    except Exception as e:
-                                        print(f"전세 데이터 엑셀 저장 중 오류: {str(e)}")
-                                break
+                        jeonse_excel_path = save_result_excel(jeonse_result, "jeonse")
+                        self.safe_after(0, lambda: store_result("jeonse", jeonse_result['trades'], jeonse_excel_path))
                     elif jeonse_result and 'error' in jeonse_result:
                         # 전세 데이터 조회 실패 시 에러 메시지 출력하고 계속 진행
                         error_msg = jeonse_result['error']
                         print(f"⚠ 전세 데이터 조회 실패: {error_msg}")
-                        self.root.after(0, lambda: self.update_progress(50, f"⚠ 전세 데이터 조회 실패 (매매 데이터만 사용)"))
+                        self.update_progress(50, f"⚠ 전세 데이터 조회 실패 (매매 데이터만 사용)")
                 except Exception as e:
                     # 예외 발생 시에도 계속 진행
                     print(f"⚠ 전세 데이터 수집 중 예외 발생: {str(e)}")
-                    self.root.after(0, lambda: self.update_progress(50, f"⚠ 전세 데이터 수집 실패 (매매 데이터만 사용)"))
+                    self.update_progress(50, f"⚠ 전세 데이터 수집 실패 (매매 데이터만 사용)")
             else:
                 print("전세 데이터 수집 건너뜀 (옵션 비활성화)")
-                self.root.after(0, lambda: self.update_progress(50, "전세 데이터 수집 건너뜀"))
-
-            self.safe_after(0, lambda: self.update_progress(100, f"✅ 전세 {jeonse_count}건 수집 완료"))
+                self.update_progress(50, "전세 데이터 수집 건너뜀")
 
-            # 수집 완료 후 UI 업데이트
-            update_message = f"✅ {apt_info['apt_name']} ({apt_info['area']}㎡) 수집 완료 - 매매: {purchase_count}건 / 전세: {jeonse_count}건"
-            self.safe_after(100, lambda: self.status_label.config(text=update_message))
-
-            # 데이터 수집 완료 확인 - 매매 또는 전세 데이터가 있으면 그래프 버튼 활성화
-            has_data = any(('trades_data' in apt and apt.get('trades_data')) or
-                          ('jeonse_data' in apt and apt.get('jeonse_data'))
-                          for apt in self.selected_apts)
+            self.update_progress(100, f"✅ 전세 {jeonse_count}건 수집 완료")
 
-            # 완료 메시지와 함께 그래프 버튼 활성화 안내
-            if has_data:
-                final_message = f"🎉 데이터 수집 완료! 이제 '📊 그래프 생성하기' 버튼을 눌러주세요."
-                self.safe_after(200, lambda: self.status_label.config(text=final_message))
-                self.safe_after(200, lambda: self.graph_button.config(state="normal", text="📊 그래프 생성하기"))
-                # 3초 후 프로그레스바 초기화
-                self.safe_after(3000, lambda: self.update_progress(0, final_message))
-            else:
-                # 데이터가 없는 경우에도 그래프 버튼 활성화 (사용자가 다시 시도할 수 있도록)
-                warning_message = "⚠️ 수집된 데이터가 없습니다. 다른 아파트를 선택해주세요."
-                self.safe_after(200, lambda: self.status_label.config(text=warning_message))
-                self.safe_after(200, lambda: self.graph_button.config(state="normal", text="📊 그래프 생성하기"))
-                self.safe_after(200, lambda: self.update_progress(0, ""))
+            # 수집 결과 반영(store_result) 후 완료 처리 - 같은 UI 대기열에 예약 순서대로 실행
+            self.safe_after(100, lambda: finish_collection(purchase_count, jeonse_count))
         
         # 백그라운드 스레드 시작
         bg_thread = threading.Thread(target=background_collection, daemon=True)
@@ -2943,12 +6980,48 @@ class RealEstateAnalyzerApp:
         
         return True
     
+    def get_monthly_rollup(self, apt_info, df, data_type, exclude_anomalies=False):
+        """아파트 월별 집계 조회 - 거래 데이터와 비교해 바뀐 월만 재집계 (exclude_anomalies: df가 필터링된 거래인지)"""
+        key = MonthlyRollupStore.make_key(apt_info, data_type, exclude_anomalies)
+        return self.monthly_rollups.update(key, df)
+
+    def get_monthly_rollups(self, apt_frames, data_type, exclude_anomalies=False):
+        """여러 아파트 월별 집계를 한 번의 그룹 연산으로 갱신 - [(apt_info, df)] -> {집계 키: 집계}"""
+        frames = {MonthlyRollupStore.make_key(apt_info, data_type, exclude_anomalies): df for apt_info, df in apt_frames}
+        return self.monthly_rollups.update_many(frames)
+
+    def find_selected_apt(self, df):
+        """거래 DataFrame의 아파트명/면적으로 선택된 아파트 정보 찾기"""
+        if df.empty:
+            return None
+        for apt in self.selected_apts:
+            if apt['apt_name'] == df['apt_name'].iloc[0] and str(apt['area']) == str(df['area'].iloc[0]):
+                return apt
+        return None
+
+    def get_monthly_mean_frame(self, apt_info, df, data_type, exclude_anomalies=False):
+        """월평균 DataFrame(date, price) - 월별 집계 기반"""
+        self.get_monthly_rollup(apt_info, df, data_type, exclude_anomalies)
+        return self.monthly_rollups.monthly_mean_frame(MonthlyRollupStore.make_key(apt_info, data_type, exclude_anomalies))
+
+    def resolve_parcel_key(self, apt_info):
+        """아파트 정보의 필지 키 조회 (목록 조회 시 수집한 키 우선, 없으면 법정동코드 + 번지로 계산)"""
+        key = self.apt_parcel_keys.get((apt_info.get('sigungu_code'), apt_info.get('dong'), apt_info.get('apt_name')))
+        if key:
+            return key
+
+        region = self.region_codes.get((apt_info.get('sido'), apt_info.get('sigungu'), apt_info.get('dong')))
+        parts = split_jibun(apt_info.get('jibun_addr'))
+        if region and parts:
+            bjd_code = region[0]
+            return make_parcel_key(bjd_code[:5], bjd_code[5:10], *parts)
+        return None
+
     def update_progress(self, value, message=""):
-        """프로그레스 바 업데이트"""
-        self.progress["value"] = value
+        """프로그레스 바 업데이트 - 어느 스레드에서나 호출 가능 (다음 UI 주기에 마지막 값만 적용)"""
+        self.ui.set(self.progress, value=value)
         if message:
-            self.status_label.config(text=message)
-        self.root.update_idletasks()
+            self.ui.set(self.status_label, text=message)
     
     def on_sido_selected(self, event):
         """시/도 선택 시 처리 (간결한 시군구 표시)"""
@@ -3030,7 +7103,7 @@ class RealEstateAnalyzerApp:
         """설정 대화상자 표시 - 캐시 경로 추가"""
         settings = tk.Toplevel(self.root)
         settings.title("설정")
-        settings.geometry("550x450")  # 창 크기 더 크게 조정 (캐시 설정 추가)
+        settings.geometry("550x610")  # 창 크기 더 크게 조정 (캐시/렌더링/점 개수/히스토리 보관 설정 추가)
         settings.resizable(False, False)
         settings.transient(self.root)
         settings.grab_set()
@@ -3143,6 +7216,32 @@ class RealEstateAnalyzerApp:
         # 설정 정보 텍스트
         info_text = "※ 설정은 이 프로그램에서만 적용되며, 다른 프로그램에 영향을 주지 않습니다."
         ttk.Label(info_frame, text=info_text, foreground="blue").pack(side="left")
+
+        # 차트 렌더링 프로필
+        ttk.Label(settings, text="차트 렌더링:").grid(row=7, column=0, sticky="w", padx=10, pady=10)
+        profile_labels = {key: profile['label'] for key, profile in RENDER_PROFILES.items()}
+        render_profile_var = tk.StringVar(value=profile_labels.get(self.render_profile, profile_labels[DEFAULT_RENDER_PROFILE]))
+        ttk.Combobox(settings, textvariable=render_profile_var, values=list(profile_labels.values()),
+                     state="readonly", width=38).grid(row=7, column=1, columnspan=2, sticky="w", padx=5, pady=10)
+
+        # 차트 점 개수 상한 (넘으면 표본 추출, 최고/최저가는 유지)
+        ttk.Label(settings, text="차트 점 개수 상한:").grid(row=8, column=0, sticky="w", padx=10, pady=10)
+        point_budget_var = tk.StringVar(value=str(self.point_budget))
+        ttk.Spinbox(settings, textvariable=point_budget_var, from_=0, to=1000000, increment=5000,
+                    width=12).grid(row=8, column=1, sticky="w", padx=5, pady=10)
+
+        # 히스토리 보관 정책 (단지별 최근 N개, 전체 최대 용량)
+        ttk.Label(settings, text="히스토리 보관:").grid(row=9, column=0, sticky="w", padx=10, pady=10)
+        retention_frame = ttk.Frame(settings)
+        retention_frame.grid(row=9, column=1, columnspan=2, sticky="w", padx=5, pady=10)
+        history_keep_var = tk.StringVar(value=str(self.history_keep_per_apt))
+        history_max_mb_var = tk.StringVar(value=str(self.history_max_mb))
+        ttk.Label(retention_frame, text="단지별 최근").pack(side="left")
+        ttk.Spinbox(retention_frame, textvariable=history_keep_var, from_=1, to=100, width=5).pack(side="left", padx=3)
+        ttk.Label(retention_frame, text="개, 최대").pack(side="left")
+        ttk.Spinbox(retention_frame, textvariable=history_max_mb_var, from_=10, to=100000, increment=100,
+                    width=7).pack(side="left", padx=3)
+        ttk.Label(retention_frame, text="MB").pack(side="left")
     
         # 저장 버튼
         def save_settings():
@@ -3161,6 +7260,11 @@ class RealEstateAnalyzerApp:
                 # 히스토리 경로가 지정되지 않은 경우 다운로드 경로 내에 history 폴더 생성
                 self.history_path = os.path.join(self.download_path, "history")
                 os.makedirs(self.history_path, exist_ok=True)
+
+            # 히스토리 색인은 다운로드 폴더 기준
+            index_path = os.path.join(self.download_path, HISTORY_INDEX_FILENAME)
+            if self.history_index.path != index_path:
+                self.history_index = HistoryIndex(index_path)
                 
             # 법정동 경로 설정
             new_lawdong_path = lawdong_path_var.get()
@@ -3177,6 +7281,31 @@ class RealEstateAnalyzerApp:
             if new_trade_cache_path:
                 os.makedirs(new_trade_cache_path, exist_ok=True)
                 self.trade_cache_path = new_trade_cache_path
+                self.monthly_rollups.cache_dir = os.path.join(new_trade_cache_path, 'rollups')
+                self.chart_cache.cache_dir = os.path.join(new_trade_cache_path, 'charts')
+                self.excel_queue.state_path = os.path.join(new_trade_cache_path, EXCEL_EXPORT_STATE_FILENAME)
+                self.region_store.cache_dir = new_trade_cache_path
+
+            # 렌더링 프로필
+            for key, label in profile_labels.items():
+                if label == render_profile_var.get():
+                    self.render_profile = key
+
+            # 차트 점 개수 상한 (잘못된 값은 기존 값 유지)
+            try:
+                self.point_budget = max(0, int(point_budget_var.get()))
+            except ValueError:
+                pass
+
+            # 히스토리 보관 정책 (경로/정책이 바뀌면 보관소 다시 만들고 정리)
+            try:
+                self.history_keep_per_apt = max(1, int(history_keep_var.get()))
+                self.history_max_mb = max(1, int(history_max_mb_var.get()))
+            except ValueError:
+                pass
+            self.history_store = HistoryStore(self.history_path, self.history_keep_per_apt,
+                                              self.history_max_mb * 1024 * 1024)
+            self.history_store.schedule_compaction()
 
             # 설정 저장 - 단지정보 경로 포함
             # 설정 저장 - 세부정보 옵션 포함
@@ -3186,10 +7315,17 @@ class RealEstateAnalyzerApp:
                 'lawdong_path': self.lawdong_path,
                 'complex_info_path': self.complex_info_path,
                 'trade_cache_path': self.trade_cache_path,
+                'render_profile': self.render_profile,
+                'point_budget': self.point_budget,
+                'history_keep_per_apt': self.history_keep_per_apt,
+                'history_max_mb': self.history_max_mb,
                 'graph_options': {
                     'show_monthly_avg': self.show_monthly_avg.get(),
                     'show_monthly_max': self.show_monthly_max.get(),
                     'show_scatter_plot': self.show_scatter_plot.get(),
+                    'show_region_index': self.show_region_index.get(),
+                    'exclude_anomalies': self.exclude_anomalies.get(),
+                    'show_price_bands': self.show_price_bands.get(),
                     'show_jeonse': self.show_jeonse.get(),
                     'show_jeonse_monthly_avg': self.show_jeonse_monthly_avg.get(),
                     'show_jeonse_monthly_max': self.show_jeonse_monthly_max.get(),
@@ -3206,8 +7342,8 @@ class RealEstateAnalyzerApp:
             with open(settings_file, 'w', encoding='utf-8') as f:
                 json.dump(settings_data, f, ensure_ascii=False, indent=2)
                 
-            # 법정동 파일 다시 로드
-            self.load_lawdong_file()
+            # 법정동 파일 다시 로드 (백그라운드)
+            self.load_region_index()
             
             # 단지정보 파일 로드 (필요한 경우)
             if hasattr(self, 'load_complex_info'):
@@ -3221,7 +7357,7 @@ class RealEstateAnalyzerApp:
             settings.destroy()
         
         button_frame = ttk.Frame(settings, padding=5)
-        button_frame.grid(row=5, column=0, columnspan=3, sticky="e", padx=10, pady=10)
+        button_frame.grid(row=10, column=0, columnspan=3, sticky="e", padx=10, pady=10)
         
         ttk.Button(button_frame, text="저장", command=save_settings).pack(side="right", padx=5)
         ttk.Button(button_frame, text="취소", command=settings.destroy).pack(side="right", padx=5)
@@ -3242,40 +7378,29 @@ class RealEstateAnalyzerApp:
             show_topmost_error("오류", f"폴더를 열 수 없습니다: {str(e)}", parent=self.root)
     
     def delete_selected_history(self):
-        """선택된 히스토리 항목 삭제"""
+        """선택된 히스토리 항목 삭제 (이미지/미리보기 피라미드 삭제 후 색인에 삭제 표시)"""
         selection = self.history_tree.selection()
         if not selection:
             show_topmost_info("알림", "삭제할 항목을 선택해주세요.", parent=self.root)
             return
         
         if ask_topmost_yesno("확인", "선택한 항목을 삭제하시겠습니까?", parent=self.root):
+            removed = []
             for item_id in selection:
-                idx = self.history_tree.index(item_id)
-                file_path = self.history_list[idx]['file_path']
-                
-                # 파일 삭제
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except Exception as e:
-                        show_topmost_error("오류", f"파일 삭제 중 오류 발생: {str(e)}", parent=self.root)
-                        continue
-                
-                # 이미지 파일 삭제
+                item = self.history_items_by_iid.get(item_id)
+                if not item:
+                    continue
+                image_path = item['image_path']
                 try:
-                    apt_name = self.history_list[idx]['apt_name']
-                    area = self.history_list[idx]['area']
-                    
-                    apt_name_clean = ''.join(char for char in apt_name if char.isalnum() or char.isspace())
-                    apt_name_clean = apt_name_clean.replace(' ', '_')
-                    
-                    img_filename = f"{apt_name_clean}_{area}m2.jpg"
-                    img_path = os.path.join(self.download_path, img_filename)
-                    
-                    if os.path.exists(img_path):
-                        os.remove(img_path)
-                except:
-                    pass
+                    if os.path.exists(image_path):
+                        os.remove(image_path)
+                    if os.path.isdir(pyramid_dir(image_path)):
+                        shutil.rmtree(pyramid_dir(image_path), ignore_errors=True)
+                except Exception as e:
+                    show_topmost_error("오류", f"파일 삭제 중 오류 발생: {str(e)}", parent=self.root)
+                    continue
+                removed.append(image_path)
+            self.history_index.remove(removed)
             
             # 히스토리 리스트 갱신
             self.history_list = self.load_history()
@@ -3292,12 +7417,14 @@ class RealEstateAnalyzerApp:
         if ask_topmost_yesno("확인", "모든 히스토리를 삭제하시겠습니까?\n이 작업은 되돌릴 수 없습니다.", parent=self.root):
             # 히스토리 폴더 내 모든 파일 삭제
             try:
+                self.history_store.clear()
                 for file in os.listdir(self.history_path):
                     file_path = os.path.join(self.history_path, file)
                     if os.path.isfile(file_path):
                         os.remove(file_path)
                 
-                # 히스토리 리스트 초기화
+                # 히스토리 색인/리스트 초기화 (그래프 이미지는 다운로드 폴더에 그대로 둠)
+                self.history_index.clear()
                 self.history_list = []
                 self.update_history_display()
                 
@@ -3355,7 +7482,7 @@ class RealEstateAnalyzerApp:
             
             if os.path.exists(self.download_path):
                 for file in os.listdir(self.download_path):
-                    if file.lower().endswith(('.jpg', '.jpeg', '.png')) and file != "graph.jpg":
+                    if file.lower().endswith(('.jpg', '.jpeg', '.png')) and not is_preview_file(file):
                         # 파일명에 아파트명이 포함되어 있는지 확인
                         if apt_name and any(word in file for word in apt_name.split() if len(word) > 1):
                             image_path = os.path.join(self.download_path, file)
@@ -3382,12 +7509,11 @@ class RealEstateAnalyzerApp:
             return
         
         try:
-            idx = self.history_tree.index(selection[0])
-            if idx >= len(self.history_list):
+            history_item = self.history_items_by_iid.get(selection[0])
+            if history_item is None:
                 show_topmost_info("알림", "히스토리 항목을 찾을 수 없습니다.", parent=self.root)
                 return
-                
-            history_item = self.history_list[idx]
+
             print(f"[디버그] 히스토리 선택: {history_item}")
             
             # 그래프 이미지 표시
@@ -3486,24 +7612,10 @@ class RealEstateAnalyzerApp:
             y = (screen_height - height) // 2
             popup.geometry(f"{width}x{height}+{x}+{y}")
             
-            # 이미지 로드 및 크기 조정
-            try:
-                img = Image.open(image_path)
-                img_width, img_height = img.size
-                
-                # 화면 크기에 맞게 스케일링
-                scale_factor = min(width / img_width, height / img_height * 0.9)  # 버튼 영역 고려하여 90%로 제한
-                new_width = int(img_width * scale_factor)
-                new_height = int(img_height * scale_factor)
-                
-                img = img.resize((new_width, new_height), Image.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                
-            except Exception as e:
-                show_topmost_error("오류", f"이미지 로드 중 오류가 발생했습니다:\n{str(e)}", parent=self.root)
-                popup.destroy()
-                return
-            
+            # 버튼 프레임 (하단 고정)
+            btn_frame = ttk.Frame(popup, padding=10)
+            btn_frame.pack(side="bottom", fill="x")
+
             # 메인 프레임
             main_frame = ttk.Frame(popup)
             main_frame.pack(fill="both", expand=True)
@@ -3512,10 +7624,9 @@ class RealEstateAnalyzerApp:
             canvas_frame = ttk.Frame(main_frame)
             canvas_frame.pack(fill="both", expand=True, padx=10, pady=10)
             
-            canvas = tk.Canvas(canvas_frame, width=new_width, height=new_height)
-            canvas.pack(side="left", fill="both", expand=True)
+            canvas = tk.Canvas(canvas_frame, background="white", highlightthickness=0)
             
-            # 스크롤바 추가
+            # 스크롤바 추가 (피라미드 뷰어 연결 후 스크롤하면 보이는 타일 로드)
             v_scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=canvas.yview)
             h_scrollbar = ttk.Scrollbar(main_frame, orient="horizontal", command=canvas.xview)
             
@@ -3523,17 +7634,50 @@ class RealEstateAnalyzerApp:
             
             v_scrollbar.pack(side="right", fill="y")
             h_scrollbar.pack(side="bottom", fill="x")
-            
-            # 이미지 표시
-            canvas.create_image(0, 0, anchor="nw", image=photo)
-            canvas.image = photo  # 참조를 유지해야 이미지가 표시됨
-            
-            # 캔버스 스크롤 영역 설정
-            canvas.configure(scrollregion=canvas.bbox("all"))
-            
-            # 버튼 프레임
-            btn_frame = ttk.Frame(popup, padding=10)
-            btn_frame.pack(side="bottom", fill="x")
+            canvas.pack(side="left", fill="both", expand=True)
+
+            # 확대/축소 (Ctrl+휠 또는 버튼) - 피라미드 뷰어 연결 후 활성화
+            zoom_buttons = [ttk.Button(btn_frame, text=text, state="disabled")
+                            for text in ("🔍 확대", "🔎 축소", "↔ 화면 맞춤")]
+            for button in zoom_buttons:
+                button.pack(side="left", padx=5, pady=5)
+
+            def attach_viewer(manifest):
+                """이미지 피라미드 뷰어 연결 (UI 스레드)"""
+                viewer = PyramidImageView(canvas, image_path, manifest)
+                v_scrollbar.config(command=viewer.yview)
+                h_scrollbar.config(command=viewer.xview)
+                commands = (lambda: viewer.zoom_by(1.5), lambda: viewer.zoom_by(1 / 1.5), viewer.fit)
+                for button, command in zip(zoom_buttons, commands):
+                    button.config(command=command, state="normal")
+                viewer.fit()
+
+            def on_pyramid_built(manifest, error):
+                """피라미드 생성 완료 (UI 스레드) - 창이 닫혔으면 무시"""
+                if not popup.winfo_exists():
+                    return
+                if error is not None:
+                    show_topmost_error("오류", f"이미지 로드 중 오류가 발생했습니다:\n{str(error)}", parent=self.root)
+                    popup.destroy()
+                    return
+                attach_viewer(manifest)
+
+            # 이미지 피라미드 로드 (저장 시 생성, 이전에 저장된 이미지는 축소 이미지를 먼저 띄우고 백그라운드에서 생성)
+            manifest = load_pyramid_manifest(image_path)
+            if manifest is not None:
+                attach_viewer(manifest)
+            else:
+                try:
+                    with Image.open(image_path) as source:
+                        source.thumbnail((width, height))
+                        canvas.placeholder_photo = ImageTk.PhotoImage(source)  # 참조 유지
+                except Exception as e:
+                    show_topmost_error("오류", f"이미지 로드 중 오류가 발생했습니다:\n{str(e)}", parent=self.root)
+                    popup.destroy()
+                    return
+                canvas.create_image(0, 0, anchor="nw", image=canvas.placeholder_photo)
+                self.chart_renderer.submit(build_image_pyramid, (image_path,),
+                                           lambda result, error: self.safe_after(0, lambda: on_pyramid_built(result, error)))
             
             # 엑셀 버튼 - 엑셀 파일 열기
             if 'excel_path' in history_item and history_item['excel_path'] and os.path.exists(history_item['excel_path']):
@@ -3652,7 +7796,8 @@ class RealEstateAnalyzerApp:
                                         'jibun_addr': jibun_addr,
                                         'road_addr': road_addr,
                                         'build_year': build_year,
-                                        'type': apt_type
+                                        'type': apt_type,
+                                        'parcel_key': parcel_key_from_item(item, sigungu_code, self.umd_code_lookup)
                                     }
 
                         print(f"'{dong}'의 {apt_type} 거래 수: {dong_count}")
@@ -3664,6 +7809,11 @@ class RealEstateAnalyzerApp:
 
         print(f"\n수집된 아파트 총 {len(apt_info)}개")
 
+        # 필지 키 저장 (단지 선택 시 apt_info에 연결)
+        for apt_name, info in apt_info.items():
+            if info.get('parcel_key'):
+                self.apt_parcel_keys[(sigungu_code, dong, apt_name)] = info['parcel_key']
+
         # 결과 리스트 생성
         apt_list = []
         new_apts = []
@@ -3701,239 +7851,161 @@ class RealEstateAnalyzerApp:
 
         
     # 2. 반응형 UI 개선 (사용자 피드백 추가)
-    def create_graph_from_selected(self):
-        """선택된 아파트 정보로 그래프 생성 (데이터 저장과 그래프 생성 분리)"""
-        if not self.selected_apts:
-            show_topmost_error("오류", "선택된 아파트가 없습니다.", parent=self.root)
-            return
-            
+    def apt_workbook_path(self, apt_info, data_type):
+        """단지별 거래 엑셀 경로 (아파트명_면적m2_매매/전세.xlsx)"""
+        apt_name_clean = ''.join(char for char in apt_info['apt_name'] if char.isalnum() or char.isspace())
+        apt_name_clean = apt_name_clean.replace(' ', '_')
+        type_suffix = "매매" if data_type == "purchase" else "전세"
+        return os.path.join(self.download_path, f"{apt_name_clean}_{apt_info['area']}m2_{type_suffix}.xlsx")
+
+    def save_session(self):
+        """선택 아파트 목록 저장 (거래 데이터는 거래 캐시/엑셀 경로 참조만) - 다음 실행 시 복원"""
+        session_file = os.path.join(self.trade_cache_path, SESSION_FILENAME)
+        apts = []
+        for apt in self.selected_apts:
+            item = {k: v for k, v in apt.items() if not k.endswith('_data')}
+            item['trade_counts'] = {data_type: len(apt.get(data_field) or [])
+                                    for data_type, data_field in SESSION_DATA_FIELDS.items()}
+            apts.append(item)
         try:
-            # 그래프 생성 버튼 비활성화
-            self.graph_button.config(state="disabled")
-            
-            # 진행 상태 표시
-            self.update_progress(5, "분석 준비 중...")
-            
-            # 데이터 수집 진행 관리
-            total_apts = len(self.selected_apts)
-            progress_per_apt = 60 / total_apts  # 데이터 수집 60%, 저장 20%, 그래프 생성 20%
-            
-            # 각 아파트별 거래 데이터 확인 (이미 수집된 데이터 사용)
-            for i, apt_info in enumerate(self.selected_apts):
-                apt_name = apt_info['apt_name']
-                area = apt_info['area']
-
-                self.update_progress(5 + (i * progress_per_apt),
-                                    f"{apt_name} ({area}㎡) 데이터 확인 중...")
-
-                # 이미 수집된 데이터가 있는지 확인
-                if 'trades_data' not in apt_info or not apt_info.get('trades_data'):
-                    # 데이터가 없으면 새로 수집
-                    self.update_progress(5 + (i * progress_per_apt),
-                                        f"{apt_name} ({area}㎡) 매매 데이터 수집 중...")
-                    trades = self.get_trade_data(apt_info)
-                    self.selected_apts[i]['trades_data'] = trades
-                else:
-                    trades = apt_info['trades_data']
-
-                self.update_progress(5 + ((i+1) * progress_per_apt),
-                                    f"{apt_name} ({area}㎡) 매매 데이터 확인 완료 ({len(trades)}건)")
-
-                # 거래 데이터가 없는 경우 경고
-                if not trades:
-                    print(f"⚠️ {apt_name} ({area}㎡)의 매매 거래 데이터가 없습니다.")
-            
-            # 1. 먼저 엑셀 파일로 데이터 저장
-            self.update_progress(70, "데이터 파일 저장 중...")
-
-            # 처리할 아파트 목록과 데이터프레임 생성 (매매 + 전세)
-            apt_dfs = []
-            jeonse_dfs = []
-
-            for apt_info in self.selected_apts:
-                # 매매 데이터 처리
-                trades = apt_info.get('trades_data', [])
-                if trades:
-                    # 데이터 정렬
-                    trades = sorted(trades, key=lambda x: x['date'])
-                    # 데이터프레임 생성
-                    df = pd.DataFrame(trades)
-                    # 엑셀 파일 저장
-                    try:
-                        self.save_apt_data_to_excel(df, apt_info, "purchase")
-                        apt_dfs.append(df)
-                    except Exception as e:
-                        print(f"⚠️ {apt_info['apt_name']} 매매 데이터 저장 중 오류: {str(e)}")
-                else:
-                    # 매매 데이터가 없어도 전세 데이터를 위해 빈 df 추가
-                    apt_dfs.append(pd.DataFrame())
-
-                # 전세 데이터 처리
-                jeonse_trades = apt_info.get('jeonse_data', [])
-                if jeonse_trades:
-                    # 데이터 정렬
-                    jeonse_trades = sorted(jeonse_trades, key=lambda x: x['date'])
-                    # 데이터프레임 생성
-                    jeonse_df = pd.DataFrame(jeonse_trades)
-                    # 엑셀 파일 저장
-                    try:
-                        self.save_apt_data_to_excel(jeonse_df, apt_info, "jeonse")
-                        jeonse_dfs.append(jeonse_df)
-                    except Exception as e:
-                        print(f"⚠️ {apt_info['apt_name']} 전세 데이터 저장 중 오류: {str(e)}")
-                else:
-                    # 전세 데이터가 없으면 빈 df 추가
-                    jeonse_dfs.append(pd.DataFrame())
-
-            # 2. 그래프 생성은 저장 성공 후 별도로 처리
-            self.update_progress(85, "그래프 생성 중...")
-
-            # 매매 또는 전세 데이터가 하나라도 있는지 확인
-            has_purchase_data = any(not df.empty for df in apt_dfs)
-            has_jeonse_data = any(not df.empty for df in jeonse_dfs)
-
-            if not has_purchase_data and not has_jeonse_data:
-                show_topmost_info("알림", "선택한 모든 아파트에 매매/전세 거래 데이터가 없습니다.", parent=self.root)
-                self.update_progress(0, "")
-                self.graph_button.config(state="normal")
-                return
-
-            try:
-                # 그래프 생성 전 데이터 준비
-                monthly_dfs = []
-                monthly_jeonse_dfs = []
-
-                # 매매 데이터 처리
-                for i, df in enumerate(apt_dfs):
-                    if not df.empty:
-                        # 아파트 이름과 면적 추가
-                        df['apt_name'] = self.selected_apts[i]['apt_name']
-                        df['area'] = self.selected_apts[i]['area']
-
-                        # 월별 평균가 계산
-                        df_monthly = df.groupby(pd.Grouper(key='date', freq='ME')).agg({'price': 'mean'}).reset_index()
-                        df_monthly['apt_name'] = self.selected_apts[i]['apt_name']
-                        df_monthly['area'] = self.selected_apts[i]['area']
-                        monthly_dfs.append(df_monthly)
-                    else:
-                        monthly_dfs.append(pd.DataFrame())
-
-                # 전세 데이터 처리
-                for i, jeonse_df in enumerate(jeonse_dfs):
-                    if not jeonse_df.empty:
-                        # 아파트 이름과 면적 추가
-                        jeonse_df['apt_name'] = self.selected_apts[i]['apt_name']
-                        jeonse_df['area'] = self.selected_apts[i]['area']
-
-                        # 월별 평균가 계산
-                        jeonse_monthly = jeonse_df.groupby(pd.Grouper(key='date', freq='ME')).agg({'price': 'mean'}).reset_index()
-                        jeonse_monthly['apt_name'] = self.selected_apts[i]['apt_name']
-                        jeonse_monthly['area'] = self.selected_apts[i]['area']
-                        monthly_jeonse_dfs.append(jeonse_monthly)
-                    else:
-                        monthly_jeonse_dfs.append(pd.DataFrame())
-
-                # 그래프 생성 (전세 데이터도 포함)
-                self.create_multi_chart(apt_dfs, monthly_dfs, jeonse_dfs, monthly_jeonse_dfs)
-                
-                # 히스토리 업데이트
-                self.history_list = self.load_history()
-                self.update_history_display()
-                
-                self.update_progress(100, "분석 완료!")
-                
-                # 그래프 이미지 표시
-                if os.path.exists(self.image_path):
-                    os.startfile(self.image_path)
-                    
-            except Exception as e:
-                show_topmost_error("오류", f"그래프 생성 중 오류 발생: {str(e)}", parent=self.root)
-                import traceback
-                traceback.print_exc()  # 콘솔에 상세 오류 출력
-            
+            os.makedirs(self.trade_cache_path, exist_ok=True)
+            with open(session_file, 'w', encoding='utf-8') as f:
+                json.dump({'saved_at': datetime.now().isoformat(), 'selected_apts': apts}, f,
+                          ensure_ascii=False, indent=2, default=str)
+            print(f"💾 세션 저장: 선택 아파트 {len(apts)}개")
         except Exception as e:
-            show_topmost_error("오류", f"분석 중 오류 발생: {str(e)}", parent=self.root)
-            import traceback
-            traceback.print_exc()  # 콘솔에 상세 오류 출력
-        finally:
-            # 그래프 생성 버튼 다시 활성화
-            self.graph_button.config(state="normal")
+            print(f"⚠️ 세션 저장 실패: {str(e)}")
 
-    def save_apt_data_to_excel(self, df, apt_info, data_type="purchase"):
-        """아파트 거래 데이터를 엑셀로 저장하는 함수"""
+    def restore_session(self):
+        """이전 세션의 선택 아파트 목록 복원 - 목록은 바로 표시하고 거래 데이터는 백그라운드에서 로드"""
+        session_file = os.path.join(self.trade_cache_path, SESSION_FILENAME)
+        if self.selected_apts or not os.path.exists(session_file):
+            return
         try:
-            apt_name = apt_info['apt_name']
-            area = apt_info['area']
-            
-            apt_name_clean = ''.join(char for char in apt_name if char.isalnum() or char.isspace())
-            apt_name_clean = apt_name_clean.replace(' ', '_')
-            
-            # 데이터 유형에 따른 파일명 설정
-            type_suffix = "매매" if data_type == "purchase" else "전세"
-            filename = f"{apt_name_clean}_{area}m2_{type_suffix}.xlsx"
-            excel_path = os.path.join(self.download_path, filename)
-            
-            # 데이터프레임을 엑셀로 저장
-            writer = pd.ExcelWriter(excel_path, engine='xlsxwriter')
-            
-            # 기본 정보 시트 생성
-            info_df = pd.DataFrame([
-                ["단지 정보", ""],
-                ["단지명", apt_name],
-                ["지역", f"{apt_info['sido']} {apt_info['sigungu']} {apt_info['dong']}"],
-                ["전용면적", f"{area}㎡"],
-                ["거래유형", f"{type_suffix}"],
-                ["거래건수", len(df)],
-                ["최고거래가", f"{df['price'].max():,.0f}만원" if not df.empty else "정보없음"],
-                ["최저거래가", f"{df['price'].min():,.0f}만원" if not df.empty else "정보없음"]
-            ])
-            
-            info_df.to_excel(writer, sheet_name='기본정보', header=False, index=False)
-            
-            # 거래 데이터 시트 생성
-            if not df.empty:
-                trade_df = df.copy()
-                trade_df['date'] = trade_df['date'].dt.strftime('%Y-%m-%d')
-                
-                # 거래 유형에 따른 컬럼명 설정
-                if data_type == "purchase":
-                    trade_df.columns = ['거래일자', '가격(만원)', '층', '면적(㎡)']
-                else:
-                    # 전세인 경우 rent_type 컬럼 처리
-                    if 'rent_type' in trade_df.columns:
-                        trade_df = trade_df.drop(columns=['rent_type'])
-                    trade_df.columns = ['거래일자', '전세가(만원)', '층', '면적(㎡)']
-                
-                trade_df = trade_df.sort_values('거래일자', ascending=False)
-                
-                trade_df.to_excel(writer, sheet_name='거래내역', index=False)
-            else:
-                # 빈 데이터프레임 저장
-                if data_type == "purchase":
-                    empty_df = pd.DataFrame(columns=['거래일자', '가격(만원)', '층', '면적(㎡)'])
-                else:
-                    empty_df = pd.DataFrame(columns=['거래일자', '전세가(만원)', '층', '면적(㎡)'])
-                empty_df.to_excel(writer, sheet_name='거래내역', index=False)
-            
-            # 엑셀 파일 저장
-            writer.close()
-            
-            # 히스토리에 추가
-            history_filename = f"history_{apt_name.replace(' ', '_')}_{area}_{type_suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            history_path = os.path.join(self.history_path, history_filename)
-            
-            # 히스토리용 파일 복사
-            if os.path.exists(excel_path):
-                shutil.copy2(excel_path, history_path)
+            with open(session_file, 'r', encoding='utf-8') as f:
+                apts = json.load(f).get('selected_apts', [])
+        except Exception as e:
+            print(f"⚠️ 세션 로드 실패: {str(e)}")
+            return
+        if not apts:
+            return
+
+        for apt in apts:
+            if len(apt.get('parcel_key') or '') != PARCEL_KEY_LENGTH:
+                apt['parcel_key'] = self.resolve_parcel_key(apt)  # 이전 버전에서 저장한 18자리 키
+            self.selected_apts.append(apt)
+            display_text = f"{apt['apt_name']} ({apt['area']}㎡) - {apt['sido']} {apt['sigungu']} {apt['dong']}"
+            self.selected_apt_listbox.insert(tk.END, display_text)
+        self.status_label.config(text=f"🔁 이전 세션 복원 중: 선택 아파트 {len(apts)}개")
+
+        def load_trades():
+            loaded = []  # (아파트, 데이터 필드, 거래 목록) - 아파트 정보 갱신은 UI 스레드에서
+            restored = []
+            for apt in list(self.selected_apts):
+                for data_type, data_field in SESSION_DATA_FIELDS.items():
+                    if apt.get(data_field) or not apt.get('trade_counts', {}).get(data_type):
+                        continue
+                    trades, source = self.load_session_trades(apt, data_type)
+                    if trades:
+                        loaded.append((apt, data_field, trades))
+                        restored.append(f"{apt['apt_name']} {'매매' if data_type == 'purchase' else '전세'} "
+                                        f"{len(trades)}건({source})")
+            print(f"🔁 세션 복원 (네트워크 조회 없음): {', '.join(restored) or '거래 데이터 없음'}")
+
+            def done():
+                for apt, data_field, trades in loaded:
+                    if not apt.get(data_field):  # 복원 중 새로 수집된 데이터는 유지
+                        apt[data_field] = trades
+                has_data = any(apt.get('trades_data') or apt.get('jeonse_data') for apt in self.selected_apts)
+                if has_data:
+                    self.graph_button.config(state="normal", text="📊 그래프 생성하기")
+                self.status_label.config(text=f"🔁 이전 세션 복원 완료: 선택 아파트 {len(self.selected_apts)}개")
+            self.safe_after(0, done)
+
+        threading.Thread(target=load_trades, daemon=True).start()
+
+    def load_session_trades(self, apt, data_type):
+        """세션 복원용 거래 데이터 - 거래 캐시 우선, 없으면 저장된 단지별 엑셀 (API 호출 없음)"""
+        try:
+            trades = self.load_trade_cache(apt['sido'], apt['sigungu'], apt['dong'], apt['apt_name'],
+                                           float(apt['area']), data_type)
+            if trades:
+                return trades, '캐시'
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️ 세션 거래 캐시 조회 실패: {str(e)}")
+
+        excel_path = apt.get(SESSION_EXCEL_FIELDS[data_type]) or self.apt_workbook_path(apt, data_type)
+        if excel_path and os.path.exists(excel_path):
+            try:
+                return trades_from_workbook(excel_path, data_type), '엑셀'
+            except Exception as e:
+                print(f"⚠️ 엑셀에서 거래 복원 실패 ({excel_path}): {str(e)}")
+        return [], None
+
+    def save_apt_data_to_excel(self, df, apt_info, data_type="purchase"):
+        """아파트 거래 데이터 엑셀 저장 요청 - 저장 대기열에 넣고 파일 경로 바로 반환 (같은 데이터는 저장 생략)"""
+        try:
+            apt_name = apt_info['apt_name']
+            area = apt_info['area']
             
+            type_suffix = "매매" if data_type == "purchase" else "전세"
+            excel_path = self.apt_workbook_path(apt_info, data_type)
+
+            # 데이터 지문 (단지/지역/유형 + 거래 내용) - 대기열 병합/생략과 히스토리 중복 제거에 사용
+            history_key = f"history_{apt_name.replace(' ', '_')}_{area}_{type_suffix}"
+            digest = hashlib.blake2b(digest_size=16)
+            _hash_value(digest, [history_key, apt_info.get('sido'), apt_info.get('sigungu'), apt_info.get('dong'),
+                                 dataset_fingerprint(df, tuple(df.columns))])
+            self.excel_queue.submit(excel_path, digest.hexdigest(), excel_path, self.write_apt_workbook,
+                                    (df.copy(), dict(apt_info), data_type, excel_path, digest.hexdigest()))
             return excel_path
-            
+
         except Exception as e:
-            print(f"엑셀 저장 중 오류: {str(e)}")
+            print(f"엑셀 저장 요청 중 오류: {str(e)}")
             import traceback
             traceback.print_exc()
             return None
-    
+
+    def on_excel_queue_idle(self, stats):
+        """엑셀 저장 대기열이 비면 상태 표시 (작업 스레드에서 호출)"""
+        print(f"📊 엑셀 저장 대기열: 저장 {stats['written']}개 ({stats['write_seconds']:.2f}초), "
+              f"변경 없음 {stats['skipped']}개, 병합 {stats['coalesced']}개, 실패 {stats['failed']}개")
+        self.safe_after(0, lambda: self.status_label.config(
+            text=f"💾 엑셀 저장 완료 (누적 {stats['written']}개, {stats['write_seconds']:.1f}초)"))
+
+    def write_apt_workbook(self, df, apt_info, data_type, excel_path, content_hash):
+        """아파트 거래 데이터 엑셀 파일 작성 (엑셀 저장 대기열 스레드에서 실행)"""
+        apt_name = apt_info['apt_name']
+        area = apt_info['area']
+        type_suffix = "매매" if data_type == "purchase" else "전세"
+        # 데이터프레임을 엑셀로 저장
+        writer = pd.ExcelWriter(excel_path, engine='xlsxwriter')
+        
+        # 기본 정보 시트 생성
+        info_df = pd.DataFrame([
+            ["단지 정보", ""],
+            ["단지명", apt_name],
+            ["지역", f"{apt_info['sido']} {apt_info['sigungu']} {apt_info['dong']}"],
+            ["전용면적", f"{area}㎡"],
+            ["거래유형", f"{type_suffix}"],
+            ["거래건수", len(df)],
+            ["최고거래가", f"{df['price'].max():,.0f}만원" if not df.empty else "정보없음"],
+            ["최저거래가", f"{df['price'].min():,.0f}만원" if not df.empty else "정보없음"]
+        ])
+        
+        info_df.to_excel(writer, sheet_name='기본정보', header=False, index=False)
+        
+        # 거래 데이터 시트 생성 (빈 데이터면 컬럼명만)
+        apt_workbook_trades(df, data_type).to_excel(writer, sheet_name='거래내역', index=False)
+        
+        # 엑셀 파일 저장
+        writer.close()
+        
+        # 히스토리에 추가 (같은 데이터는 다시 저장하지 않고 기존 파일에 연결)
+        history_key = f"history_{apt_name.replace(' ', '_')}_{area}_{type_suffix}"
+        self.history_store.add(excel_path, history_key, content_hash,
+                               f"{history_key}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+
     def on_closing(self):
         """프로그램 종료 시 설정 자동 저장 및 안전한 종료"""
         # 중복 호출 방지
@@ -3951,10 +8023,17 @@ class RealEstateAnalyzerApp:
                 'lawdong_path': self.lawdong_path,
                 'complex_info_path': self.complex_info_path,
                 'trade_cache_path': self.trade_cache_path,
+                'render_profile': self.render_profile,
+                'point_budget': self.point_budget,
+                'history_keep_per_apt': self.history_keep_per_apt,
+                'history_max_mb': self.history_max_mb,
                 'graph_options': {
                     'show_monthly_avg': self.show_monthly_avg.get(),
                     'show_monthly_max': self.show_monthly_max.get(),
                     'show_scatter_plot': self.show_scatter_plot.get(),
+                    'show_region_index': self.show_region_index.get(),
+                    'exclude_anomalies': self.exclude_anomalies.get(),
+                    'show_price_bands': self.show_price_bands.get(),
                     'show_jeonse': self.show_jeonse.get(),
                     'show_jeonse_monthly_avg': self.show_jeonse_monthly_avg.get(),
                     'show_jeonse_monthly_max': self.show_jeonse_monthly_max.get(),
@@ -3971,6 +8050,14 @@ class RealEstateAnalyzerApp:
         except Exception as e:
             print(f"⚠️ 설정 저장 중 오류 발생: {str(e)}")
 
+        # 선택 아파트 목록 저장 (다음 실행 시 복원)
+        self.save_session()
+
+        # 엑셀 저장/렌더링 워커 종료
+        self.excel_queue.shutdown()
+        self.chart_renderer.shutdown()
+        self.ui.stop()
+
         # 프로그램 종료
         self.root.destroy()
 
@@ -4024,15 +8111,14 @@ class RealEstateAnalyzerApp:
                         
                     # 진행 상태 업데이트
                     progress = min(100, (month / max_months) * 100)
-                    progress_bar['value'] = progress
+                    self.ui.set(progress_bar, value=progress)
                     
                     # 수집한 데이터 개수에 따라 진행 상태 메시지 업데이트
                     if trades:
-                        progress_label.config(text=f"{progress:.1f}% 완료 - {len(trades)}건 수집됨 ({month+1}/{max_months}개월)")
+                        self.ui.set(progress_label, text=f"{progress:.1f}% 완료 - {len(trades)}건 수집됨 ({month+1}/{max_months}개월)")
                     else:
-                        progress_label.config(text=f"{progress:.1f}% 완료 ({month+1}/{max_months}개월)")
+                        self.ui.set(progress_label, text=f"{progress:.1f}% 완료 ({month+1}/{max_months}개월)")
                     
-                    progress_window.update_idletasks()
                     
                     # 현재 조회할 월 계산
                     search_date = current_date - timedelta(days=30 * month)
@@ -4069,1204 +8155,212 @@ class RealEstateAnalyzerApp:
                                             ),
                                             'price': int(item.findtext('dealAmount').replace(',', '')),
                                             'floor': int(item.findtext('floor', '0')),
-                                            'area': area
-                                        }
-                                        monthly_trades.append(trade)
-                        
-                        # 이번 달 데이터 개수 확인
-                        if monthly_trades:
-                            consecutive_empty_months = 0  # 데이터가 있으면 카운터 리셋
-                            trades.extend(monthly_trades)  # 전체 거래 목록에 추가
-                            
-                            # 진행 상태 업데이트
-                            progress_label.config(text=f"{progress:.1f}% 완료 - {len(trades)}건 수집됨 ({month+1}/{max_months}개월)")
-                            progress_window.update_idletasks()
-                        else:
-                            consecutive_empty_months += 1  # 데이터가 없으면 카운터 증가
-                        
-                        # 일정 기간 연속으로 데이터가 없으면 조기 종료
-                        if consecutive_empty_months >= consecutive_empty_months_limit:
-                            progress_label.config(text=f"데이터 수집 완료 - {consecutive_empty_months}개월 연속 거래 내역 없음")
-                            break
-                            
-                        # 잠시 대기하여 API 서버 부하 방지
-                        time.sleep(0.1)
-                        
-                    except Exception as e:
-                        print(f"API 호출 중 오류: {str(e)}")
-                        # 오류가 발생해도 계속 진행
-                        continue
-                
-                # 진행 상태 100%로 설정
-                progress_bar['value'] = 100
-                progress_label.config(text=f"100% 완료 - 총 {len(trades)}건 수집됨")
-                progress_window.update_idletasks()
-                
-                # 잠시 후 창 닫기
-                time.sleep(0.5)
-                if not cancel_flag[0]:
-                    progress_window.destroy()
-                    
-            except Exception as e:
-                show_topmost_error("오류", f"데이터 수집 중 오류 발생: {str(e)}", parent=self.root)
-                progress_window.destroy()
-        
-        # 별도 스레드로 데이터 수집 실행
-        import threading
-        thread = threading.Thread(target=collect_data)
-        thread.daemon = True
-        thread.start()
-        
-        # 창이 닫힐 때까지 대기
-        self.root.wait_window(progress_window)
-        
-        # 결과 반환
-        if cancel_flag[0]:
-            return []  # 취소된 경우 빈 목록 반환
-        
-        # 결과를 날짜순으로 정렬하여 반환
-        return sorted(trades, key=lambda x: x['date'])
-
-    
-    # 2. 호출 부분 수정 - analyze_and_visualize_multi 함수 수정
-    def analyze_and_visualize_multi(self):
-        """여러 아파트 실거래 데이터 분석 및 시각화"""
-        try:
-            # 각 아파트별 데이터프레임 생성
-            apt_dfs = []
-            for apt_info in self.selected_apts:
-                trades = apt_info['trades_data']
-                if not trades:
-                    continue
-                    
-                # 데이터 정렬
-                trades = sorted(trades, key=lambda x: x['date'])
-                
-                # 데이터프레임 생성
-                df = pd.DataFrame(trades)
-                df['apt_name'] = apt_info['apt_name']
-                df['area'] = apt_info['area']
-                
-                apt_dfs.append(df)
-            
-            if not apt_dfs:
-                show_topmost_info("알림", "선택한 아파트의 실거래 데이터가 없습니다.", parent=self.root)
-                return
-                
-            # 모든 데이터프레임 결합
-            combined_df = pd.concat(apt_dfs)
-            
-            # 아파트별 월별 평균가 계산
-            monthly_dfs = []
-            for i, df in enumerate(apt_dfs):
-                # 평균가 추가 (ME: Month End 사용)
-                df_monthly = df.groupby(pd.Grouper(key='date', freq='ME')).agg({'price': 'mean'}).reset_index()
-                df_monthly['apt_name'] = self.selected_apts[i]['apt_name']
-                df_monthly['area'] = self.selected_apts[i]['area']
-                monthly_dfs.append(df_monthly)
-                
-            combined_monthly = pd.concat(monthly_dfs) if monthly_dfs else None
-            
-            # 차트 생성
-            self.create_multi_chart(apt_dfs, monthly_dfs)
-            
-            # 분석 데이터 저장
-            for i, df in enumerate(apt_dfs):
-                # self.save_analysis_result가 2개의 인자만 받도록 수정
-                self.save_analysis_result(df, self.selected_apts[i])
-            
-            # 히스토리 리스트 갱신 - 여기서 한 번만 수행
-            self.history_list = self.load_history()
-            self.update_history_display()
-            
-        except Exception as e:
-            show_topmost_error("오류", f"분석 중 오류 발생: {str(e)}", parent=self.root)
-            import traceback
-            traceback.print_exc()
-            raise
-    
-        # create_multi_chart 함수에서 time 관련 코드 수정
-    # create_multi_chart 함수의 시계열 그래프 부분 수정
-        # create_multi_chart 함수에서 표 부분 수정
-
-    def create_multi_chart(self, apt_dfs, monthly_dfs, jeonse_dfs=None, monthly_jeonse_dfs=None):
-        """여러 아파트 거래 데이터 차트 생성 (seaborn 스타일, 개선된 레이블 배치)"""
-        # seaborn 스타일 설정
-        sns.set_style("whitegrid")
-        sns.set_context("notebook", font_scale=1.1)
-
-        # seaborn 설정 후 한글 폰트 재설정 (seaborn이 폰트를 덮어쓰므로)
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-        plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
-
-        # 세부정보 가져오기가 선택된 경우만 단지정보 로드
-        complex_df = None
-        if self.show_complex_info.get():
-            complex_df = self.load_complex_info()
-
-        # 매매가와 전세가 데이터 모두 있는 경우 레이아웃 조정
-        has_jeonse = jeonse_dfs and any(not df.empty for df in jeonse_dfs) and self.show_jeonse.get()
-
-        # 단지세부정보 선택 여부에 따라 그래프 영역 크기 조정
-        from matplotlib.gridspec import GridSpec
-
-        if self.show_complex_info.get():
-            # 하단에 단지세부정보 테이블이 있을 경우
-            fig = plt.figure(figsize=(18, 13))  # 크기 증가 (수익률 테이블 공간 추가)
-            gs = GridSpec(18, 1, figure=fig, hspace=0.6)  # 행 증가 및 간격 증가
-            ax = fig.add_subplot(gs[0:9, 0])  # 그래프 영역: 0-8행 (9행)
-            ax_yield = fig.add_subplot(gs[10:12, 0])  # 수익률 테이블 영역: 10-11행 (2행) - 1행 간격 추가
-            # 단지세부정보 테이블은 나중에 gs[13:18, 0] 영역에 배치
-        else:
-            # 단지세부정보 없이 수익률 테이블만 표시
-            fig = plt.figure(figsize=(18, 11))  # 크기 증가
-            gs = GridSpec(13, 1, figure=fig, hspace=0.6)  # 행 증가 및 간격 증가
-            ax = fig.add_subplot(gs[0:9, 0])  # 그래프 영역: 0-8행 (9행)
-            ax_yield = fig.add_subplot(gs[10:12, 0])  # 수익률 테이블 영역: 10-11행 (2행) - 1행 간격 추가
-
-        # 매매가 색상 - 더 진하고 가시성 좋은 색상
-        colors = [
-            '#E74C3C',  # 밝은 빨강 (매우 눈에 잘 띔)
-            '#3498DB',  # 밝은 파랑
-            '#2ECC71',  # 밝은 초록
-            '#F39C12',  # 밝은 주황
-            '#9B59B6',  # 보라
-            '#1ABC9C',  # 청록
-        ]
-        markers = ['o', 's', '^', 'D', 'X', 'P']
-
-        # 전세가 색상 (매매가보다 연한 색상)
-        jeonse_colors = [
-            '#F1948A',  # 연한 빨강
-            '#85C1E2',  # 연한 파랑
-            '#82E0AA',  # 연한 초록
-            '#F8C471',  # 연한 주황
-            '#BB8FCE',  # 연한 보라
-            '#76D7C4',  # 연한 청록
-        ]
-        jeonse_markers = ['v', 'd', '*', 'p', '8', 'h']
-        
-        max_price = 0
-        min_price = float('inf')
-        first_date = datetime.now()
-        last_date = datetime(1990, 1, 1)
-
-        # 연복리 계산 및 매전갭 정보를 저장할 변수
-        cagr_info = []
-
-        # 어노테이션 저장 리스트 (adjustText를 위한)
-        annotations = []
-        texts_for_adjust = []
-        
-        # 1. 매매가 데이터 플롯
-        for i, df in enumerate(apt_dfs):
-            if df.empty:
-                continue
-                
-            apt_info = None
-            for apt in self.selected_apts:
-                if apt['apt_name'] == df['apt_name'].iloc[0] and str(apt['area']) == str(df['area'].iloc[0]):
-                    apt_info = apt
-                    break
-                    
-            if not apt_info:
-                continue
-                
-            apt_name = apt_info['apt_name']
-            area = apt_info['area']
-            
-            color = colors[i % len(colors)]
-            marker = markers[i % len(markers)]
-            
-            # 날짜 범위 업데이트
-            if df['date'].min() < first_date:
-                first_date = df['date'].min()
-            if df['date'].max() > last_date:
-                last_date = df['date'].max()
-            
-            # 점도표 (실거래가)
-            if self.show_scatter_plot.get():
-                alpha = 0.5 if len(apt_dfs) > 1 else 0.7
-                ax.scatter(df['date'], df['price'], 
-                           color=color, alpha=alpha, s=40, 
-                           marker=marker,
-                           label=f'{apt_name} ({area}㎡) 실거래', zorder=3)
-            
-            # 월별 데이터 처리 개선
-            # 월별 고유 값 추출(년-월 형식)
-            df_sorted = df.sort_values('date')
-            df_sorted['year_month'] = df_sorted['date'].dt.strftime('%Y-%m')
-            
-            # 월별 데이터 계산
-            monthly_data = df_sorted.groupby('year_month').agg({
-                'date': 'first',  # 각 월의 첫 날짜
-                'price': ['mean', 'max']  # 평균가와 최고가
-            }).reset_index()
-            
-            # 컬럼 이름 재설정
-            monthly_data.columns = ['year_month', 'date', 'avg_price', 'max_price']
-            
-            # 날짜 순서로 정렬
-            monthly_data = monthly_data.sort_values('date')
-            
-            # 월 평균가격 그래프
-            if self.show_monthly_avg.get():
-                if len(monthly_data) > 0:
-                    ax.plot(monthly_data['date'], monthly_data['avg_price'], 
-                            color=color, linewidth=2.5, 
-                            label=f'{apt_name} ({area}㎡) 월평균', zorder=4)
-            
-            # 월 최고가 그래프
-            # 매매가 월 최고가 그래프에서 어노테이션 위치 조정
-            # 매매가 월 최고가 그래프에서 어노테이션 위치 조정
-            # 매매가 월 최고가 어노테이션 위치 조정 부분 수정
-            if self.show_monthly_max.get():
-                if len(monthly_data) > 0:
-                    # 월 최고가 선 그래프
-                    ax.plot(monthly_data['date'], monthly_data['max_price'], 
-                            color=color, linewidth=1.5, linestyle='--', dashes=(2, 2),
-                            label=f'{apt_name} ({area}㎡) 월최고가', zorder=4)
-                    
-                    # 월 최고가 중 가장 높은 값 (최고가)
-                    monthly_max_idx = monthly_data['max_price'].idxmax()
-                    monthly_max = monthly_data.iloc[monthly_max_idx]
-                    
-                    # 가장 최근 거래가
-                    monthly_latest = monthly_data.iloc[-1]
-                    
-                    # 최고가와 최근가의 날짜 차이 계산 (6개월 이내인지 확인)
-                    date_diff = abs((monthly_latest['date'] - monthly_max['date']).days)
-                    close_dates = date_diff <= 180  # 6개월(180일) 이내
-                    
-                    # 상대적 가격 위치에 따른 어노테이션 위치 조정
-                    # 현재 단지의 최고가
-                    current_max_price = monthly_max['max_price']
-
-                    # 요구사항 1, 2: 단지 수에 따른 위치 조정
-                    # x 좌표를 기존 -40에서 -80으로 수정하여 더 왼쪽으로 이동
-                    if len(apt_dfs) == 2:
-                        # 2개 단지 비교일 경우: 큰 값은 위로, 작은 값은 아래로
-                        # 다른 단지의 인덱스 구하기
-                        other_idx = 1 if i == 0 else 0
-                        if not apt_dfs[other_idx].empty:
-                            other_max_price = apt_dfs[other_idx]['price'].max()
-                            if current_max_price > other_max_price:
-                                max_xytext = (-100, 30)  # 더 높은 가격은 위로
-                            else:
-                                max_xytext = (-100, -30)  # 더 낮은 가격은 아래로
-                        else:
-                            max_xytext = (-100, 30)  # 다른 단지 데이터 없으면 위로
-                    elif len(apt_dfs) >= 3:
-                        # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
-                        all_max_prices = [df['price'].max() for df in apt_dfs if not df.empty]
-                        sorted_prices = sorted(all_max_prices)
-
-                        if len(sorted_prices) >= 3:
-                            if current_max_price == sorted_prices[-1]:  # 가장 큰 값
-                                max_xytext = (-100, 50)  # 최상단
-                            elif current_max_price == sorted_prices[0]:  # 가장 작은 값
-                                max_xytext = (-100, -50)  # 최하단
-                            else:  # 중간값
-                                max_xytext = (-100, 0)  # 중앙
-                        else:
-                            # 정렬된 가격이 3개보다 적은 경우
-                            if current_max_price == max(sorted_prices):
-                                max_xytext = (-100, 30)  # 위로
-                            else:
-                                max_xytext = (-100, -30)  # 아래로
-                    else:
-                        # 단일 단지인 경우
-                        max_xytext = (-80, 30)  # 좌측 위로
-                    
-                    # 최고가 점 표시
-                    ax.scatter([monthly_max['date']], [monthly_max['max_price']],
-                              color='white', edgecolor=color, s=100, linewidth=2.5, zorder=5)
-
-                    # 최고가 어노테이션 추가 (더 세련된 스타일)
-                    ann = ax.annotate(f"{monthly_max['max_price']:,.0f}만\n(최고가)",
-                              xy=(monthly_max['date'], monthly_max['max_price']),
-                              xytext=max_xytext,
-                              textcoords='offset points',
-                              bbox=dict(boxstyle='round,pad=0.6', fc='white', alpha=0.95,
-                                       edgecolor=color, linewidth=2),
-                              fontsize=10,
-                              color='red',
-                              fontweight='bold',
-                              zorder=6,
-                              arrowprops=dict(
-                                  arrowstyle='->',
-                                  color=color,
-                                  lw=1.5,
-                                  alpha=0.8,
-                                  connectionstyle="arc3,rad=0.2"
-                              ))
-                    texts_for_adjust.append(ann)
-                    
-                    # 현재가 어노테이션 표시 조건 - 최고가와 다르고, 날짜가 충분히 떨어진 경우만
-                    if monthly_latest['date'] != monthly_max['date'] and not close_dates:
-                        
-                        # 요구사항 1, 2: 단지 수에 따른 위치 조정 (현재가)
-                        # 2개 단지 비교일 경우 코드 수정
-                        if len(apt_dfs) == 2:
-                            # 다른 단지의 인덱스 구하기
-                            other_idx = 1 if i == 0 else 0
-                            
-                            # 다른 단지의 데이터가 있는지 확인
-                            if not apt_dfs[other_idx].empty and len(monthly_dfs) > other_idx:
-                                other_monthly_data = monthly_dfs[other_idx]
-                                
-                                if not other_monthly_data.empty:
-                                    # 다른 단지의 최근 월별 데이터
-                                    other_latest = other_monthly_data.iloc[-1]
-                                    
-                                    # 현재 가격이 다른 단지보다 높으면 위로, 낮으면 아래로
-                                    if monthly_latest['max_price'] > other_latest['price']:
-                                        latest_xytext = (30, 30)  # 우측 위로
-                                    else:
-                                        latest_xytext = (30, -30)  # 우측 아래로
-                                else:
-                                    # 다른 단지의 월별 데이터가 없으면 기본값
-                                    latest_xytext = (30, 0)
-                            else:
-                                # 다른 단지의 데이터가 없으면 기본값
-                                latest_xytext = (30, 0)
-                        # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
-                        elif len(apt_dfs) >= 3:
-                            # 모든 단지의 최근 가격을 비교
-                            latest_prices = []
-                            
-                            for j, monthly_df in enumerate(monthly_dfs):
-                                if j != i and not monthly_df.empty:  # 현재 단지가 아니고, 데이터가 있는 경우
-                                    latest_prices.append(monthly_df.iloc[-1]['price'])
-                            
-                            if latest_prices:  # 다른 단지의, 비교할 데이터가 있는 경우
-                                current_price = monthly_latest['max_price']
-                                
-                                # 모든 가격 중 현재 가격의 상대적 위치 확인
-                                if current_price >= max(latest_prices):  # 가장 큰 값
-                                    latest_xytext = (30, 50)  # 우측 위로
-                                elif current_price <= min(latest_prices):  # 가장 작은 값
-                                    latest_xytext = (30, -50)  # 우측 아래로
-                                else:  # 중간값
-                                    latest_xytext = (30, 0)  # 위치 변경 없음
-                            else:
-                                # 비교할 다른 단지 데이터가 없는 경우
-                                latest_xytext = (30, 0)
-                        else:
-                            # 단일 단지인 경우
-                            latest_xytext = (30, -30)  # 우측 아래로
-
-                        
-                        # 최근 거래가 점 표시
-                        ax.scatter([monthly_latest['date']], [monthly_latest['max_price']],
-                                  color='white', edgecolor=color, s=100, linewidth=2.5, zorder=5)
-
-                        # 현재가 어노테이션 추가 (더 세련된 스타일)
-                        ann = ax.annotate(f"{monthly_latest['max_price']:,.0f}만\n({monthly_latest['date'].strftime('%y.%m')})",
-                                  xy=(monthly_latest['date'], monthly_latest['max_price']),
-                                  xytext=latest_xytext,
-                                  textcoords='offset points',
-                                  bbox=dict(boxstyle='round,pad=0.6', fc='white', alpha=0.95,
-                                           edgecolor=color, linewidth=2),
-                                  fontsize=10,
-                                  color='green',
-                                  fontweight='bold',
-                                  zorder=6,
-                                  arrowprops=dict(
-                                      arrowstyle='->',
-                                      color=color,
-                                      lw=1.5,
-                                      alpha=0.8,
-                                      connectionstyle="arc3,rad=-0.2"
-                                  ))
-                        texts_for_adjust.append(ann)
-                    
-
-            
-            # 최대/최소 가격 갱신
-            if not df.empty:
-                if df['price'].max() > max_price:
-                    max_price = df['price'].max()
-                if df['price'].min() < min_price:
-                    min_price = df['price'].min()
-                    
-            # 연복리 계산 추가
-            if len(df) >= 2:
-                first_trade = df.iloc[0]
-                last_trade = df.iloc[-1]
-                max_trade = df.loc[df['price'].idxmax()]  # 최고거래가
-                price_change = last_trade['price'] - first_trade['price']
-                years = (last_trade['date'] - first_trade['date']).days / 365.25
-                
-                if years > 0 and first_trade['price'] > 0:
-                    cagr = (((last_trade['price'] / first_trade['price'])) ** (1/years) - 1) * 100
-
-                    # 전고점 대비 하락률 계산
-                    decline_rate = 0.0
-                    if max_trade['price'] > 0:
-                        decline_rate = ((max_trade['price'] - last_trade['price']) / max_trade['price']) * 100
-
-                    # 최근 매매가 추가
-                    cagr_info.append({
-                        'apt_name': apt_name,
-                        'area': area,
-                        'color': color,
-                        'first_date': first_trade['date'],
-                        'last_date': last_trade['date'],
-                        'years': years,
-                        'first_price': first_trade['price'],
-                        'last_price': last_trade['price'],
-                        'max_price': max_trade['price'],  # 최고거래가 추가
-                        'max_date': max_trade['date'],    # 최고거래가 날짜 추가
-                        'decline_rate': decline_rate,      # 전고점 대비 하락률 추가
-                        'change': price_change,
-                        'cagr': cagr,
-                        'type': '매매',
-                        'jeonse_price': 0,  # 전세가 (기본값)
-                        'gap': 0,  # 매전갭 (기본값)
-                        'min_gap_2020': None,  # 2020년 이후 최소 갭 (기본값)
-                        'min_gap_date_2020': None  # 2020년 이후 최소 갭 날짜 (기본값)
-                    })
-        
-        # 2. 전세가 데이터 플롯 (매매가와 동일한 옵션 적용)
-        if jeonse_dfs and self.show_jeonse.get():
-            for i, df in enumerate(jeonse_dfs):
-                if df.empty:
-                    continue
-                    
-                apt_info = None
-                for apt in self.selected_apts:
-                    if apt['apt_name'] == df['apt_name'].iloc[0] and str(apt['area']) == str(df['area'].iloc[0]):
-                        apt_info = apt
-                        break
-                        
-                if not apt_info:
-                    continue
-                    
-                apt_name = apt_info['apt_name']
-                area = apt_info['area']
-                
-                color = jeonse_colors[i % len(jeonse_colors)]
-                marker = jeonse_markers[i % len(jeonse_markers)]
-                
-                # 날짜 범위 업데이트
-                if df['date'].min() < first_date:
-                    first_date = df['date'].min()
-                if df['date'].max() > last_date:
-                    last_date = df['date'].max()
-                
-                # 전세 점도표 (매매가와 동일한 옵션 적용)
-                if self.show_jeonse_scatter_plot.get():
-                    alpha = 0.5 if len(jeonse_dfs) > 1 else 0.7
-                    ax.scatter(df['date'], df['price'], 
-                              color=color, alpha=alpha, s=35, 
-                              marker=marker,
-                              label=f'{apt_name} ({area}㎡) 전세 실거래', zorder=2)
-                
-                # 월별 데이터 처리 - 매매가와 동일한 방식
-                df_sorted = df.sort_values('date')
-                df_sorted['year_month'] = df_sorted['date'].dt.strftime('%Y-%m')
-                
-                # 월별 전세 데이터 계산 (평균, 최고가)
-                monthly_data = df_sorted.groupby('year_month').agg({
-                    'date': 'first',
-                    'price': ['mean', 'max']  # 평균가와 최고가 모두 계산
-                }).reset_index()
-                
-                # 컬럼명 설정
-                monthly_data.columns = ['year_month', 'date', 'avg_price', 'max_price']
-                monthly_data = monthly_data.sort_values('date')
-                
-                # 전세 월평균가 추세선 (매매가와 동일한 옵션 적용)
-                if self.show_jeonse_monthly_avg.get() and len(monthly_data) > 0:
-                    ax.plot(monthly_data['date'], monthly_data['avg_price'], 
-                           color=color, linewidth=2, 
-                           label=f'{apt_name} ({area}㎡) 전세 월평균', zorder=3)
-                
-                # 전세 월최고가 추세선 (매매가와 동일한 옵션 적용)
-                # 전세 월최고가 추세선에도 동일한 로직 적용
-                # 전세가 어노테이션 위치 조정 부분도 유사하게 수정
-                # 전세가 어노테이션 위치 조정 부분도 유사하게 수정
-                if self.show_jeonse_monthly_max.get() and len(monthly_data) > 0:
-                    # 월 최고가 선 그래프
-                    ax.plot(monthly_data['date'], monthly_data['max_price'], 
-                           color=color, linewidth=1.5, linestyle='--', dashes=(2, 2),
-                           label=f'{apt_name} ({area}㎡) 전세 월최고가', zorder=3)
-                    
-                    # 전세 최고가 표시
-                    monthly_max_idx = monthly_data['max_price'].idxmax()
-                    monthly_max = monthly_data.iloc[monthly_max_idx]
-                    
-                    # 최근 전세가
-                    monthly_latest = monthly_data.iloc[-1]
-                    
-                    # 최고가와 최근가의 날짜 차이 계산 (6개월 이내인지 확인)
-                    date_diff = abs((monthly_latest['date'] - monthly_max['date']).days)
-                    close_dates = date_diff <= 180  # 6개월(180일) 이내
-                    
-                    # 요구사항 1, 2: 단지 수에 따른 위치 조정 (전세 최고가)
-                    # x 좌표를 기존 -40에서 -80으로 수정하여 더 왼쪽으로 이동
-                    if len(jeonse_dfs) == 2:
-                        # 2개 단지 비교일 경우: 큰 값은 위로, 작은 값은 아래로
-                        if i == 0:  # 첫 번째 단지
-                            jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
-                        else:  # 두 번째 단지
-                            jeonse_max_xytext = (-100, -30)  # 좌측 아래로 (x 값 -80)
-                    elif len(jeonse_dfs) >= 3:
-                        # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
-                        sorted_prices = sorted([df['price'].max() for df in jeonse_dfs if not df.empty])
-                        if len(sorted_prices) >= 3:
-                            if df['price'].max() == sorted_prices[-1]:  # 가장 큰 값
-                                jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
-                            elif df['price'].max() == sorted_prices[0]:  # 가장 작은 값
-                                jeonse_max_xytext = (-100, -30)  # 좌측 아래로 (x 값 -80)
-                            else:  # 중간값
-                                jeonse_max_xytext = (-100, 0)  # 좌측으로만 이동 (x 값 -80)
-                        else:
-                            # 정렬된 가격이 3개보다 적은 경우
-                            if df['price'].max() == max(sorted_prices):
-                                jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
-                            else:
-                                jeonse_max_xytext = (-100, -30)  # 좌측 아래로 (x 값 -80)
-                    else:
-                        # 단일 단지인 경우
-                        jeonse_max_xytext = (-100, 30)  # 좌측 위로 (x 값 -80)
-                    
-                    # 전세 최고가 점 표시
-                    ax.scatter([monthly_max['date']], [monthly_max['max_price']], 
-                              color='white', edgecolor=color, s=70, linewidth=2, zorder=5)
-                    
-                    # 요구사항 3: 최고가는 항상 왼쪽에 위치 (x 값 -40)
-                    ax.annotate(f"전세 {monthly_max['max_price']:,.0f}만원 (최고가)\n"
-                               f"({monthly_max['date'].strftime('%Y-%m')})",
-                               xy=(monthly_max['date'], monthly_max['max_price']),
-                               xytext=jeonse_max_xytext, 
-                               textcoords='offset points',
-                               bbox=dict(boxstyle='round,pad=0.5', fc='white', alpha=0.8, edgecolor=color),
-                               fontsize=9,
-                               color='red',
-                               fontweight='bold',
-                               zorder=6,
-                               arrowprops=dict(
-                                   arrowstyle='->',
-                                   color=color,
-                                   lw=1.2,
-                                   alpha=0.7
-                               ))
-                    
-                    # 현재가 어노테이션 표시 조건 - 최고가와 다르고, 날짜가 충분히 떨어진 경우만
-                    if monthly_latest['date'] != monthly_max['date'] and not close_dates:
-                        
-                        # 요구사항 1, 2: 단지 수에 따른 위치 조정 (전세 현재가)
-                        # 2개 단지 비교일 경우 코드 수정
-                        # 2개 단지 비교일 경우 코드 수정
-                        if len(jeonse_dfs) == 2:
-                            # 다른 단지의 인덱스 구하기
-                            other_idx = 1 if i == 0 else 0
-                            
-                            # 다른 단지의 데이터가 있는지 확인
-                            if not jeonse_dfs[other_idx].empty and len(monthly_jeonse_dfs) > other_idx:
-                                other_monthly_data = monthly_jeonse_dfs[other_idx]
-                                
-                                if not other_monthly_data.empty:
-                                    # 다른 단지의 최근 월별 데이터
-                                    other_latest = other_monthly_data.iloc[-1]
-                                    
-                                    # 현재 가격이 다른 단지보다 높으면 위로, 낮으면 아래로
-                                    if monthly_latest['max_price'] > other_latest['price']:
-                                        jeonse_latest_xytext = (30, 30)  # 우측 위로
-                                    else:
-                                        jeonse_latest_xytext = (30, -30)  # 우측 아래로
-                                else:
-                                    # 다른 단지의 월별 데이터가 없으면 기본값
-                                    jeonse_latest_xytext = (30, 0)
-                            else:
-                                # 다른 단지의 데이터가 없으면 기본값
-                                jeonse_latest_xytext = (30, 0)
-                        # 3개 이상 단지 비교: 가장 큰 값은 위로, 가장 작은 값은 아래로, 중간값은 그대로
-                        elif len(jeonse_dfs) >= 3:
-                            # 모든 단지의 최근 가격을 비교
-                            latest_prices = []
-                            
-                            for j, monthly_df in enumerate(monthly_jeonse_dfs):
-                                if j != i and not monthly_df.empty:  # 현재 단지가 아니고, 데이터가 있는 경우
-                                    latest_prices.append(monthly_df.iloc[-1]['price'])
+                                            'area': area
+                                        }
+                                        monthly_trades.append(trade)
+                        
+                        # 이번 달 데이터 개수 확인
+                        if monthly_trades:
+                            consecutive_empty_months = 0  # 데이터가 있으면 카운터 리셋
+                            trades.extend(monthly_trades)  # 전체 거래 목록에 추가
                             
-                            if latest_prices:  # 다른 단지의, 비교할 데이터가 있는 경우
-                                current_price = monthly_latest['max_price']
-                                
-                                # 모든 가격 중 현재 가격의 상대적 위치 확인
-                                if current_price >= max(latest_prices):  # 가장 큰 값
-                                    jeonse_latest_xytext = (30, 50)  # 우측 위로
-                                elif current_price <= min(latest_prices):  # 가장 작은 값
-                                    jeonse_latest_xytext = (30, -50)  # 우측 아래로
-                                else:  # 중간값
-                                    jeonse_latest_xytext = (30, 0)  # 위치 변경 없음
-                            else:
-                                # 비교할 다른 단지 데이터가 없는 경우
-                                jeonse_latest_xytext = (30, 0)
+                            # 진행 상태 업데이트
+                            self.ui.set(progress_label, text=f"{progress:.1f}% 완료 - {len(trades)}건 수집됨 ({month+1}/{max_months}개월)")
                         else:
-                            # 단일 단지인 경우
-                            jeonse_latest_xytext = (30, -30)  # 우측 아래로
-                        # 최근 전세가 점 표시
-                        ax.scatter([monthly_latest['date']], [monthly_latest['max_price']], 
-                                  color='white', edgecolor=color, s=70, linewidth=2, zorder=5)
-                        
-                        # 요구사항 3: 현재가는 항상 오른쪽에 위치
-                        ax.annotate(f"전세 {monthly_latest['max_price']:,.0f}만원\n"
-                                   f"({monthly_latest['date'].strftime('%Y-%m')})",
-                                   xy=(monthly_latest['date'], monthly_latest['max_price']),
-                                   xytext=jeonse_latest_xytext, 
-                                   textcoords='offset points',
-                                   bbox=dict(boxstyle='round,pad=0.5', fc='white', alpha=0.8, edgecolor=color),
-                                   fontsize=9, 
-                                   zorder=6,
-                                   arrowprops=dict(
-                                       arrowstyle='->',
-                                       color=color,
-                                       lw=1.2,
-                                       alpha=0.7
-                                   ))
-                    
-                    # 최근 전세가와 최고가가 다르고, 6개월 이상 차이나는 경우에만
-  
-                
-                # 전세 최대/최소 가격도 전체 그래프 범위에 포함
-                if not df.empty:
-                    if df['price'].max() > max_price:
-                        max_price = df['price'].max()
-                    if df['price'].min() < min_price:
-                        min_price = df['price'].min()
-                        
-                # 전세 연복리 계산 추가
-                if len(df) >= 2:
-                    first_trade = df.iloc[0]
-                    last_trade = df.iloc[-1]
-                    max_trade = df.loc[df['price'].idxmax()]  # 최고거래가
-                    price_change = last_trade['price'] - first_trade['price']
-                    years = (last_trade['date'] - first_trade['date']).days / 365.25
-                    
-                    if years > 0 and first_trade['price'] > 0:
-                        cagr = (((last_trade['price'] / first_trade['price'])) ** (1/years) - 1) * 100
+                            consecutive_empty_months += 1  # 데이터가 없으면 카운터 증가
                         
-                        # 전고점 대비 하락률 계산 (전세)
-                        decline_rate = 0.0
-                        if max_trade['price'] > 0:
-                            decline_rate = ((max_trade['price'] - last_trade['price']) / max_trade['price']) * 100
-
-                        # 연복리 정보 저장
-                        jeonse_info = {
-                            'apt_name': apt_name,
-                            'area': area,
-                            'color': color,
-                            'first_date': first_trade['date'],
-                            'last_date': last_trade['date'],
-                            'years': years,
-                            'first_price': first_trade['price'],
-                            'last_price': last_trade['price'],
-                            'max_price': max_trade['price'],  # 최고거래가 추가
-                            'max_date': max_trade['date'],    # 최고거래가 날짜 추가
-                            'decline_rate': decline_rate,      # 전고점 대비 하락률 추가
-                            'change': price_change,
-                            'cagr': cagr,
-                            'type': '전세'
-                        }
+                        # 일정 기간 연속으로 데이터가 없으면 조기 종료
+                        if consecutive_empty_months >= consecutive_empty_months_limit:
+                            self.ui.set(progress_label, text=f"데이터 수집 완료 - {consecutive_empty_months}개월 연속 거래 내역 없음")
+                            break
+                            
+                        # 잠시 대기하여 API 서버 부하 방지
+                        time.sleep(0.1)
                         
-                        # 매매 정보와 연결하여 매전갭 계산
-                        for j, info in enumerate(cagr_info):
-                            if info['apt_name'] == apt_name and info['area'] == area and info['type'] == '매매':
-                                cagr_info[j]['jeonse_price'] = last_trade['price']
-                                cagr_info[j]['gap'] = info['last_price'] - last_trade['price']
-
-                                # 2020년 이후 최소 갭 계산
-                                # 매매 데이터와 전세 데이터를 날짜별로 매칭
-                                maemae_df = apt_dfs[i]
-                                jeonse_df = df
-
-                                # 2020년 1월 1일 이후 데이터만 필터링
-                                cutoff_date = datetime(2020, 1, 1)
-                                maemae_2020 = maemae_df[maemae_df['date'] >= cutoff_date].copy()
-                                jeonse_2020 = jeonse_df[jeonse_df['date'] >= cutoff_date].copy()
-
-                                if not maemae_2020.empty and not jeonse_2020.empty:
-                                    # 각 매매 날짜에 대해 가장 가까운 전세가 찾기
-                                    min_gap = float('inf')
-                                    min_gap_date = None
-
-                                    for _, maemae_row in maemae_2020.iterrows():
-                                        # 해당 매매 날짜 이전의 가장 최근 전세가 찾기
-                                        recent_jeonse = jeonse_2020[jeonse_2020['date'] <= maemae_row['date']]
-                                        if not recent_jeonse.empty:
-                                            closest_jeonse = recent_jeonse.iloc[-1]  # 가장 최근 전세가
-                                            gap = maemae_row['price'] - closest_jeonse['price']
-                                            if gap < min_gap:
-                                                min_gap = gap
-                                                min_gap_date = maemae_row['date']
-
-                                    if min_gap != float('inf'):
-                                        cagr_info[j]['min_gap_2020'] = min_gap
-                                        cagr_info[j]['min_gap_date_2020'] = min_gap_date
-
-                                break
-
-                        # 전세 연복리 정보 추가
-                        cagr_info.append(jeonse_info)
-        
-        # 날짜 범위 설정 (적절한 여백 추가)
-        date_range = (last_date - first_date).days
-        date_padding = timedelta(days=date_range * 0.05)  # 5% 여백
-        ax.set_xlim(first_date - date_padding, last_date + date_padding)
-        
-        # 가격 범위 설정 (적절한 여백 추가)
-        if min_price < float('inf') and max_price > 0:
-            price_range = max_price - min_price
-            price_padding = price_range * 0.1  # 10% 여백
-            ax.set_ylim(max(0, min_price - price_padding), max_price + price_padding)
-        
-        # 차트 제목 변경 - '부태리의 실거래가 비교 분석'으로 변경
-        title_text = "부태리의 실거래가 비교 분석\n"
-        
-        # 매매가 데이터의 아파트 정보 먼저 표시
-        for i, df in enumerate(apt_dfs):
-            if not df.empty:
-                # 해당 아파트 정보 찾기
-                apt_info = None
-                for apt in self.selected_apts:
-                    if apt['apt_name'] == df['apt_name'].iloc[0] and str(apt['area']) == str(df['area'].iloc[0]):
-                        apt_info = apt
-                        break
+                    except Exception as e:
+                        print(f"API 호출 중 오류: {str(e)}")
+                        # 오류가 발생해도 계속 진행
+                        continue
                 
-                if apt_info:
-                    apt_name = apt_info['apt_name']
-                    area = apt_info['area']
-                    
-                    # 준공연도 정보가 있으면 표시
-                    build_year_text = ""
-                    if 'build_year' in apt_info and apt_info['build_year']:
-                        current_year = datetime.now().year
-                        age = current_year - int(apt_info['build_year'])
-                        build_year_text = f", {apt_info['build_year']}년 준공({age}년차)"
-                    
-                    title_text += f"{apt_name} ({area}㎡{build_year_text})"
+                # 진행 상태 100%로 설정
+                self.ui.set(progress_bar, value=100)
+                self.ui.set(progress_label, text=f"100% 완료 - 총 {len(trades)}건 수집됨")
+                
+                # 잠시 후 창 닫기
+                time.sleep(0.5)
+                if not cancel_flag[0]:
+                    self.ui.call(progress_window.destroy)
                     
-                    if i < len(apt_dfs) - 1 and i < len(apt_dfs) - 1 and not apt_dfs[i+1].empty:
-                        title_text += " vs "
+            except Exception as e:
+                self.ui.call(show_topmost_error, "오류", f"데이터 수집 중 오류 발생: {str(e)}", parent=self.root)
+                self.ui.call(progress_window.destroy)
         
-        ax.set_title(title_text, pad=20, fontsize=18, fontweight='bold')
-
-        ax.set_xlabel('', fontsize=12, labelpad=15)  # labelpad 추가로 여백 확보
-        ax.set_ylabel('가격(만원)', fontsize=12)
+        # 별도 스레드로 데이터 수집 실행
+        import threading
+        thread = threading.Thread(target=collect_data)
+        thread.daemon = True
+        thread.start()
         
-        # x축 날짜 형식 설정
-        if date_range > 365 * 5:  # 5년 이상
-            ax.xaxis.set_major_locator(mdates.YearLocator())
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-            ax.xaxis.set_minor_locator(mdates.MonthLocator([1, 7]))  # 1월, 7월에 minor tick
-        else:
-            ax.xaxis.set_major_locator(mdates.MonthLocator([1, 4, 7, 10]))  # 분기별
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-                    
-        plt.setp(ax.get_xticklabels(), rotation=-45, ha='center')
+        # 창이 닫힐 때까지 대기
+        self.root.wait_window(progress_window)
         
-        # y축 숫자 형식 설정 (천 단위 콤마)
-        import matplotlib.ticker as ticker
-        ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+        # 결과 반환
+        if cancel_flag[0]:
+            return []  # 취소된 경우 빈 목록 반환
         
-        # adjustText를 사용하여 레이블 자동 조정
-        if ADJUSTTEXT_AVAILABLE and texts_for_adjust:
-            try:
-                adjust_text(
-                    texts_for_adjust,
-                    ax=ax,
-                    arrowprops=dict(
-                        arrowstyle='->',
-                        color='gray',
-                        lw=0.5,
-                        alpha=0.5,
-                        shrinkA=5,  # 화살표 시작점을 텍스트에서 5pt 떨어뜨림
-                        shrinkB=5   # 화살표 끝점을 포인트에서 5pt 떨어뜨림
-                    ),
-                    expand_points=(1.2, 1.3),
-                    expand_text=(1.2, 1.3),
-                    force_points=(0.5, 0.5),
-                    force_text=(0.5, 0.5),
-                    avoid_self=True,
-                    only_move={'points':'y', 'text':'xy'},
-                    lim=500  # 최대 반복 횟수 제한
-                )
-            except Exception as e:
-                print(f"⚠️ adjustText 적용 중 경고 (무시 가능): {str(e)}")
-
-        # seaborn 스타일 그리드 설정
-        ax.grid(True, linestyle='--', alpha=0.3, linewidth=0.8, color='gray')
-        ax.set_axisbelow(True)  # 그리드를 데이터 아래로
-
-        # x축 tick label 패딩 추가 (테이블과 간격 확보)
-        ax.tick_params(axis='x', pad=10)
-
-        # 범례 설정 (seaborn 스타일)
-        legend = ax.legend(loc='upper left', bbox_to_anchor=(0.01, 0.99),
-                          fontsize=10, framealpha=0.95, frameon=True,
-                          fancybox=True, shadow=True,
-                          edgecolor='gray', facecolor='white')
-
-        # 2개 단지 비교 시 2020년 이후 두 단지 매매가 갭이 가장 작았던 시점 표시
-        if len(apt_dfs) == 2 and not apt_dfs[0].empty and not apt_dfs[1].empty:
-            # 2020년 이후 데이터만 필터링
-            cutoff_date = datetime(2020, 1, 1)
-            apt1_2020 = apt_dfs[0][apt_dfs[0]['date'] >= cutoff_date].copy()
-            apt2_2020 = apt_dfs[1][apt_dfs[1]['date'] >= cutoff_date].copy()
-
-            if not apt1_2020.empty and not apt2_2020.empty:
-                # 월별 평균가 계산
-                apt1_2020['year_month'] = apt1_2020['date'].dt.to_period('M')
-                apt2_2020['year_month'] = apt2_2020['date'].dt.to_period('M')
-
-                apt1_monthly = apt1_2020.groupby('year_month')['price'].mean().reset_index()
-                apt2_monthly = apt2_2020.groupby('year_month')['price'].mean().reset_index()
-
-                # 두 단지 모두 데이터가 있는 월만 비교
-                common_months = set(apt1_monthly['year_month']) & set(apt2_monthly['year_month'])
-
-                min_gap = float('inf')
-                min_gap_date = None
-                min_gap_price1 = 0
-                min_gap_price2 = 0
-
-                for month in common_months:
-                    apt1_price = apt1_monthly[apt1_monthly['year_month'] == month]['price'].iloc[0]
-                    apt2_price = apt2_monthly[apt2_monthly['year_month'] == month]['price'].iloc[0]
-                    gap = abs(apt1_price - apt2_price)
-
-                    if gap < min_gap:
-                        min_gap = gap
-                        min_gap_date = month.to_timestamp()  # Period를 Timestamp로 변환
-                        min_gap_price1 = apt1_price
-                        min_gap_price2 = apt2_price
-
-                if min_gap_date is not None:
-                    # 그래프 하단에 표시 (그래프를 가리지 않도록)
-                    avg_price = (min_gap_price1 + min_gap_price2) / 2
-                    apt1_name = apt_dfs[0]['apt_name'].iloc[0]
-                    apt2_name = apt_dfs[1]['apt_name'].iloc[0]
-
-                    # y축 범위 가져오기
-                    y_min, y_max = ax.get_ylim()
-                    y_range = y_max - y_min
-
-                    # 하단 20% 위치에 배치
-                    label_y_position = y_min + (y_range * 0.2)
-
-                    # 어노테이션 추가 (아래쪽으로 화살표)
-                    ax.annotate(
-                        f'📍 두 단지 최소 갭\n{min_gap_date.strftime("%Y.%m")}\n갭: {min_gap:,.0f}만원',
-                        xy=(min_gap_date, avg_price),
-                        xytext=(0, -120),  # 아래쪽으로 더 멀리 배치
-                        textcoords='offset points',
-                        fontsize=10,
-                        fontweight='bold',
-                        color='#E74C3C',
-                        bbox=dict(boxstyle='round,pad=0.8', facecolor='#FFF3CD',
-                                 edgecolor='#E74C3C', linewidth=2, alpha=0.95),
-                        arrowprops=dict(arrowstyle='->', color='#E74C3C', lw=2,
-                                      connectionstyle="arc3,rad=-0.3"),
-                        zorder=15,
-                        horizontalalignment='center'
-                    )
-
-        # 매매·전세가 및 수익률 정보 테이블을 그래프 아래 별도 영역에 표시
-        # ax_yield 영역 설정
-        ax_yield.axis('off')  # 축 숨기기
-
-        if cagr_info:
-            # 테이블 데이터 준비
-            headers = ['아파트', '종류', '최고거래가', '최근가격', '매전갭', '하락률', '연복리']
-            table_data = []
-
-            for info in cagr_info:
-                apt_short = info['apt_name']
-                if len(apt_short) > 12:
-                    apt_short = apt_short[:12] + ".."
+        # 결과를 날짜순으로 정렬하여 반환
+        return sorted(trades, key=lambda x: x['date'])
 
-                # 1줄로 표기: 아파트명(면적)
-                apt_label = f"{apt_short}({info['area']}㎡)"
-                trade_type = info['type']
-                # 1줄로 표기: 99,000만원
-                max_price_text = f"{info['max_price']:,.0f}만원"
-                last_price = f"{info['last_price']:,.0f}만원"
+    
+        # create_multi_chart 함수에서 time 관련 코드 수정
+    # create_multi_chart 함수의 시계열 그래프 부분 수정
+        # create_multi_chart 함수에서 표 부분 수정
 
-                gap = ''
-                if trade_type == '매매' and info['jeonse_price'] > 0:
-                    gap = f"{info['gap']:,.0f}만원"
+    def prepare_chart_request(self, apt_dfs, monthly_dfs, jeonse_dfs=None, monthly_jeonse_dfs=None):
+        """렌더링 워커에 넘길 요청 생성 - 옵션/월별 집계/단지정보는 UI 프로세스에서 준비하고 데이터는 열 단위로 전달"""
+        jeonse_dfs = jeonse_dfs or []
+        monthly_jeonse_dfs = monthly_jeonse_dfs or []
+        chart_options = {name: getattr(self, name).get() for name in CHART_OPTION_NAMES}
+        exclude_anomalies = self.exclude_anomalies.get()  # build_chart_frames()와 같은 필터 상태
+
+        # 선택 아파트 전체 월별 집계(분위수 포함)를 한 번의 그룹 연산으로 갱신
+        purchase_frames = [(self.find_selected_apt(df), df) for df in apt_dfs]
+        jeonse_frames = [(self.find_selected_apt(df), df) for df in jeonse_dfs]
+        purchase_rollups = self.get_monthly_rollups([(a, df) for a, df in purchase_frames if a], 'purchase',
+                                                    exclude_anomalies)
+        jeonse_rollups = self.get_monthly_rollups([(a, df) for a, df in jeonse_frames if a], 'jeonse',
+                                                  exclude_anomalies)
+
+        # 단지정보는 주소 검색 시 선택 대화상자가 뜰 수 있으므로 UI 프로세스에서 미리 조회
+        complex_infos = None
+        if chart_options['show_complex_info']:
+            complex_df = self.load_complex_info()
+            if complex_df is not None:
+                complex_infos = {}
+                joined_complex_rows = join_complex_info(complex_df, self.selected_apts)
+                for apt_info, df in purchase_frames:
+                    if not apt_info:
+                        continue
+                    if apt_info.get('parcel_key') in joined_complex_rows:
+                        complex_info = self._extract_complex_info(joined_complex_rows[apt_info['parcel_key']])
+                    else:
+                        complex_info = self.get_complex_info_by_address(complex_df, apt_info)
+                    complex_infos[(df['apt_name'].iloc[0], str(df['area'].iloc[0]))] = complex_info
+
+        return {
+            'options': chart_options,
+            # 거래 목록을 뺀 아파트 정보만 전달 (거래는 열 단위 데이터로 별도 전달)
+            'apts': [{k: v for k, v in apt.items() if not k.endswith('_data')} for apt in self.selected_apts],
+            'apt_frames': [frame_to_columns(df) for df in apt_dfs],
+            'monthly_frames': [frame_to_columns(df) for df in monthly_dfs],
+            'jeonse_frames': [frame_to_columns(df) for df in jeonse_dfs],
+            'monthly_jeonse_frames': [frame_to_columns(df) for df in monthly_jeonse_dfs],
+            'purchase_rollups': {key: frame_to_columns(r) for key, r in purchase_rollups.items()},
+            'jeonse_rollups': {key: frame_to_columns(r) for key, r in jeonse_rollups.items()},
+            'exclude_anomalies': exclude_anomalies,  # 월별 집계 키 구분
+            'complex_infos': complex_infos,
+            'region_cache_dir': self.region_store.cache_dir,
+            'point_budget': self.point_budget,
+            # 지역지수 입력 (저장된 지역-월 파일과 수정 시각) - 지문 계산용, 최근 월 재조회 시 차트 다시 그림
+            'region_months': {apt.get('sigungu_code'): self.region_store.stored_month_versions(
+                                  'purchase', apt.get('sigungu_code'))
+                              for apt in self.selected_apts} if chart_options['show_region_index'] else None,
+        }
 
-                # 하락률에 마이너스 기호 추가
-                decline_text = f"-{info['decline_rate']:.1f}%"
-                cagr_value = f"{info['cagr']:.1f}%"
+    def create_multi_chart(self, apt_dfs, monthly_dfs, jeonse_dfs, monthly_jeonse_dfs, on_done):
+        """여러 아파트 비교 차트 생성 - 렌더링 워커 프로세스에서 그리고 저장 (같은 요청은 캐시된 이미지 사용)
+        바로 반환하고 미리보기 완료 시 UI 스레드에서 on_done(image_path, error) 호출 (UI 스레드를 막지 않음)"""
+        request = self.prepare_chart_request(apt_dfs, monthly_dfs, jeonse_dfs, monthly_jeonse_dfs)
+        fingerprint = chart_request_fingerprint(request)
+        filename = multi_chart_filename(apt_dfs, request['options'], fingerprint)
+
+        profile_name = self.render_profile if self.render_profile in RENDER_PROFILES else DEFAULT_RENDER_PROFILE
+        profile = RENDER_PROFILES[profile_name]
+        export_path = os.path.join(self.download_path, filename)
+        # 차트와 같은 이름의 비교 엑셀 (전체 단지 매매/전세/월별 집계/요약) - 엑셀 저장 대기열에서 작성
+        workbook_path = os.path.splitext(export_path)[0] + ".xlsx"
+        self.excel_queue.submit(workbook_path, fingerprint, workbook_path, write_comparison_workbook,
+                                (request, workbook_path))
+        # 고해상도 내보내기가 있으면 미리보기는 히스토리 제외 파일로 저장
+        # (요청 지문별 파일이라 동시에 렌더링하는 다른 차트와 겹치지 않음)
+        if profile['export_dpi']:
+            prune_preview_files(self.download_path)
+            preview_path = os.path.join(self.download_path, preview_filename(fingerprint))
+        else:
+            preview_path = export_path
+        submitted = time.perf_counter()
 
-                table_data.append([apt_label, trade_type, max_price_text, last_price, gap, decline_text, cagr_value])
+        def log_timing(stage, result):
+            if result.get('cached'):
+                print(f"⏱ 렌더링 [{profile_name}] {stage} {result['dpi']}dpi: 캐시 사용 "
+                      f"({time.perf_counter() - submitted:.2f}초, {fingerprint[:8]})")
+                return
+            print(f"⏱ 렌더링 [{profile_name}] {stage} {result['dpi']}dpi (pid {result['pid']}): "
+                  f"그리기 {result['draw_seconds']:.2f}초, 저장 {result['save_seconds']:.2f}초, "
+                  f"요청부터 {time.perf_counter() - submitted:.2f}초")
+
+        def render(path, dpi, callback):
+            # 같은 지문/해상도 이미지가 캐시에 있으면 렌더링 없이 복사
+            # (고해상도 이미지 복사로 UI가 멈추지 않도록 캐시 확인/복사는 작업 스레드에서, callback도 작업 스레드에서 호출)
+            key = f"{fingerprint}_{dpi}"
+
+            def on_rendered(result, error):
+                if error is None:
+                    self.chart_cache.store(key, path)
+                callback(result, error)
+
+            def fetch_or_render():
+                if self.chart_cache.fetch(key, path):
+                    callback({'path': path, 'dpi': dpi, 'cached': True}, None)
+                    return
+                self.chart_renderer.render(request, path, dpi, on_rendered)
+
+            threading.Thread(target=fetch_or_render, daemon=True).start()
+
+        def record_history():
+            # 저장된 차트를 히스토리 색인에 기록 (파일명 해석 없이 요청 정보 그대로)
+            display = " vs ".join(f"{apt['apt_name']} ({apt['area']}㎡)" for apt in request['apts'])
+            self.record_history(export_path, "다중 아파트 비교 분석", display, 'multi', request['apts'],
+                                request['options'], fingerprint, excel_path=workbook_path)
+
+        def on_preview(result, error):
+            if error is None:
+                log_timing('미리보기' if profile['export_dpi'] else '저장', result)
+                if not profile['export_dpi']:
+                    record_history()
+                    self.chart_renderer.submit(build_image_pyramid, (export_path,))  # 팝업/히스토리 미리보기용
+            else:
+                print(f"⚠️ 차트 렌더링 실패: {str(error)}")
+            self.safe_after(0, lambda: finish_preview(error))
+
+        def finish_preview(error):
+            # 완료된 차트 기준으로 현재 이미지 경로 갱신 (UI 스레드)
+            if error is None:
+                self.image_path = preview_path
+            on_done(preview_path if error is None else None, error)
+
+        def on_exported(result, error):
+            if error is not None:
+                print(f"⚠️ 고해상도 이미지 저장 실패: {str(error)}")
+                return
+            log_timing('내보내기', result)
+            record_history()
 
-            # matplotlib 테이블 생성
-            table = ax_yield.table(cellText=table_data,
-                                   colLabels=headers,
-                                   cellLoc='center',
-                                   loc='center',
-                                   bbox=[0, 0, 1, 1])
+            def refresh_history(*_):
+                self.history_list = self.load_history()
+                self.update_history_display()
+                self.status_label.config(text=f"💾 고해상도 이미지 저장 완료: {filename}")
 
-            # 테이블 스타일 설정
-            table.auto_set_font_size(False)
-            table.set_fontsize(10)
-            table.scale(1, 1.8)  # 행 높이 조정 (1줄 표기이므로 낮춤)
-
-            # 헤더 스타일
-            for i in range(len(headers)):
-                cell = table[(0, i)]
-                cell.set_facecolor('#4472C4')
-                cell.set_text_props(weight='bold', color='white', fontsize=11)
-                cell.set_edgecolor('white')
-                cell.set_linewidth(1.5)
-
-            # 데이터 셀 스타일
-            for i in range(len(table_data)):
-                # 배경색 교대로 설정
-                bg_color = '#f5f5f5' if i % 2 == 0 else 'white'
-
-                for j in range(len(headers)):
-                    cell = table[(i+1, j)]
-
-                    # 첫 번째 열(아파트명)은 아파트 색상으로 표시
-                    if j == 0:
-                        cell.set_facecolor(cagr_info[i]['color'])
-                        cell.set_text_props(weight='bold', color='white', fontsize=10)
-                    # 두 번째 열(종류)은 매매/전세 구분하여 눈에 띄는 색상
-                    elif j == 1:
-                        trade_type = table_data[i][1]
-                        if trade_type == '매매':
-                            cell.set_facecolor('#E74C3C')  # 빨간색 (매매)
-                            cell.set_text_props(weight='bold', color='white', fontsize=11)
-                        else:  # 전세
-                            cell.set_facecolor('#3498DB')  # 파란색 (전세)
-                            cell.set_text_props(weight='bold', color='white', fontsize=11)
-                    else:
-                        cell.set_facecolor(bg_color)
-                        cell.set_text_props(color='black', fontsize=9.5)
-
-                    cell.set_edgecolor('#cccccc')
-                    cell.set_linewidth(0.5)
-
-            # 테이블 제목
-            ax_yield.text(0.5, 1.05, '매매·전세가 및 수익률 정보',
-                         transform=ax_yield.transAxes,
-                         fontsize=12, fontweight='bold',
-                         horizontalalignment='center',
-                         verticalalignment='bottom')
-
-        # 단지세부정보가 선택된 경우에만 하단 테이블 표시
-        if self.show_complex_info.get():
-            # 단지정보 테이블 생성 함수 - 가격 정보 제외
-            # create_multi_chart 함수 내에서 단지정보 테이블 생성 함수 수정
-            def create_complex_info_table():
-                """단지정보 테이블 데이터 생성 - 가격 정보 제외"""
-                table_data = []
-                # 기본 헤더에서 가격 정보 제외
-                headers = ['아파트명']
-                
-                # 세부정보 가져오기가 선택된 경우만 추가 헤더
-                if self.show_complex_info.get() and complex_df is not None:
-                    headers.extend(['단지분류', '동수/세대수/최고층', '임대세대', '난방방식', '시공사', '주차대수'])
-                
-                for i, df in enumerate(apt_dfs):
-                    if df.empty:
-                        continue
-                        
-                    apt_name = df['apt_name'].iloc[0]
-                    area = df['area'].iloc[0]
-                    
-                    # 기본 정보만 담은 데이터 구성 (가격 정보 제외)
-                    row_data = [
-                        f"{apt_name} ({area}㎡)"
-                    ]
-                    
-                    # 세부정보 가져오기가 선택된 경우만 추가 정보 조회
-                    if self.show_complex_info.get() and complex_df is not None:
-                        # 아파트 정보 전체 전달
-                        apt_info = None
-                        for apt in self.selected_apts:
-                            if apt['apt_name'] == apt_name and str(apt['area']) == str(area):
-                                apt_info = apt
-                                break
-                        
-                        if apt_info:
-                            complex_info = self.get_complex_info_by_address(complex_df, apt_info)
-                            
-                            if complex_info:
-                                # 동수/세대수/최고층 정보 결합
-                                building_info = f"{complex_info.get('n', 0)}동/"
-                                building_info += f"{complex_info.get('o', 0)}세대/"
-                                building_info += f"{complex_info.get('bo', 0)}층"
-                                
-                                # 단지분류 정보
-                                complex_type = complex_info.get('g', '-')
-                                
-                                # 임대세대수
-                                rental_units = complex_info.get('q', '-')
-                                
-                                # 난방방식
-                                heating_system = complex_info.get('u', '-')
-                                
-                                # 시공사
-                                constructor = complex_info.get('w', '-')
-                                
-                                # 주차대수 (세대당 주차대수 비율 추가)
-                                parking_spots = complex_info.get('ba', '-')
-                                total_households = complex_info.get('o', 0)
-                                
-                                # 주차대수와 세대당 주차대수 비율 계산
-                                parking_ratio = "-"
-                                if parking_spots != '-' and total_households and int(total_households) > 0:
-                                    try:
-                                        # 문자열 타입인 경우를 대비해 정수로 변환
-                                        parking_spots_num = int(parking_spots)
-                                        total_households_num = int(total_households)
-                                        if total_households_num > 0:
-                                            ratio = parking_spots_num / total_households_num
-                                            parking_ratio = f"{parking_spots}(세대당 주차대수 {ratio:.1f})"
-                                        else:
-                                            parking_ratio = f"{parking_spots}"
-                                    except (ValueError, TypeError):
-                                        parking_ratio = f"{parking_spots}"
-                                else:
-                                    parking_ratio = f"{parking_spots}"
-                            else:
-                                # 단지정보를 찾을 수 없는 경우 기본값
-                                building_info = "-/-/-"
-                                complex_type = "-"
-                                rental_units = "-"
-                                heating_system = "-"
-                                constructor = "-"
-                                parking_ratio = "-"
-                        else:
-                            # 아파트 정보를 찾을 수 없는 경우 기본값
-                            building_info = "-/-/-"
-                            complex_type = "-"
-                            rental_units = "-"
-                            heating_system = "-"
-                            constructor = "-"
-                            parking_ratio = "-"
-                        
-                        # 세부정보 추가
-                        row_data.extend([
-                            complex_type,          # 단지분류
-                            building_info,         # 동수/세대수/최고층
-                            str(rental_units),     # 임대세대수
-                            heating_system,        # 난방방식
-                            constructor,           # 시공사
-                            parking_ratio          # 주차대수(세대당 주차대수 x.x)
-                        ])
-                    
-                    table_data.append(row_data)
-                
-                return table_data, headers
-    
-            # 상세 정보 및 통계 테이블 (단지세부정보가 선택된 경우에만)
-            stats_ax = fig.add_subplot(gs[13:18, 0])  # GridSpec의 13-17행 (5행) 사용
-            stats_ax.axis('off')
-            
-            # 단지정보 테이블 데이터 생성
-            table_data, headers = create_complex_info_table()
-            
-            # 테이블 생성
-            if table_data:
-                table = stats_ax.table(
-                    cellText=table_data,
-                    colLabels=headers,
-                    loc='center',
-                    cellLoc='center',
-                    colColours=['#f2f2f2'] * len(headers),
-                    cellColours=[['#ffffff' if i % 2 == 0 else '#f9f9f9' for j in range(len(headers))] for i in range(len(table_data))]
-                )
-                
-                # 테이블 스타일 조정
-                table.auto_set_font_size(False)
-                table.set_fontsize(9)
-                table.scale(1, 1.5)  # 행 높이 조정
-                
-                # 열 너비 자동 조정
-                for key, cell in table.get_celld().items():
-                    cell.set_linewidth(0.5)
-                    cell.set_edgecolor('#cccccc')
-                    
-                    # 열별 너비 설정
-                    if key[1] == 0:  # 아파트명
-                        cell.set_width(0.18)
-                    elif key[1] == 1:  # 단지분류
-                        cell.set_width(0.10)
-                    elif key[1] == 2:  # 동수/세대수/최고층
-                        cell.set_width(0.15)
-                    elif key[1] == 3:  # 임대세대
-                        cell.set_width(0.10)
-                    elif key[1] == 4:  # 난방방식
-                        cell.set_width(0.12)
-                    elif key[1] == 5:  # 시공사
-                        cell.set_width(0.15)
-                    elif key[1] == 6:  # 주차대수
-                        cell.set_width(0.20)
-        
-        # 워터마크 추가 (그래프 우측 하단에 위치)
-        ax.text(0.99, 0.01,
-                f'만든이 부태리 : https://blog.naver.com/landlover333',
-                fontsize=12,
-                color='#3366CC',
-                alpha=0.7,
-                transform=ax.transAxes,
-                verticalalignment='bottom',
-                horizontalalignment='right',
-                fontweight='bold',
-                bbox=dict(facecolor='white', alpha=0.6, pad=3, boxstyle='round,pad=0.5'),
-                zorder=10
-               )
+            # 팝업/히스토리 미리보기용 피라미드 생성 후 히스토리 갱신
+            self.chart_renderer.submit(build_image_pyramid, (export_path,),
+                                       lambda *_: self.safe_after(0, refresh_history))
 
-        # GridSpec 여백 조정은 이미 hspace=0.3으로 설정됨
-        # plt.tight_layout()은 GridSpec과 충돌할 수 있으므로 사용하지 않음
-        
-        # 파일명 생성 및 이미지 저장
-        filename = "multi_apt_comparison_"
-        for i, df in enumerate(apt_dfs):
-            if not df.empty:
-                apt_name = df['apt_name'].iloc[0]
-                area = df['area'].iloc[0]
-                apt_name_clean = ''.join(char for char in apt_name if char.isalnum() or char.isspace())
-                apt_name_clean = apt_name_clean.replace(' ', '_')
-                filename += f"{apt_name_clean}_{area}m2"
-                
-                # 다음 아파트가 있는 경우에만 vs 추가
-                if i < len(apt_dfs) - 1 and not apt_dfs[i+1].empty:
-                    filename += "_vs_"
-        
-        # 그래프 옵션을 파일명에 추가
-        options = []
-        if self.show_monthly_avg.get():
-            options.append("avg")
-        if self.show_monthly_max.get():
-            options.append("max")
-        if self.show_scatter_plot.get():
-            options.append("scatter")
-        if self.show_jeonse.get():
-            options.append("jeonse")
-            
-        if options:
-            filename += "_" + "_".join(options)
-        
-        filename += ".jpg"
-        
-        self.image_path = os.path.join(self.download_path, filename)
-        
-        # 이미지 저장
-        plt.savefig(self.image_path, bbox_inches='tight', dpi=600, pad_inches=0.3)
-        plt.close('all')  # 모든 figure 완전히 닫기
-        gc.collect()  # 가비지 컬렉션으로 메모리 정리
+        render(preview_path, profile['preview_dpi'], on_preview)
+        if profile['export_dpi']:
+            # 고해상도 내보내기는 다른 워커에서 동시에 렌더링
+            render(export_path, profile['export_dpi'], on_exported)
+        return preview_path
 
-        return self.image_path
-                    
     def _extract_complex_info(self, row):
         """단지정보 추출 헬퍼 함수"""
         complex_info = {
@@ -5393,6 +8487,15 @@ class RealEstateAnalyzerApp:
             print(f"[디버그] 법정동: {dong}")
             print(f"[디버그] 지번주소: {jibun_addr}")
             print(f"[디버그] 전체 엑셀 데이터 행 수: {len(complex_df)}")
+
+            # 필지 키 조인 먼저 시도 (문자열 포함 검색보다 빠르고 모호하지 않음)
+            parcel_key = apt_info.get('parcel_key')
+            if parcel_key and 'parcel_key' in complex_df.columns:
+                joined = join_complex_info(complex_df, [apt_info])
+                if parcel_key in joined:
+                    print(f"[디버그] 필지 키 매칭 성공: {parcel_key}")
+                    return self._extract_complex_info(joined[parcel_key])
+                print(f"[디버그] 필지 키 매칭 실패: {parcel_key} - 주소 검색으로 대체")
             
             # 법정동+번지로 단지 찾기
             matching_address = f"{dong} {jibun_addr}" if jibun_addr else dong
@@ -5461,6 +8564,260 @@ class RealEstateAnalyzerApp:
 
 
 
+    def show_area_comparison(self):
+        """선택한 아파트의 모든 전용면적 거래를 한 번에 수집해 면적별 비교 차트 생성"""
+        if not self.selected_apts:
+            show_topmost_error("오류", "선택된 아파트가 없습니다.", parent=self.root)
+            return
+
+        selection = self.selected_apt_listbox.curselection()
+        apt_info = dict(self.selected_apts[selection[0] if selection else 0])
+        include_jeonse = self.collect_jeonse_data.get()
+        exclude_anomalies = self.exclude_anomalies.get()
+
+        self.area_compare_button.config(state="disabled", text="🔄 면적별 수집 중...")
+        self.update_progress(10, f"📐 {apt_info['apt_name']} 전체 면적 거래 수집 중...")
+
+        def background_collection():
+            try:
+                started = time.perf_counter()
+                purchase_areas = self.collect_complex_all_areas(apt_info, "purchase")
+                jeonse_areas = self.collect_complex_all_areas(apt_info, "jeonse") if include_jeonse else []
+                print(f"⏱ 면적별 수집: {apt_info['apt_name']} {len(purchase_areas)}개 면적 "
+                      f"({time.perf_counter() - started:.2f}초)")
+            except Exception as e:
+                print(f"면적별 수집 중 오류: {str(e)}")
+                error_message = str(e)
+                self.safe_after(0, lambda: finish(None, None, error_message))
+                return
+            self.safe_after(0, lambda: finish(purchase_areas, jeonse_areas))
+
+        def to_frames(areas):
+            frames = []
+            for bucket, label, trades in areas:
+                df = pd.DataFrame(trades)
+                if df.empty:
+                    continue
+                if exclude_anomalies:
+                    df = df[~anomaly_mask(df)].reset_index(drop=True)
+                if len(df) > 0:
+                    frames.append((bucket, label, df))
+            return frames
+
+        def finish(purchase_areas, jeonse_areas, error_message=None):
+            if purchase_areas is None:
+                self.area_compare_button.config(state="normal", text="📐 면적별 비교")
+                self.update_progress(0, "")
+                show_topmost_error("오류", f"면적별 수집 중 오류 발생: {error_message}", parent=self.root)
+                return
+
+            area_dfs = to_frames(purchase_areas)
+            if not area_dfs:
+                self.area_compare_button.config(state="normal", text="📐 면적별 비교")
+                self.update_progress(0, "")
+                show_topmost_info("알림", f"{apt_info['apt_name']}의 매매 거래가 없습니다.", parent=self.root)
+                return
+
+            # 면적별 차트는 렌더링 워커에서 그려 저장 (UI 스레드는 결과 파일만 열기, 버튼은 완료 후 활성화)
+            self.update_progress(80, "📊 면적별 비교 그래프 생성 중...")
+            options = {name: getattr(self, name).get()
+                       for name in ('show_scatter_plot', 'show_monthly_avg', 'show_monthly_max', 'show_jeonse')}
+            safe_name = re.sub(r'[\\/:*?"<>|\s]+', '_', apt_info['apt_name']).strip('_')
+            image_path = os.path.join(self.download_path, f"area_comparison_{safe_name}.jpg")
+            self.chart_renderer.submit(
+                render_area_comparison_chart,
+                (image_path, 200, {k: v for k, v in apt_info.items() if not k.endswith('_data')},  # 거래 목록 제외
+                 area_dfs, to_frames(jeonse_areas), options, self.point_budget),
+                lambda result, error: self.safe_after(0, lambda: on_rendered(area_dfs, result, error)))
+
+        def on_rendered(area_dfs, result, error):
+            # 렌더링 워커 완료 후 UI 스레드에서 호출
+            self.area_compare_button.config(state="normal", text="📐 면적별 비교")
+            if error is not None:
+                self.update_progress(0, "")
+                show_topmost_error("오류", f"면적별 비교 그래프 생성 중 오류 발생: {str(error)}", parent=self.root)
+                return
+            image_path = result['path']
+            print(f"⏱ 면적별 비교 차트: 그리기 {result['draw_seconds']:.2f}초, 저장 {result['save_seconds']:.2f}초")
+            self.image_path = image_path
+            self.record_history(image_path, "단지 면적별 비교", f"{apt_info['apt_name']} (전체 면적)",
+                                apts=[apt_info], options={'areas': [label for _, label, _ in area_dfs]})
+            self.chart_renderer.submit(build_image_pyramid, (image_path,))  # 팝업/히스토리 미리보기용
+            self.update_progress(100, f"✅ {len(area_dfs)}개 면적 비교 완료")
+            if os.path.exists(image_path):
+                os.startfile(image_path)
+            self.history_list = self.load_history()
+            self.update_history_display()
+            self.root.after(3000, lambda: self.update_progress(0, ""))
+
+        threading.Thread(target=background_collection, daemon=True).start()
+
+    def resolve_region_lawd_code(self, sido, sigungu, dong):
+        """선택된 지역 -> (시군구코드 5자리, 동 필터) 변환 - 동 미선택/구 선택 시 동 필터 없음"""
+        if "선택" in [sido, sigungu]:
+            return None, None
+
+        original_si = sigungu.replace('(경)', '').replace('(충)', '').replace('(전)', '').strip()
+        if sigungu in self.sigungu_to_full_info:
+            _, original_si, _ = self.sigungu_to_full_info[sigungu]
+
+        # 구 선택 (구 전체)
+        if dong.endswith('구') and not dong.startswith("  └ "):
+            gu_code = getattr(self, 'gu_info', {}).get(f"{sido}_{original_si}_{dong}")
+            if gu_code:
+                return gu_code, None
+
+        # 하위 동 ("  └ 동") - 상위 구 코드 사용
+        if dong.startswith("  └ "):
+            sub_dong = dong.replace("  └ ", "").strip()
+            dong_list = list(self.dong_combobox['values'])
+            parent_gu = None
+            if dong in dong_list:
+                for item in reversed(dong_list[:dong_list.index(dong)]):
+                    if not item.startswith("  └ ") and item.endswith('구'):
+                        parent_gu = item
+                        break
+            if parent_gu:
+                gu_code = getattr(self, 'gu_info', {}).get(f"{sido}_{original_si}_{parent_gu}")
+                if gu_code:
+                    return gu_code, sub_dong
+                region_code = self.region_codes.get(f"{original_si}_{parent_gu}_{sub_dong}")
+                if region_code:
+                    return region_code[1], sub_dong
+            dong = sub_dong
+
+        # 일반 동
+        if "선택" not in dong:
+            region_code = self.region_codes.get((sido, sigungu, dong))
+            if region_code:
+                return region_code[1], dong
+
+        # 시군구 전체
+        if sigungu in self.sigungu_to_full_info:
+            _, _, sigungu_code = self.sigungu_to_full_info[sigungu]
+            return sigungu_code, (None if "선택" in dong or dong.endswith('구') else dong)
+        return None, None
+
+    def show_bulk_compare_dialog(self):
+        """단지 일괄 비교 설정 창 - 선택 지역의 여러 단지를 같은 면적 기준으로 순위 비교"""
+        sido = self.sido_combobox.get()
+        sigungu = self.sigungu_combobox.get()
+        dong = self.dong_combobox.get()
+
+        lawd_cd, dong_filter = self.resolve_region_lawd_code(sido, sigungu, dong)
+        if not lawd_cd:
+            show_topmost_error("오류", "시/도와 시/군/구를 선택해주세요.\n(읍/면/동을 선택하지 않으면 시/군/구 전체를 비교합니다)", parent=self.root)
+            return
+
+        region_label = f"{sigungu} {dong_filter}" if dong_filter else sigungu
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("단지 일괄 비교")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.resizable(False, False)
+
+        ttk.Label(dialog, text=f"📍 {region_label}", font=self.font_large).grid(row=0, column=0, columnspan=2, padx=15, pady=(15, 10), sticky="w")
+
+        area_var = tk.StringVar(value="84")
+        years_var = tk.StringVar(value="10")
+        min_trades_var = tk.StringVar(value="3")
+        max_complexes_var = tk.StringVar(value="50")
+
+        fields = [("전용면적(㎡):", area_var), ("조회 기간(년):", years_var),
+                  ("최소 거래수:", min_trades_var), ("최대 단지수:", max_complexes_var)]
+        for row, (label, var) in enumerate(fields, start=1):
+            ttk.Label(dialog, text=label).grid(row=row, column=0, padx=15, pady=5, sticky="w")
+            ttk.Entry(dialog, textvariable=var, width=10).grid(row=row, column=1, padx=15, pady=5, sticky="w")
+
+        def start_compare():
+            try:
+                target_area = float(area_var.get())
+                years = int(years_var.get())
+                min_trades = int(min_trades_var.get())
+                max_complexes = int(max_complexes_var.get())
+            except ValueError:
+                show_topmost_error("오류", "숫자를 입력해주세요.", parent=dialog)
+                return
+            dialog.destroy()
+            self.run_bulk_compare(lawd_cd, dong_filter, region_label, target_area, years, min_trades, max_complexes)
+
+        ttk.Button(dialog, text="비교 시작", command=start_compare,
+                   style='Accent.TButton').grid(row=len(fields) + 1, column=0, columnspan=2, pady=15)
+
+    def run_bulk_compare(self, lawd_cd, dong_filter, region_label, target_area, years, min_trades, max_complexes):
+        """지역-월 저장소에서 거래를 모아 단지별 지표 계산 후 비교 차트 생성 (백그라운드)"""
+        self.bulk_compare_button.config(state="disabled", text="🔄 단지 비교 중...")
+        self.update_progress(5, f"🏘 {region_label} 거래 데이터 준비 중...")
+
+        end_date = datetime.now()
+        months = month_range(end_date.replace(year=end_date.year - years, day=1), end_date)
+
+        def on_progress(done, total):
+            self.safe_after(0, lambda: self.update_progress(5 + int(done / total * 75),
+                                                            f"🏘 지역 거래 조회 중... ({done}/{total}개월)"))
+
+        def background_compare():
+            try:
+                started = time.perf_counter()
+                region_df = self.region_store.get_months("purchase", lawd_cd, months, progress_callback=on_progress)
+                ranking, monthly_pivot, region_monthly = compare_complexes(
+                    region_df, dong=dong_filter, target_area=target_area,
+                    min_trades=min_trades, max_complexes=max_complexes)
+                print(f"⏱ 단지 일괄 비교 계산: {len(region_df):,}건 → {len(ranking)}개 단지 ({time.perf_counter() - started:.2f}초)")
+            except Exception as e:
+                print(f"단지 일괄 비교 중 오류: {str(e)}")
+                error_message = str(e)
+                self.safe_after(0, lambda: finish(None, error_message))
+                return
+            self.safe_after(0, lambda: finish((ranking, monthly_pivot, region_monthly)))
+
+        def finish(result, error_message=None):
+            if result is None:
+                self.bulk_compare_button.config(state="normal", text="🏘 단지 일괄 비교")
+                self.update_progress(0, "")
+                show_topmost_error("오류", f"단지 비교 중 오류 발생: {error_message}", parent=self.root)
+                return
+
+            ranking, monthly_pivot, region_monthly = result
+            if ranking.empty:
+                self.bulk_compare_button.config(state="normal", text="🏘 단지 일괄 비교")
+                self.update_progress(0, "")
+                show_topmost_info("알림", f"{region_label}에 {target_area:g}㎡ 거래가 {min_trades}건 이상인 단지가 없습니다.", parent=self.root)
+                return
+
+            # 비교 차트는 렌더링 워커에서 그려 저장 (UI 스레드는 결과 파일만 열기, 버튼은 완료 후 활성화)
+            self.update_progress(85, "📊 비교 그래프 생성 중...")
+            safe_region = re.sub(r'[\\/:*?"<>|\s]+', '_', region_label).strip('_')
+            image_path = os.path.join(self.download_path, f"bulk_comparison_{safe_region}_{target_area:g}m2.jpg")
+            self.chart_renderer.submit(
+                render_comparison_chart,
+                (image_path, 200, ranking, monthly_pivot, region_monthly, region_label, target_area),
+                lambda result, error: self.safe_after(0, lambda: on_rendered(ranking, result, error)))
+
+        def on_rendered(ranking, result, error):
+            # 렌더링 워커 완료 후 UI 스레드에서 호출
+            self.bulk_compare_button.config(state="normal", text="🏘 단지 일괄 비교")
+            if error is not None:
+                self.update_progress(0, "")
+                show_topmost_error("오류", f"비교 그래프 생성 중 오류 발생: {str(error)}", parent=self.root)
+                return
+            image_path = result['path']
+            print(f"⏱ 단지 일괄 비교 차트: 그리기 {result['draw_seconds']:.2f}초, 저장 {result['save_seconds']:.2f}초")
+            self.image_path = image_path
+            self.record_history(image_path, "단지 일괄 비교", f"{region_label} {target_area:g}㎡",
+                                regions=[region_label],
+                                options={'target_area': target_area, 'complexes': list(ranking['label'])})
+            self.chart_renderer.submit(build_image_pyramid, (image_path,))  # 팝업/히스토리 미리보기용
+            self.update_progress(100, f"✅ {len(ranking)}개 단지 비교 완료")
+            if os.path.exists(image_path):
+                os.startfile(image_path)
+            self.history_list = self.load_history()
+            self.update_history_display()
+            self.root.after(3000, lambda: self.update_progress(0, ""))
+
+        threading.Thread(target=background_compare, daemon=True).start()
+
     def show_apt_list(self):
         """아파트 목록 조회 및 표시 (구 선택 시 모든 동 조회 기능 추가)"""
         # 버튼 비활성화 및 텍스트 변경
@@ -5764,24 +9121,8 @@ class RealEstateAnalyzerApp:
         # 메인 그래프 영역
         ax = plt.subplot2grid((10, 1), (0, 0), rowspan=7)
         
-        # 월 단위로 데이터 그룹화하여 평균 및 최대값 계산
-        # 날짜 기준으로 정렬
-        df_sorted = df.sort_values('date')
-        
-        # 월별 고유 값 추출(년-월 형식)
-        df_sorted['year_month'] = df_sorted['date'].dt.strftime('%Y-%m')
-        
-        # 월별 데이터 계산
-        monthly_data = df_sorted.groupby('year_month').agg({
-            'date': 'first',  # 각 월의 첫 날짜
-            'price': ['mean', 'max']  # 평균가와 최고가
-        }).reset_index()
-        
-        # 컬럼 이름 재설정
-        monthly_data.columns = ['year_month', 'date', 'avg_price', 'max_price']
-        
-        # 날짜 순서로 정렬
-        monthly_data = monthly_data.sort_values('date')
+        # 월별 평균가/최고가 (분석 엔진 - 데이터가 같으면 캐시된 결과 사용)
+        monthly_data = monthly_price_stats(df)
 
         # 차트 설정 - 준공연도 정보 추가
         apt_info = self.selected_apt_info
@@ -5986,6 +9327,8 @@ class RealEstateAnalyzerApp:
         # 이미지 저장
         plt.savefig(self.image_path, bbox_inches='tight', dpi=600, pad_inches=0.3)
         plt.close('all')  # 모든 figure 완전히 닫기
+        self.record_history(self.image_path, "아파트 실거래가 분석", f"{apt_info['apt_name']} ({apt_info['area']}㎡)",
+                            apts=[apt_info])
         gc.collect()  # 가비지 컬렉션으로 메모리 정리
 
         return self.image_path
@@ -6000,13 +9343,13 @@ class RealEstateAnalyzerApp:
             # 엑셀 파일에 저장
             self.save_analysis_result_to_excel(df)
             
-            # 히스토리에 추가
-            history_filename = f"history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            history_path = os.path.join(self.history_path, history_filename)
-            
-            # 히스토리용 파일 복사
+            # 히스토리에 추가 (같은 데이터는 다시 저장하지 않음)
             if os.path.exists(self.excel_path):
-                shutil.copy2(self.excel_path, history_path)
+                history_key = f"history_{apt_info['apt_name'].replace(' ', '_')}_{apt_info['area']}_분석"
+                digest = hashlib.blake2b(digest_size=16)
+                _hash_value(digest, [history_key, dataset_fingerprint(df, tuple(df.columns))])
+                self.history_store.add(self.excel_path, history_key, digest.hexdigest(),
+                                       f"{history_key}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
             
             # 히스토리 리스트 갱신
             self.history_list = self.load_history()
@@ -6052,18 +9395,8 @@ class RealEstateAnalyzerApp:
             info_df.to_excel(writer, sheet_name='기본정보', header=False, index=False)
             
             
-            # 거래 데이터 시트 생성
-            if not df.empty:
-                trade_df = df.copy()
-                trade_df['date'] = trade_df['date'].dt.strftime('%Y-%m-%d')
-                trade_df.columns = ['거래일자', '가격(만원)', '층', '면적(㎡)']
-                trade_df = trade_df.sort_values('거래일자', ascending=False)
-                
-                trade_df.to_excel(writer, sheet_name='거래내역', index=False)
-            else:
-                # 빈 데이터프레임 저장
-                empty_df = pd.DataFrame(columns=['거래일자', '가격(만원)', '층', '면적(㎡)'])
-                empty_df.to_excel(writer, sheet_name='거래내역', index=False)
+            # 거래 데이터 시트 생성 (빈 데이터면 컬럼명만)
+            apt_workbook_trades(df, "purchase").to_excel(writer, sheet_name='거래내역', index=False)
             
             # 엑셀 파일 저장
             writer.close()
@@ -6077,6 +9410,194 @@ class RealEstateAnalyzerApp:
             return None
 
 
+class PyramidImageView:
+    """이미지 피라미드 뷰어 - 화면 맞춤은 화면 크기 이미지 한 장, 확대 시 보이는 영역의 타일만 로드"""
+
+    def __init__(self, canvas, image_path, manifest):
+        self.canvas = canvas
+        self.base_dir = pyramid_dir(image_path)
+        self.tile_size = manifest['tile_size']
+        self.levels = manifest['levels']  # 0단계 = 원본 해상도
+        self.full_width = self.levels[0]['width']
+        self.full_height = self.levels[0]['height']
+        self.zoom = None  # 원본 대비 배율 (None이면 화면 맞춤)
+        self.tile_images = {}  # (단계, 열, 행) -> PhotoImage (참조 유지)
+
+        canvas.bind('<Configure>', lambda e: self.fit() if self.zoom is None else self.load_visible_tiles())
+        canvas.bind('<Control-MouseWheel>', lambda e: self.zoom_by(1.25 if e.delta > 0 else 0.8))
+        canvas.bind('<MouseWheel>', lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+
+    def fit_zoom(self):
+        """창에 맞는 배율"""
+        width = max(self.canvas.winfo_width(), 100)
+        height = max(self.canvas.winfo_height(), 100)
+        return min(width / self.full_width, height / self.full_height)
+
+    def fit(self):
+        """화면 맞춤 - 화면 크기 단계 이미지 한 장만 축소해 표시"""
+        self.zoom = None
+        zoom = self.fit_zoom()
+        with Image.open(os.path.join(self.base_dir, 'screen.jpg')) as screen:
+            size = (max(1, round(self.full_width * zoom)), max(1, round(self.full_height * zoom)))
+            photo = ImageTk.PhotoImage(screen.resize(size, Image.LANCZOS))
+        self.canvas.delete('all')
+        self.tile_images = {'screen': photo}
+        self.canvas.create_image(0, 0, anchor="nw", image=photo)
+        self.canvas.configure(scrollregion=(0, 0, size[0], size[1]))
+
+    def zoom_by(self, factor):
+        """배율 변경 (화면 맞춤 ~ 원본 크기), 보이는 영역 중심 유지"""
+        current = self.zoom or self.fit_zoom()
+        new_zoom = min(max(current * factor, self.fit_zoom()), 1.0)
+        if new_zoom <= self.fit_zoom() * 1.001:
+            self.fit()
+            return
+        center_x = (self.canvas.canvasx(0) + self.canvas.winfo_width() / 2) / current
+        center_y = (self.canvas.canvasy(0) + self.canvas.winfo_height() / 2) / current
+
+        self.zoom = new_zoom
+        self.canvas.delete('all')
+        self.tile_images = {}
+        width, height = self.full_width * new_zoom, self.full_height * new_zoom
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+        self.canvas.xview_moveto(max(0.0, (center_x * new_zoom - self.canvas.winfo_width() / 2) / width))
+        self.canvas.yview_moveto(max(0.0, (center_y * new_zoom - self.canvas.winfo_height() / 2) / height))
+        self.load_visible_tiles()
+
+    def load_visible_tiles(self):
+        """현재 배율에 맞는 단계에서 보이는 타일만 로드 (이미 로드한 타일은 재사용)"""
+        if self.zoom is None:
+            return
+        # 배율 이상 해상도를 가진 가장 작은 단계
+        index = 0
+        for i, level in enumerate(self.levels):
+            if level['width'] / self.full_width >= self.zoom:
+                index = i
+        level = self.levels[index]
+        factor = self.zoom * self.full_width / level['width']
+        tile_pixels = self.tile_size * factor
+
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        right, bottom = left + self.canvas.winfo_width(), top + self.canvas.winfo_height()
+        for col in range(max(0, int(left // tile_pixels)), min(level['cols'], int(right // tile_pixels) + 1)):
+            for row in range(max(0, int(top // tile_pixels)), min(level['rows'], int(bottom // tile_pixels) + 1)):
+                key = (index, col, row)
+                if key in self.tile_images:
+                    continue
+                with Image.open(os.path.join(self.base_dir, str(index), f"{col}_{row}.jpg")) as tile:
+                    if abs(factor - 1.0) > 1e-3:
+                        tile = tile.resize((max(1, round(tile.width * factor)), max(1, round(tile.height * factor))),
+                                           Image.BILINEAR)
+                    photo = ImageTk.PhotoImage(tile)
+                self.tile_images[key] = photo
+                self.canvas.create_image(round(col * tile_pixels), round(row * tile_pixels), anchor="nw", image=photo)
+
+    def xview(self, *args):
+        """가로 스크롤 후 타일 로드"""
+        self.canvas.xview(*args)
+        self.load_visible_tiles()
+
+    def yview(self, *args):
+        """세로 스크롤 후 타일 로드"""
+        self.canvas.yview(*args)
+        self.load_visible_tiles()
+
+
+class InteractiveChartWindow:
+    """다중 비교 차트 대화형 창 - Figure를 창에 임베드하고 레이어(gid)별 표시 여부만 바꿔 다시 그리기"""
+
+    # (옵션 이름, 표시 이름) - 주석 외에는 메인 창 그래프 옵션과 같은 변수 사용
+    LAYER_TOGGLES = [
+        ('show_scatter_plot', '실거래'),
+        ('show_monthly_avg', '월평균'),
+        ('show_monthly_max', '월최고'),
+        ('show_price_bands', '가격대'),
+        ('show_region_index', '지역지수'),
+        ('show_jeonse', '전세'),
+        ('show_jeonse_scatter_plot', '전세 실거래'),
+        ('show_jeonse_monthly_avg', '전세 월평균'),
+        ('show_jeonse_monthly_max', '전세 월최고'),
+        ('show_annotations', '가격 주석'),
+    ]
+
+    def __init__(self, app, fig, ax, filename, apts=()):
+        self.app = app
+        self.fig = fig
+        self.ax = ax
+        self.filename = filename
+        self.apts = list(apts)  # 히스토리 기록용 아파트 정보
+
+        self.window = tk.Toplevel(app.root)
+        self.window.title(f"대화형 차트: {filename}")
+        self.window.geometry("1400x900")
+
+        self.show_annotations = tk.BooleanVar(value=True)
+        self.layer_vars = {name: self.show_annotations if name == 'show_annotations' else getattr(app, name)
+                           for name, _ in self.LAYER_TOGGLES}
+
+        # 레이어 토글 및 내보내기
+        layer_frame = ttk.Frame(self.window)
+        layer_frame.pack(side="top", fill="x", padx=10, pady=5)
+        for name, label in self.LAYER_TOGGLES:
+            ttk.Checkbutton(layer_frame, text=label, variable=self.layer_vars[name],
+                            command=self.apply_layers).pack(side="left", padx=4)
+        ttk.Button(layer_frame, text="💾 이미지 저장", command=self.export_image).pack(side="right", padx=5)
+
+        # 차트 캔버스 (확대/이동 툴바 포함)
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        self.canvas = FigureCanvasTkAgg(fig, master=self.window)
+        NavigationToolbar2Tk(self.canvas, self.window)
+        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.apply_layers()
+
+    def apply_layers(self):
+        """레이어 표시 여부 반영 - 아티스트 표시 속성만 바꾸고 캔버스는 한 번만 다시 그리기"""
+        values = {name: var.get() for name, var in self.layer_vars.items()}
+        for artist in self.ax.get_children():
+            required = CHART_LAYERS.get(artist.get_gid())
+            if required:
+                artist.set_visible(all(values[name] for name in required))
+        self.refresh_legend()
+        self.canvas.draw_idle()
+
+    def refresh_legend(self):
+        """보이는 레이어만 범례에 표시"""
+        handles, labels = self.ax.get_legend_handles_labels()
+        visible = [(handle, label) for handle, label in zip(handles, labels) if handle.get_visible()]
+        if visible:
+            self.ax.legend(*zip(*visible), **CHART_LEGEND_STYLE)
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+
+    def export_image(self):
+        """현재 보이는 레이어 그대로 이미지 저장 (렌더링 프로필의 고해상도 dpi)"""
+        path = filedialog.asksaveasfilename(parent=self.window, initialdir=self.app.download_path,
+                                            initialfile=self.filename, defaultextension=".jpg",
+                                            filetypes=[("JPEG 이미지", "*.jpg"), ("PNG 이미지", "*.png")])
+        if not path:
+            return
+        profile = RENDER_PROFILES.get(self.app.render_profile, RENDER_PROFILES[DEFAULT_RENDER_PROFILE])
+        dpi = profile['export_dpi'] or profile['preview_dpi']
+        try:
+            elapsed = render_figure(self.fig, path, dpi)
+            print(f"⏱ 대화형 차트 저장 {dpi}dpi: {elapsed:.2f}초 → {path}")
+            display = " vs ".join(f"{apt['apt_name']} ({apt['area']}㎡)" for apt in self.apts)
+            layers = {name: var.get() for name, var in self.layer_vars.items()}
+            self.app.record_history(path, "다중 아파트 비교 분석", display, 'multi', self.apts, layers)
+            self.app.history_list = self.app.load_history()
+            self.app.update_history_display()
+            show_topmost_info("저장 완료", f"이미지를 저장했습니다:\n{path}", parent=self.window)
+        except Exception as e:
+            show_topmost_error("오류", f"이미지 저장 중 오류 발생: {str(e)}", parent=self.window)
+
+    def close(self):
+        """창 닫기 (Figure 해제)"""
+        self.window.destroy()
+        self.fig.clear()
+
+
 class AptSelectDialog:
     def __init__(self, parent, apt_list, service_key, sigungu_code, dong, sido, sigungu, title="아파트 선택"):
         # parent가 RealEstateAnalyzerApp 인스턴스인 경우
@@ -6087,6 +9608,9 @@ class AptSelectDialog:
             self.parent = parent  # Tk 객체
             self.app = parent
 
+        # 작업 스레드 진행 상황 표시용 (앱의 UI 업데이트 대기열 공유)
+        self.ui = getattr(self.app, 'ui', None) or UIDispatcher(self.parent)
+
         self.service_key = service_key
         self.sigungu_code = sigungu_code
         self.dong = dong
@@ -6463,8 +9987,7 @@ class AptSelectDialog:
                         
                         # 진행 상태 업데이트
                         progress = min(100, (processed / total_requests) * 100)
-                        progress_bar['value'] = progress
-                        progress_window.update_idletasks()
+                        self.ui.set(progress_bar, value=progress)
                         
                         # 이미 충분한 데이터가 모였다면 나머지 요청은 건너뛰기
                         if len(areas) >= 5:
@@ -6514,8 +10037,7 @@ class AptSelectDialog:
                             continue
                 
                 # 데이터 처리 완료
-                progress_bar['value'] = 100
-                progress_window.update_idletasks()
+                self.ui.set(progress_bar, value=100)
                 
                 # 조회 결과를 캐시에 저장
                 self.apt_area_cache[apt_name] = sorted(list(areas), key=float)
@@ -6526,7 +10048,7 @@ class AptSelectDialog:
             # 창 닫기
             time.sleep(0.3)  # 약간의 지연
             if not cancel_flag[0]:
-                progress_window.destroy()
+                self.ui.call(progress_window.destroy)
         
         # 별도 스레드로 데이터 수집 실행
         import threading
@@ -6549,9 +10071,21 @@ class AptSelectDialog:
 
 
 def main():
+    # 벤치마크 모드 (GUI 없이 실행)
+    if '--benchmark-gap' in sys.argv:
+        benchmark_gap_analysis()
+        return
+
+    # 저장된 거래 내보내기 (GUI 없이 실행)
+    if '--export' in sys.argv:
+        export_cli(sys.argv[1:])
+        return
+
+    record_startup_timing('module', '모듈 최상위 코드', time.perf_counter() - _MODULE_LOAD_STARTED)
     app = RealEstateAnalyzerApp()
     app.root.mainloop()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 실행 파일(exe)에서 렌더링 워커 프로세스 지원
     main()
\ No newline at end of file